@@ -79,7 +79,25 @@ class TestLightningCore(unittest.TestCase):
         self.assertIsInstance(result, CompilationResult)
         self.assertTrue(result.success)
         self.assertIsNotNone(result.compiled_unit)
-    
+
+    def test_compile_python_ast(self):
+        """Test translated ASTs compile to code objects cached under the source hash"""
+        import ast
+        module = ast.parse("def main():\n    return sum(range(10))")
+
+        first = self.compiler.compile_python_ast("main = sum 0..9", module)
+        self.assertTrue(first.success)
+        namespace = {}
+        exec(first.compiled_unit.code_object, namespace)
+        self.assertEqual(namespace['main'](), 45)
+
+        second = self.compiler.compile_python_ast("main = sum 0..9", module)
+        self.assertIs(second.compiled_unit, first.compiled_unit)
+        self.assertEqual(second.compilation_time_ms, 0)
+        self.assertEqual(self.compiler.get_statistics()['code_objects'], 1)
+        # Code objects live in memory only, the on-disk index is untouched
+        self.assertEqual(self.compiler.get_statistics()['total_entries'], 0)
+
     def test_models(self):
         """Test Lightning models"""
         # Test CompiledUnit model
@@ -8,6 +8,10 @@ import sys
 import os
 import time
 import asyncio
+import pickle
+import tracemalloc
+import tempfile
+import json
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -21,9 +25,27 @@ from zeus import (
     PerformanceMonitor,
     HealthChecker,
     RegexCache,
+    ParseCache,
     SafeEvaluator
 )
+from zeus import zeus_ast
+from zeus.zeus_optimizer import resolve_level
+from zeus.zeus_resolver import resolve_function, resolve_statement
+from zeus.zeus_runtime import SlotFrame
+from zeus.zeus_write_buffer import WriteBehindBuffer
+from zeus.zeus_telemetry import TelemetryChannel
+from zeus import zeus_module_cache as module_cache
+from zeus.zeus_module_cache import set_module_cache
+from lightning import CacheManager
+from zeus.zeus_arrays import HAS_NUMPY, Range, storable
+from zeus.zeus_memo import MemoCache
+from zeus.zeus_purity import analyze_function, analyze_loop
+from zeus import zeus_parallel
+from zeus.zeus_exceptions import ZeusSyntaxError, ZeusRuntimeError, ZeusTypeError
+from lightning.lightning_models import OptimizationLevel
+from zeus.zeus_performance import get_performance_stats
 from zeus.zeus_cli import ZeusCLI as CLI
+from zeus.ermis_receiver import zeus_receiver
 
 
 class TestZeusCore(unittest.TestCase):
@@ -100,5 +122,1645 @@ class TestZeusCore(unittest.TestCase):
             self.evaluator.evaluate("1 / 0")
 
 
+class TestZeusParser(unittest.TestCase):
+    """Test Zeus parser AST shapes and parse-time scaling"""
+    
+    def setUp(self):
+        self.parser = ZeusParser()
+    
+    def _best_parse_time(self, code, runs=5):
+        """Best-of-N wall time for parsing code"""
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            self.parser.parse(code)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    
+    def test_operator_precedence(self):
+        """Test that * binds tighter than + and comparisons do not chain"""
+        ast = self.parser.parse("1 + 2 * 3")
+        self.assertEqual(ast.operator, "+")
+        self.assertEqual(ast.right.operator, "*")
+        
+        ast = self.parser.parse("a < b and c < d")
+        self.assertEqual(ast.operator, "and")
+        self.assertEqual(ast.left.operator, "<")
+        self.assertEqual(ast.right.operator, "<")
+    
+    def test_nested_arguments(self):
+        """Test that commas inside nested brackets do not split arguments"""
+        ast = self.parser.parse("f([1, 2], g(3, 4))")
+        self.assertEqual(ast.type, "function_call")
+        self.assertEqual(len(ast.arguments), 2)
+        self.assertEqual(len(ast.arguments[0].elements), 2)
+        self.assertEqual(len(ast.arguments[1].arguments), 2)
+    
+    def test_statement_shapes(self):
+        """Test statement AST shapes"""
+        ast = self.parser.parse("if x > 5 then y = 1 else y = 2")
+        self.assertIsInstance(ast, zeus_ast.If)
+        self.assertIsInstance(ast.then_branch, zeus_ast.Assign)
+        self.assertIsInstance(ast.else_branch, zeus_ast.Assign)
+        
+        ast = self.parser.parse("for i in range(3) do total = total + i")
+        self.assertEqual(ast.type, "for_loop")
+        self.assertEqual(ast.iterator, "i")
+        self.assertEqual(len(ast.body), 1)
+        
+        ast = self.parser.parse("double square 3")
+        self.assertEqual(ast.name, "double")
+        self.assertEqual(ast.arguments[0].name, "square")
+        self.assertNotIn("tokens_consumed", ast.to_dict())
+    
+    def test_program_blocks(self):
+        """Test programs parse into statements with indented blocks"""
+        module = self.parser.parse_program(
+            "# squares\n"
+            "def tri(n):\n"
+            "    t = 0\n"
+            "    for i in range(n) do\n"
+            "        t = t + i\n"
+            "    t\n"
+            "\n"
+            "if tri(4) > 5:\n"
+            "    big = 1\n"
+            "    small = 0\n"
+            "else if x: big = 2\n"
+            "else:\n"
+            "    big = 0\n"
+            "total = sum([1,\n"
+            "             2])\n"
+        )
+        self.assertIsInstance(module, zeus_ast.Module)
+        self.assertEqual(module.lines, (2, 8, 14))
+        tri, branch, total = module.body
+        self.assertEqual(len(tri.body), 3)
+        self.assertEqual(len(tri.body[1].body), 1)
+        self.assertIsInstance(branch.then_branch, zeus_ast.Block)
+        self.assertIsInstance(branch.else_branch, zeus_ast.If)
+        self.assertEqual(branch.else_branch.else_branch.expression.value, 0)
+        self.assertEqual(len(total.expression.arguments[0].elements), 2)
+
+    def test_program_syntax_errors(self):
+        """Test program syntax errors report their line"""
+        for code, line in [
+            ("x = 1\n  y = 2", 2),
+            ("x = 1\nfor i in range(3) do\nx = 1", 2),
+            ("else:\n  x = 1", 1),
+            ("x = 1\ny = 1 2", 2),
+        ]:
+            with self.subTest(code=code):
+                with self.assertRaises(ZeusSyntaxError) as raised:
+                    self.parser.parse_program(code)
+                self.assertEqual(raised.exception.line, line)
+
+    def test_parse_time_scales_linearly(self):
+        """Benchmark: 4x longer input should cost roughly 4x, not 16x"""
+        short_expr = "x = " + " + ".join(str(i) for i in range(500))
+        long_expr = "x = " + " + ".join(str(i) for i in range(2000))
+        ratio = self._best_parse_time(long_expr) / self._best_parse_time(short_expr)
+        self.assertLess(ratio, 8.0, f"Long expression parse grew {ratio:.1f}x for 4x input")
+        
+        short_nested = "f(" * 40 + "1" + ")" * 40
+        long_nested = "f(" * 160 + "1" + ")" * 160
+        ratio = self._best_parse_time(long_nested) / self._best_parse_time(short_nested)
+        self.assertLess(ratio, 8.0, f"Nested call parse grew {ratio:.1f}x for 4x depth")
+
+
+class TestAstNodes(unittest.TestCase):
+    """Test slotted AST nodes and their legacy dict form"""
+    
+    PROGRAM = "if total > 10 then result = f(total * 2, [1, 2, 3]) else result = -1"
+    
+    def setUp(self):
+        self.parser = ZeusParser()
+    
+    def _retained(self, build):
+        """Bytes and allocated blocks still held by the object build() returns"""
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            result = build()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        size = sum(stat.size_diff for stat in stats)
+        blocks = sum(stat.count_diff for stat in stats)
+        return result, size, blocks
+    
+    def test_nodes_are_immutable(self):
+        """Test nodes reject assignment and have no per-instance dict"""
+        ast = self.parser.parse("x = 1 + 2")
+        with self.assertRaises(AttributeError):
+            ast.variable = "y"
+        with self.assertRaises(AttributeError):
+            ast.expression.tag = "folded"
+        self.assertFalse(hasattr(ast, "__dict__"))
+        self.assertIsInstance(ast.expression.left, zeus_ast.Literal)
+    
+    def test_identifiers_are_interned(self):
+        """Test repeated names share one string object"""
+        first = self.parser.parse("counter_" + "name = 1")
+        second = self.parser.parse("counter_name + 1")
+        self.assertIs(first.variable, second.left.name)
+    
+    def test_dict_round_trip(self):
+        """Test to_dict() keeps the legacy shape and from_dict() restores the tree"""
+        ast = self.parser.parse(self.PROGRAM)
+        legacy = ast.to_dict()
+        self.assertEqual(legacy["type"], "if_statement")
+        self.assertEqual(legacy["then_branch"]["expression"]["arguments"][1]["type"], "list")
+        self.assertEqual(zeus_ast.from_dict(legacy).to_dict(), legacy)
+        self.assertEqual(pickle.loads(pickle.dumps(ast)).to_dict(), legacy)
+        self.assertEqual(zeus_ast.ErrorNode("Unexpected token").to_dict(), {"error": "Unexpected token"})
+        
+        assignment = zeus_ast.from_dict(
+            {"type": "assignment", "variable": "x", "value": {"type": "literal", "value": 1}}
+        )
+        self.assertEqual(assignment.expression.value, 1)
+        self.assertIsInstance(zeus_ast.from_dict({"type": "break"}), zeus_ast.ErrorNode)
+    
+    def test_analysis_uses_dict_form(self):
+        """Test analyze_code and validate_syntax still report on the dict form"""
+        interpreter = ZeusInterpreter()
+        analysis = interpreter.analyze_code("y = x / 0")
+        self.assertEqual(analysis["ast"]["type"], "assignment")
+        self.assertEqual(analysis["variables_used"], ["y", "x"])
+        validation = interpreter.validate_syntax("y = x / 0")
+        self.assertIn("Potential division by zero", validation["warnings"])
+    
+    def test_memory_and_allocations(self):
+        """Benchmark: a node tree holds far less memory and fewer blocks than its dict form"""
+        code = "x = " + " + ".join(f"f(v{i}, [{i}, 2])" for i in range(300))
+        tree, tree_bytes, tree_blocks = self._retained(lambda: self.parser.parse(code))
+        legacy, dict_bytes, dict_blocks = self._retained(tree.to_dict)
+        self.assertGreater(tree_bytes, 0)
+        self.assertLess(tree_bytes * 2, dict_bytes, f"{tree_bytes} vs {dict_bytes} bytes")
+        self.assertLess(tree_blocks, dict_blocks, f"{tree_blocks} vs {dict_blocks} blocks")
+
+
+class TestParseCache(unittest.TestCase):
+    """Test the shared AST cache"""
+    
+    def test_hits_on_normalized_source(self):
+        """Test that whitespace variants share one entry"""
+        cache = ParseCache(max_entries=10)
+        first = cache.parse("x = 1 + 2")
+        second = cache.parse("  x  =  1 +   2 ")
+        self.assertIs(first, second)
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+    
+    def test_lru_eviction(self):
+        """Test entry and byte limits evict least recently used entries"""
+        cache = ParseCache(max_entries=2)
+        cache.parse("a + 1")
+        cache.parse("b + 1")
+        cache.parse("a + 1")
+        cache.parse("c + 1")
+        stats = cache.get_stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        cache.parse("a + 1")
+        self.assertEqual(cache.get_stats()["hits"], 2)
+        
+        small = ParseCache(max_bytes=cache.get_stats()["bytes"] // 2 + 1)
+        small.parse("a + 1")
+        small.parse("b + 1")
+        self.assertEqual(small.get_stats()["size"], 1)
+    
+    def test_stats_in_performance_stats(self):
+        """Test parse cache statistics are exposed through get_performance_stats"""
+        stats = get_performance_stats("parse_cache")
+        self.assertIn("hit_rate", stats)
+        self.assertIn("parse_cache", get_performance_stats())
+
+
+class TestEvaluatorModes(unittest.TestCase):
+    """Differential tests: compiled closures, bytecode and the VM must match the tree-walker"""
+
+    PROGRAMS = [
+        ["1 + 2 * 3 - 4 / 2", "(1 + 2) * 3", "17 % 5", "-5 + 3"],
+        ["3 < 5", "3 >= 5", "1 == 1 and 2 != 3", "not 0", "True or False"],
+        ['"zeus" + " " + "olympus"', "[1, 2, 3 + 4]", "len([1, 2, 3])", "abs(-7)"],
+        ["x = 10", "y = x * 2 + 1", "x + y", "max(x, y, 3)"],
+        ["n = 4", "if n > 3 then big = 1 else big = 0", "big", "if n > 9 then big = 2"],
+        ["total = 0", "for i in range(10) do total = total + i", "total"],
+        ["i = 0", "while i < 25 do i = i + 1", "i"],
+        ["acc = 1", "for k in range(1, 6) do acc = acc * k", "acc"],
+        ["sq(5)", "sq(2) + sq(3)", "total = 0", "for i in range(4) do total = total + sq(i)", "total"],
+        ["fib(12)", "n = 5", "fib(n) + n"],
+        ["k = 3", "addk(4)", "for j in range(3) do k = addk(j)", "k"],
+        ["undefined_name"],
+        ["1 / 0", "z = 5", "z = z / 0", "z", "len(5)"],
+        ["1 + \"a\""],
+        ["tri(5)", "t = 100", "tri(4) + t", "t", "k = 1", "bump(5)", "k", "wrap(3)"],
+        ["s = 0", "for k in range(4) do s = s + addk(1)", "s", "k", "for q in [] do r = 1", "r"],
+    ]
+
+    # Operand type errors, raised directly and from inside functions
+    TYPE_ERRORS = ['"a" + 1', "1 < \"a\"", 'inc("a")', "sq([1])", "add(1)"]
+
+    # Programs the optimizer rewrites, run at every optimization level
+    OPTIMIZER_PROGRAMS = [
+        ["r = 3", "x = 2 * 3.14159 * r", "y = sqrt(16) + abs(-2) * r", "x + y"],
+        ["n = 2", "if true then a = n else a = 0", "if 1 > 2 then a = 5", "a", "if false then b = 1"],
+        ["n = 0", "while false do n = n + 1", "for q in [] do n = 9", "n"],
+        ["t = 0", "for i in range(6) do t = t + i * 1 + 0 - 0", "for i in range(3) do u = i + 1 + 2 - 4", "u"],
+        ["r = 2", "s = \"abc\"", "t = 0", "for i in range(5) do t = t + r * 3 + len(s) * i", "t"],
+        ["s = \"abcd\"", "i = 0", "while i < len(s) * 2 do i = i + 1", "i"],
+        ["m = 1", "t = 0", "for i in range(3) do for j in range(4) do t = t + m * 2 + i", "t"],
+        ["z = 0", "for i in range(0) do w = 1 / z", "for i in range(2) do w = 1 / z"],
+        ["v = 1.5", "f = v * 1 - 0", "g = not not (v < 2)", "g"],
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.functions["sq"] = cls.parser.parse("def sq(x): x * x")
+        cls.runtime.functions["fib"] = cls.parser.parse(
+            "def fib(n): if n < 2 then n else fib(n - 1) + fib(n - 2)"
+        )
+        cls.runtime.functions["addk"] = cls.parser.parse("def addk(a): a + k")
+        cls.runtime.functions["inc"] = cls.parser.parse("def inc(x): x + 1")
+        cls.runtime.functions["add"] = cls.parser.parse("def add(a, b): a + b")
+        # Multi-statement bodies, which the parser does not produce yet
+        cls.runtime.functions["tri"] = zeus_ast.FunctionDef("tri", ("n",), (
+            cls.parser.parse("t = 0"), cls.parser.parse("for i in range(n) do t = t + i"),
+            cls.parser.parse("t"),
+        ))
+        cls.runtime.functions["bump"] = cls.parser.parse("def bump(a): k = k + a")
+        cls.runtime.functions["wrap"] = zeus_ast.FunctionDef("wrap", ("a",), (
+            cls.parser.parse("b = a + 1"), cls.parser.parse("sq(b)"),
+        ))
+
+    def _run(self, evaluator, program):
+        """Run each statement in a fresh local scope, capturing results and errors"""
+        outcomes = []
+        # Memoized results would let one mode answer for another
+        self.runtime.memo.clear()
+        self.runtime.push_scope()
+        try:
+            for line in program:
+                ast = self.parser.parse(line)
+                try:
+                    outcomes.append(("ok", evaluator.evaluate_ast(ast, self.runtime)))
+                except Exception as e:
+                    outcomes.append((type(e).__name__, str(e)))
+            return outcomes, dict(self.runtime.scopes[-1])
+        finally:
+            self.runtime.pop_scope()
+
+    def test_modes_agree(self):
+        """Test all modes produce identical results, errors and variables"""
+        reference = Evaluator(mode="tree")
+        self.assertEqual(Evaluator().mode, "compiled")
+        for mode in ("compiled", "bytecode", "vm"):
+            evaluator = Evaluator(mode=mode)
+            for program in self.PROGRAMS:
+                with self.subTest(mode=mode, program=program):
+                    self.assertEqual(self._run(evaluator, program), self._run(reference, program))
+
+    def test_type_errors_agree(self):
+        """Test every mode raises the same exception type and message for operand type errors"""
+        for source in self.TYPE_ERRORS:
+            raised = {}
+            for mode in ("tree", "compiled", "bytecode", "tiered", "vm"):
+                self.runtime.memo.clear()
+                with self.subTest(mode=mode, source=source):
+                    with self.assertRaises(ZeusTypeError) as caught:
+                        Evaluator(mode=mode).evaluate_ast(self.parser.parse(source), self.runtime)
+                    raised[mode] = (type(caught.exception), str(caught.exception))
+            with self.subTest(source=source):
+                self.assertEqual(len(set(raised.values())), 1, raised)
+
+    def test_bytecode_loop_speed(self):
+        """Benchmark: a translated loop should beat the tree-walker by a wide margin"""
+        program = ["total = 0", "for i in range(20000) do total = total + i * 2"]
+        timings = {}
+        for mode in ("tree", "bytecode"):
+            evaluator = Evaluator(mode=mode)
+            start = time.perf_counter()
+            outcomes, variables = self._run(evaluator, program)
+            timings[mode] = time.perf_counter() - start
+            self.assertEqual(variables["total"], 399980000)
+        self.assertLess(timings["bytecode"] * 3, timings["tree"])
+
+    def test_optimizer_levels_agree(self):
+        """Test optimized programs match the unoptimized tree-walker at every level"""
+        reference = Evaluator(mode="tree")
+        expected = [self._run(reference, program) for program in self.OPTIMIZER_PROGRAMS]
+        for mode in ("compiled", "bytecode", "vm"):
+            for level in OptimizationLevel:
+                evaluator = Evaluator(mode=mode, optimization_level=level)
+                for program, outcome in zip(self.OPTIMIZER_PROGRAMS, expected):
+                    with self.subTest(mode=mode, level=level.name, program=program):
+                        self.assertEqual(self._run(evaluator, program), outcome)
+
+    def test_hoisting_speed(self):
+        """Benchmark: hoisting loop invariants beats re-evaluating them"""
+        program = ["r = 2", "s = \"abc\"", "t = 0",
+                   "for i in range(20000) do t = t + r * 3 + len(s) * 2 + sqrt(r * 8)"]
+        timings = {}
+        for level in (OptimizationLevel.NONE, OptimizationLevel.AGGRESSIVE):
+            evaluator = Evaluator(optimization_level=level)
+            best = None
+            for _ in range(3):
+                start = time.perf_counter()
+                outcomes, variables = self._run(evaluator, program)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[level] = best
+            self.assertEqual(variables["t"], 320000.0)
+        self.assertLess(timings[OptimizationLevel.AGGRESSIVE], timings[OptimizationLevel.NONE])
+
+    def test_programs_agree(self):
+        """Test a whole program module runs the same in every mode"""
+        module = self.parser.parse_program(
+            "total = 0\n"
+            "for i in range(6) do\n"
+            "    if i > 2:\n"
+            "        total = total + tri(i)\n"
+            "    else:\n"
+            "        total = total - 1\n"
+            "        last = i\n"
+            "total\n"
+        )
+        reference = None
+        for mode in ("tree", "compiled", "bytecode", "vm"):
+            self.runtime.push_scope()
+            try:
+                result = Evaluator(mode=mode).evaluate_ast(module, self.runtime)
+                outcome = (result, dict(self.runtime.scopes[-1]))
+            finally:
+                self.runtime.pop_scope()
+            with self.subTest(mode=mode):
+                self.assertEqual(outcome[0], 16)
+                if reference is not None:
+                    self.assertEqual(outcome, reference)
+            reference = outcome
+
+    def test_compiled_nodes_are_reused(self):
+        """Test a shared AST is compiled once and reused"""
+        evaluator = Evaluator()
+        ast = self.parser.parse("[1, 2] + [3]")
+        self.assertEqual(evaluator.evaluate_ast(ast, self.runtime), [1, 2, 3])
+        self.assertEqual(evaluator.evaluate_ast(ast, self.runtime), [1, 2, 3])
+        stats = evaluator.compiler.get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_unknown_mode(self):
+        """Test an unknown evaluation mode is rejected"""
+        with self.assertRaises(ValueError):
+            Evaluator(mode="jit")
+
+
+class TestScopeResolver(unittest.TestCase):
+    """Test variable slots for function locals and top-level loops"""
+
+    def setUp(self):
+        self.parser = ZeusParser()
+
+    def test_function_locals_get_slots(self):
+        """Test parameters and assigned names are resolved, free names are not"""
+        func = zeus_ast.FunctionDef("f", ("a",), (
+            self.parser.parse("b = a + k"),
+            zeus_ast.For("i", self.parser.parse("range(b)"), (
+                zeus_ast.Call("sq", (zeus_ast.Call("b", ()),)),
+            )),
+        ))
+        resolved, slots = resolve_function(func)
+        self.assertEqual(slots, {"a": 0, "b": 1, "i": 2})
+        assign = resolved.body[0]
+        self.assertIsInstance(assign, zeus_ast.LocalAssign)
+        self.assertIsInstance(assign.expression.left, zeus_ast.LocalVariable)
+        self.assertIsInstance(assign.expression.right, zeus_ast.Identifier)
+        loop = resolved.body[1]
+        self.assertIsInstance(loop, zeus_ast.LocalFor)
+        self.assertIsInstance(loop.body[0].arguments[0], zeus_ast.LocalArgument)
+
+    def test_top_level_loops_get_frames(self):
+        """Test outermost loops run in a frame, other statements are unchanged"""
+        ast = self.parser.parse("for i in range(3) do t = t + i")
+        frame = resolve_statement(ast)
+        self.assertIsInstance(frame, zeus_ast.LocalFrame)
+        self.assertEqual(frame.names, ("i", "t"))
+        ast = self.parser.parse("x = y + 1")
+        self.assertIs(resolve_statement(ast), ast)
+
+    def test_slot_frame_is_a_scope(self):
+        """Test a frame shows assigned slots and extra names as a mapping"""
+        frame = SlotFrame({"a": 0, "b": 1})
+        frame["a"] = 1
+        frame["c"] = 3
+        self.assertNotIn("b", frame)
+        self.assertEqual(dict(frame), {"a": 1, "c": 3})
+        self.assertIsNone(frame.get("b"))
+        frame.clear()
+        self.assertEqual(len(frame), 0)
+
+    def test_locals_skip_name_lookups(self):
+        """Test a compiled function reads its locals by slot, not through the runtime"""
+        runtime = Runtime()
+        runtime.functions["tri"] = zeus_ast.FunctionDef("tri", ("n",), (
+            self.parser.parse("t = 0"), self.parser.parse("for i in range(n) do t = t + i"),
+            self.parser.parse("t"),
+        ))
+        lookups = []
+        lookup_variable = runtime.lookup_variable
+        runtime.lookup_variable = lambda name, *args: lookups.append(name) or lookup_variable(name, *args)
+        self.assertEqual(Evaluator().evaluate_ast(self.parser.parse("tri(50)"), runtime), 1225)
+        self.assertEqual(lookups, [])
+        self.assertEqual(len(runtime.scopes), 1)
+
+
+class TestProgramExecution(unittest.TestCase):
+    """Test running whole programs and .zeus files"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.interpreter = ZeusInterpreter()
+        cls.interpreter.runtime.set_durability("memory")
+
+    def test_stream_program(self):
+        """Test statements run in order, yielding each value"""
+        results = list(self.interpreter.stream_program(
+            "def sq(x): x * x\nn = 0\nfor i in range(4) do\n    n = n + sq(i)\nn\n"
+        ))
+        self.assertEqual(results, ["Function sq defined", 0, 14, 14])
+
+    def test_execute_file(self):
+        """Test a .zeus file runs and returns its last value"""
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".zeus", delete=False) as f:
+            f.write("a = 2\nwhile a < 100:\n    a = a * a\na\n")
+        try:
+            self.assertEqual(self.interpreter.execute_file(f.name), 256)
+        finally:
+            os.unlink(f.name)
+
+    def test_errors_report_line(self):
+        """Test runtime errors name the failing line"""
+        with self.assertRaises(ZeusRuntimeError) as raised:
+            self.interpreter.execute_program("x = 1\n\ny = x / 0\n")
+        self.assertEqual(raised.exception.context, "line 3")
+        with self.assertRaises(ZeusSyntaxError):
+            self.interpreter.execute_program("y = (1")
+
+
+class RecordingErmis:
+    """Ermis stand-in that records stores and retrieves and simulates their round trip"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.stored = []
+        self.batches = []
+        self.values = {}
+        self.retrieved = []
+
+    def store(self, name, value, metadata=None):
+        time.sleep(self.latency)
+        self.stored.append((name, value))
+        self.values[name] = value
+        return True
+
+    def store_many(self, variables):
+        time.sleep(self.latency)
+        self.batches.append(list(variables))
+        for name, (value, metadata) in variables.items():
+            self.stored.append((name, value))
+            self.values[name] = value
+        return dict.fromkeys(variables, True)
+
+    def retrieve(self, name):
+        time.sleep(self.latency)
+        self.retrieved.append(name)
+        return self.values.get(name)
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Test write-behind persistence of global variables"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+
+    def _use(self, mode, latency=0.0, **options):
+        ermis = RecordingErmis(latency)
+        self.runtime.writes = WriteBehindBuffer(ermis, mode, **options)
+        return ermis
+
+    def test_writes_coalesce_per_name(self):
+        """Test repeated global assignments store the last value once"""
+        ermis = self._use("batched")
+        self.runtime.execute("for i in range(50) do x = i")
+        self.assertEqual(sorted(ermis.stored), [("i", 49), ("x", 49)])
+        ermis = self._use("batched")
+        evaluator = Evaluator(mode="tree")
+        evaluator.evaluate_ast(self.parser.parse("for i in range(50) do x = i"), self.runtime)
+        self.assertEqual(ermis.stored, [])
+        self.assertEqual(self.runtime.writes.get_stats()["coalesced"], 98)
+        self.assertEqual(self.runtime.flush(), 2)
+        self.assertEqual(ermis.stored, [("i", 49), ("x", 49)])
+
+    def test_flush_thresholds(self):
+        """Test a full buffer or an old pending write flushes"""
+        ermis = self._use("batched", max_pending=3)
+        for name in "abcde":
+            self.runtime.set_variable(name, 1)
+        self.assertEqual([name for name, _ in ermis.stored], ["a", "b", "c"])
+        self.assertEqual(ermis.batches, [["a", "b", "c"]])
+        ermis = self._use("batched", flush_interval=0.0)
+        self.runtime.set_variable("a", 2)
+        self.assertEqual(ermis.stored, [("a", 2)])
+        self.assertEqual(ermis.batches, [["a"]])
+
+    def test_flush_timer(self):
+        """Test pending writes are flushed after the interval without another write"""
+        ermis = self._use("batched", flush_interval=0.05)
+        self.runtime.set_variable("a", 1)
+        self.runtime.set_variable("b", 2)
+        self.assertEqual(ermis.stored, [])
+        deadline = time.time() + 5
+        while not ermis.stored and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(ermis.batches, [["a", "b"]])
+        self.assertEqual(self.runtime.writes.pending(), 0)
+
+    def test_durability_modes(self):
+        """Test sync stores every write and memory stores none"""
+        ermis = self._use("sync")
+        self.runtime.set_variable("a", 1)
+        self.runtime.set_variable("a", 2)
+        self.assertEqual(ermis.stored, [("a", 1), ("a", 2)])
+        ermis = self._use("memory")
+        self.runtime.set_variable("a", 3)
+        self.runtime.flush()
+        self.assertEqual(ermis.stored, [])
+        self.assertEqual(self.runtime.get_variable("a"), 3)
+        ermis = self._use("batched")
+        self.runtime.set_variable("a", 4)
+        self.runtime.set_durability("sync")
+        self.assertEqual(ermis.stored, [("a", 4)])
+        with self.assertRaises(ValueError):
+            self.runtime.set_durability("eventual")
+
+    def test_sync_failures(self):
+        """Test sync writes Ermis does not store count as failures, as a flush does"""
+        ermis = self._use("sync")
+        ermis.store = lambda name, value, metadata=None: name != "b"
+        for name in "abc":
+            self.runtime.set_variable(name, 1)
+        stats = self.runtime.writes.get_stats()
+        self.assertEqual((stats["writes"], stats["stored"], stats["failures"]), (3, 2, 1))
+        self.assertEqual(self.runtime.get_variable("b"), 1)
+
+    def test_loop_throughput(self):
+        """Benchmark: a global loop no longer pays a round trip per assignment"""
+        evaluator = Evaluator(mode="tree")
+        ast = self.parser.parse("for i in range(500) do x = i * 2")
+        timings = {}
+        for mode in ("sync", "batched"):
+            ermis = self._use(mode, latency=0.001)
+            start = time.perf_counter()
+            evaluator.evaluate_ast(ast, self.runtime)
+            self.runtime.flush()
+            timings[mode] = time.perf_counter() - start
+            self.assertEqual(ermis.stored[-1], ("x", 998))
+        self.assertLess(timings["batched"] * 10, timings["sync"])
+
+
+class LibraryErmis(RecordingErmis):
+    """Recording Ermis whose storage holds a function library"""
+
+    def __init__(self, functions):
+        super().__init__()
+        self.functions = functions
+
+    def query(self, query_type, query_data):
+        return self.functions if query_type == "list_functions" else None
+
+
+class TestMissingNames(unittest.TestCase):
+    """Test undefined names are not looked up in storage again"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.ermis = RecordingErmis()
+        cls.runtime = Runtime(cls.ermis)
+        cls.runtime.set_durability("sync")
+
+    def setUp(self):
+        self.ermis.retrieved.clear()
+        self.runtime.forget_missing()
+
+    def test_misses_are_remembered(self):
+        """Test a missing name costs one retrieve until Cronos reports it changed"""
+        for _ in range(3):
+            self.assertFalse(self.runtime.has_variable("typo"))
+        self.assertEqual(self.ermis.retrieved, ["typo"])
+        self.assertEqual(self.runtime.get_statistics()["missing"]["names"], 1)
+        self.ermis.values["typo"] = 7
+        self.assertFalse(self.runtime.has_variable("typo"))
+        zeus_receiver.handle_variable_changed({"type": "variable_changed", "data": {"name": "typo"}})
+        self.assertEqual(self.runtime.get_variable("typo"), 7)
+        self.assertEqual(self.ermis.retrieved, ["typo", "typo"])
+
+    def test_set_and_define_invalidate(self):
+        """Test a global assignment or definition in any runtime is seen by the others"""
+        other = Runtime(self.ermis)
+        self.assertFalse(other.has_variable("shared"))
+        self.runtime.execute("shared = 3")
+        self.assertEqual(other.get_variable("shared"), 3)
+        self.assertFalse(self.runtime.has_variable("helper"))
+        self.runtime.execute("def helper(x): x + 1")
+        self.assertNotIn("helper", self.runtime.missing)
+
+    def test_batched_write_reaches_others_when_stored(self):
+        """Test a runtime that misses a name while its write is buffered sees it once the write is flushed"""
+        writer, other = Runtime(self.ermis), Runtime(self.ermis)
+        writer.set_durability("batched")
+        self.assertFalse(other.has_variable("late"))
+        writer.set_variable("late", 5)
+        self.assertFalse(other.has_variable("late"))
+        self.assertEqual(self.ermis.retrieved, ["late"])
+        writer.flush()
+        self.assertEqual(other.get_variable("late"), 5)
+
+    def test_probe_throughput(self):
+        """Benchmark: probing an undefined name no longer waits on storage each time"""
+        self.ermis.latency = 0.001
+        self.runtime.set_durability("memory")
+        try:
+            evaluator = Evaluator(mode="tree")
+            # Without the missing-name cache every probe paid what the first one does
+            start = time.perf_counter()
+            evaluator.evaluate_ast(self.parser.parse("if has_typo then 1 else 0"), self.runtime)
+            one_probe = time.perf_counter() - start
+            self.runtime.forget_missing()
+
+            ast = self.parser.parse("for i in range(200) do if has_typo then 1 else 0")
+            start = time.perf_counter()
+            evaluator.evaluate_ast(ast, self.runtime)
+            looped = time.perf_counter() - start
+            print(f"\n  one probe {one_probe * 1000:.2f} ms, 200 probes {looped * 1000:.2f} ms")
+            self.assertLess(looped * 10, one_probe * 200)
+            self.assertEqual(self.ermis.retrieved.count("has_typo"), 2)
+        finally:
+            self.ermis.latency = 0.0
+            self.runtime.set_durability("sync")
+
+
+class TestTelemetry(unittest.TestCase):
+    """Test execution telemetry is batched off the critical path"""
+
+    def setUp(self):
+        self.parser = ZeusParser()
+        self.ermis = RecordingErmis()
+        self.sent = []
+
+    def _channel(self, **options):
+        options.setdefault("batch_size", 100)
+        options.setdefault("flush_interval", 60.0)
+        return TelemetryChannel(self.ermis, "s1", send=lambda message, msg_type: self.sent.append(message),
+                                **options)
+
+    def test_records_are_batched(self):
+        """Test queued records go out as one store and one learning message"""
+        channel = self._channel()
+        ast = self.parser.parse("1 + 2")
+        for n in range(10):
+            channel.record_execution(f"_exec_{n}", {"code": "1 + 2", "result": "3"})
+            channel.record_learning("1 + 2", ast, 3, {"session_id": "s1"})
+        self.assertEqual(self.ermis.stored, [])
+        self.assertEqual(channel.flush(), 20)
+        self.assertEqual(self.ermis.batches, [[f"_exec_{n}" for n in range(10)]])
+        self.assertEqual(self.ermis.values["_exec_0"], {"code": "1 + 2", "result": "3"})
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(len(self.sent[0]["records"]), 10)
+        self.assertEqual(self.sent[0]["records"][0]["parsed_ast"], ast.to_dict())
+
+    def test_background_sender(self):
+        """Test a full batch is sent without a flush"""
+        channel = self._channel(batch_size=4)
+        for n in range(4):
+            channel.record_execution(f"_exec_{n}", {"result": str(n)})
+        deadline = time.monotonic() + 5
+        while not self.ermis.stored and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.ermis.batches[0]), 4)
+        self.assertEqual(channel.pending(), 0)
+
+    def test_load_shedding(self):
+        """Test learning is sampled and shed first, then the oldest records"""
+        channel = self._channel(max_queued=8, sample=2)
+        ast = self.parser.parse("x")
+        for _ in range(20):
+            channel.record_learning("x", ast, None, {})
+        stats = channel.get_stats()
+        self.assertEqual((stats["sampled_out"], stats["pending"], stats["dropped"]), (10, 6, 4))
+        for n in range(4):
+            channel.record_execution(f"_exec_{n}", {})
+        self.assertEqual(channel.get_stats()["dropped"], 6)
+        channel.flush()
+        self.assertEqual(self.ermis.batches, [["_exec_0", "_exec_1", "_exec_2", "_exec_3"]])
+        self.assertEqual(len(self.sent[0]["records"]), 4)
+
+    def test_modes(self):
+        """Test sync sends before returning and off records nothing"""
+        channel = self._channel(mode="sync")
+        channel.record_execution("_exec_1", {})
+        self.assertEqual(self.ermis.stored, [("_exec_1", {})])
+        channel.set_mode("off")
+        channel.record_execution("_exec_2", {})
+        self.assertEqual(channel.flush(), 0)
+        self.assertEqual(len(self.ermis.stored), 1)
+        with self.assertRaises(ValueError):
+            channel.set_mode("eventual")
+
+    def test_failed_stores(self):
+        """Test records Ermis does not store count as failures, not as sent"""
+        self.ermis.store_many = lambda variables: {name: name != "_exec_1" for name in variables}
+        channel = self._channel()
+        for n in range(3):
+            channel.record_execution(f"_exec_{n}", {})
+        self.assertEqual(channel.flush(), 2)
+        stats = channel.get_stats()
+        self.assertEqual((stats["sent"], stats["failures"]), (2, 1))
+
+    def test_recording_latency(self):
+        """Benchmark: recording no longer waits on the store round trip"""
+        self.ermis.latency = 0.005
+        timings = {}
+        for mode in ("sync", "async"):
+            channel = self._channel(mode=mode)
+            start = time.perf_counter()
+            for n in range(20):
+                channel.record_execution(f"_exec_{n}", {})
+            timings[mode] = time.perf_counter() - start
+            channel.flush()
+        self.assertLess(timings["async"] * 10, timings["sync"])
+
+
+class TestModuleCache(unittest.TestCase):
+    """Test compiled Zeus units persist through Lightning's cache"""
+
+    PROGRAM = "def double(x): x * 2\ny = double(21)\ny + 1"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CacheManager(self.directory.name)
+        set_module_cache(self.cache)
+        module_cache.clear_stats()
+        self.parser = ZeusParser()
+        self.parses = 0
+
+    def tearDown(self):
+        set_module_cache(None)
+        self.directory.cleanup()
+
+    def _parse(self, code):
+        self.parses += 1
+        return self.parser.parse_program(code)
+
+    def test_program_is_parsed_once(self):
+        """Test a program is loaded from its artifact, also by a fresh cache on the same directory"""
+        first = module_cache.load_unit(module_cache.PROGRAM, self.PROGRAM, lambda: self._parse(self.PROGRAM))
+        set_module_cache(CacheManager(self.directory.name))
+        second = module_cache.load_unit(module_cache.PROGRAM, self.PROGRAM, lambda: self._parse(self.PROGRAM))
+        self.assertEqual(self.parses, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(first.to_dict(), second.to_dict())
+        stats = get_performance_stats()["module_cache"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+        self.assertEqual(self.cache.get_statistics()["by_type"], {"zeusc": 1})
+
+    def test_hits_leave_the_index_alone(self):
+        """Test loading a unit from its artifact does not rewrite the cache index"""
+        module_cache.load_unit(module_cache.PROGRAM, self.PROGRAM, lambda: self._parse(self.PROGRAM))
+        os.remove(self.cache.index_file)
+        for _ in range(3):
+            module_cache.load_unit(module_cache.PROGRAM, self.PROGRAM, lambda: self._parse(self.PROGRAM))
+        self.assertEqual(self.parses, 1)
+        self.assertEqual(module_cache.get_stats()["hits"], 3)
+        self.assertFalse(os.path.exists(self.cache.index_file))
+
+    def test_stale_and_invalid_artifacts(self):
+        """Test artifacts with another stamp are rebuilt and failed parses are not stored"""
+        digest = module_cache.source_hash(module_cache.PROGRAM, self.PROGRAM)
+        self.cache.store_zeus_unit(digest, pickle.dumps(("zeusc", 0, digest, "program", None)))
+        module_cache.load_unit(module_cache.PROGRAM, self.PROGRAM, lambda: self._parse(self.PROGRAM))
+        module_cache.load_unit(module_cache.PROGRAM, self.PROGRAM, lambda: self._parse(self.PROGRAM))
+        self.assertEqual(self.parses, 1)
+        self.assertEqual(module_cache.get_stats()["rejected"], 1)
+        for _ in range(2):
+            with self.assertRaises(ZeusSyntaxError):
+                module_cache.load_unit(module_cache.PROGRAM, "y = (1", lambda: self._parse("y = (1"))
+        self.assertEqual(self.parses, 3)
+
+    def test_function_library(self):
+        """Test a runtime loads its stored functions from the library's artifact"""
+        ermis = LibraryErmis([
+            {"name": "inc", "parameters": ["x"], "body": json.dumps([self.parser.parse("x + 1").to_dict()])},
+        ])
+        for _ in range(2):
+            runtime = Runtime(ermis)
+            runtime.set_durability("memory")
+            self.assertEqual(Evaluator().evaluate_ast(self.parser.parse("inc(41)"), runtime), 42)
+        stats = module_cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+
+class TestOptimizer(unittest.TestCase):
+    """Test the AST optimizer passes"""
+
+    def setUp(self):
+        self.parser = ZeusParser()
+
+    def _optimize(self, code, level=OptimizationLevel.STANDARD):
+        return Evaluator(optimization_level=level).optimizer.optimize(self.parser.parse(code))
+
+    def test_levels_match_lightning(self):
+        """Test levels accept Lightning's enum, integers and names"""
+        for level in OptimizationLevel:
+            self.assertEqual(resolve_level(level), level.value)
+            self.assertEqual(resolve_level(level.name), level.value)
+        self.assertEqual(Evaluator().optimizer.level, OptimizationLevel.STANDARD.value)
+        with self.assertRaises(ValueError):
+            resolve_level("extreme")
+        ast = self.parser.parse("x = 2 * 3")
+        self.assertIs(Evaluator(optimization_level=0).optimizer.optimize(ast), ast)
+
+    def test_constant_folding(self):
+        """Test literals and pure builtins fold, failing operations do not"""
+        ast = self._optimize("x = 2 * 3.14159 * r", OptimizationLevel.BASIC)
+        self.assertEqual(ast.expression.left.value, 2 * 3.14159)
+        self.assertEqual(ast.expression.right.name, "r")
+        self.assertEqual(self._optimize("sqrt(16) + abs(-2)").value, 6.0)
+        self.assertIsInstance(self._optimize("1 / 0"), zeus_ast.BinaryOp)
+        self.assertIsInstance(self._optimize("print(1)"), zeus_ast.Call)
+
+    def test_dead_branches(self):
+        """Test constant conditions drop the branch that cannot run"""
+        ast = self._optimize("if true then y = 1 else y = 2")
+        self.assertIsNone(ast.else_branch)
+        self.assertEqual(ast.then_branch.expression.value, 1)
+        self.assertEqual(self._optimize("if 1 > 2 then y = 1").value, "__STATEMENT_EXECUTED__")
+        self.assertIsNone(self._optimize("while false do n = n + 1").value)
+        self.assertIsInstance(self._optimize("if true then y = 1", OptimizationLevel.BASIC), zeus_ast.If)
+
+    def test_algebraic_simplification(self):
+        """Test identities only apply to operands known to be numbers"""
+        ast = self._optimize("for i in range(3) do t = t + (i + 1 + 2) * 1")
+        self.assertEqual(ast.body[0].expression.right.to_dict(),
+                         self.parser.parse("i + 3").to_dict())
+        # t may be a string or list, so t * 1 stays
+        self.assertEqual(self._optimize("x = t * 1").expression.operator, "*")
+
+    def test_loop_invariant_hoisting(self):
+        """Test invariants in pure loops are wrapped for one evaluation per run"""
+        ast = self._optimize("for i in range(3) do t = t + r * 2 + i", OptimizationLevel.AGGRESSIVE)
+        self.assertIsInstance(ast, zeus_ast.HoistedLoop)
+        self.assertEqual(ast.size, 1)
+        invariants = [n for n in zeus_ast.walk(ast) if isinstance(n, zeus_ast.InvariantRef)]
+        self.assertEqual(invariants[0].expression.to_dict(), self.parser.parse("r * 2").to_dict())
+
+        # Loops calling anything impure, and anything assigned in the loop, stay
+        ast = self._optimize("for i in range(3) do print(r * 2)", OptimizationLevel.AGGRESSIVE)
+        self.assertIsInstance(ast, zeus_ast.For)
+        ast = self._optimize("while i < 10 do i = i + 1", OptimizationLevel.AGGRESSIVE)
+        self.assertIsInstance(ast, zeus_ast.While)
+
+    def test_function_definitions_keep_source_form(self):
+        """Test definitions are stored unoptimized and their statements optimized when run"""
+        ast = self.parser.parse("def f(a): a + 2 * 3")
+        evaluator = Evaluator(optimization_level=OptimizationLevel.AGGRESSIVE)
+        self.assertIs(evaluator.optimizer.optimize(ast), ast)
+        optimized = evaluator.optimizer.optimize_function(ast)
+        self.assertEqual(optimized.body[0].right.value, 6)
+        self.assertIn("constant_folding", evaluator.optimizer.get_stats()["rewrites"])
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+class TestArrays(unittest.TestCase):
+    """Test NumPy-backed arrays and vectorized builtins"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+
+    def _run(self, mode, program):
+        evaluator = Evaluator(mode=mode)
+        self.runtime.push_scope()
+        try:
+            return [evaluator.evaluate_ast(self.parser.parse(line), self.runtime) for line in program]
+        finally:
+            self.runtime.pop_scope()
+
+    def test_operators_broadcast(self):
+        """Test arithmetic and math builtins run element-wise in every mode"""
+        program = ["a = array([1, 4, 9])", "b = sqrt(a) * 2 + 1", "b", "pow(range(4), 2)",
+                   "zeros(3) + [1, 2, 3]", "a > 3", "abs(range(3) - 2)", "log([1, 100], 10)"]
+        expected = [[3.0, 5.0, 7.0], [0, 1, 4, 9], [1.0, 2.0, 3.0],
+                    [False, True, True], [2, 1, 0], [0.0, 2.0]]
+        for mode in ("tree", "compiled", "bytecode"):
+            with self.subTest(mode=mode):
+                results = self._run(mode, program)[2:]
+                self.assertEqual([r.tolist() for r in results], expected)
+
+    def test_reductions(self):
+        """Test reductions return plain Python numbers, and scalars are unchanged"""
+        results = self._run("compiled", [
+            "a = array([2, 4, 9])", "sum(a)", "mean(a)", "max(a)", "min(a)",
+            "sum(range(1000001))", "max(range(10, 0, -3))", "mean([1, 2])", "max(3, 7)", "sqrt(16)",
+        ])
+        self.assertEqual(results[1:], [15, 5.0, 9, 2, 500000500000, 10, 1.5, 7, 4.0])
+        self.assertIs(type(results[1]), int)
+        self.assertIs(type(results[3]), int)
+
+    def test_range_stays_lazy(self):
+        """Test loops iterate a range as Python integers and values persist as lists"""
+        results = self._run("compiled", ["t = 0", "for i in range(5) do t = t + i", "t", "r = range(3)", "r"])
+        self.assertEqual(results[2], 10)
+        self.assertEqual(results[4], Range(3))
+        self.assertEqual(list(results[4]), [0, 1, 2])
+        self.assertEqual(storable(results[4]), range(3))
+        self.assertEqual(storable(Evaluator().builtins["array"]([1.5, 2])), [1.5, 2.0])
+
+    def test_vectorized_speed(self):
+        """Benchmark: vectorized math should beat the equivalent interpreted loop"""
+        program = ["t = 0", "for i in range(50000) do t = t + sqrt(i) * 2"]
+        start = time.perf_counter()
+        looped = self._run("compiled", program)[-1]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = self._run("compiled", ["sum(sqrt(range(50000)) * 2)"])[0]
+        vector_time = time.perf_counter() - start
+
+        self.assertAlmostEqual(vectorized, looped, delta=1e-6 * looped)
+        self.assertLess(vector_time * 5, loop_time)
+
+
+class FakePatternLearner:
+    """Stand-in for Athena's pattern learner that counts applications"""
+
+    def __init__(self, patterns):
+        self.patterns = {
+            name: type("Pattern", (), {"implementation": impl, "parameters": ["n"]})()
+            for name, impl in patterns.items()
+        }
+        self.applied = 0
+
+    def apply_pattern(self, name, arguments):
+        self.applied += 1
+        if self.patterns[name].implementation == "broken":
+            return "Error: broken"
+        return arguments["n"] * 2
+
+
+class TestMemoization(unittest.TestCase):
+    """Test purity analysis and memoized calls of pure functions and patterns"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+        cls.builtins = Evaluator().builtins
+
+    def setUp(self):
+        self.runtime.functions.clear()
+        self.runtime.memo = MemoCache()
+
+    def _define(self, *sources):
+        for source in sources:
+            node = self.parser.parse(source)
+            self.runtime.functions[node.name] = node
+
+    def _purity(self, name):
+        functions = self.runtime.functions
+        return analyze_function(name, functions[name], functions, self.builtins)
+
+    def test_purity_analysis(self):
+        """Test free reads, impure builtins and unknown callees make a function impure"""
+        self._define(
+            "def fib(n): if n < 2 then n else fib(n - 1) + fib(n - 2)",
+            "def addk(a): a + k",
+            "def show(a): print(a)",
+            "def maybe(a): if a then b = 1 else c = 2",
+            "def outer(a): inner(a) + sqrt(a)",
+        )
+        self.runtime.functions["tri"] = zeus_ast.FunctionDef("tri", ("n",), (
+            self.parser.parse("t = 0"), self.parser.parse("for i in range(n) do t = t + i"),
+            self.parser.parse("t"),
+        ))
+        self.runtime.functions["late"] = zeus_ast.FunctionDef("late", ("a",), (
+            self.parser.parse("if a then b = 1 else b = 2"), self.parser.parse("b + a"),
+        ))
+        self.assertTrue(self._purity("fib").pure)
+        self.assertTrue(self._purity("tri").pure)
+        self.assertTrue(self._purity("late").pure)
+        self.assertTrue(self._purity("maybe").pure)
+        self.assertEqual(self._purity("addk").reason, "reads non-local variable k")
+        self.assertEqual(self._purity("show").reason, "calls print")
+        self.assertFalse(self._purity("outer").pure)
+
+        self._define("def inner(a): a * 2")
+        self.assertTrue(self._purity("outer").pure)
+        self.assertEqual(dict(self._purity("outer").dependencies).keys(), {"outer", "inner"})
+
+    def test_recursion_is_memoized(self):
+        """Test every mode computes fib with one call per argument"""
+        self._define("def fib(n): if n < 2 then n else fib(n - 1) + fib(n - 2)")
+        for mode in ("tree", "compiled", "bytecode"):
+            with self.subTest(mode=mode):
+                self.runtime.memo.clear()
+                result = Evaluator(mode=mode).evaluate_ast(self.parser.parse("fib(60)"), self.runtime)
+                self.assertEqual(result, 1548008755920)
+                stats = self.runtime.memo.get_stats()["fib"]
+                self.assertEqual(stats["misses"], 61)
+                self.assertEqual(stats["size"], 61)
+
+    def test_impure_and_unhashable_calls_run(self):
+        """Test impure functions and list arguments are not memoized"""
+        self._define("def addk(a): a + k", "def total(xs): sum(xs)")
+        evaluator = Evaluator()
+        self.runtime.set_variable("k", 1)
+        self.assertEqual(evaluator.evaluate_ast(self.parser.parse("addk(1)"), self.runtime), 2)
+        self.runtime.set_variable("k", 5)
+        self.assertEqual(evaluator.evaluate_ast(self.parser.parse("addk(1)"), self.runtime), 6)
+        self.assertEqual(evaluator.evaluate_ast(self.parser.parse("total([1, 2])"), self.runtime), 3)
+        stats = self.runtime.memo.get_stats()
+        self.assertFalse(stats["addk"]["pure"])
+        self.assertEqual(stats["total"]["uncacheable"], 1)
+
+    def test_redefinition_invalidates(self):
+        """Test redefining a callee drops results that depended on it"""
+        self._define("def scale(a): a * 2", "def twice(a): scale(a) + 0")
+        evaluator = Evaluator()
+        call = self.parser.parse("twice(3)")
+        self.assertEqual(evaluator.evaluate_ast(call, self.runtime), 6)
+        self.assertEqual(evaluator.evaluate_ast(call, self.runtime), 6)
+        self.assertEqual(self.runtime.memo.get_stats()["twice"]["hits"], 1)
+        self._define("def scale(a): a * 3")
+        self.assertEqual(evaluator.evaluate_ast(call, self.runtime), 9)
+        self.assertEqual(self.runtime.memo.clear("twice"), 1)
+        self.assertEqual(self.runtime.memo.get_stats()["twice"]["size"], 0)
+
+    def test_patterns_are_memoized(self):
+        """Test pattern applications are cached unless they fail"""
+        learner = FakePatternLearner({"double": "{n} * 2", "broken": "broken"})
+        self.runtime.athena_brain = type("Brain", (), {"pattern_learner": learner})()
+        try:
+            for _ in range(3):
+                self.assertEqual(self.runtime.apply_pattern("double", {"n": 4}), 8)
+                self.runtime.apply_pattern("broken", {"n": 4})
+            self.assertEqual(learner.applied, 1 + 3)
+            self.assertEqual(self.runtime.memo.get_stats()["double"]["hits"], 2)
+        finally:
+            self.runtime.athena_brain = None
+
+
+class TestTrampoline(unittest.TestCase):
+    """Test deep recursion runs on the trampoline in compiled modes"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+
+    def setUp(self):
+        self.runtime.functions.clear()
+        self.runtime.memo = MemoCache(0)
+
+    def _define(self, *sources):
+        for source in sources:
+            node = self.parser.parse(source)
+            self.runtime.functions[node.name] = node
+
+    def _run(self, source, mode):
+        return Evaluator(mode=mode).evaluate_ast(self.parser.parse(source), self.runtime)
+
+    def test_tail_recursion_runs_in_constant_space(self):
+        """Test tail calls past the depth limit replace their caller's frame"""
+        self._define("def count(n, acc): if n == 0 then acc else count(n - 1, acc + n)")
+        for mode in ("compiled", "bytecode", "vm"):
+            with self.subTest(mode=mode):
+                self.assertEqual(self._run("count(200000, 0)", mode), 20000100000)
+                self.assertEqual(len(self.runtime.scopes), 1)
+
+    def test_deep_recursion(self):
+        """Test non-tail recursion far deeper than Python's stack"""
+        self._define("def total(n): if n == 0 then 0 else n + total(n - 1)")
+        for mode in ("compiled", "bytecode", "tiered"):
+            with self.subTest(mode=mode):
+                self.assertEqual(self._run("total(5000)", mode), 12502500)
+
+    def test_caller_variables_stay_visible(self):
+        """Test a tail callee reading a non-local variable keeps its callers' frames"""
+        self._define("def reach(n): if n == 0 then k else reach(n - 1)")
+        self.runtime.set_variable("k", 7)
+        self.assertEqual(self._run("reach(3000)", "compiled"), 7)
+
+    def test_max_depth(self):
+        """Test exceeding the depth limit raises and unwinds every frame"""
+        self._define("def total(n): if n == 0 then 0 else n + total(n - 1)")
+        evaluator = Evaluator(mode="compiled")
+        evaluator.trampoline.max_depth = 1000
+        with self.assertRaises(ZeusRuntimeError):
+            evaluator.evaluate_ast(self.parser.parse("total(5000)"), self.runtime)
+        self.assertEqual(len(self.runtime.scopes), 1)
+
+    def test_speed(self):
+        """Benchmark: deep tail recursion with memoization on, in time linear in the depth"""
+        self.runtime.memo = MemoCache()
+        self._define("def sumto(n, acc): if n == 0 then acc else sumto(n - 1, acc + n)")
+        times = {}
+        for depth in (10000, 100000):
+            start = time.perf_counter()
+            self.assertEqual(self._run(f"sumto({depth}, 0)", "compiled"), depth * (depth + 1) // 2)
+            times[depth] = time.perf_counter() - start
+            self.assertEqual(len(self.runtime.scopes), 1)
+
+        print(f"\n  sumto 1e4 deep {times[10000]:.2f}s, 1e5 deep {times[100000]:.2f}s")
+        # Copying pending memo entries into every tail call made this quadratic, 100x
+        self.assertLess(times[100000], times[10000] * 25)
+
+
+class TestVirtualMachine(unittest.TestCase):
+    """Test the bytecode compiler, the VM and its speed against the tree-walker"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+
+    def setUp(self):
+        self.runtime.functions.clear()
+        # Memoized results would hide the calls being measured
+        self.runtime.memo = MemoCache(0)
+        self.vm = Evaluator(mode="vm")
+
+    def _define(self, *sources):
+        for source in sources:
+            node = self.parser.parse(source)
+            self.runtime.functions[node.name] = node
+
+    def _run(self, source, evaluator=None):
+        return (evaluator or self.vm).evaluate_ast(self.parser.parse(source), self.runtime)
+
+    def _best_time(self, evaluator, program, runs):
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            for source in program:
+                result = self._run(source, evaluator)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def test_disassembly(self):
+        """Test code is compiled once and lists its jumps, slots and calls"""
+        self._define("def sq(x): x * x")
+        ast = self.parser.parse("for i in range(3) do t = sq(i)")
+        self.assertEqual(self.vm.evaluate_ast(ast, self.runtime), 4)
+        self.assertEqual(self.vm.evaluate_ast(ast, self.runtime), 4)
+        code = self.vm.vm.get_program(ast)
+        listing = self.vm.vm.disassemble(code)
+        for expected in ("ENTER_FRAME", "(i, t)", "FOR_ITER", "CALL_FUNCTION", "(sq/1)",
+                         "function sq:", "LOAD_LOCAL           0 (x)", "BINARY_OP            2 (*)"):
+            self.assertIn(expected, listing)
+        stats = self.vm.vm.get_stats()
+        self.assertEqual((stats["programs"], stats["functions"]), (1, 1))
+        self.assertEqual(stats["calls"], 6)
+
+    def test_deep_recursion(self):
+        """Test calls run on VM frames, not the Python stack"""
+        self._define("def total(n): if n == 0 then 0 else n + total(n - 1)")
+        self.assertEqual(self._run("total(20000)"), 200010000)
+        self.vm.trampoline.max_depth = 1000
+        with self.assertRaises(ZeusRuntimeError):
+            self._run("total(5000)")
+        self.assertEqual(len(self.runtime.scopes), 1)
+
+    def test_tail_calls(self):
+        """Test tail calls past the depth limit replace their caller's VM frame"""
+        self._define("def count(n, acc): if n == 0 then acc else count(n - 1, acc + n)",
+                     "def reach(n): if n == 0 then k else reach(n - 1)")
+        self.runtime.set_variable("k", 7)
+        self.vm.trampoline.max_depth = 1000
+        self.assertEqual(self._run("count(5000, 0)"), 12502500)
+        self.assertEqual(self.vm.vm.get_stats()["tail_calls"], 5000)
+        # A callee reading a non-local variable keeps its callers' frames
+        with self.assertRaises(ZeusRuntimeError):
+            self._run("reach(5000)")
+        self.assertEqual(len(self.runtime.scopes), 1)
+
+    def test_errors_unwind(self):
+        """Test an error inside calls and loops leaves scopes as the closures do"""
+        self._define("def inv(x): 10 / x")
+        self.runtime.set_variable("s", 0)
+        with self.assertRaises(ZeusRuntimeError):
+            self._run("for i in range(3, -3, -1) do s = s + inv(i)")
+        self.assertEqual(len(self.runtime.scopes), 1)
+        self.assertEqual(self.runtime.get_variable("i"), 0)
+        self.assertAlmostEqual(self.runtime.get_variable("s"), 10 / 3 + 5 + 10)
+
+    def test_speed(self):
+        """Benchmark: loops, recursion and arithmetic beat the tree-walker"""
+        self._define("def fib(n): if n < 2 then n else fib(n - 1) + fib(n - 2)")
+        tree = Evaluator(mode="tree")
+        cases = [
+            (["total = 0", "for i in range(20000) do total = total + i * 2"], 399980000),
+            (["fib(16)"], 987),
+            (["x = 3", "t = 0", "for i in range(5000) do t = t + x * i / 4 - (i - 1) * (x + 1) % 5"],
+             -40596875.0),
+        ]
+        for program, expected in cases:
+            timings = {}
+            for mode, evaluator in (("tree", tree), ("vm", self.vm)):
+                timings[mode], result = self._best_time(evaluator, program, 3)
+                self.assertEqual(result, expected)
+            with self.subTest(program=program):
+                self.assertLess(timings["vm"], timings["tree"])
+
+
+class TestInlineCaches(unittest.TestCase):
+    """Test operator sites specialize and call sites cache what their names resolve to"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+
+    def setUp(self):
+        self.runtime.functions.clear()
+        self.runtime.memo = MemoCache(0)
+        self.evaluator = Evaluator(mode="compiled")
+        self.caches = self.evaluator.compiler.inline_caches
+
+    def _define(self, source):
+        node = self.parser.parse(source)
+        self.runtime.functions[node.name] = node
+
+    def _run(self, source, evaluator=None):
+        return (evaluator or self.evaluator).evaluate_ast(self.parser.parse(source), self.runtime)
+
+    def test_specialize_and_deoptimize(self):
+        """Test a site specializes on stable types and gives the generic results once they change"""
+        self._define("def add(a, b): a + b")
+        self.assertEqual(self._run("for i in range(20) do t = add(i, 1)"), 20)
+        self.assertEqual(self.caches.specializations, 1)
+
+        self.assertEqual(self._run("add(0.5, 2)"), 2.5)
+        self.assertEqual(self._run('add("ab", "c")'), "abc")
+        self.assertEqual(self.caches.deoptimizations, 1)
+        with self.assertRaises(ZeusTypeError):
+            self._run('add("a", 1)')
+
+        self.assertEqual(self._run('for i in range(20) do s = add("x", "y")'), "xy")
+        self.assertEqual(self.caches.specializations, 2)
+
+    def test_constant_operands(self):
+        """Test sites with a literal operand agree with the tree-walker, errors included"""
+        program = [
+            "t = 0", "for i in range(30) do t = t + 2 * i - 1", "t < 500", "1 - t", 't + "a"',
+            "for i in range(10) do u = i / 2", "10 % 0",
+        ]
+        results = {}
+        for mode in ("tree", "compiled"):
+            outcomes = []
+            for line in program:
+                try:
+                    outcomes.append(self._run(line, Evaluator(mode=mode)))
+                except ZeusError as e:
+                    outcomes.append(type(e))
+            results[mode] = outcomes
+        self.assertEqual(results["compiled"], results["tree"])
+
+    def test_redefinition_invalidates(self):
+        """Test a call site resolves again after any function is defined or removed"""
+        self._define("def f(x): x + 1")
+        ast = self.parser.parse("f(1)")
+        self.assertEqual(self.evaluator.evaluate_ast(ast, self.runtime), 2)
+        self.assertEqual(self.evaluator.evaluate_ast(ast, self.runtime), 2)
+        self.assertEqual(self.caches.call_resolutions, 1)
+
+        self._define("def f(x): x + 2")
+        self.assertEqual(self.evaluator.evaluate_ast(ast, self.runtime), 3)
+        self._define("def g(x): x")
+        self.assertEqual(self.evaluator.evaluate_ast(ast, self.runtime), 3)
+        self.assertEqual(self.caches.call_resolutions, 3)
+
+        del self.runtime.functions["f"]
+        self.assertIsNone(self.evaluator.evaluate_ast(ast, self.runtime))
+
+    def test_fuzzy_pattern_resolved_once(self):
+        """Test a pattern name is matched once per site until a pattern is learned"""
+        learner = FakePatternLearner({"double": "{n} * 2"})
+        lookups = []
+        learner._find_closest_pattern = lambda name: lookups.append(name) or "double"
+        self.runtime.athena_brain = type("Brain", (), {"pattern_learner": learner})()
+        try:
+            self.assertEqual(self._run("for i in range(10) do t = dubble(i)"), 18)
+            self.assertEqual(lookups, ["dubble"])
+            self.assertEqual(learner.applied, 10)
+
+            learner.patterns["other"] = learner.patterns["double"]
+            self.assertEqual(self._run("for i in range(10) do t = dubble(i)"), 18)
+            self.assertEqual(lookups, ["dubble", "dubble"])
+        finally:
+            self.runtime.athena_brain = None
+
+    def test_speed(self):
+        """Benchmark: call-heavy and arithmetic loops run faster with inline caches"""
+        self._define("def fib(n): if n < 2 then n else fib(n - 1) + fib(n - 2)")
+        self._define("def sq(x): x * x")
+        for source, expected in (
+            ("fib(16)", 987),
+            ("for i in range(20000) do t = sq(i) + 1", 399960002),
+        ):
+            timings = {}
+            ast = self.parser.parse(source)
+            for enabled in (False, True):
+                evaluator = Evaluator(mode="compiled")
+                evaluator.compiler.inline_caches.enabled = enabled
+                evaluator.compiler.inline_caches.calls_enabled = enabled
+                best = None
+                for _ in range(3):
+                    start = time.perf_counter()
+                    result = evaluator.evaluate_ast(ast, self.runtime)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[enabled] = best
+                self.assertEqual(result, expected)
+            with self.subTest(source=source):
+                self.assertLess(timings[True], timings[False])
+
+
+class TestTiers(unittest.TestCase):
+    """Test tiered mode compiles hot functions and drops them on redefinition"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+
+    def setUp(self):
+        self.runtime.functions.clear()
+        self.runtime.memo = MemoCache(0)
+        self.evaluator = Evaluator(mode="tiered")
+        self.evaluator.tiers.promote_calls = 5
+
+    def tearDown(self):
+        self.evaluator.tiers.shutdown()
+
+    def _run(self, source):
+        return self.evaluator.evaluate_ast(self.parser.parse(source), self.runtime)
+
+    def _profile(self, name):
+        self.evaluator.tiers.wait()
+        return self.evaluator.tiers.get_stats()["functions"][name]
+
+    def test_hot_function_is_promoted(self):
+        """Test a function is compiled once called often enough, with the same results"""
+        self._run("def poly(x): x * x * 3 + x * 2 + 1")
+        self._run("poly(2)")
+        self.assertEqual(self._profile("poly")["tier"], "interpreted")
+
+        self.assertEqual(self._run("for i in range(10) do s = poly(i)"), 262)
+        profile = self._profile("poly")
+        self.assertEqual(profile["tier"], "bytecode")
+        self.assertEqual(profile["transitions"], {"interpreted->bytecode": 1})
+        self.assertEqual(self._run("for i in range(10) do s = poly(i)"), 262)
+        self.assertEqual(self._profile("poly")["calls"], 21)
+
+    def test_interpreted_tier_compiles_nothing(self):
+        """Test the closure compiler sees no function body before the function is promoted"""
+        node = self.parser.parse("def sq(x): x * x")
+        self.runtime.functions["sq"] = node
+        body = {id(child) for child in zeus_ast.walk(node)}
+        compiled = []
+        compiler = self.evaluator.compiler
+        for method in ("get", "compile", "get_function"):
+            def record(target, *args, _original=getattr(compiler, method), **kwargs):
+                compiled.append(id(target))
+                return _original(target, *args, **kwargs)
+            setattr(compiler, method, record)
+
+        for _ in range(self.evaluator.tiers.promote_calls - 1):
+            self.assertEqual(self._run("sq(3)"), 9)
+        self.assertEqual(self._profile("sq")["tier"], "interpreted")
+        self.assertTrue(compiled)
+        self.assertFalse(body.intersection(compiled))
+
+        self.assertEqual(self._run("sq(3)"), 9)
+        self.assertNotEqual(self._profile("sq")["tier"], "interpreted")
+
+    def test_redefinition_deoptimizes(self):
+        """Test a redefined function drops back to the interpreted tier"""
+        self._run("def f(x): x + 1")
+        self._run("for i in range(10) do f(i)")
+        self.assertEqual(self._profile("f")["tier"], "bytecode")
+
+        self._run("def f(x): x + 2")
+        self.assertEqual(self._run("f(1)"), 3)
+        profile = self._profile("f")
+        self.assertEqual(profile["tier"], "interpreted")
+        self.assertEqual(profile["transitions"], {"interpreted->bytecode": 1, "bytecode->interpreted": 1})
+        self.assertEqual(self.evaluator.tiers.get_stats()["deoptimizations"], 1)
+
+        self._run("for i in range(10) do f(i)")
+        self.assertEqual(self._profile("f")["transitions"]["interpreted->bytecode"], 2)
+        self.assertEqual(self._run("f(1)"), 3)
+
+    def test_recursion_across_tiers(self):
+        """Test recursive calls agree with compiled mode before and after promotion"""
+        self._run("def fact(n): if n < 2 then 1 else n * fact(n - 1)")
+        for _ in range(2):
+            self.assertEqual(self._run("fact(20)"), 2432902008176640000)
+        self.assertNotEqual(self._profile("fact")["tier"], "interpreted")
+        self.assertEqual(
+            Evaluator(mode="compiled").evaluate_ast(self.parser.parse("fact(20)"), self.runtime),
+            self._run("fact(20)"),
+        )
+
+
+class TestSequences(unittest.TestCase):
+    """Test lazy map, filter, take and zip pipelines"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+        cls.runtime.functions["sq"] = cls.parser.parse("def sq(x): x * x")
+        cls.runtime.functions["even"] = cls.parser.parse("def even(x): round(x / 2) * 2 == x")
+
+    def _run(self, source, mode="compiled"):
+        return Evaluator(mode=mode).evaluate_ast(self.parser.parse(source), self.runtime)
+
+    def test_pipeline_is_lazy(self):
+        """Test a pipeline over a huge range only computes the items it consumes"""
+        source = 'sum(take(1000, map("sq", filter("even", range(1000000000000)))))'
+        for mode in ("tree", "compiled", "bytecode"):
+            with self.subTest(mode=mode):
+                self.assertEqual(self._run(source, mode), sum((2 * i) ** 2 for i in range(1000)))
+
+    def test_lengths_and_reuse(self):
+        """Test sized sources give lengths and a sequence can be consumed twice"""
+        self.assertEqual(self._run('len(map("sq", range(10)))'), 10)
+        self.assertEqual(self._run("len(zip(range(3), [1, 2]))"), 2)
+        self.assertEqual(self._run("len(take(5, range(3)))"), 3)
+        with self.assertRaises(RuntimeError):
+            self._run('len(filter("even", range(10)))')
+        self._run('squares = map("sq", range(4))')
+        self.assertEqual(self._run("sum(squares)"), 14)
+        self.assertEqual(self._run("sum(squares)"), 14)
+        self.assertEqual(self._run("list(squares)"), [0, 1, 4, 9])
+
+    def test_consumers(self):
+        """Test loops, builtins and reductions pull items from sequences"""
+        self.assertEqual(self._run("for p in zip(range(3), [5, 6, 7]) do last = p"), (2, 7))
+        self.assertEqual(self._run('max(map("sq", [3, -5, 4]))'), 25)
+        self.assertEqual(self._run('list(take(2, map("sqrt", [4, 9, 16])))'), [2.0, 3.0])
+        self.assertEqual(storable(self._run('map("sq", range(3))')), "map(sq, range(0, 3))")
+
+    def test_constant_memory(self):
+        """Benchmark: summing a long pipeline allocates no list of its items"""
+        peaks = {}
+        for source in ('sum(map("abs", range(200000)))', 'sum(list(map("abs", range(200000))))'):
+            tracemalloc.start()
+            try:
+                self.assertEqual(self._run(source), 19999900000)
+                peaks[source] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        lazy, materialized = peaks.values()
+        print(f"\n  peak {lazy} bytes streamed, {materialized} bytes through a list")
+        self.assertLess(lazy * 10, materialized)
+
+
+class TestParallelFor(unittest.TestCase):
+    """Test parallel for loops and their dependency analysis"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ZeusParser()
+        cls.runtime = Runtime()
+        cls.runtime.set_durability("memory")
+        cls.runtime.functions["sq"] = cls.parser.parse("def sq(x): x * x")
+        cls.evaluators = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        for evaluator in cls.evaluators.values():
+            evaluator.parallel.shutdown()
+
+    def _evaluator(self, mode="compiled", parallel="explicit"):
+        evaluator = self.evaluators.get((mode, parallel))
+        if evaluator is None:
+            evaluator = self.evaluators[(mode, parallel)] = Evaluator(mode=mode, parallel=parallel)
+            # Workers are only used with more than one, whatever this machine has
+            evaluator.parallel.max_workers = 2
+            evaluator.parallel.min_iterations = 8
+        return evaluator
+
+    def _run(self, source, **options):
+        return self._evaluator(**options).evaluate_ast(self.parser.parse(source), self.runtime)
+
+    def test_parse(self):
+        """Test parallel only starts a loop before for"""
+        loop = self.parser.parse("parallel for i in range(4) do sq(i)")
+        self.assertIsInstance(loop, zeus_ast.ParallelFor)
+        self.assertTrue(loop.collect)
+        self.assertIsInstance(self.parser.parse("parallel = 3"), zeus_ast.Assign)
+
+    def test_dependency_analysis(self):
+        """Test loop-carried variables and impure calls make iterations dependent"""
+        functions, builtins = self.runtime.functions, Evaluator().builtins
+
+        def analyze(source):
+            loop = self.parser.parse(source)
+            return analyze_loop(loop.iterator, loop.body, functions, builtins)
+
+        self.assertTrue(analyze("for i in range(4) do sq(i) + k").pure)
+        self.assertTrue(analyze("for i in range(4) do y = sq(i)").pure)
+        self.assertEqual(analyze("for i in range(4) do t = t + i").reason, "reads non-local variable t")
+        self.assertEqual(analyze("for i in range(4) do print(i)").reason, "calls print")
+
+    def test_iterations_run_in_workers(self):
+        """Test results come back in order and variables hold the last iteration's values"""
+        self.runtime.set_variable("k", 10)
+        for mode in ("tree", "compiled", "bytecode"):
+            with self.subTest(mode=mode):
+                stats = self._evaluator(mode).parallel.get_stats()
+                result = self._run("parallel for i in range(20) do y = sq(i) + k", mode=mode)
+                self.assertEqual(result, [i * i + 10 for i in range(20)])
+                self.assertEqual(self.runtime.get_variable("i"), 19)
+                self.assertEqual(self.runtime.get_variable("y"), 371)
+                after = self._evaluator(mode).parallel.get_stats()
+                self.assertEqual(after["parallel_loops"], stats["parallel_loops"] + 1)
+
+    def test_dependent_loop_runs_in_order(self):
+        """Test a loop-carried variable keeps the loop in this process"""
+        self.runtime.set_variable("t", 0)
+        self.assertEqual(self._run("parallel for i in range(4) do t = t + i"), [0, 1, 3, 6])
+        self.assertEqual(self.runtime.get_variable("t"), 6)
+
+    def test_loop_control(self):
+        """Test a loop run in order stops at break and skips the rest of an iteration at continue"""
+        # print keeps the loop in this process
+        loop = self.parser.parse("parallel for i in range(6) do print(i)")
+        parallel = self._evaluator().parallel
+        seen = []
+        body = [
+            (lambda runtime: runtime.get_variable("i"), "continue"),
+            (lambda runtime: seen.append(runtime.get_variable("i")), None),
+        ]
+        self.assertEqual(parallel.run(loop, Range(6), self.runtime, body), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(seen, [])
+        body = [(lambda runtime: runtime.get_variable("i"), "break")] + body
+        self.assertEqual(parallel.run(loop, Range(6), self.runtime, body), [0])
+        self.assertEqual((self.runtime.get_variable("i"), seen), (0, []))
+
+    def test_chunks(self):
+        """Test ranges are split into ranges and lazy sequences a chunk at a time"""
+        chunks = list(zeus_parallel._chunks(Range(1000000000), 1000000000, 400000000))
+        self.assertEqual(chunks, [Range(0, 400000000), Range(400000000, 800000000),
+                                  Range(800000000, 1000000000)])
+        squares = self._evaluator().builtins["map"](lambda x: x * x, Range(5))
+        self.assertEqual(list(zeus_parallel._chunks(squares, 5, 2)), [[0, 1], [4, 9], [16]])
+
+    def test_errors_propagate(self):
+        """Test the first failing iteration's error is raised"""
+        with self.assertRaises(ZeusRuntimeError) as caught:
+            self._run("parallel for i in range(8) do 10 / (i - 5)")
+        self.assertIn("Division by zero", str(caught.exception))
+
+    def test_automatic(self):
+        """Test auto mode runs long independent for loops in workers"""
+        evaluator = self._evaluator(parallel="auto")
+        loops = evaluator.parallel.get_stats()["parallel_loops"]
+        self.assertEqual(self._run("for i in range(16) do sq(i)", parallel="auto"), 225)
+        self.assertEqual(self._run("for i in range(4) do sq(i)", parallel="auto"), 9)
+        self.assertEqual(evaluator.parallel.get_stats()["parallel_loops"], loops + 1)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -66,7 +66,7 @@ class UnifiedKnowledgeBase:
             }
         }
         
-        self.ermis_sender.send_request(request, 'cronos')
+        self.ermis_sender.send_request(request, 'cronos', wait_for_response=False)
 
     # Pattern Management
     def store_pattern(self, pattern: Dict[str, Any]):
@@ -283,7 +283,7 @@ class UnifiedKnowledgeBase:
             }
         }
         
-        self.ermis_sender.send_request(request, 'cronos')
+        self.ermis_sender.send_request(request, 'cronos', wait_for_response=False)
 
     def get_context(self, context_type: str = None) -> List[Dict[str, Any]]:
         """Retrieve context information."""
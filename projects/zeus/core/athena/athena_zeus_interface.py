@@ -63,4 +63,4 @@ class ZeusInterface:
         if response and response.get('status') == 'success':
             return response.get('result', None)
         else:
-            raise RuntimeError(f"Zeus execution failed: {response.get('error', 'Unknown error')}")
\ No newline at end of file
+            raise RuntimeError(f"Zeus execution failed: {(response or {}).get('error', 'No response')}")
\ No newline at end of file
@@ -6,7 +6,7 @@ Handles incoming messages from other gods through Ermis messenger system
 
 import asyncio
 import json
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, Callable, List, Optional
 from queue import Queue, Empty
 import threading
 
@@ -119,27 +119,33 @@ class AthenaErmisReceiver:
         
     def handle_learn_from_code(self, message: Dict[str, Any]):
         """Handle pattern learning from Zeus code execution"""
-        data = message.get('data', {})
-        code = data.get('code', '')
-        parsed_ast = data.get('parsed_ast', {})
-        result = data.get('result')
-        
+        self._learn_from_code([message.get('data', {})])
+
+    def handle_learn_from_code_batch(self, message: Dict[str, Any]):
+        """Handle pattern learning from a batch of Zeus code executions"""
+        self._learn_from_code(message.get('data', {}).get('records', []))
+
+    def _learn_from_code(self, records: List[Dict[str, Any]]):
+        """Learn from executed code records, each with code, parsed_ast and result"""
         # Forward to brain coordinator for pattern detection
         try:
             from .athena_coordinator import BrainCoordinator
             # Get or create coordinator instance
             if not hasattr(self, '_brain_coordinator'):
                 self._brain_coordinator = BrainCoordinator()
-                
-            # Create understanding structure for pattern detector
-            understanding = {
-                'parsed_ast': parsed_ast,
-                'intent': 'code_execution',
-                'code': code
-            }
-            
-            # Learn from the interaction
-            self._brain_coordinator._learn_from_interaction(code, understanding, result)
+
+            for data in records:
+                code = data.get('code', '')
+
+                # Create understanding structure for pattern detector
+                understanding = {
+                    'parsed_ast': data.get('parsed_ast', {}),
+                    'intent': 'code_execution',
+                    'code': code
+                }
+
+                # Learn from the interaction
+                self._brain_coordinator._learn_from_interaction(code, understanding, data.get('result'))
             
             # Debug: print pattern summary
             patterns_summary = self._brain_coordinator.pattern_detector.get_pattern_summary()
@@ -190,5 +196,6 @@ athena_receiver.register_handler('memory_sync', athena_receiver.handle_memory_sy
 athena_receiver.register_handler('system_check', athena_receiver.handle_system_check)
 athena_receiver.register_handler('unified_request', athena_receiver.handle_unified_request)
 athena_receiver.register_handler('learn_from_code', athena_receiver.handle_learn_from_code)
+athena_receiver.register_handler('learn_from_code_batch', athena_receiver.handle_learn_from_code_batch)
 athena_receiver.register_handler('get_usage_patterns', athena_receiver.handle_get_usage_patterns)
 athena_receiver.register_handler('learn_and_store', athena_receiver.handle_learn_and_store)
\ No newline at end of file
@@ -53,71 +53,35 @@ class AthenaErmisSender:
             msg_type = f"{self.god_name}_message"
         return self.messenger.send_message_full(self.god_name, target, content, msg_type)
         
-    def send_and_wait(self, target: str, content: Any, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    def send_and_wait(self, target: str, content: Any, timeout: float = 5.0,
+                      msg_type: str = None) -> Optional[Dict[str, Any]]:
         """Send message and wait for response"""
-        # Add a unique request ID
-        import uuid
-        request_id = str(uuid.uuid4())
-        content['request_id'] = request_id
-        content['requires_response'] = True
-        
-        # Send the message
-        if not self.send(target, content):
-            return None
-            
-        # Wait for response
-        # This is a simplified implementation - in production, we'd use proper async messaging
-        import time
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            # Check for response in messenger queue
-            # For now, return a mock response
-            # TODO: Implement proper response handling in Ermis
-            time.sleep(0.1)
-            
-        # Mock response for now
-        return {
-            'status': 'success',
-            'request_id': request_id,
-            'result': {},
-            'from': target
-        }
+        if msg_type is None:
+            msg_type = f"{self.god_name}_request"
+        success, response = self.messenger.send_request_with_response(
+            self.god_name, target, content, timeout, msg_type
+        )
+        return response if success else None
     
-    def send_request(self, request: Dict[str, Any], target: str) -> Optional[Dict[str, Any]]:
-        """Send a request and wait for response (for database operations)"""
-        # For now, this is a mock implementation
-        # In production, this would properly send through Ermis and wait for response
-        import uuid
-        request['request_id'] = str(uuid.uuid4())
-        request['from'] = self.god_name
-        
-        # Mock successful response for database operations
-        if request.get('type') == 'database_request':
-            operation = request.get('data', {}).get('operation')
-            if operation in ['store_variable', 'store_pattern', 'store_function', 'store_concept', 'create', 'update', 'delete']:
-                return {'success': True}
-            elif operation in ['get_variable', 'get_pattern', 'get_function', 'get_concept']:
-                # Return mock data
-                return {
-                    'success': True,
-                    'variable': {'name': 'mock', 'value': 42, 'type': 'int'},
-                    'pattern': {'name': 'mock', 'implementation': 'mock'},
-                    'function': {'name': 'mock', 'body': 'return 42'},
-                    'concept': {'id': 'mock', 'name': 'mock'}
-                }
-            elif operation in ['read', 'query', 'get_all_patterns']:
-                # Use the real messenger for database queries
-                result = self.messenger.request_and_wait(
-                    source=self.god_name,
-                    target=target,
-                    data=request.get('data', {}),
-                    msg_type=request.get('type', 'database_request'),
-                    timeout=5.0
-                )
-                return result
-        
-        return {'success': False, 'error': 'Mock implementation'}
+    def send_request(self, request: Dict[str, Any], target: str, timeout: float = 5.0,
+                     wait_for_response: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Send a request and wait for response (for database operations)
+
+        With wait_for_response False the request is only queued, for callers
+        that ignore the answer, and None is returned.
+        """
+        # The receiver gets the operation itself, typed by the request type
+        content, msg_type = request.get('data', {}), request.get('type', 'database_request')
+        if not wait_for_response:
+            self.messenger.send_message_full(self.god_name, target, content, msg_type)
+            return None
+        success, response = self.messenger.send_request_with_response(
+            self.god_name, target, content, timeout, msg_type
+        )
+        if success:
+            return response
+        return {'success': False, 'error': response}
         
     # Specific command methods
     def report_analysis_complete(self, analysis_id: str, results: Any) -> bool:
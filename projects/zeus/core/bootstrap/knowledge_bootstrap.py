@@ -76,31 +76,37 @@ class KnowledgeBootstrap:
             
         results = {}
         
-        # Bootstrap each domain
-        domains = [
-            ('mathematics', self.math_bootstrap),
-            ('patterns', self.patterns_bootstrap),
-            ('physics', self.physics_bootstrap)
-        ]
-        
-        for domain_name, bootstrapper in domains:
-            if verbose:
-                print(f"\n📚 Loading {domain_name.title()}...")
+        # Bulk loading goes in Ermis' background lane, behind interactive requests
+        priority, self.ermis.priority = getattr(self.ermis, 'priority', None), 'background'
+        
+        try:
+            # Bootstrap each domain
+            domains = [
+                ('mathematics', self.math_bootstrap),
+                ('patterns', self.patterns_bootstrap),
+                ('physics', self.physics_bootstrap)
+            ]
+        
+            for domain_name, bootstrapper in domains:
+                if verbose:
+                    print(f"\n📚 Loading {domain_name.title()}...")
                 
-            try:
-                result = bootstrapper.load()
-                results[domain_name] = result
-                self.loaded_domains.add(domain_name)
+                try:
+                    result = bootstrapper.load()
+                    results[domain_name] = result
+                    self.loaded_domains.add(domain_name)
                 
-                if verbose:
-                    self._print_domain_summary(domain_name, result)
-                    
-            except Exception as e:
-                self.logger.error(f"Failed to load {domain_name}: {e}")
-                results[domain_name] = {'status': 'failed', 'error': str(e)}
-                if verbose:
-                    print(f"   ❌ Failed: {e}")
+                    if verbose:
+                        self._print_domain_summary(domain_name, result)
                     
+                except Exception as e:
+                    self.logger.error(f"Failed to load {domain_name}: {e}")
+                    results[domain_name] = {'status': 'failed', 'error': str(e)}
+                    if verbose:
+                        print(f"   ❌ Failed: {e}")
+        finally:
+            self.ermis.priority = priority
+        
         if verbose:
             print("\n" + "=" * 40)
             print(f"✅ Bootstrap Complete! Loaded {len(self.loaded_domains)} domains")
@@ -55,7 +55,10 @@ class UnifiedCronosManager:
         
         handler = handlers.get(request_type)
         if handler:
-            return handler(data)
+            result = handler(data)
+            if request_type == 'store_variable' and result.get('success'):
+                self._announce_variable(data.get('name'), message.get('source'))
+            return result
         
         return {
             'success': False,
@@ -260,6 +263,18 @@ class UnifiedCronosManager:
                 'error': str(e)
             }
     
+    def _announce_variable(self, name: Optional[str], source: Optional[str]):
+        """Tell Zeus a variable changed, so runtimes that missed it look it up again."""
+        if not name or source == 'zeus':
+            # Zeus already knows about its own writes
+            return
+        try:
+            from .ermis_sender import cronos_sender
+            cronos_sender.send_to_zeus({'name': name}, 'variable_changed')
+        except Exception:
+            # Notifications are best effort, a runtime then keeps its misses
+            pass
+
     def _handle_get_variable(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle variable retrieval requests."""
         try:
@@ -22,6 +22,8 @@ class CronosErmisReceiver:
         self.running = False
         self.worker_thread = None
         self.scheduled_tasks = {}
+        # Replies held back while a storage batch runs, sent once it commits
+        self._held_replies = None
         # Initialize unified Cronos manager
         self.cronos_manager = UnifiedCronosManager()
         
@@ -148,14 +150,8 @@ class CronosErmisReceiver:
         # Forward entire message to unified manager
         result = self.cronos_manager.handle_ermis_request(message)
         
-        # Send response back through Ermis if there's a response_id
-        source = message.get('source', 'unknown')
-        response_id = message.get('response_id')
-        
-        if response_id and hasattr(self, 'sender'):
-            # Send response back
-            from .ermis_sender import cronos_sender
-            cronos_sender.send_response(source, result, response_id)
+        # Answer the requester if it waits for the result
+        self._reply(message, result)
         
         return result
         
@@ -176,6 +172,8 @@ class CronosErmisReceiver:
         # Store in Cronos database
         result = self.cronos_manager.handle_ermis_request({
             'type': 'store_variable',
+            # Who stored it, rather than Ermis which routed it
+            'source': data.get('original_sender', message.get('source')),
             'data': {
                 'name': name,
                 'value': value,
@@ -186,6 +184,52 @@ class CronosErmisReceiver:
         # Silently handle without printing unless error
         if not result.get('success', False):
             print(f"⚠️  Cronos failed to store {name}: {result.get('error', 'Storage failed')}")
+
+        self._reply(message, dict(result, status='success' if result.get('success') else 'error'))
+
+    def handle_retrieve_cascade(self, message: Dict[str, Any]):
+        """Handle retrieve requests, Cronos answering from the database"""
+        data = message.get('data', {})
+        actual_data = data.get('data', data)
+        
+        result = self.cronos_manager.handle_ermis_request({
+            'type': 'database_request',
+            'data': {'operation': 'get_variable', 'data': {'name': actual_data.get('name')}}
+        })
+        
+        if result.get('success'):
+            self._reply(message, {'status': 'success', 'value': result['variable']['value']})
+        else:
+            self._reply(message, {'status': 'error', 'error': result.get('error', 'Retrieval failed')})
+
+    def handle_storage_batch(self, message: Dict[str, Any]):
+        """Handle a batch of storage messages in one database transaction, then answer each"""
+        messages = message.get('data', {}).get('messages', [])
+        
+        self._held_replies = []
+        try:
+            with self.cronos_manager.db_adapter.transaction():
+                for item in messages:
+                    self._handle_message(item)
+            replies = self._held_replies
+        except Exception as e:
+            # Rolled back, so none of the batch was stored
+            error = f'Batch failed: {e}'
+            replies = [(item, {'success': False, 'status': 'error', 'error': error}) for item in messages]
+        finally:
+            self._held_replies = None
+        
+        from .ermis_sender import cronos_sender
+        for item, result in replies:
+            cronos_sender.reply(item, result)
+
+    def _reply(self, message: Dict[str, Any], result: Dict[str, Any]):
+        """Answer a message, or hold the answer until the running batch commits"""
+        if self._held_replies is not None:
+            self._held_replies.append((message, result))
+            return
+        from .ermis_sender import cronos_sender
+        cronos_sender.reply(message, result)
             
     def handle_cache(self, message: Dict[str, Any]):
         """Handle cache-only requests (usually for Lightning but routed through Cronos)"""
@@ -242,6 +286,8 @@ cronos_receiver.register_handler('timer_request', cronos_receiver.handle_timer_r
 cronos_receiver.register_handler('system_check', cronos_receiver.handle_system_check)
 cronos_receiver.register_handler('database_request', cronos_receiver.handle_database_request)
 cronos_receiver.register_handler('store_and_cache', cronos_receiver.handle_store_and_cache)
+cronos_receiver.register_handler('retrieve_cascade', cronos_receiver.handle_retrieve_cascade)
+cronos_receiver.register_handler('storage_batch', cronos_receiver.handle_storage_batch)
 cronos_receiver.register_handler('cache', cronos_receiver.handle_cache)
 cronos_receiver.register_handler('query_functions', cronos_receiver.handle_query_functions)
 cronos_receiver.register_handler('unified_request', cronos_receiver.handle_unified_request)
@@ -50,7 +50,13 @@ class CronosErmisSender:
     
     def send_response(self, target: str, response: Dict[str, Any], response_id: str) -> bool:
         """Send a response back to a requester"""
-        return self.messenger.send_response(self.god_name, target, response_id, response)
+        return self.messenger.send_response(
+            self.god_name, dict(response, request_id=response_id, response_to=target)
+        )
+
+    def reply(self, message: Dict[str, Any], result: Any) -> bool:
+        """Answer a received message if its sender waits for a response"""
+        return self.messenger.reply(self.god_name, message, result)
         
     # Specific command methods
     def notify_task_complete(self, task_id: str, target_god: str, result: Any = None) -> bool:
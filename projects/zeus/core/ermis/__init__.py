@@ -6,6 +6,7 @@ Central communication hub for Zeus ecosystem
 # Core messenger components
 from .ermis_messenger import ErmisMessenger, Message, get_messenger, messenger
 from .ermis_messenger import GODS, QUEUE_SIZE, TIMEOUT
+from .ermis_async import AsyncErmisMessenger, get_async_messenger, async_messenger
 
 # Adapter components
 from .ermis_adapters import (
@@ -40,6 +41,9 @@ __all__ = [
     'Message',
     'get_messenger',
     'messenger',
+    'AsyncErmisMessenger',
+    'get_async_messenger',
+    'async_messenger',
     # Adapters
     'MessageAdapter',
     'ZeusAdapter',
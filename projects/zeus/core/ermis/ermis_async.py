@@ -0,0 +1,232 @@
+"""
+Ermis Async - asyncio surface of the divine messenger
+Lets coroutines send, await requests and receive messages without a thread each
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import queue
+from typing import Dict, Any, Optional, Awaitable, Callable
+
+from .ermis_messenger import ErmisMessenger, Message, GODS, TIMEOUT, get_messenger
+from .ermis_correlation import correlator
+
+AsyncHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class _LoopReceiver:
+    """Stands in for an async god among the thread-based receivers, handing messages to the loop"""
+
+    def __init__(self, god: str, loop: asyncio.AbstractEventLoop, inbox: asyncio.Queue):
+        self.god = god
+        self.loop = loop
+        self.inbox = inbox
+        self.running = True
+
+    def receive_message(self, message: Dict[str, Any]) -> bool:
+        """Receive a message from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self.inbox.put_nowait, (self.god, message))
+            return True
+        except RuntimeError:
+            # The loop has been closed
+            self.running = False
+            return False
+
+
+class AsyncErmisMessenger:
+    """Asyncio messenger hosted on one event loop, bridged to the thread-based ErmisMessenger"""
+
+    def __init__(self, messenger: Optional[ErmisMessenger] = None):
+        self.messenger = messenger or get_messenger()
+        self.handlers: Dict[str, AsyncHandler] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.inbox: Optional[asyncio.Queue] = None
+        self.router_task = None
+        self.delivering = set()
+        self._replaced = {}
+
+    async def start(self):
+        """Start the router on the running event loop"""
+        if self.router_task:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.inbox = asyncio.Queue()
+        self.router_task = self.loop.create_task(self._route_messages())
+        await self._load_receivers()
+
+    async def stop(self):
+        """Stop the router and give the gods back their thread-based receivers"""
+        if not self.router_task:
+            return
+        self.router_task.cancel()
+        try:
+            await self.router_task
+        except asyncio.CancelledError:
+            pass
+        self.router_task = None
+        for god in list(self._replaced):
+            self._detach(god)
+
+    def register_receiver(self, god: str, handler: AsyncHandler):
+        """
+        Receive a god's messages with a coroutine.
+
+        Args:
+            god: God whose messages the handler takes over
+            handler: Coroutine called with each message dict; a dict it returns
+                answers the message when the sender awaits a response
+        """
+        if god not in GODS:
+            raise ValueError(f"Unknown god: {god}")
+        self.handlers[god] = handler
+        if self.router_task:
+            self.loop.call_soon_threadsafe(self._attach, god)
+
+    async def send(self, source: str, destination: str, content: Any, msg_type: str = "data") -> bool:
+        """Send a message through Ermis without blocking the event loop"""
+        messenger = self.messenger
+        if source not in GODS or destination not in GODS:
+            return False
+        if not messenger._receivers_loaded:
+            await self._load_receivers()
+        if destination in messenger.receivers:
+            # Thread-based receivers queue what they get, loop receivers hand it over
+            return messenger.send_message_full(source, destination, content, msg_type)
+
+        msg = Message(source, destination, content, msg_type)
+        try:
+            return messenger._enqueue(destination, msg, timeout=0)
+        except queue.Full:
+            # Only a full queue waits, and then in an executor thread
+            return await self._in_thread(self._enqueue_or_fail, destination, msg)
+
+    async def request(self, source: str, destination: str, content: Any, timeout: float = 5.0,
+                      msg_type: str = "request") -> Optional[Dict[str, Any]]:
+        """
+        Send a request and await its response.
+
+        Args:
+            source: God sending the request, which the response is addressed to
+            destination: God answering it
+            content: Request content; a dict gets request_id, requires_response
+                and response_to added, anything else is wrapped in {'data': ...}
+            timeout: Maximum time to wait for the response
+
+        Returns:
+            Response data or None on timeout
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Responses are matched on whichever thread they arrive, then resolved on the loop
+        pending = correlator.register(
+            source, destination, timeout,
+            callback=lambda response: loop.call_soon_threadsafe(_resolve, future, response),
+        )
+        data = dict(content) if isinstance(content, dict) else {'data': content}
+        data.update(request_id=pending.request_id, requires_response=True, response_to=source)
+        try:
+            if not await self.send(source, destination, data, msg_type):
+                return None
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            correlator.cancel(pending.request_id)
+
+    def request_threadsafe(self, source: str, destination: str, content: Any,
+                           timeout: float = 5.0) -> concurrent.futures.Future:
+        """Start a request on the messenger's loop from another thread; the future gets the response"""
+        if not self.router_task:
+            raise RuntimeError("Async messenger is not started")
+        return asyncio.run_coroutine_threadsafe(
+            self.request(source, destination, content, timeout), self.loop
+        )
+
+    def send_threadsafe(self, source: str, destination: str, content: Any,
+                        msg_type: str = "data") -> concurrent.futures.Future:
+        """Send a message on the messenger's loop from another thread"""
+        if not self.router_task:
+            raise RuntimeError("Async messenger is not started")
+        return asyncio.run_coroutine_threadsafe(
+            self.send(source, destination, content, msg_type), self.loop
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get async messenger statistics"""
+        return {
+            'running': self.router_task is not None,
+            'async_gods': sorted(self.handlers),
+            'queued': self.inbox.qsize() if self.inbox else 0,
+            'delivering': len(self.delivering),
+        }
+
+    async def _route_messages(self):
+        """Router task: hands each message to its god's handler without waiting for it"""
+        while True:
+            god, message = await self.inbox.get()
+            task = self.loop.create_task(self._deliver(god, message))
+            self.delivering.add(task)
+            task.add_done_callback(self.delivering.discard)
+
+    async def _deliver(self, god: str, message: Dict[str, Any]):
+        """Run a god's handler and send back its answer"""
+        handler = self.handlers.get(god)
+        if handler is None:
+            return
+        try:
+            response = await handler(message)
+        except Exception as e:
+            print(f"Error in async handler for {god}: {e}")
+            return
+
+        if response is not None:
+            self.messenger.reply(god, message, response)
+
+    async def _load_receivers(self):
+        messenger = self.messenger
+        if not messenger._receivers_loaded:
+            # Importing the gods' receivers is slow, so it runs off the loop
+            await self._in_thread(messenger._load_receivers)
+            messenger._receivers_loaded = True
+        if self.router_task:
+            for god in self.handlers:
+                self._attach(god)
+
+    def _attach(self, god: str):
+        receivers = self.messenger.receivers
+        current = receivers.get(god)
+        if not isinstance(current, _LoopReceiver):
+            self._replaced[god] = current
+        receivers[god] = _LoopReceiver(god, self.loop, self.inbox)
+
+    def _detach(self, god: str):
+        previous = self._replaced.pop(god)
+        if previous is None:
+            self.messenger.receivers.pop(god, None)
+        else:
+            self.messenger.receivers[god] = previous
+
+    def _enqueue_or_fail(self, destination: str, msg: Message) -> bool:
+        try:
+            return self.messenger._enqueue(destination, msg, timeout=TIMEOUT)
+        except queue.Full:
+            return False
+
+    async def _in_thread(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+
+def _resolve(future: asyncio.Future, response: Dict[str, Any]):
+    if not future.done():
+        future.set_result(response)
+
+
+# Global async messenger, sharing the global messenger
+async_messenger = AsyncErmisMessenger()
+
+
+def get_async_messenger() -> AsyncErmisMessenger:
+    """Get the global async messenger instance"""
+    return async_messenger
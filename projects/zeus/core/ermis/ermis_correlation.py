@@ -0,0 +1,187 @@
+"""
+Ermis Correlation - matches responses to the requests waiting for them
+One future per request, keyed by request id, with deadlines kept in a timer heap
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+# States of a response future
+PENDING = "pending"
+RESOLVED = "resolved"
+EXPIRED = "expired"
+CANCELLED = "cancelled"
+
+# Settled entries the heap may hold before it is rebuilt from the pending ones
+HEAP_SLACK = 64
+
+
+class ResponseFuture:
+    """A pending request, settled once: resolved with its response, expired or cancelled"""
+
+    __slots__ = ("request_id", "source", "destination", "deadline", "callback",
+                 "state", "response", "_done")
+
+    def __init__(self, request_id: str, source: str, destination: Optional[str],
+                 deadline: float, callback: Optional[Callable[[Any], None]]):
+        self.request_id = request_id
+        self.source = source
+        self.destination = destination
+        self.deadline = deadline
+        self.callback = callback
+        self.state = PENDING
+        self.response = None
+        # Held until the future settles, so waiters block on it with no condition or queue
+        self._done = threading.Lock()
+        self._done.acquire()
+
+    def done(self) -> bool:
+        return self.state != PENDING
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until settled, at most timeout seconds or else until the deadline; True if settled"""
+        if timeout is None:
+            timeout = self.deadline - time.monotonic()
+        if self._done.acquire(timeout=max(timeout, 0)):
+            self._done.release()
+            return True
+        return False
+
+    def result(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Wait for the response, None if the request expires, is cancelled or the wait times out"""
+        if self.wait(timeout) and self.state == RESOLVED:
+            return self.response
+        return None
+
+
+class Correlator:
+    """Single request-response correlation layer for every Ermis request"""
+
+    def __init__(self):
+        self.pending: Dict[str, ResponseFuture] = {}
+        self.lock = threading.Lock()
+        # Woken when a new earliest deadline is pushed
+        self._timer = threading.Condition(self.lock)
+        self._deadlines: List[Tuple[float, int, ResponseFuture]] = []
+        self._order = itertools.count()
+        # Ids are a random prefix and a counter, unique without a urandom call per request
+        self._id_prefix = uuid.uuid4().hex[:12]
+        self._ids = itertools.count(1)
+        self._timer_thread = None
+        self.stats = {RESOLVED: 0, EXPIRED: 0, CANCELLED: 0, 'unmatched': 0}
+
+    def register(self, source: str, destination: Optional[str] = None, timeout: float = 5.0,
+                 request_id: Optional[str] = None,
+                 callback: Optional[Callable[[Any], None]] = None) -> ResponseFuture:
+        """
+        Register a request that expects a response.
+
+        Args:
+            source: God waiting for the response
+            destination: God expected to answer, if known
+            timeout: Seconds until the request expires
+            request_id: Id the response will carry, a new one if not given
+            callback: Called with the response, on the resolving thread
+
+        Returns:
+            Future for the response, its request_id set
+        """
+        future = ResponseFuture(request_id or f"{self._id_prefix}-{next(self._ids)}", source, destination,
+                                time.monotonic() + timeout, callback)
+        with self.lock:
+            self.pending[future.request_id] = future
+            deadlines = self._deadlines
+            if len(deadlines) > HEAP_SLACK and len(deadlines) > 2 * len(self.pending):
+                # Most entries were settled before their deadline, drop them in one pass
+                deadlines[:] = [entry for entry in deadlines if entry[2].state == PENDING]
+                heapq.heapify(deadlines)
+            heapq.heappush(deadlines, (future.deadline, next(self._order), future))
+            if deadlines[0][2] is future:
+                if self._timer_thread is None:
+                    self._timer_thread = threading.Thread(target=self._expire_requests, daemon=True)
+                    self._timer_thread.start()
+                self._timer.notify()
+        return future
+
+    def resolve(self, request_id: Optional[str], response: Any) -> bool:
+        """Deliver a response; True if a pending request took it"""
+        with self.lock:
+            future = self.pending.pop(request_id, None)
+            if future is None:
+                self.stats['unmatched'] += 1
+                return False
+            self._settle(future, RESOLVED, response)
+        if future.callback:
+            try:
+                future.callback(response)
+            except Exception as e:
+                print(f"Error in response callback: {e}")
+        return True
+
+    def cancel(self, request_id: str) -> bool:
+        """Stop waiting for a request; True if it was still pending"""
+        with self.lock:
+            future = self.pending.pop(request_id, None)
+            if future is None:
+                return False
+            self._settle(future, CANCELLED)
+        return True
+
+    def wait(self, future: ResponseFuture, timeout: Optional[float] = None) -> Optional[Any]:
+        """Wait for a future's response, cancelling the request if none comes in time"""
+        response = future.result(timeout)
+        if not future.done():
+            self.cancel(future.request_id)
+        return response
+
+    def get_pending_count(self) -> int:
+        """Get number of pending requests"""
+        with self.lock:
+            return len(self.pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get correlation statistics"""
+        with self.lock:
+            oldest = min(self.pending.values(), key=lambda f: f.deadline, default=None)
+            return {
+                'pending_requests': len(self.pending),
+                'scheduled_deadlines': len(self._deadlines),
+                'oldest_request': oldest.request_id if oldest else None,
+                **self.stats,
+            }
+
+    def _settle(self, future: ResponseFuture, state: str, response: Any = None):
+        # Called with the lock held, after the future left pending
+        future.response = response
+        future.state = state
+        self.stats[state] += 1
+        future._done.release()
+
+    def _expire_requests(self):
+        """Timer thread: sleeps until the earliest deadline, then expires what is overdue"""
+        deadlines = self._deadlines
+        with self.lock:
+            while True:
+                if not deadlines:
+                    self._timer.wait()
+                    continue
+                deadline, _, future = deadlines[0]
+                if future.state != PENDING:
+                    heapq.heappop(deadlines)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._timer.wait(remaining)
+                    continue
+                heapq.heappop(deadlines)
+                if self.pending.get(future.request_id) is future:
+                    del self.pending[future.request_id]
+                self._settle(future, EXPIRED)
+
+
+# Global correlator instance
+correlator = Correlator()
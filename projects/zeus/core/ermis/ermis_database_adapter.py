@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 import os
 import threading
+from contextlib import contextmanager
 
 
 class ErmisDatabaseAdapter:
@@ -22,8 +23,10 @@ class ErmisDatabaseAdapter:
         os.makedirs(data_dir, exist_ok=True)
         self.db_path = os.path.join(data_dir, "memory.db")
         
-        # Thread lock for database operations
-        self._lock = threading.Lock()
+        # Thread lock for database operations, reentrant so a transaction can hold it across them
+        self._lock = threading.RLock()
+        # Set while a transaction runs, its operations then leave the commit to it
+        self._in_transaction = False
         
         self.conn = None
         self._init_database()
@@ -142,6 +145,29 @@ class ErmisDatabaseAdapter:
         
         self.conn.commit()
     
+    @contextmanager
+    def transaction(self):
+        """Run the requests made inside the block in one transaction, committed once at its end"""
+        with self._lock:
+            if self._in_transaction:
+                # Nested, the outer transaction commits
+                yield
+                return
+            self._in_transaction = True
+            try:
+                yield
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                self._in_transaction = False
+
+    def _commit(self):
+        """Commit a single operation, unless a transaction will"""
+        if not self._in_transaction:
+            self.conn.commit()
+
     def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle database requests from Ermis"""
         operation = request.get('operation', '')
@@ -207,7 +233,7 @@ class ErmisDatabaseAdapter:
                     VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (name, serialized_value, var_type, scope, now, now, metadata_json))
                 
-                self.conn.commit()
+                self._commit()
             
             return {'success': True, 'name': name}
         except Exception as e:
@@ -259,7 +285,7 @@ class ErmisDatabaseAdapter:
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (concept_id, name, description, attrs_json, rels_json, now, confidence))
             
-            self.conn.commit()
+            self._commit()
             return {'success': True, 'id': concept_id}
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -308,7 +334,7 @@ class ErmisDatabaseAdapter:
                     VALUES (?, ?, ?, ?, ?)
                 """, (name, pattern, implementation, now, metadata_json))
                 
-                self.conn.commit()
+                self._commit()
             
             return {'success': True, 'name': name}
         except Exception as e:
@@ -392,7 +418,7 @@ class ErmisDatabaseAdapter:
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (name, params_json, body, return_type, now, now, metadata_json))
             
-            self.conn.commit()
+            self._commit()
             return {'success': True, 'name': name}
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -434,7 +460,7 @@ class ErmisDatabaseAdapter:
             query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
             
             self.conn.execute(query, list(record.values()))
-            self.conn.commit()
+            self._commit()
             return {'success': True, 'table': table}
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -478,7 +504,7 @@ class ErmisDatabaseAdapter:
             params = list(updates.values()) + list(conditions.values())
             
             self.conn.execute(query, params)
-            self.conn.commit()
+            self._commit()
             return {'success': True, 'table': table}
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -493,7 +519,7 @@ class ErmisDatabaseAdapter:
             query = f"DELETE FROM {table} WHERE {' AND '.join(where_clauses)}"
             
             self.conn.execute(query, list(conditions.values()))
-            self.conn.commit()
+            self._commit()
             return {'success': True, 'table': table}
         except Exception as e:
             return {'success': False, 'error': str(e)}
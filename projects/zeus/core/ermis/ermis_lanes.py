@@ -0,0 +1,206 @@
+"""
+Ermis Lanes - per-god priority lanes with credit-based flow control
+Interactive traffic overtakes bulk work, producers are paced before a lane fills
+and droppable traffic is shed instead of holding anyone up
+"""
+
+import collections
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, Deque, Tuple
+
+# Lanes, highest priority first
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, NORMAL, BACKGROUND)
+
+# Messages a lane may hand out per round before the lanes below it get a turn
+LANE_WEIGHTS = {INTERACTIVE: 8, NORMAL: 4, BACKGROUND: 1}
+
+# Share of a lane's credits in use past which producers are paced
+HIGH_WATER = 0.75
+# Longest a paced producer waits for the router to take a message from its lane
+PACE = 0.001
+
+# Load shedding policies for droppable traffic
+DROP_NEWEST = "drop_newest"  # the arriving message is dropped
+DROP_OLDEST = "drop_oldest"  # the oldest droppable message in the lane makes room for it
+
+# Lane of message types that do not name one
+LANE_BY_TYPE = {
+    'response': INTERACTIVE,
+    'error_response': INTERACTIVE,
+    'learning_update': BACKGROUND,
+    'learning_schedule': BACKGROUND,
+    'learn_and_store': BACKGROUND,
+    'knowledge_share': BACKGROUND,
+    'memory_optimize': BACKGROUND,
+    'cache_update': BACKGROUND,
+    'performance_metrics': BACKGROUND,
+    'telemetry': BACKGROUND,
+    'system_check': BACKGROUND,
+    'time_sync': BACKGROUND,
+}
+
+# Droppable message types, shed by their policy once their lane is past high water
+SHED_POLICIES = {
+    'performance_metrics': DROP_OLDEST,
+    'telemetry': DROP_OLDEST,
+    'time_sync': DROP_OLDEST,
+    'system_check': DROP_NEWEST,
+}
+
+# Recent waits kept per lane for the percentiles
+WAIT_SAMPLES = 1024
+
+
+def classify(msg) -> str:
+    """Lane of a message: the one it names, else by its type, with awaited requests interactive"""
+    data = msg.data
+    lane = data.get('priority')
+    if lane in LANES:
+        return lane
+    lane = LANE_BY_TYPE.get(msg.msg_type)
+    if lane:
+        return lane
+    if msg.msg_type == 'unified_request' and data.get('intent') == 'learn':
+        return BACKGROUND
+    if msg.request_id or data.get('requires_response'):
+        return INTERACTIVE
+    return NORMAL
+
+
+class _Lane:
+    """One priority lane: queued messages with their enqueue times, one credit per free slot"""
+
+    __slots__ = ("name", "capacity", "high_water", "items", "turns", "drained", "waits", "stats")
+
+    def __init__(self, name: str, capacity: int, lock: threading.Lock):
+        self.name = name
+        self.capacity = capacity
+        self.high_water = max(int(capacity * HIGH_WATER), 1)
+        self.items: Deque[Tuple[float, Any]] = collections.deque()
+        self.turns = LANE_WEIGHTS[name]
+        # Signalled each time the router takes a message, returning a credit
+        self.drained = threading.Condition(lock)
+        self.waits: Deque[float] = collections.deque(maxlen=WAIT_SAMPLES)
+        self.stats = {'enqueued': 0, 'dequeued': 0, 'paced': 0, 'shed': 0, 'rejected': 0}
+
+
+class LaneQueue:
+    """A god's inbox: one bounded lane per priority, drained by weighted round robin"""
+
+    def __init__(self, capacity: int):
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._order = [_Lane(name, capacity, self._lock) for name in LANES]
+        self.lanes = {lane.name: lane for lane in self._order}
+        self._size = 0
+
+    def put(self, msg, timeout: Optional[float] = None) -> bool:
+        """
+        Queue a message in its lane.
+
+        Past high water, droppable messages are shed by their policy and others
+        are paced, waiting briefly for the router to take one. A full lane
+        makes the producer wait up to timeout for a credit.
+
+        Returns:
+            True if queued, False if the message was shed
+
+        Raises:
+            queue.Full: no credit came in time
+        """
+        lane = self.lanes[classify(msg)]
+        policy = SHED_POLICIES.get(msg.msg_type)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            if len(lane.items) >= lane.high_water:
+                if policy is not None:
+                    if not self._shed(lane, policy):
+                        return False
+                elif timeout != 0:
+                    lane.stats['paced'] += 1
+                    lane.drained.wait(PACE if deadline is None else min(PACE, max(deadline - time.monotonic(), 0)))
+
+            while len(lane.items) >= lane.capacity:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    lane.stats['rejected'] += 1
+                    raise queue.Full
+                lane.drained.wait(remaining)
+
+            lane.items.append((time.monotonic(), msg))
+            lane.stats['enqueued'] += 1
+            self._size += 1
+            self._not_empty.notify()
+        return True
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        """Take the next message by lane priority (raises queue.Empty)"""
+        with self._lock:
+            if not self._size:
+                if not block or not self._not_empty.wait_for(lambda: self._size, timeout):
+                    raise queue.Empty
+            return self._take()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        return not self._size
+
+    def qsize(self) -> int:
+        return self._size
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Depth, credits, counters and wait times of each lane, in seconds"""
+        with self._lock:
+            now = time.monotonic()
+            metrics = {}
+            for lane in self._order:
+                waits = sorted(lane.waits)
+                metrics[lane.name] = dict(
+                    lane.stats,
+                    depth=len(lane.items),
+                    credits=lane.capacity - len(lane.items),
+                    wait_p50=waits[len(waits) // 2] if waits else 0.0,
+                    wait_p99=waits[int(len(waits) * 0.99)] if waits else 0.0,
+                    oldest_wait=now - lane.items[0][0] if lane.items else 0.0,
+                )
+            return metrics
+
+    def _take(self):
+        # Called with the lock held and a message queued
+        lane = self._next_lane()
+        enqueued, msg = lane.items.popleft()
+        lane.turns -= 1
+        lane.stats['dequeued'] += 1
+        lane.waits.append(time.monotonic() - enqueued)
+        self._size -= 1
+        lane.drained.notify()
+        return msg
+
+    def _next_lane(self) -> _Lane:
+        """Weighted round robin: the first lane with messages and turns left, refilling turns once spent"""
+        for lane in self._order:
+            if lane.items and lane.turns > 0:
+                return lane
+        for lane in self._order:
+            lane.turns = LANE_WEIGHTS[lane.name]
+        for lane in self._order:
+            if lane.items:
+                return lane
+
+    def _shed(self, lane: _Lane, policy: str) -> bool:
+        """Apply a shedding policy to a lane past high water; True if the arriving message may be queued"""
+        lane.stats['shed'] += 1
+        if policy == DROP_OLDEST:
+            for index, (_, queued) in enumerate(lane.items):
+                if queued.msg_type in SHED_POLICIES:
+                    del lane.items[index]
+                    self._size -= 1
+                    return True
+        return False
@@ -12,14 +12,18 @@ import importlib
 import os
 import sys
 from .ermis_olympus import olympus, storage_router
-from .ermis_response_handler import response_handler
+from .ermis_correlation import correlator
+from .ermis_lanes import LaneQueue
 from .ermis_pipeline import pipeline_registry
-from .ermis_request_response import request_response_manager
 
 # Default configuration
 QUEUE_SIZE = 1000
 TIMEOUT = 1.0
 GODS = ['zeus', 'athena', 'cronos', 'lightning', 'ermis']
+# Storage operations for a god are held this long, or until this many wait, then sent as one batch
+BATCH_WINDOW = 0.001
+BATCH_SIZE = 64
+BATCH_MESSAGE = 'storage_batch'
 
 class Message:
     """Message structure for inter-component communication"""
@@ -41,11 +45,20 @@ class ErmisMessenger:
     def __init__(self):
         import logging
         self.logger = logging.getLogger(__name__)
-        self.queues = {god: queue.Queue(maxsize=QUEUE_SIZE) for god in GODS}
+        # Interactive, normal and background lanes per god, each with its own credits
+        self.queues = {god: LaneQueue(QUEUE_SIZE) for god in GODS}
+        # Signalled by every enqueue and by stop, the router sleeps on it
+        self._ready = threading.Condition()
         self.receivers = {}
         self.running = False
         self.router_thread = None
         self._receivers_loaded = False
+        # Storage operations waiting to go out as one batch message per god, router thread only
+        self.batch_window = BATCH_WINDOW
+        self.batch_size = BATCH_SIZE
+        self._batches: Dict[str, List[Dict[str, Any]]] = {}
+        self._batch_deadline = None
+        self.batch_stats = {'batches': 0, 'batched_messages': 0, 'failed_batches': 0}
         
     def _load_receivers(self):
         """Load all god receivers dynamically"""
@@ -77,18 +90,14 @@ class ErmisMessenger:
         self.router_thread = threading.Thread(target=self._route_messages)
         self.router_thread.daemon = True
         self.router_thread.start()
-        # Start response handler and request-response manager
-        response_handler.start()
-        request_response_manager.start()
         
     def stop(self):
         """Stop the messenger service"""
-        self.running = False
+        with self._ready:
+            self.running = False
+            self._ready.notify_all()
         if self.router_thread:
             self.router_thread.join()
-        # Stop response handler and request-response manager
-        response_handler.stop()
-        request_response_manager.stop()
             
     def send_message(self, channel: str, content: Any, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Send a message through Ermis (simplified API for tests)"""
@@ -136,6 +145,16 @@ class ErmisMessenger:
             self._load_receivers()
             self._receivers_loaded = True
         
+        # While the router runs everything goes through the lanes, so credits and shedding apply
+        if self.running:
+            # The router cannot wait for a credit only it would return
+            timeout = 0 if threading.current_thread() is self.router_thread else TIMEOUT
+            try:
+                return self._enqueue(destination, msg, timeout)
+            except queue.Full:
+                print(f"Ermis queue for {destination} is full, {msg_type} not sent")
+                return False
+
         # Direct delivery to receiver if available
         if destination in self.receivers:
             try:
@@ -151,8 +170,7 @@ class ErmisMessenger:
         else:
             # Fallback to queue
             try:
-                self.queues[destination].put(msg, timeout=TIMEOUT)
-                return True
+                return self._enqueue(destination, msg)
             except queue.Full:
                 return False
     
@@ -213,20 +231,16 @@ class ErmisMessenger:
         Returns:
             Response data or None
         """
-        import uuid
-        request_id = str(uuid.uuid4())
-        request['request_id'] = request_id
+        future = correlator.register(source, timeout=timeout)
+        request['request_id'] = future.request_id
         request['requires_response'] = True
-        
-        # Register request for response tracking
-        response_queue = response_handler.register_request(request_id, source, timeout)
+        request['response_to'] = source
         
         # Send the request
         if self.send_request(source, request):
-            # Wait for response
-            response = response_handler.wait_for_response(request_id, timeout)
-            return response
+            return correlator.wait(future)
         
+        correlator.cancel(future.request_id)
         return None
     
     def broadcast_message(self, source: str, content: Any, msg_type: str = "broadcast", exclude: List[str] = None) -> Dict[str, bool]:
@@ -242,59 +256,76 @@ class ErmisMessenger:
         return results
     
     def send_request_with_response(self, source: str, destination: str, content: Any, 
-                                  timeout: float = 30.0) -> Tuple[bool, Any]:
+                                  timeout: float = 30.0, msg_type: str = "request") -> Tuple[bool, Any]:
         """
         Send a request and wait for a response
         
         Args:
             source: Source component
             destination: Target component
-            content: Request content
+            content: Request content; a dict gets request_id, requires_response
+                and response_to added so the responder can answer
             timeout: Timeout in seconds
+            msg_type: Message type, 'unified_request' to have Ermis route it
             
         Returns:
             Tuple of (success, response_data)
         """
-        # Create request ID
-        request_id = request_response_manager.create_request(source, destination, timeout)
+        future = correlator.register(source, destination, timeout)
+        if isinstance(content, dict):
+            content = dict(content, request_id=future.request_id, requires_response=True,
+                           response_to=source)
         
         # Send message with request ID
-        msg = Message(source, destination, content, "request", request_id=request_id)
+        msg = Message(source, destination, content, msg_type, request_id=future.request_id)
         
         # Queue the message
         try:
-            self.queues[destination].put(msg, timeout=1.0)
-            
-            # Wait for response
-            return request_response_manager.wait_for_response(request_id, timeout)
-        except:
-            request_response_manager.cancel_request(request_id)
+            queued = self._enqueue(destination, msg)
+        except queue.Full:
+            queued = False
+        if not queued:
+            correlator.cancel(future.request_id)
             return False, "Failed to send request"
-    
-    def send_response(self, source: str, destination: str, request_id: str, content: Any) -> bool:
+
+        response = correlator.wait(future)
+        if future.state == 'resolved':
+            return True, response
+        return False, "Request timed out"
+
+    def send_requests_with_responses(self, source: str, destination: str, contents: List[Dict[str, Any]],
+                                     timeout: float = 30.0, msg_type: str = "request") -> List[Tuple[bool, Any]]:
         """
-        Send a response to a request
-        
-        Args:
-            source: Source component
-            destination: Target component (original requester)
-            request_id: The request ID this is responding to
-            content: Response content
-            
+        Send several requests at once and wait for all their responses
+
+        Every request is queued before any is awaited, so the router can batch
+        their storage operations and the sender waits one round trip, not one each.
+
         Returns:
-            True if response was sent
+            A (success, response_data) tuple per request, in order
         """
-        # Send response message
-        msg = Message(source, destination, content, "response", 
-                     request_id=request_id, is_response=True)
-        
-        try:
-            self.queues[destination].put(msg, timeout=1.0)
-            # Also handle through response manager
-            request_response_manager.handle_response(request_id, content)
-            return True
-        except:
-            return False
+        futures = []
+        for content in contents:
+            future = correlator.register(source, destination, timeout)
+            msg = Message(source, destination, dict(content, request_id=future.request_id, requires_response=True,
+                                                    response_to=source), msg_type, request_id=future.request_id)
+            try:
+                queued = self._enqueue(destination, msg)
+            except queue.Full:
+                queued = False
+            if not queued:
+                correlator.cancel(future.request_id)
+                future = None
+            futures.append(future)
+
+        results = []
+        for future in futures:
+            if future is None:
+                results.append((False, "Failed to send request"))
+                continue
+            response = correlator.wait(future)
+            results.append((True, response) if future.state == 'resolved' else (False, "Request timed out"))
+        return results
                 
     def receive_message(self, component: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """Receive a message for a component from queue (fallback method)"""
@@ -309,42 +340,63 @@ class ErmisMessenger:
         except queue.Empty:
             return None
         
+    def _enqueue(self, destination: str, msg: Message, timeout: float = TIMEOUT) -> bool:
+        """Queue a message in its lane and wake the router; False if it was shed (raises queue.Full)"""
+        if not self.queues[destination].put(msg, timeout=timeout):
+            return False
+        with self._ready:
+            self._ready.notify()
+        return True
+
+    def get_queue_metrics(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Depth, credits, shed and paced counts and wait times of every god's lanes"""
+        return {god: lanes.metrics() for god, lanes in self.queues.items()}
+
+    def _has_work(self) -> bool:
+        """Router wake-up condition, checked with the condition held"""
+        return not self.running or any(not q.empty() for q in self.queues.values())
+
     def _route_messages(self):
-        """Background thread that processes queued messages"""
-        while self.running:
-            try:
-                # Process messages in all queues
-                for god in GODS:
-                    try:
-                        msg = self.queues[god].get_nowait()
-                        
-                        # Check if this is a response
-                        if msg.msg_type == 'response' and hasattr(msg, 'request_id'):
-                            # Handle response through request-response manager
-                            if msg.request_id:
-                                request_response_manager.handle_response(msg.request_id, msg.content)
-                            # Also handle through legacy response handler
-                            if hasattr(msg, 'data'):
-                                response_handler.handle_response(msg.data)
-                        # Check if this is a unified request that needs Olympus routing
-                        elif msg.msg_type == 'unified_request' and hasattr(msg, 'data'):
-                            self._handle_unified_request(msg)
-                        else:
-                            # Normal message delivery
-                            if god in self.receivers and hasattr(self.receivers[god], 'running') and self.receivers[god].running:
-                                self.receivers[god].receive_message({
-                                    'source': msg.source,
-                                    'type': msg.msg_type,
-                                    'data': msg.data,
-                                    'timestamp': msg.timestamp
-                                })
-                    except queue.Empty:
-                        continue
-                        
-                time.sleep(0.001)  # Small delay to prevent CPU spinning
-                    
-            except Exception as e:
-                print(f"Ermis routing error: {e}")
+        """Background thread that processes queued messages, sleeping until one is enqueued"""
+        while True:
+            with self._ready:
+                # A put before the check is seen by it, one after it notifies us
+                self._ready.wait_for(self._has_work, self._batch_wait())
+            if not self.running:
+                self._flush_batches()
+                return
+
+            # One message per god per pass, so a busy god cannot starve the others
+            for god in GODS:
+                try:
+                    msg = self.queues[god].get_nowait()
+                except queue.Empty:
+                    continue
+                try:
+                    self._dispatch(god, msg)
+                except Exception as e:
+                    print(f"Ermis routing error: {e}")
+
+            if self._batch_deadline is not None and time.monotonic() >= self._batch_deadline:
+                self._flush_batches()
+
+    def _dispatch(self, god: str, msg: Message):
+        """Deliver one message taken from a god's queue"""
+        # Responses go to whoever waits for them
+        if msg.msg_type == 'response':
+            correlator.resolve(msg.request_id or msg.data.get('request_id'), msg.data)
+        # Check if this is a unified request that needs Olympus routing
+        elif msg.msg_type == 'unified_request' and hasattr(msg, 'data'):
+            self._handle_unified_request(msg)
+        else:
+            # Normal message delivery
+            if god in self.receivers and hasattr(self.receivers[god], 'running') and self.receivers[god].running:
+                self._deliver(god, {
+                    'source': msg.source,
+                    'type': msg.msg_type,
+                    'data': msg.data,
+                    'timestamp': msg.timestamp
+                })
     
     def _handle_unified_request(self, msg: Message):
         """Handle unified requests with intelligent routing and optional pipeline processing"""
@@ -427,16 +479,72 @@ class ErmisMessenger:
         if target in self.receivers:
             # Add response tracking if needed
             if original_msg.data.get('requires_response'):
-                data['response_id'] = original_msg.id
+                data['response_id'] = original_msg.request_id or original_msg.data.get('request_id')
                 data['response_to'] = original_msg.source
                 
-            self.receivers[target].receive_message({
+            self._deliver(target, {
                 'source': 'ermis',
                 'type': data.get('type', 'routed_request'),
                 'data': data,
                 'timestamp': time.time()
             })
     
+    def _deliver(self, target: str, message: Dict[str, Any]) -> bool:
+        """Hand a message to a god's receiver, holding storage operations back for its next batch"""
+        receiver = self.receivers[target]
+        if (self.batch_window > 0 and storage_router.is_batchable(message['type'])
+                and BATCH_MESSAGE in getattr(receiver, 'handlers', ())):
+            batch = self._batches.setdefault(target, [])
+            batch.append(message)
+            if self._batch_deadline is None:
+                self._batch_deadline = time.monotonic() + self.batch_window
+            if len(batch) >= self.batch_size:
+                self._flush_batch(target)
+            return True
+        if target in self._batches:
+            # Whatever was held for the god goes first, so it sees its messages in order
+            self._flush_batch(target)
+        return receiver.receive_message(message)
+
+    def _batch_wait(self) -> Optional[float]:
+        """Seconds the router may sleep before a batch is due, None when nothing is held"""
+        if self._batch_deadline is None:
+            return None
+        return max(self._batch_deadline - time.monotonic(), 0)
+
+    def _flush_batch(self, target: str):
+        """Send the storage operations held for a god as one message, failing each one if it is refused"""
+        messages = self._batches.pop(target)
+        if not self._batches:
+            self._batch_deadline = None
+        if len(messages) == 1:
+            batch = messages[0]
+        else:
+            self.batch_stats['batches'] += 1
+            self.batch_stats['batched_messages'] += len(messages)
+            batch = {
+                'source': 'ermis',
+                'type': BATCH_MESSAGE,
+                'data': {'messages': messages},
+                'timestamp': time.time()
+            }
+        try:
+            if self.receivers[target].receive_message(batch) is not False:
+                return
+            error = f'{target} refused the batch'
+        except Exception as e:
+            error = f'Batch delivery to {target} failed: {e}'
+        print(f"Ermis batch delivery error: {error}")
+
+        # The operations left the queue with the batch, so their waiters are answered here
+        self.batch_stats['failed_batches'] += 1
+        for message in messages:
+            self.reply('ermis', message, {'success': False, 'status': 'error', 'error': error})
+
+    def _flush_batches(self):
+        for target in list(self._batches):
+            self._flush_batch(target)
+
     def _send_error_response(self, original_msg: Message, error: str):
         """Send error response back to original sender"""
         if original_msg.source in self.receivers:
@@ -463,9 +571,26 @@ class ErmisMessenger:
         
         if not request_id or not response_to:
             return False
+
+        # A registered waiter takes the response directly, on this thread
+        if correlator.resolve(request_id, response_data):
+            return True
             
         # Send response message
         return self.send_message_full(source, response_to, response_data, 'response')
+
+    def reply(self, source: str, message: Dict[str, Any], result: Any) -> bool:
+        """Answer a received message if its sender waits for a response"""
+        data = message.get('data')
+        if not isinstance(data, dict):
+            return False
+        # Routed requests carry response_id, direct ones their own request_id
+        request_id = data.get('response_id') or (data.get('requires_response') and data.get('request_id'))
+        if not request_id:
+            return False
+        response = dict(result) if isinstance(result, dict) else {'result': result}
+        response.update(request_id=request_id, response_to=data.get('response_to'))
+        return self.send_response(source, response)
     
     def start_all_receivers(self):
         """Start all god receivers"""
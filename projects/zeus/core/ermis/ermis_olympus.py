@@ -309,9 +309,19 @@ class StorageRouter:
     Now with integrated validation.
     """
     
+    # Storage operations a god may be sent together, in one batch message
+    BATCHED_ACTIONS = frozenset({
+        'store_and_cache', 'store_function', 'cache', 'session_cache',
+        'retrieve_cascade', 'database_request',
+    })
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
+    def is_batchable(self, action: str) -> bool:
+        """Whether an operation may wait to be sent in a batch with others for the same god"""
+        return action in self.BATCHED_ACTIONS
+        
     def route_storage_request(self, intent: str, data: Dict[str, Any], sender: Optional[str] = None) -> Dict[str, Any]:
         """
         Route storage requests intelligently with validation.
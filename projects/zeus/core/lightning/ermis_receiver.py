@@ -175,6 +175,15 @@ class LightningErmisReceiver:
         # Lightning handles caching
         # Silently cache without printing
         pass
+        
+    def handle_retrieve_cascade(self, message: Dict[str, Any]):
+        """Handle retrieve requests - nothing is cached yet, so Cronos answers"""
+        pass
+        
+    def handle_storage_batch(self, message: Dict[str, Any]):
+        """Handle a batch of storage messages, one by one"""
+        for item in message.get('data', {}).get('messages', []):
+            self._handle_message(item)
 
 
 # Singleton instance
@@ -187,4 +196,6 @@ lightning_receiver.register_handler('performance_query', lightning_receiver.hand
 lightning_receiver.register_handler('compile_request', lightning_receiver.handle_compile_request)
 lightning_receiver.register_handler('system_check', lightning_receiver.handle_system_check)
 lightning_receiver.register_handler('store_and_cache', lightning_receiver.handle_store_and_cache)
-lightning_receiver.register_handler('cache', lightning_receiver.handle_cache)
\ No newline at end of file
+lightning_receiver.register_handler('cache', lightning_receiver.handle_cache)
+lightning_receiver.register_handler('retrieve_cascade', lightning_receiver.handle_retrieve_cascade)
+lightning_receiver.register_handler('storage_batch', lightning_receiver.handle_storage_batch)
\ No newline at end of file
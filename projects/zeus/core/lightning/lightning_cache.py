@@ -9,7 +9,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from .lightning_models import CompiledUnit, CodeType
+from .lightning_models import CompiledUnit, CodeType, OptimizationLevel
 
 class CacheManager:
     """Manages Lightning's cache of compiled code"""
@@ -96,6 +96,39 @@ class CacheManager:
         
         self._save_index()
         
+    def store_zeus_unit(self, source_hash: str, data: bytes, metadata: Optional[Dict[str, Any]] = None):
+        """Store a compiled Zeus unit (.zeusc artifact) under its source hash"""
+        file_path = os.path.join(self.cache_dir, f"{source_hash}.zeusc")
+        # Written aside and renamed, so a reader never sees half an artifact
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+        
+        self.store(CompiledUnit(
+            id=source_hash[:16],
+            source_hash=source_hash,
+            code_type=CodeType.ZEUS,
+            optimization_level=OptimizationLevel.NONE,
+            file_path=file_path,
+            metadata=metadata or {}
+        ))
+        
+    def get_zeus_unit(self, source_hash: str) -> Optional[bytes]:
+        """Get a compiled Zeus unit (.zeusc artifact) stored under source_hash
+
+        Read on every program load, so unlike get_cached it leaves the index
+        and its access times untouched instead of rewriting it on each hit.
+        """
+        cache_data = self.index.get(f"{source_hash}_{CodeType.ZEUS.value}")
+        if cache_data is None:
+            return None
+        try:
+            with open(cache_data['file_path'], 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+        
     def clear_cache(self, code_type: Optional[CodeType] = None):
         """Clear cache, optionally filtered by code type"""
         if code_type:
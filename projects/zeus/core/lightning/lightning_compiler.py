@@ -7,6 +7,8 @@ import py_compile
 import hashlib
 import tempfile
 import time
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from pathlib import Path
 
@@ -16,6 +18,9 @@ from .lightning_models import (
 )
 from .lightning_cache import CacheManager
 
+# Code objects kept in memory for translated-AST requests
+MAX_CODE_OBJECTS = 1024
+
 class LightningCompiler:
     """Main compiler for Lightning system"""
     
@@ -31,6 +36,10 @@ class LightningCompiler:
         self.cache_manager = CacheManager(cache_dir)
         self._ensure_directories()
         
+        # Code objects have no file on disk, so they are cached here
+        self._code_cache: "OrderedDict[str, CompiledUnit]" = OrderedDict()
+        self._code_lock = threading.Lock()
+        
     def _ensure_directories(self):
         """Ensure Lightning directories exist"""
         dirs = ['cache', 'compiled', 'bytecode', 'native', 'llvm', 'jit']
@@ -46,7 +55,10 @@ class LightningCompiler:
             source_hash = self._hash_source(request.source_code)
             
             # Check cache first
-            cached = self.cache_manager.get_cached(source_hash, request.target_type)
+            if request.python_ast is not None:
+                cached = self._get_code_object(source_hash, request.target_type)
+            else:
+                cached = self.cache_manager.get_cached(source_hash, request.target_type)
             if cached:
                 return CompilationResult(
                     success=True,
@@ -55,7 +67,9 @@ class LightningCompiler:
                 )
             
             # Compile based on target type
-            if request.target_type == CodeType.BYTECODE:
+            if request.target_type == CodeType.BYTECODE and request.python_ast is not None:
+                result = self._compile_python_ast(request, source_hash)
+            elif request.target_type == CodeType.BYTECODE:
                 result = self._compile_bytecode(request, source_hash)
             elif request.target_type == CodeType.NATIVE:
                 result = self._compile_native(request, source_hash)
@@ -75,7 +89,10 @@ class LightningCompiler:
             
             # Cache the result if successful
             if result.success and result.compiled_unit:
-                self.cache_manager.store(result.compiled_unit)
+                if result.compiled_unit.code_object is not None:
+                    self._store_code_object(result.compiled_unit)
+                else:
+                    self.cache_manager.store(result.compiled_unit)
                 
             return result
             
@@ -86,6 +103,17 @@ class LightningCompiler:
                 compilation_time_ms=(time.time() - start_time) * 1000
             )
             
+    def compile_python_ast(self, source_code: str, python_ast: Any, language: str = "zeus",
+                           metadata: Optional[Dict[str, Any]] = None) -> CompilationResult:
+        """Compile an ast.Module translated from source_code, cached under its source hash"""
+        return self.compile(CompilationRequest(
+            source_code=source_code,
+            language=language,
+            target_type=CodeType.BYTECODE,
+            metadata=metadata,
+            python_ast=python_ast
+        ))
+        
     def _hash_source(self, source: str) -> str:
         """Generate hash of source code"""
         return hashlib.sha256(source.encode()).hexdigest()
@@ -128,6 +156,48 @@ class LightningCompiler:
         except py_compile.PyCompileError as e:
             return CompilationResult(success=False, error=str(e))
             
+    def _compile_python_ast(self, request: CompilationRequest, source_hash: str) -> CompilationResult:
+        """Compile a Python AST straight to an in-memory code object"""
+        filename = request.metadata.get('filename', f'<{request.language}:{source_hash[:12]}>')
+        
+        try:
+            code = compile(
+                request.python_ast, filename, 'exec',
+                optimize=min(request.optimization_level.value, 2)
+            )
+        except (SyntaxError, ValueError, TypeError) as e:
+            return CompilationResult(success=False, error=str(e))
+            
+        unit = CompiledUnit(
+            id=source_hash[:16],
+            source_hash=source_hash,
+            code_type=CodeType.BYTECODE,
+            optimization_level=request.optimization_level,
+            file_path='',
+            metadata=request.metadata,
+            code_object=code
+        )
+        
+        return CompilationResult(success=True, compiled_unit=unit)
+        
+    def _get_code_object(self, source_hash: str, code_type: CodeType) -> Optional[CompiledUnit]:
+        """Get a cached in-memory code object"""
+        key = f"{source_hash}_{code_type.value}"
+        with self._code_lock:
+            unit = self._code_cache.get(key)
+            if unit is not None:
+                self._code_cache.move_to_end(key)
+            return unit
+            
+    def _store_code_object(self, unit: CompiledUnit):
+        """Cache an in-memory code object, evicting the least recently used"""
+        key = f"{unit.source_hash}_{unit.code_type.value}"
+        with self._code_lock:
+            self._code_cache[key] = unit
+            self._code_cache.move_to_end(key)
+            while len(self._code_cache) > MAX_CODE_OBJECTS:
+                self._code_cache.popitem(last=False)
+                
     def _compile_native(self, request: CompilationRequest, source_hash: str) -> CompilationResult:
         """Compile to native code (placeholder)"""
         # This would use Cython, Nuitka, or similar
@@ -157,4 +227,7 @@ class LightningCompiler:
         
     def get_statistics(self) -> Dict[str, Any]:
         """Get compilation statistics"""
-        return self.cache_manager.get_statistics()
\ No newline at end of file
+        stats = self.cache_manager.get_statistics()
+        with self._code_lock:
+            stats['code_objects'] = len(self._code_cache)
+        return stats
\ No newline at end of file
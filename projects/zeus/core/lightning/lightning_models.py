@@ -20,6 +20,7 @@ class CodeType(Enum):
     NATIVE = "native"          # .so/.dll
     LLVM_IR = "llvm_ir"        # LLVM intermediate
     JIT = "jit"                # Just-in-time compiled
+    ZEUS = "zeusc"             # Serialized Zeus AST (.zeusc)
 
 @dataclass
 class CompiledUnit:
@@ -34,6 +35,7 @@ class CompiledUnit:
     last_accessed: datetime = None
     execution_count: int = 0
     average_runtime_ms: float = 0.0
+    code_object: Any = None    # In-memory code object, never written to the index
     
     def __post_init__(self):
         if self.created_at is None:
@@ -50,6 +52,7 @@ class CompilationRequest:
     target_type: CodeType = CodeType.BYTECODE
     metadata: Dict[str, Any] = None
     request_id: Optional[str] = None
+    python_ast: Any = None     # ast.Module translated from another language
     
     def __post_init__(self):
         if self.metadata is None:
@@ -36,6 +36,9 @@ with suppress_stderr():
         zeus_sender
     )
     from zeus.zeus_cli import ZeusCLI as CLI
+    from zeus.zeus_exceptions import ZeusError
+    from zeus.zeus_py_compiler import set_lightning_compiler
+    from zeus.zeus_module_cache import set_module_cache
     from athena import (
         AthenaCore,
         athena_receiver,
@@ -47,6 +50,7 @@ with suppress_stderr():
         cronos_sender
     )
     from lightning import (
+        CacheManager,
         LightningManager,
         lightning_receiver,
         lightning_sender
@@ -72,6 +76,9 @@ class DivineOrchestrator:
         # Initialize core components
         print("  • Zeus (King of Gods)...")
         with suppress_stderr():
+            # Compiled Zeus units persist in Lightning's cache, attached before
+            # Zeus loads its function library
+            set_module_cache(CacheManager())
             self.components['zeus'] = {
                 'interpreter': ZeusInterpreter(),
                 'receiver': zeus_receiver,
@@ -102,6 +109,8 @@ class DivineOrchestrator:
                 'receiver': lightning_receiver,
                 'sender': lightning_sender
             }
+            # Zeus bytecode is compiled and cached by Lightning
+            set_lightning_compiler(self.components['lightning']['manager'].compiler)
         
         print("  • Ermis (Divine Messenger)...")
         with suppress_stderr():
@@ -195,6 +204,23 @@ class DivineOrchestrator:
         # Start CLI (blocks until exit)
         self.start_cli()
         
+    def run_file(self, path: str) -> int:
+        """Run a .zeus file without the CLI, returns the exit status"""
+        self.running = True
+
+        # Startup messages go to stderr, stdout belongs to the program
+        with contextlib.redirect_stdout(sys.stderr):
+            self.initialize_gods()
+            self.start_messaging_system()
+
+        interpreter = self.components['zeus']['interpreter']
+        try:
+            interpreter.execute_file(path)
+        except (ZeusError, OSError) as e:
+            print(f"❌ {path}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
     def stop(self):
         """Stop the orchestrator"""
         if not self.running:
@@ -227,7 +253,16 @@ class DivineOrchestrator:
 def main():
     """Main entry point"""
     orchestrator = DivineOrchestrator()
-    
+
+    # zeus run file.zeus
+    if len(sys.argv) > 2 and sys.argv[1] == 'run':
+        try:
+            status = orchestrator.run_file(sys.argv[2])
+        finally:
+            with contextlib.redirect_stdout(sys.stderr):
+                orchestrator.stop()
+        sys.exit(status)
+
     try:
         orchestrator.start()
     except Exception as e:
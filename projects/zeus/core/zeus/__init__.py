@@ -22,6 +22,7 @@ from .zeus_health import HealthMonitor
 # HealthChecker is an alias for HealthMonitor
 HealthChecker = HealthMonitor
 from .zeus_regex_cache import RegexCache
+from .zeus_parse_cache import ParseCache
 from common.safe_eval import SafeExpressionEvaluator
 # SafeEvaluator is an alias for SafeExpressionEvaluator
 SafeEvaluator = SafeExpressionEvaluator
@@ -44,6 +45,7 @@ __all__ = [
     "PerformanceMonitor",
     "HealthChecker",
     "RegexCache",
+    "ParseCache",
     "SafeEvaluator",
     # Messaging
     "zeus_receiver",
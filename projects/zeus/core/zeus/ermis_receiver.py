@@ -102,6 +102,13 @@ class ZeusErmisReceiver:
         # Process optimization
         print(f"Zeus optimizing with Lightning: {data}")
     
+    def handle_variable_changed(self, message: Dict[str, Any]):
+        """Handle Cronos reporting a stored variable changed, so runtimes look it up again"""
+        from .zeus_runtime import forget_missing
+
+        data = message.get('data', {})
+        forget_missing(data.get('name'))
+
     def handle_system_check(self, message: Dict[str, Any]):
         """Handle system check messages"""
         data = message.get('data', {})
@@ -121,4 +128,5 @@ zeus_receiver = ZeusErmisReceiver()
 zeus_receiver.register_handler('athena_request', zeus_receiver.handle_athena_request)
 zeus_receiver.register_handler('cronos_schedule', zeus_receiver.handle_cronos_schedule)
 zeus_receiver.register_handler('lightning_optimize', zeus_receiver.handle_lightning_optimize)
-zeus_receiver.register_handler('system_check', zeus_receiver.handle_system_check)
\ No newline at end of file
+zeus_receiver.register_handler('system_check', zeus_receiver.handle_system_check)
+zeus_receiver.register_handler('variable_changed', zeus_receiver.handle_variable_changed)
\ No newline at end of file
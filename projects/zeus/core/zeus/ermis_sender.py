@@ -61,7 +61,7 @@ class ZeusErmisSender:
             
         # Use send_request_with_response for proper request-response handling
         success, response = self.messenger.send_request_with_response(
-            self.god_name, target, content, timeout
+            self.god_name, target, content, timeout, msg_type
         )
         
         if success:
@@ -77,7 +77,20 @@ class ZeusErmisSender:
                     'from': target
                 }
             return None
-        
+
+    def send_many_and_wait(self, target: str, contents: List[Any], timeout: float = 5.0,
+                           msg_type: str = None) -> List[Optional[Dict[str, Any]]]:
+        """Send several messages at once and wait for all their responses, None for each that got none"""
+        if msg_type is None:
+            msg_type = f"{self.god_name}_request"
+        results = self.messenger.send_requests_with_responses(self.god_name, target, contents, timeout, msg_type)
+        return [response if success else None for success, response in results]
+
+    async def send_and_await(self, target: str, content: Any, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+        """Send message and await the response on the running event loop, holding no thread"""
+        from ermis.ermis_async import get_async_messenger
+        return await get_async_messenger().request(self.god_name, target, content, timeout)
+
     def request(self, request_data: Dict[str, Any]) -> bool:
         """
         Send a request without knowing the target - Olympus will route it.
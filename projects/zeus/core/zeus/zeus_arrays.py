@@ -0,0 +1,245 @@
+"""
+Array values for Zeus, backed by NumPy.
+
+Arrays are numpy.ndarray values. The evaluator's operators broadcast over
+them natively, so element-wise math runs in NumPy in every evaluation mode
+instead of one interpreted operation per element.
+
+range() returns a lazy Range. Loops iterate it as a plain Python range,
+while operators, math builtins and reductions treat it as an integer array,
+so `sqrt(range(n)) * 2` is computed without a loop. Math builtins broadcast
+over arrays, ranges, lists of numbers and lazy sequences, and sum, mean,
+max and min reduce arrays and ranges to Python numbers.
+
+List literals stay Python lists, since + and * already concatenate and
+repeat them; they broadcast when combined with an array, or through array().
+
+Without NumPy, range() is Python's and array() and zeros() raise
+ZeusRuntimeError.
+"""
+
+import math
+import operator
+import statistics
+from typing import Any, Callable, Dict
+
+from .zeus_exceptions import ZeusRuntimeError
+from .zeus_sequences import Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+class Range:
+    """range() value that iterates lazily and computes as an integer array."""
+
+    __slots__ = ("range",)
+
+    def __init__(self, *args: int):
+        self.range = range(*args)
+
+    def __iter__(self):
+        return iter(self.range)
+
+    def __reversed__(self):
+        return reversed(self.range)
+
+    def __len__(self) -> int:
+        return len(self.range)
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self.range
+
+    def __getitem__(self, index: Any) -> Any:
+        item = self.range[index]
+        if isinstance(item, range):
+            return Range(item.start, item.stop, item.step)
+        return item
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Range):
+            return self.range == other.range
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.range)
+
+    def __repr__(self) -> str:
+        return repr(self.range)
+
+    def __array__(self, dtype: Any = None, copy: Any = None):
+        return np.arange(self.range.start, self.range.stop, self.range.step, dtype=dtype)
+
+    def __neg__(self):
+        return -self.__array__()
+
+    def __pos__(self):
+        return self.__array__()
+
+    def __abs__(self):
+        return abs(self.__array__())
+
+
+def _array_operator(op: Callable[[Any, Any], Any]):
+    def method(self, other):
+        return op(self.__array__(), other)
+
+    def reflected(self, other):
+        return op(other, self.__array__())
+
+    return method, reflected
+
+
+for _name, _op in (
+    ("add", operator.add), ("sub", operator.sub), ("mul", operator.mul),
+    ("truediv", operator.truediv), ("floordiv", operator.floordiv),
+    ("mod", operator.mod), ("pow", operator.pow),
+):
+    _method, _reflected = _array_operator(_op)
+    setattr(Range, f"__{_name}__", _method)
+    setattr(Range, f"__r{_name}__", _reflected)
+
+# Comparisons reflect to their mirror image, as Python does
+for _name, _op in (("lt", operator.lt), ("le", operator.le), ("gt", operator.gt), ("ge", operator.ge)):
+    setattr(Range, f"__{_name}__", _array_operator(_op)[0])
+
+
+def storable(value: Any) -> Any:
+    """value in a form Ermis can store, arrays become lists."""
+    if HAS_NUMPY and isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Range):
+        return value.range
+    if isinstance(value, Sequence):
+        # Storing a lazy sequence must not force its items
+        return repr(value)
+    return value
+
+
+def _require_numpy(name: str):
+    if not HAS_NUMPY:
+        raise ZeusRuntimeError(f"{name}() needs NumPy, which is not installed", context=name)
+
+
+def array(values: Any = ()) -> Any:
+    """Array of the given numbers."""
+    _require_numpy("array")
+    return np.asarray(values if not isinstance(values, (set, dict)) else list(values))
+
+
+def zeros(size: Any) -> Any:
+    """Array of size zeros, size may be a list of dimensions."""
+    _require_numpy("zeros")
+    return np.zeros(tuple(size) if isinstance(size, (list, tuple)) else size)
+
+
+def _broadcasting(scalar: Callable, vector: Callable) -> Callable:
+    """scalar for numbers, vector for arrays, ranges and lists."""
+
+    # Numbers are checked by class first, isinstance on a tuple costs more than the math
+    def function(value, *args):
+        cls = value.__class__
+        if cls is float or cls is int or not isinstance(value, _VECTOR_TYPES):
+            return scalar(value, *args)
+        return vector(value, *args)
+
+    def unary(value):
+        cls = value.__class__
+        if cls is float or cls is int or not isinstance(value, _VECTOR_TYPES):
+            return scalar(value)
+        return vector(value)
+
+    wrapper = unary if scalar in _UNARY else function
+    wrapper.__name__ = scalar.__name__
+    wrapper.__doc__ = scalar.__doc__
+    return wrapper
+
+
+def _vector_log(value, base=None):
+    result = np.log(value)
+    return result if base is None else result / math.log(base)
+
+
+def _vector_round(value, digits=0):
+    return np.round(value, digits)
+
+
+def _range_sum(values: Range, *args):
+    if args:
+        return sum(values.range, *args)
+    r = values.range
+    # Arithmetic series, exact on Python integers
+    return len(r) * (r[0] + r[-1]) // 2 if r else 0
+
+
+def _range_extreme(pick: Callable) -> Callable:
+    def extreme(values: Range):
+        r = values.range
+        if not r:
+            return pick(r)  # Raises the usual empty sequence error
+        return pick(r[0], r[-1])
+
+    return extreme
+
+
+def _reduction(builtin: Callable, method: str, over_range: Callable) -> Callable:
+    """builtin, except that a single array or range argument is reduced directly."""
+
+    def reduce(*args):
+        if len(args) == 1:
+            value = args[0]
+            if isinstance(value, np.ndarray):
+                return getattr(value, method)().item()
+            if isinstance(value, Range):
+                return over_range(value)
+        return builtin(*args)
+
+    reduce.__name__ = getattr(builtin, "__name__", method)
+    reduce.__doc__ = builtin.__doc__
+    return reduce
+
+
+def mean(values: Any) -> float:
+    """Arithmetic mean of the values."""
+    if HAS_NUMPY and isinstance(values, np.ndarray):
+        return float(values.mean())
+    if isinstance(values, Range):
+        r = values.range
+        if not r:
+            raise statistics.StatisticsError("mean requires at least one data point")
+        return (r[0] + r[-1]) / 2
+    return statistics.fmean(values)
+
+
+def array_builtins() -> Dict[str, Callable]:
+    """Builtins that create, broadcast over and reduce arrays."""
+    builtins: Dict[str, Callable] = {"array": array, "zeros": zeros, "mean": mean}
+    if not HAS_NUMPY:
+        return builtins
+
+    builtins.update({
+        "range": Range,
+        "sum": _reduction(sum, "sum", _range_sum),
+        "max": _reduction(max, "max", _range_extreme(max)),
+        "min": _reduction(min, "min", _range_extreme(min)),
+        "abs": _broadcasting(abs, np.abs),
+        "round": _broadcasting(round, _vector_round),
+        "pow": _broadcasting(pow, np.power),
+        "sqrt": _broadcasting(math.sqrt, np.sqrt),
+        "sin": _broadcasting(math.sin, np.sin),
+        "cos": _broadcasting(math.cos, np.cos),
+        "tan": _broadcasting(math.tan, np.tan),
+        "log": _broadcasting(math.log, _vector_log),
+        "exp": _broadcasting(math.exp, np.exp),
+    })
+    return builtins
+
+
+_VECTOR_TYPES = (np.ndarray, Range, list, Sequence) if HAS_NUMPY else ()
+
+# Builtins that take exactly one argument
+_UNARY = (abs, math.sqrt, math.sin, math.cos, math.tan, math.exp)
@@ -0,0 +1,340 @@
+"""
+Zeus AST node classes.
+
+Every construct has its own class with ``__slots__``, so a node holds its
+fields and nothing else: no per-node dict and no repeated key strings.
+Nodes are immutable once built, which lets the parse cache, the compilers
+and stored function definitions share one tree without defensive copies.
+Sequences of children are tuples, and identifier strings are interned by
+the parser.
+
+Each class keeps the ``type`` string of the dict it replaces. to_dict()
+produces that legacy dict form for callers that inspect or serialize ASTs,
+and from_dict() converts it back.
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+_new_field = object.__setattr__
+
+# Value of an if statement whose branch produced no value
+STATEMENT_EXECUTED = "__STATEMENT_EXECUTED__"
+
+
+class Node:
+    """Base class for Zeus AST nodes."""
+
+    __slots__ = ()
+
+    # Legacy dict "type" of the node
+    type = ""
+    # Set on ErrorNode only, so `node.error` can be checked on any node
+    error = None
+
+    def __init__(self, *values: Any):
+        if len(values) != len(self.__slots__):
+            raise TypeError(
+                f"{type(self).__name__} takes {len(self.__slots__)} fields, got {len(values)}"
+            )
+        for name, value in zip(self.__slots__, values):
+            _new_field(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the legacy dict form of this node and its children."""
+        result = {"type": self.type}
+        for name in self.__slots__:
+            result[name] = _plain(getattr(self, name))
+        return result
+
+
+class Empty(Node):
+    __slots__ = ()
+    type = "empty"
+
+
+class Literal(Node):
+    __slots__ = ("value",)
+    type = "literal"
+
+
+class Identifier(Node):
+    __slots__ = ("name",)
+    type = "identifier"
+
+
+class BinaryOp(Node):
+    __slots__ = ("operator", "left", "right")
+    type = "binary_op"
+
+
+class UnaryOp(Node):
+    __slots__ = ("operator", "operand")
+    type = "unary_op"
+
+
+class Call(Node):
+    __slots__ = ("name", "arguments")
+    type = "function_call"
+
+
+class Parenthesized(Node):
+    __slots__ = ("expression",)
+    type = "parenthesized"
+
+
+class ListLiteral(Node):
+    __slots__ = ("elements",)
+    type = "list"
+
+
+class DictLiteral(Node):
+    # Tuple of (key, value) node pairs
+    __slots__ = ("items",)
+    type = "dict"
+
+
+class Assign(Node):
+    __slots__ = ("variable", "expression")
+    type = "assignment"
+
+
+class If(Node):
+    __slots__ = ("condition", "then_branch", "else_branch")
+    type = "if_statement"
+
+
+class While(Node):
+    __slots__ = ("condition", "body")
+    type = "while_loop"
+
+
+class For(Node):
+    __slots__ = ("iterator", "iterable", "body")
+    type = "for_loop"
+
+
+class ParallelFor(Node):
+    """A for loop whose iterations may run in worker processes, see zeus_parallel."""
+
+    # collect: whether the loop's value is the list of every iteration's value
+    __slots__ = ("iterator", "iterable", "body", "collect")
+    type = "parallel_for_loop"
+
+
+class FunctionDef(Node):
+    __slots__ = ("name", "parameters", "body")
+    type = "function_definition"
+
+
+class AthenaCommand(Node):
+    __slots__ = ("command",)
+    type = "athena_command"
+
+
+class PatternDef(Node):
+    __slots__ = ("definition",)
+    type = "pattern_definition"
+
+
+class Block(Node):
+    """Statements run in order, the value is the last one's."""
+
+    __slots__ = ("statements",)
+    type = "block"
+
+
+class Module(Node):
+    """A parsed program: its top-level statements and their source line numbers."""
+
+    __slots__ = ("body", "lines")
+    type = "module"
+
+
+class HoistedLoop(Node):
+    """A loop whose invariant expressions are computed once per run, see InvariantRef."""
+
+    __slots__ = ("frame", "size", "loop")
+    type = "hoisted_loop"
+
+
+class InvariantRef(Node):
+    """An expression evaluated at most once per run of its HoistedLoop."""
+
+    __slots__ = ("frame", "index", "expression")
+    type = "invariant"
+
+
+class LocalFrame(Node):
+    """A statement run with its own slot frame, see zeus_resolver."""
+
+    # names holds the variable name of each slot
+    __slots__ = ("names", "statement")
+    type = "local_frame"
+
+
+class LocalVariable(Node):
+    """A read of a variable resolved to a frame slot."""
+
+    __slots__ = ("name", "slot")
+    type = "local"
+
+
+class LocalAssign(Node):
+    __slots__ = ("variable", "slot", "expression")
+    type = "local_assignment"
+
+
+class LocalFor(Node):
+    __slots__ = ("iterator", "slot", "iterable", "body")
+    type = "local_for_loop"
+
+
+class LocalArgument(Node):
+    """A bare name argument resolved to a frame slot, a call if the slot is unset."""
+
+    __slots__ = ("name", "slot")
+    type = "local_argument"
+
+
+class ErrorNode(Node):
+    """A parse failure, evaluating it raises the message."""
+
+    __slots__ = ("error",)
+    type = "error"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"error": self.error}
+
+
+NODE_TYPES: Dict[str, type] = {
+    cls.type: cls
+    for cls in (
+        Empty, Literal, Identifier, BinaryOp, UnaryOp, Call, Parenthesized, ListLiteral,
+        DictLiteral, Assign, If, While, For, ParallelFor, FunctionDef, AthenaCommand, PatternDef,
+        Block, Module, HoistedLoop, InvariantRef, LocalFrame, LocalVariable, LocalAssign, LocalFor,
+        LocalArgument,
+    )
+}
+
+
+# Fields the old dict nodes could omit, meaning an empty sequence
+_SEQUENCE_FIELDS = frozenset(("arguments", "elements", "items", "parameters", "statements"))
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Node):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _node_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return from_dict(value)
+    if isinstance(value, list):
+        return tuple(_node_value(item) for item in value)
+    return value
+
+
+def from_dict(data: Optional[Dict[str, Any]]) -> Optional[Node]:
+    """
+    Build a node tree from its legacy dict form.
+
+    Nodes are returned unchanged. An unknown type becomes an ErrorNode, so it
+    fails when evaluated just as the dict did.
+    """
+    if data is None or isinstance(data, Node):
+        return data
+    if "type" not in data and data.get("error"):
+        return ErrorNode(data["error"])
+
+    node_type = data.get("type")
+    cls = NODE_TYPES.get(node_type)
+    if cls is None:
+        return ErrorNode(f"Unknown node type: {node_type}")
+    if cls is Literal:
+        return Literal(data.get("value"))
+    if cls is Assign:
+        # Older definitions stored the assigned expression under "value"
+        return Assign(data.get("variable"), from_dict(data.get("expression") or data.get("value")))
+    return cls(*(
+        _node_value(data.get(name, [] if name in _SEQUENCE_FIELDS else None))
+        for name in cls.__slots__
+    ))
+
+
+def iter_child_nodes(node: Node) -> Iterator[Node]:
+    """Yield the direct child nodes of node in field order."""
+    for name in node.__slots__:
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            yield value
+        elif isinstance(value, tuple):
+            yield from _iter_nested(value)
+
+
+def _iter_nested(values: Tuple[Any, ...]) -> Iterator[Node]:
+    for value in values:
+        if isinstance(value, Node):
+            yield value
+        elif isinstance(value, tuple):
+            yield from _iter_nested(value)
+
+
+def map_children(node: Node, transform: Callable[[Node], Optional[Node]]) -> Node:
+    """
+    Return node with transform applied to each direct child node.
+
+    Node is returned unchanged when every child is, so callers can detect
+    changes with an identity check.
+    """
+    values = []
+    changed = False
+    for name in node.__slots__:
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            new_value = transform(value)
+        elif isinstance(value, tuple):
+            new_value = _map_nested(value, transform)
+        else:
+            new_value = value
+        changed = changed or new_value is not value
+        values.append(new_value)
+    return type(node)(*values) if changed else node
+
+
+def _map_nested(values: Tuple[Any, ...], transform) -> Tuple[Any, ...]:
+    mapped = tuple(
+        transform(value) if isinstance(value, Node)
+        else _map_nested(value, transform) if isinstance(value, tuple)
+        else value
+        for value in values
+    )
+    if all(new is old for new, old in zip(mapped, values)):
+        return values
+    return mapped
+
+
+def walk(node: Optional[Node]) -> Iterator[Node]:
+    """Yield node and all of its descendants, parents first."""
+    if node is None:
+        return
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(list(iter_child_nodes(current))))
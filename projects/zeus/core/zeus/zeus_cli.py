@@ -56,6 +56,7 @@ class ZeusCLI:
             ".save": self._save_session,
             ".load": self._load_session,
             ".stats": self._show_statistics,
+            ".memo": self._show_memo,
             ".explain": self._explain_last,
             ".usage": self._show_usage_patterns,
             ".bootcamp": self._run_pattern_bootcamp,
@@ -116,6 +117,7 @@ class ZeusCLI:
         print(f"  {Fore.CYAN}.save{Style.RESET_ALL}      - Save session to file")
         print(f"  {Fore.CYAN}.load{Style.RESET_ALL}      - Load session from file")
         print(f"  {Fore.CYAN}.stats{Style.RESET_ALL}     - Show statistics")
+        print(f"  {Fore.CYAN}.memo{Style.RESET_ALL}      - Show memoized functions (.memo clear [name])")
         print(f"  {Fore.CYAN}.explain{Style.RESET_ALL}   - Explain last execution")
         print(f"  {Fore.CYAN}.usage{Style.RESET_ALL}     - Show usage patterns")
         print(f"  {Fore.CYAN}.bootcamp{Style.RESET_ALL}  - Run pattern bootcamp")
@@ -208,6 +210,36 @@ class ZeusCLI:
         print(f"  Conversations: {kb_stats.get('conversations', 0)}")
         print()
 
+    def _show_memo(self, args: str = ""):
+        """Show or clear memoized results of pure functions and patterns."""
+        memo = self.interpreter.runtime.memo
+        words = args.split()
+        if words and words[0] == "clear":
+            name = words[1] if len(words) > 1 else None
+            cleared = memo.clear(name)
+            target = name or "all functions"
+            if cleared:
+                print(f"{Fore.GREEN}Cleared memoized results of {target}{Style.RESET_ALL}")
+            else:
+                print(f"{Fore.YELLOW}Nothing memoized for {target}{Style.RESET_ALL}")
+            return
+
+        stats = memo.get_stats()
+        if not stats:
+            print(f"{Fore.YELLOW}No functions called yet.{Style.RESET_ALL}")
+            return
+
+        print(f"\n{Fore.YELLOW}Memoization:{Style.RESET_ALL}")
+        for name, table in sorted(stats.items()):
+            if table["pure"]:
+                print(f"  {Fore.CYAN}{name}{Style.RESET_ALL} ({table['kind']}): "
+                      f"{table['size']} results, {table['hits']} hits, {table['misses']} misses, "
+                      f"{table['hit_rate']:.1f}% hit rate")
+            else:
+                print(f"  {Fore.CYAN}{name}{Style.RESET_ALL} ({table['kind']}): "
+                      f"not memoized, {table['reason']}")
+        print()
+
     def _explain_last(self, args: str = ""):
         """Explain the last execution."""
         explanation = self.interpreter.explain_last_execution()
@@ -0,0 +1,580 @@
+"""
+Closure compiler - turns Zeus ASTs into trees of nested Python closures.
+
+Each AST node is compiled once into a function taking the runtime. Operators
+are resolved from the evaluator's tables at compile time, builtins are bound
+directly and child nodes are referenced as already compiled closures, so
+executing a loop body is a chain of plain calls instead of a walk over nodes.
+
+The closures reproduce the tree-walking evaluator exactly, including where
+errors surface: a malformed node compiles to a closure that raises when it
+runs, not when it is compiled. Operator and call sites are inline caches,
+see zeus_inline_cache.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_ast import Node, Call, FunctionDef, Literal, STATEMENT_EXECUTED
+from .zeus_inline_cache import InlineCaches
+from .zeus_optimizer import loop_frames, UNSET_INVARIANT
+from .zeus_parallel import AUTO, automatic
+from .zeus_resolver import resolve_function, resolve_statement
+from .zeus_runtime import SlotFrame, UNASSIGNED, UNDEFINED
+from .zeus_exceptions import (
+    ZeusRuntimeError,
+    ZeusTypeError,
+    ZeusValueError,
+    ZeusDivisionByZeroError,
+)
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+    from .zeus_runtime import ZeusRuntime
+
+# A compiled node: called with the runtime, returns the node's value
+CompiledNode = Callable[["ZeusRuntime"], Any]
+
+# A compiled user function: called with the runtime and the argument list
+CompiledFunction = Callable[["ZeusRuntime", List[Any]], Any]
+
+# Default number of compiled top-level nodes kept per compiler
+MAX_ENTRIES = 4096
+
+_MISSING = object()
+
+
+def _return_none(runtime: "ZeusRuntime") -> None:
+    return None
+
+
+def _raise_runtime_error(message: str) -> CompiledNode:
+    def raise_error(runtime):
+        raise RuntimeError(message)
+
+    return raise_error
+
+
+class ClosureCompiler:
+    """Compiles Zeus AST nodes into closures bound to one evaluator."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", max_entries: int = MAX_ENTRIES):
+        self.evaluator = evaluator
+        self.max_entries = max_entries
+
+        # Compiled nodes and functions keyed by id(); the node is kept alive
+        # alongside its closure so the id cannot be reused while the entry exists
+        self._cache: "OrderedDict[int, tuple]" = OrderedDict()
+        self._functions: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Specializing operator sites and resolution-caching call sites
+        self.inline_caches = InlineCaches(self)
+
+        self._compilers: Dict[str, Callable[[Node], CompiledNode]] = {
+            "empty": lambda node: _return_none,
+            "literal": self._compile_literal,
+            "identifier": self._compile_identifier,
+            "assignment": self._compile_assignment,
+            "binary_op": self._compile_binary_op,
+            "unary_op": self._compile_unary_op,
+            "function_call": self._compile_function_call,
+            "parenthesized": lambda node: self.compile(node.expression),
+            "if_statement": self._compile_if_statement,
+            "while_loop": self._compile_while_loop,
+            "for_loop": self._compile_for_loop,
+            "parallel_for_loop": self._compile_parallel_for_loop,
+            "function_definition": self._compile_function_definition,
+            "athena_command": self._compile_athena_command,
+            "pattern_definition": self._compile_pattern_definition,
+            "list": self._compile_list,
+            "dict": self._compile_dict,
+            "block": lambda node: self._compile_statements(node.statements),
+            "module": lambda node: self._compile_statements(node.body),
+            "hoisted_loop": self._compile_hoisted_loop,
+            "invariant": self._compile_invariant,
+            "local_frame": self._compile_local_frame,
+            "local": self._compile_local,
+            "local_assignment": self._compile_local_assignment,
+            "local_for_loop": self._compile_local_for_loop,
+            "local_argument": self._compile_local_argument,
+        }
+
+    def get(self, node: Optional[Node]) -> CompiledNode:
+        """
+        Return the compiled closure for node, compiling it on first use.
+
+        The node is run through the evaluator's optimizer and the scope
+        resolver before compiling. ASTs handed out by the parse cache are
+        long-lived shared objects, so repeated executions reuse the closure.
+        """
+        return self._get(self._cache, node, self._compile_statement)
+
+    def get_function(self, node: Any) -> Optional[CompiledFunction]:
+        """Return the compiled user function for a definition, or None."""
+        if not isinstance(node, FunctionDef):
+            return None
+        return self._get(self._functions, node, self._compile_user_function)
+
+    def _get(self, cache: "OrderedDict[int, tuple]", node: Any, compile_node) -> Callable:
+        key = id(node)
+        with self._lock:
+            entry = cache.get(key)
+            if entry is not None and entry[0] is node:
+                cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        compiled = compile_node(node)
+
+        with self._lock:
+            cache[key] = (node, compiled)
+            cache.move_to_end(key)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+
+        return compiled
+
+    def _compile_statement(self, node: Optional[Node]) -> CompiledNode:
+        if self.evaluator.parallel.policy == AUTO:
+            node = automatic(node)
+        return self.compile(resolve_statement(self.evaluator.optimizer.optimize(node)))
+
+    def _compile_user_function(self, node: FunctionDef) -> CompiledFunction:
+        """Compile a function body to run in a SlotFrame, parameters bound by slot."""
+        resolved, slots = resolve_function(self.evaluator.optimizer.optimize_function(node))
+        param_slots = [slots[name] for name in resolved.parameters or ()]
+        body_fns = [self.compile(statement) for statement in resolved.body or ()]
+
+        def user_function(runtime, args):
+            frame = SlotFrame(slots)
+            values = frame.values
+            # Missing arguments default to None, extra ones are ignored
+            for index, slot in enumerate(param_slots):
+                values[slot] = args[index] if index < len(args) else None
+            runtime.push_frame(frame)
+            try:
+                result = None
+                for statement_fn in body_fns:
+                    result = statement_fn(runtime)
+                return result
+            finally:
+                runtime.pop_scope()
+
+        return user_function
+
+    def compile(self, node: Optional[Node]) -> CompiledNode:
+        """Compile node and its children into a closure without caching."""
+        if node is None:
+            return _return_none
+
+        if node.error:
+            return _raise_runtime_error(node.error)
+
+        node_type = node.type
+        compiler = self._compilers.get(node_type)
+        if compiler is None:
+            return _raise_runtime_error(f"Unknown node type: {node_type}")
+        return compiler(node)
+
+    def clear(self):
+        """Drop all compiled closures."""
+        with self._lock:
+            self._cache.clear()
+            self._functions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get compiled closure cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "functions": len(self._functions),
+                "max_size": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+                "inline_caches": self.inline_caches.get_stats(),
+            }
+
+    def _compile_block(self, statements: Tuple[Node, ...]) -> List[tuple]:
+        """Compile a loop body into (closure, control) pairs."""
+        block = []
+        for statement in statements:
+            control = None
+            if statement is not None and statement.type in ("break", "continue"):
+                control = statement.type
+            block.append((self.compile(statement), control))
+        return block
+
+    def _compile_statements(self, statements: Optional[Tuple[Node, ...]]) -> CompiledNode:
+        statement_fns = [self.compile(statement) for statement in statements or ()]
+
+        def statements_fn(runtime):
+            result = None
+            for statement_fn in statement_fns:
+                result = statement_fn(runtime)
+            return result
+
+        return statements_fn
+
+    def _compile_literal(self, node: Node) -> CompiledNode:
+        value = node.value
+
+        def literal(runtime):
+            return value
+
+        return literal
+
+    def _compile_identifier(self, node: Node) -> CompiledNode:
+        name = node.name
+        builtin = self.evaluator.builtins.get(name, _MISSING)
+        # Value when no scope defines the name
+        fallback = builtin if builtin is not _MISSING else f"Error: Variable '{name}' is not defined"
+
+        def identifier(runtime):
+            value = runtime.lookup_variable(name)
+            return fallback if value is UNDEFINED else value
+
+        return identifier
+
+    def _compile_assignment(self, node: Node) -> CompiledNode:
+        variable = node.variable
+        value_node = node.expression
+        if value_node is None:
+            return _raise_runtime_error("Assignment must have either 'expression' or 'value'")
+        value_fn = self.compile(value_node)
+
+        def assignment(runtime):
+            value = value_fn(runtime)
+            runtime.set_variable(variable, value)
+            return value
+
+        return assignment
+
+    def _compile_binary_op(self, node: Node) -> CompiledNode:
+        left_fn = self.compile(node.left)
+        right_fn = self.compile(node.right)
+        op = node.operator
+        op_func = self.evaluator.binary_ops.get(op)
+
+        if op_func is None:
+
+            def unknown_operator(runtime):
+                left_fn(runtime)
+                right_fn(runtime)
+                raise ZeusValueError(f"Unknown operator: {op}")
+
+            return unknown_operator
+
+        site = self.inline_caches.binary_site(op, op_func, node.left, node.right, left_fn, right_fn)
+        if site is not None:
+            return site
+
+        def binary_op(runtime):
+            left = left_fn(runtime)
+            right = right_fn(runtime)
+            try:
+                return op_func(left, right)
+            except ZeroDivisionError:
+                raise ZeusDivisionByZeroError()
+            except TypeError:
+                raise ZeusTypeError(op, "compatible types", left)
+            except Exception as e:
+                raise ZeusRuntimeError(f"Error in {op} operation: {e}", context=op)
+
+        return binary_op
+
+    def _compile_unary_op(self, node: Node) -> CompiledNode:
+        operand_fn = self.compile(node.operand)
+        op = node.operator
+        op_func = self.evaluator.unary_ops.get(op)
+
+        if op_func is None:
+
+            def unknown_operator(runtime):
+                operand_fn(runtime)
+                raise RuntimeError(f"Unknown unary operator: {op}")
+
+            return unknown_operator
+
+        def unary_op(runtime):
+            return op_func(operand_fn(runtime))
+
+        return unary_op
+
+    def _compile_argument(self, arg: Node) -> CompiledNode:
+        arg_fn = self.compile(arg)
+        if not (isinstance(arg, Call) and not arg.arguments):
+            return arg_fn
+
+        # A bare name in argument position may be a variable parsed as a call
+        name = arg.name
+
+        def variable_or_call(runtime):
+            value = runtime.lookup_variable(name)
+            return arg_fn(runtime) if value is UNDEFINED else value
+
+        return variable_or_call
+
+    def _compile_function_call(self, node: Node) -> CompiledNode:
+        func_name = node.name
+        arg_fns = [self._compile_argument(arg) for arg in node.arguments]
+        builtin = self.evaluator.builtins.get(func_name, _MISSING)
+
+        if builtin is not _MISSING:
+
+            def call_builtin(runtime):
+                args = [arg_fn(runtime) for arg_fn in arg_fns]
+                try:
+                    return builtin(*args)
+                except Exception as e:
+                    raise RuntimeError(f"Error calling {func_name}: {e}")
+
+            return call_builtin
+
+        site = self.inline_caches.call_site(func_name, arg_fns)
+        if site is not None:
+            return site
+
+        call_by_name = self.evaluator._call_by_name
+
+        def call(runtime):
+            return call_by_name(func_name, [arg_fn(runtime) for arg_fn in arg_fns], runtime)
+
+        return call
+
+    def _compile_if_statement(self, node: Node) -> CompiledNode:
+        condition_fn = self.compile(node.condition)
+        then_fn = self.compile(node.then_branch) if node.then_branch else None
+        else_fn = self.compile(node.else_branch) if node.else_branch else None
+
+        if isinstance(node.condition, Literal):
+            # Branch decided at compile time, as left by dead-branch elimination
+            taken_fn = then_fn if node.condition.value else else_fn
+            if taken_fn is None:
+                return lambda runtime: STATEMENT_EXECUTED
+
+            def constant_if_statement(runtime):
+                result = taken_fn(runtime)
+                return result if result is not None else STATEMENT_EXECUTED
+
+            return constant_if_statement
+
+        def if_statement(runtime):
+            if condition_fn(runtime):
+                if then_fn is not None:
+                    result = then_fn(runtime)
+                    return result if result is not None else STATEMENT_EXECUTED
+            elif else_fn is not None:
+                result = else_fn(runtime)
+                return result if result is not None else STATEMENT_EXECUTED
+            return STATEMENT_EXECUTED
+
+        return if_statement
+
+    def _compile_while_loop(self, node: Node) -> CompiledNode:
+        condition_fn = self.compile(node.condition)
+        body = self._compile_block(node.body or ())
+
+        def while_loop(runtime):
+            result = None
+            while condition_fn(runtime):
+                for statement_fn, control in body:
+                    result = statement_fn(runtime)
+                    if control == "break":
+                        return result
+                    if control == "continue":
+                        break
+            return result
+
+        return while_loop
+
+    def _compile_for_loop(self, node: Node) -> CompiledNode:
+        iterator_name = node.iterator
+        iterable_fn = self.compile(node.iterable)
+        body = self._compile_block(node.body or ())
+
+        def for_loop(runtime):
+            result = None
+            set_variable = runtime.set_variable
+            for item in iterable_fn(runtime):
+                set_variable(iterator_name, item)
+                for statement_fn, control in body:
+                    result = statement_fn(runtime)
+                    if control == "break":
+                        return result
+                    if control == "continue":
+                        break
+            return result
+
+        return for_loop
+
+    def _compile_parallel_for_loop(self, node: Node) -> CompiledNode:
+        iterable_fn = self.compile(node.iterable)
+        body = self._compile_block(node.body or ())
+        run = self.evaluator.parallel.run
+
+        def parallel_for_loop(runtime):
+            return run(node, iterable_fn(runtime), runtime, body)
+
+        return parallel_for_loop
+
+    def _compile_function_definition(self, node: Node) -> CompiledNode:
+        func_name = node.name
+        message = f"Function {func_name} defined"
+
+        def function_definition(runtime):
+            runtime.define_function(func_name, node)
+            return message
+
+        return function_definition
+
+    def _compile_hoisted_loop(self, node: Node) -> CompiledNode:
+        loop_fn = self.compile(node.loop)
+        frame = node.frame
+        size = node.size
+
+        def hoisted_loop(runtime):
+            previous = loop_frames.enter(frame, size)
+            try:
+                return loop_fn(runtime)
+            finally:
+                loop_frames.exit(frame, previous)
+
+        return hoisted_loop
+
+    def _compile_invariant(self, node: Node) -> CompiledNode:
+        expression_fn = self.compile(node.expression)
+        frame = node.frame
+        index = node.index
+
+        def invariant(runtime):
+            values = loop_frames.active[frame]
+            value = values[index]
+            if value is UNSET_INVARIANT:
+                value = values[index] = expression_fn(runtime)
+            return value
+
+        return invariant
+
+    def _compile_local_frame(self, node: Node) -> CompiledNode:
+        slots = {name: slot for slot, name in enumerate(node.names)}
+        statement_fn = self.compile(node.statement)
+
+        def local_frame(runtime):
+            frame = SlotFrame(slots)
+            runtime.push_frame(frame)
+            try:
+                return statement_fn(runtime)
+            finally:
+                # Assigned variables land in the enclosing scope, as without a frame
+                runtime.pop_scope()
+                for name, value in frame.items():
+                    runtime.set_variable(name, value)
+
+        return local_frame
+
+    def _compile_local(self, node: Node) -> CompiledNode:
+        slot = node.slot
+        # Until the slot is assigned, the name resolves through the scope stack
+        lookup_fn = self._compile_identifier(node)
+
+        def local(runtime):
+            value = runtime.scopes[-1].values[slot]
+            if value is UNASSIGNED:
+                return lookup_fn(runtime)
+            return value
+
+        return local
+
+    def _compile_local_assignment(self, node: Node) -> CompiledNode:
+        slot = node.slot
+        value_node = node.expression
+        if value_node is None:
+            return _raise_runtime_error("Assignment must have either 'expression' or 'value'")
+        value_fn = self.compile(value_node)
+
+        def local_assignment(runtime):
+            value = value_fn(runtime)
+            runtime.scopes[-1].values[slot] = value
+            return value
+
+        return local_assignment
+
+    def _compile_local_for_loop(self, node: Node) -> CompiledNode:
+        slot = node.slot
+        iterable_fn = self.compile(node.iterable)
+        body = self._compile_block(node.body or ())
+
+        def local_for_loop(runtime):
+            result = None
+            # Calls made by the body pop their frames, so this one stays current
+            values = runtime.scopes[-1].values
+            for item in iterable_fn(runtime):
+                values[slot] = item
+                for statement_fn, control in body:
+                    result = statement_fn(runtime)
+                    if control == "break":
+                        return result
+                    if control == "continue":
+                        break
+            return result
+
+        return local_for_loop
+
+    def _compile_local_argument(self, node: Node) -> CompiledNode:
+        slot = node.slot
+        variable_or_call = self._compile_argument(Call(node.name, ()))
+
+        def local_argument(runtime):
+            value = runtime.scopes[-1].values[slot]
+            if value is UNASSIGNED:
+                return variable_or_call(runtime)
+            return value
+
+        return local_argument
+
+    def _compile_athena_command(self, node: Node) -> CompiledNode:
+        command = node.command
+
+        def athena_command(runtime):
+            return runtime.execute_athena_command(command)
+
+        return athena_command
+
+    def _compile_pattern_definition(self, node: Node) -> CompiledNode:
+        definition = node.definition
+
+        def pattern_definition(runtime):
+            return runtime.teach_pattern(definition)
+
+        return pattern_definition
+
+    def _compile_list(self, node: Node) -> CompiledNode:
+        element_fns = [self.compile(elem) for elem in node.elements]
+
+        def list_literal(runtime):
+            return [element_fn(runtime) for element_fn in element_fns]
+
+        return list_literal
+
+    def _compile_dict(self, node: Node) -> CompiledNode:
+        item_fns = [
+            (self.compile(key_node), self.compile(value_node))
+            for key_node, value_node in node.items
+        ]
+
+        def dict_literal(runtime):
+            result = {}
+            for key_fn, value_fn in item_fns:
+                key = key_fn(runtime)
+                result[key] = value_fn(runtime)
+            return result
+
+        return dict_literal
@@ -18,8 +18,11 @@ class ZeusErmisInterface:
         self.logger = logging.getLogger(__name__)
         self.sender = zeus_sender
         self.session_id = None
+        # Ermis lane for requests that do not name one: interactive, normal or background
+        self.priority = None
         
-    def request(self, intent: str, data: Dict[str, Any], wait_for_response: bool = True) -> Optional[Dict[str, Any]]:
+    def request(self, intent: str, data: Dict[str, Any], wait_for_response: bool = True,
+                priority: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Send a unified request through Ermis.
         Olympus will decide how to route it.
@@ -28,6 +31,8 @@ class ZeusErmisInterface:
             intent: The intent of the request (store, retrieve, compute, learn, etc.)
             data: The data associated with the request
             wait_for_response: Whether to wait for a response
+            priority: Ermis lane to queue it in, else self.priority, else
+                Ermis picks one from the request
             
         Returns:
             Response from the divine assembly, or None if fire-and-forget
@@ -39,6 +44,8 @@ class ZeusErmisInterface:
             'session_id': self.session_id,
             'from': 'zeus'
         }
+        if priority or self.priority:
+            message['priority'] = priority or self.priority
         
         if wait_for_response:
             # Send as unified request to Ermis queue for intelligent routing
@@ -73,6 +80,35 @@ class ZeusErmisInterface:
         
         return response and response.get('status') == 'success'
         
+    def store_many(self, variables: Dict[str, Any]) -> Dict[str, bool]:
+        """
+        Store several values in one round trip, Olympus decides where each goes.
+
+        Args:
+            variables: name -> (value, metadata)
+
+        Returns:
+            name -> whether it was stored
+        """
+        messages = []
+        for name, (value, metadata) in variables.items():
+            message = {
+                'type': 'unified_request',
+                'intent': 'store',
+                'data': {'name': name, 'value': value, 'metadata': metadata or {}},
+                'session_id': self.session_id,
+                'from': 'zeus'
+            }
+            if self.priority:
+                message['priority'] = self.priority
+            messages.append(message)
+
+        responses = self.sender.send_many_and_wait('ermis', messages, msg_type='unified_request')
+        return {
+            name: bool(response and response.get('status') == 'success')
+            for name, response in zip(variables, responses)
+        }
+        
     def retrieve(self, name: str) -> Any:
         """Retrieve a value - Olympus decides where to look"""
         response = self.request('retrieve', {'name': name})
@@ -1,7 +1,10 @@
 import operator
+import os
 from typing import Any, Dict, List, Optional, Union
 import logging
 import math
+import time
+from functools import partial
 from .zeus_exceptions import (
     ZeusRuntimeError,
     ZeusTypeError,
@@ -9,7 +12,24 @@ from .zeus_exceptions import (
     ZeusDivisionByZeroError,
     ZeusSyntaxError,
 )
-from .zeus_runtime import ZeusRuntime
+from .zeus_runtime import ZeusRuntime, UNDEFINED
+from .zeus_ast import Node, Call, FunctionDef, from_dict
+from .zeus_arrays import array_builtins
+from .zeus_sequences import active, sequence_builtins
+from .zeus_optimizer import ZeusOptimizer, STANDARD, loop_frames, UNSET_INVARIANT
+from .zeus_closure_compiler import ClosureCompiler
+from .zeus_py_compiler import ZeusPyCompiler
+from .zeus_trampoline import Trampoline, TRAMPOLINE_DEPTH
+from .zeus_parallel import ParallelLoops
+from .zeus_tiers import TieredFunctions, interpreting
+from .zeus_vm import ZeusVM
+
+# Evaluation modes
+COMPILED = "compiled"  # ASTs are compiled once into nested closures
+TREE_WALK = "tree"  # Reference mode, walks the AST on every evaluation
+BYTECODE = "bytecode"  # Programs translated to Python bytecode, closures otherwise
+TIERED = "tiered"  # As compiled, but functions start interpreted and hot ones are compiled
+VM = "vm"  # Zeus bytecode run by a stack-based virtual machine
 
 
 class ZeusEvaluator:
@@ -17,9 +37,13 @@ class ZeusEvaluator:
     Evaluates parsed Zeus AST nodes and executes code.
     """
 
-    def __init__(self):
+    def __init__(self, mode: str = COMPILED, optimization_level: Any = STANDARD,
+                 parallel: Optional[str] = None):
+        if mode not in (COMPILED, TREE_WALK, BYTECODE, TIERED, VM):
+            raise ValueError(f"Unknown evaluation mode: {mode}")
+
         self.logger = logging.getLogger(__name__)
-        self._parser = None  # Lazy load parser to avoid circular import
+        self.mode = mode
 
         # Built-in functions
         self.builtins = {
@@ -47,6 +71,10 @@ class ZeusEvaluator:
             "log": math.log,
             "exp": math.exp,
         }
+        # Array constructors, and math and reductions that broadcast over arrays
+        self.builtins.update(array_builtins())
+        # map, filter, take and zip, which build lazy sequences
+        self.builtins.update(sequence_builtins())
 
         # Binary operators
         self.binary_ops = {
@@ -74,25 +102,70 @@ class ZeusEvaluator:
             "not": operator.not_,
         }
 
-    def evaluate_ast(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+        # Optimize and compile ASTs against the tables above, so they are created last.
+        # The tree-walker stays the unoptimized reference.
+        self.optimizer = ZeusOptimizer(self, optimization_level)
+        # Call sites cache what names resolve to, except where tiers decide per call
+        self.cached_calls = mode in (COMPILED, BYTECODE)
+        self.compiler = ClosureCompiler(self)
+        self.py_compiler = ZeusPyCompiler(self)
+        self.trampoline = Trampoline(self)
+        # Off, explicit or auto, ZEUS_PARALLEL when not given
+        self.parallel = ParallelLoops(self, parallel)
+        # Call profiles and tiers of user functions, in tiered mode
+        self.tiers = TieredFunctions(self)
+        # Zeus bytecode and the VM running it, in vm mode
+        self.vm = ZeusVM(self)
+
+    def evaluate_ast(self, node: Optional[Node], runtime: "ZeusRuntime") -> Any:
         """
         Evaluate an AST node and return the result.
+
+        Legacy dict ASTs are converted to nodes first.
+        """
+        if isinstance(node, dict):
+            node = from_dict(node)
+        context = active.get()
+        if context is None or context[0] is not self or context[1] is not runtime:
+            # Lazy sequences created meanwhile call functions through this evaluation
+            token = active.set((self, runtime))
+            try:
+                return self.evaluate_ast(node, runtime)
+            finally:
+                active.reset(token)
+
+        if self.mode == TREE_WALK or (self.mode == TIERED and interpreting.get()):
+            # Function bodies in the interpreted tier are walked too
+            return self.walk_ast(node, runtime)
+        if self.mode == VM:
+            return self.vm.run(self.vm.get_program(node), runtime)
+        if self.mode == BYTECODE:
+            program = self.py_compiler.get_program(node)
+            if program is not None:
+                return self.py_compiler.run(program, runtime)
+        return self.compiler.get(node)(runtime)
+
+    def walk_ast(self, node: Optional[Node], runtime: "ZeusRuntime") -> Any:
+        """
+        Evaluate an AST node by walking it directly.
+
+        This is the reference implementation the closure compiler must match.
         """
         if node is None:
             return None
 
-        node_type = node.get("type")
+        node_type = node.type
 
         # Handle errors
-        if node.get("error"):
-            raise RuntimeError(node["error"])
+        if node.error:
+            raise RuntimeError(node.error)
 
         # Dispatch based on node type
         if node_type == "empty":
             return None
 
         elif node_type == "literal":
-            return node["value"]
+            return node.value
 
         elif node_type == "identifier":
             return self._evaluate_identifier(node, runtime)
@@ -110,7 +183,7 @@ class ZeusEvaluator:
             return self._evaluate_function_call(node, runtime)
 
         elif node_type == "parenthesized":
-            return self.evaluate_ast(node["expression"], runtime)
+            return self.evaluate_ast(node.expression, runtime)
 
         elif node_type == "if_statement":
             return self._evaluate_if_statement(node, runtime)
@@ -121,6 +194,9 @@ class ZeusEvaluator:
         elif node_type == "for_loop":
             return self._evaluate_for_loop(node, runtime)
 
+        elif node_type == "parallel_for_loop":
+            return self._evaluate_parallel_for_loop(node, runtime)
+
         elif node_type == "function_definition":
             return self._evaluate_function_definition(node, runtime)
 
@@ -136,12 +212,24 @@ class ZeusEvaluator:
         elif node_type == "dict":
             return self._evaluate_dict(node, runtime)
 
+        elif node_type == "block":
+            return self._evaluate_statements(node.statements, runtime)
+
+        elif node_type == "module":
+            return self._evaluate_statements(node.body, runtime)
+
+        elif node_type == "hoisted_loop":
+            return self._evaluate_hoisted_loop(node, runtime)
+
+        elif node_type == "invariant":
+            return self._evaluate_invariant(node, runtime)
+
         else:
             raise RuntimeError(f"Unknown node type: {node_type}")
 
-    def _evaluate_identifier(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_identifier(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate identifier (variable or function reference)."""
-        name = node["name"]
+        name = node.name
 
         # Check runtime variables first (allows shadowing builtins)
         try:
@@ -152,12 +240,11 @@ class ZeusEvaluator:
                 return self.builtins[name]
             return f"Error: Variable '{name}' is not defined"
 
-    def _evaluate_assignment(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_assignment(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate variable assignment."""
-        variable = node["variable"]
-        # Support both "expression" and "value" for backwards compatibility
-        value_node = node.get("expression") or node.get("value")
-        if not value_node:
+        variable = node.variable
+        value_node = node.expression
+        if value_node is None:
             raise RuntimeError("Assignment must have either 'expression' or 'value'")
         value = self.evaluate_ast(value_node, runtime)
 
@@ -167,11 +254,11 @@ class ZeusEvaluator:
         # Return the assigned value
         return value
 
-    def _evaluate_binary_op(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_binary_op(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate binary operation."""
-        left = self.evaluate_ast(node["left"], runtime)
-        right = self.evaluate_ast(node["right"], runtime)
-        op = node["operator"]
+        left = self.evaluate_ast(node.left, runtime)
+        right = self.evaluate_ast(node.right, runtime)
+        op = node.operator
 
         if op in self.binary_ops:
             try:
@@ -185,40 +272,40 @@ class ZeusEvaluator:
         else:
             raise ZeusValueError(f"Unknown operator: {op}")
 
-    def _evaluate_unary_op(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_unary_op(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate unary operation."""
-        operand = self.evaluate_ast(node["operand"], runtime)
-        op = node["operator"]
+        operand = self.evaluate_ast(node.operand, runtime)
+        op = node.operator
 
         if op in self.unary_ops:
             return self.unary_ops[op](operand)
         else:
             raise RuntimeError(f"Unknown unary operator: {op}")
 
-    def _evaluate_function_call(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_function_call(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate function call."""
-        func_name = node["name"]
-        arguments = node.get("arguments", [])
+        func_name = node.name
+        arguments = node.arguments
 
         # Evaluate arguments
         evaluated_args = []
         for arg in arguments:
             # Special handling for pattern calls that might be identifiers
-            if (
-                isinstance(arg, dict)
-                and arg.get("type") == "function_call"
-                and not arg.get("arguments")
-            ):
+            if isinstance(arg, Call) and not arg.arguments:
                 # This might be a variable reference that was parsed as a function call
-                var_name = arg["name"]
-                if runtime.has_variable(var_name):
-                    evaluated_args.append(runtime.get_variable(var_name))
+                value = runtime.lookup_variable(arg.name)
+                if value is not UNDEFINED:
+                    evaluated_args.append(value)
                 else:
                     # Not a variable, evaluate normally
                     evaluated_args.append(self.evaluate_ast(arg, runtime))
             else:
                 evaluated_args.append(self.evaluate_ast(arg, runtime))
 
+        return self._call_by_name(func_name, evaluated_args, runtime)
+
+    def _call_by_name(self, func_name: str, evaluated_args: List[Any], runtime: "ZeusRuntime") -> Any:
+        """Call a builtin, user-defined function or learned pattern by name."""
         # Check if it's a builtin function
         if func_name in self.builtins:
             func = self.builtins[func_name]
@@ -229,7 +316,25 @@ class ZeusEvaluator:
 
         # Check if it's a user-defined function
         func = runtime.get_function(func_name)
+        if func and self.mode == TIERED and isinstance(func, FunctionDef):
+            return self._call_tiered(func_name, func, evaluated_args, runtime)
+        if func and self.mode == VM and isinstance(func, FunctionDef):
+            return self.vm.call_function(runtime, func_name, func, evaluated_args)
         if func:
+            # Compiled modes run the body in a frame with its locals in slots
+            compiled = self.compiler.get_function(func) if self.mode != TREE_WALK else None
+            memo = runtime.memo.function_table(func_name, func, runtime.functions, self.builtins)
+            if compiled is not None:
+                if len(runtime.scopes) > TRAMPOLINE_DEPTH:
+                    # Deep recursion continues on an explicit stack
+                    return self.trampoline.call(runtime, func_name, func, evaluated_args)
+                if memo is not None:
+                    return memo.call(evaluated_args, lambda: compiled(runtime, evaluated_args))
+                return compiled(runtime, evaluated_args)
+            if memo is not None:
+                return memo.call(
+                    evaluated_args, lambda: self._call_user_function(func, evaluated_args, runtime)
+                )
             return self._call_user_function(func, evaluated_args, runtime)
 
         # Check if it's a learned pattern
@@ -267,7 +372,13 @@ class ZeusEvaluator:
                     pass
 
                 # print(f"DEBUG: Pattern {func_name} called with args: {pattern_args}")
-                return runtime.apply_pattern(func_name, pattern_args)
+                if self.mode != TIERED:
+                    return runtime.apply_pattern(func_name, pattern_args)
+                start = time.perf_counter()
+                try:
+                    return runtime.apply_pattern(func_name, pattern_args)
+                finally:
+                    self.tiers.record_pattern(func_name, time.perf_counter() - start)
         except Exception as e:
             # Log the error for debugging
             # print(f"DEBUG: Pattern application failed: {e}")
@@ -276,18 +387,33 @@ class ZeusEvaluator:
             traceback.print_exc()
             raise
 
+    def _call_tiered(self, func_name: str, func: FunctionDef, evaluated_args: List[Any],
+                     runtime: "ZeusRuntime") -> Any:
+        """Call a user function in the tier its profile has reached."""
+        if len(runtime.scopes) > TRAMPOLINE_DEPTH:
+            # Deep recursion continues on an explicit stack
+            return self.trampoline.call(runtime, func_name, func, evaluated_args)
+        memo = runtime.memo.function_table(func_name, func, runtime.functions, self.builtins)
+        if memo is not None:
+            return memo.call(
+                evaluated_args, lambda: self.tiers.call(runtime, func_name, func, evaluated_args)
+            )
+        return self.tiers.call(runtime, func_name, func, evaluated_args)
+
     def _call_user_function(
-        self, func: Dict[str, Any], args: List[Any], runtime: "ZeusRuntime"
+        self, func: Union[Node, Dict[str, Any]], args: List[Any], runtime: "ZeusRuntime"
     ) -> Any:
         """Call user-defined function."""
-        # Check if it's a builtin/Python function
-        if func.get("type") == "builtin" and "function" in func:
-            python_func = func["function"]
-            if callable(python_func):
-                try:
-                    return python_func(*args)
-                except Exception as e:
-                    raise RuntimeError(f"Error calling function: {e}")
+        if isinstance(func, dict):
+            # Check if it's a builtin/Python function
+            if func.get("type") == "builtin" and "function" in func:
+                python_func = func["function"]
+                if callable(python_func):
+                    try:
+                        return python_func(*args)
+                    except Exception as e:
+                        raise RuntimeError(f"Error calling function: {e}")
+            func = from_dict(func)
 
         # Otherwise it's a Zeus function with parameters and body
         # Create new scope
@@ -295,7 +421,7 @@ class ZeusEvaluator:
 
         try:
             # Bind arguments to parameters
-            params = func.get("parameters", [])
+            params = func.parameters or ()
             for i, param in enumerate(params):
                 if i < len(args):
                     runtime.set_variable(param, args[i])
@@ -305,12 +431,12 @@ class ZeusEvaluator:
 
             # Execute function body
             result = None
-            for statement in func.get("body", []):
+            for statement in func.body or ():
                 result = self.evaluate_ast(statement, runtime)
 
                 # Check for return statement
-                if isinstance(statement, dict) and statement.get("type") == "return":
-                    result = self.evaluate_ast(statement["value"], runtime)
+                if statement is not None and statement.type == "return":
+                    result = self.evaluate_ast(statement.value, runtime)
                     break
 
             return result
@@ -319,45 +445,45 @@ class ZeusEvaluator:
             # Restore previous scope
             runtime.pop_scope()
 
-    def _evaluate_if_statement(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_if_statement(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate if statement."""
-        condition = self.evaluate_ast(node["condition"], runtime)
+        condition = self.evaluate_ast(node.condition, runtime)
 
         if condition:
-            if node.get("then_branch"):
-                result = self.evaluate_ast(node["then_branch"], runtime)
+            if node.then_branch:
+                result = self.evaluate_ast(node.then_branch, runtime)
                 # If the branch executed successfully, return the result or a marker
                 return result if result is not None else "__STATEMENT_EXECUTED__"
         else:
-            if node.get("else_branch"):
-                result = self.evaluate_ast(node["else_branch"], runtime)
+            if node.else_branch:
+                result = self.evaluate_ast(node.else_branch, runtime)
                 return result if result is not None else "__STATEMENT_EXECUTED__"
 
         # Return a marker when condition was false and no else branch
         return "__STATEMENT_EXECUTED__"
 
-    def _evaluate_while_loop(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_while_loop(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate while loop."""
         result = None
 
-        while self.evaluate_ast(node["condition"], runtime):
-            if node.get("body"):
-                for statement in node["body"]:
+        while self.evaluate_ast(node.condition, runtime):
+            if node.body:
+                for statement in node.body:
                     result = self.evaluate_ast(statement, runtime)
 
                     # Check for break/continue
-                    if isinstance(statement, dict):
-                        if statement.get("type") == "break":
+                    if statement is not None:
+                        if statement.type == "break":
                             return result
-                        elif statement.get("type") == "continue":
+                        elif statement.type == "continue":
                             break
 
         return result
 
-    def _evaluate_for_loop(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_for_loop(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate for loop."""
-        iterator_name = node["iterator"]
-        iterable = self.evaluate_ast(node["iterable"], runtime)
+        iterator_name = node.iterator
+        iterable = self.evaluate_ast(node.iterable, runtime)
         result = None
 
         # Don't create a new scope for the loop body
@@ -365,50 +491,62 @@ class ZeusEvaluator:
         for item in iterable:
             runtime.set_variable(iterator_name, item)
 
-            if node.get("body"):
-                for statement in node["body"]:
+            if node.body:
+                for statement in node.body:
                     result = self.evaluate_ast(statement, runtime)
 
                     # Check for break/continue
-                    if isinstance(statement, dict):
-                        if statement.get("type") == "break":
+                    if statement is not None:
+                        if statement.type == "break":
                             return result
-                        elif statement.get("type") == "continue":
+                        elif statement.type == "continue":
                             break
 
         return result
 
-    def _evaluate_function_definition(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_parallel_for_loop(self, node: Node, runtime: "ZeusRuntime") -> Any:
+        """Evaluate parallel for loop, in worker processes when its iterations are independent."""
+        iterable = self.evaluate_ast(node.iterable, runtime)
+        # (closure, control) pairs, as the closure compiler passes
+        body = []
+        for statement in node.body or ():
+            control = None
+            if statement is not None and statement.type in ("break", "continue"):
+                control = statement.type
+            body.append((partial(self.evaluate_ast, statement), control))
+        return self.parallel.run(node, iterable, runtime, body)
+
+    def _evaluate_function_definition(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate function definition."""
-        func_name = node["name"]
+        func_name = node.name
 
         # Store function in runtime
         runtime.define_function(func_name, node)
 
         return f"Function {func_name} defined"
 
-    def _evaluate_athena_command(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_athena_command(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate Athena AI command."""
-        command = node["command"]
+        command = node.command
 
         # Use runtime's Athena brain to execute
         return runtime.execute_athena_command(command)
 
-    def _evaluate_pattern_definition(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Any:
+    def _evaluate_pattern_definition(self, node: Node, runtime: "ZeusRuntime") -> Any:
         """Evaluate pattern teaching definition."""
-        definition = node["definition"]
+        definition = node.definition
 
         # Use runtime to teach pattern
         return runtime.teach_pattern(definition)
 
-    def _evaluate_list(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> List[Any]:
+    def _evaluate_list(self, node: Node, runtime: "ZeusRuntime") -> List[Any]:
         """Evaluate list literal."""
-        elements = node.get("elements", [])
+        elements = node.elements
         return [self.evaluate_ast(elem, runtime) for elem in elements]
 
-    def _evaluate_dict(self, node: Dict[str, Any], runtime: "ZeusRuntime") -> Dict[str, Any]:
+    def _evaluate_dict(self, node: Node, runtime: "ZeusRuntime") -> Dict[str, Any]:
         """Evaluate dictionary literal."""
-        items = node.get("items", [])
+        items = node.items
         result = {}
 
         for key_node, value_node in items:
@@ -418,7 +556,30 @@ class ZeusEvaluator:
 
         return result
     
-    def evaluate(self, code_or_node: Union[str, Dict[str, Any]], runtime: Optional["ZeusRuntime"] = None) -> Any:
+    def _evaluate_statements(self, statements, runtime: "ZeusRuntime") -> Any:
+        """Evaluate statements in order, returning the last value."""
+        result = None
+        for statement in statements or ():
+            result = self.evaluate_ast(statement, runtime)
+        return result
+
+    def _evaluate_hoisted_loop(self, node: Node, runtime: "ZeusRuntime") -> Any:
+        """Evaluate a loop with hoisted invariants."""
+        previous = loop_frames.enter(node.frame, node.size)
+        try:
+            return self.evaluate_ast(node.loop, runtime)
+        finally:
+            loop_frames.exit(node.frame, previous)
+
+    def _evaluate_invariant(self, node: Node, runtime: "ZeusRuntime") -> Any:
+        """Evaluate a hoisted expression once per run of its loop."""
+        values = loop_frames.active[node.frame]
+        value = values[node.index]
+        if value is UNSET_INVARIANT:
+            value = values[node.index] = self.evaluate_ast(node.expression, runtime)
+        return value
+
+    def evaluate(self, code_or_node: Union[str, Node, Dict[str, Any]], runtime: Optional["ZeusRuntime"] = None) -> Any:
         """
         Evaluate Zeus code or AST node.
         
@@ -427,21 +588,33 @@ class ZeusEvaluator:
         """
         # Handle string input
         if isinstance(code_or_node, str):
-            if self._parser is None:
-                from .zeus_parser import ZeusParser
-                self._parser = ZeusParser()
+            from .zeus_parse_cache import cached_parse
             
-            parsed = self._parser.parse(code_or_node)
-            if parsed.get("error"):
-                raise ZeusSyntaxError(parsed['error'])
+            parsed = cached_parse(code_or_node)
+            if parsed.error:
+                raise ZeusSyntaxError(parsed.error)
             node = parsed
         else:
             node = code_or_node
         
         # Handle missing runtime
         if runtime is None:
-            from .zeus_runtime import ZeusRuntime
             runtime = ZeusRuntime()
         
         # Call the original evaluate method
         return self.evaluate_ast(node, runtime)
+
+
+# Shared evaluator instance - evaluation state lives in the runtime, not here
+_evaluator = None
+
+
+def get_evaluator() -> ZeusEvaluator:
+    """Get the shared evaluator instance."""
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = ZeusEvaluator(
+            os.environ.get("ZEUS_EVAL_MODE", COMPILED),
+            os.environ.get("ZEUS_OPT_LEVEL", STANDARD),
+        )
+    return _evaluator
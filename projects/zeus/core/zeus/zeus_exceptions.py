@@ -3,10 +3,20 @@
 from typing import Optional, Any
 
 
+def _restore(cls: type, args: tuple, state: dict) -> "ZeusError":
+    error = cls.__new__(cls)
+    error.args = args
+    error.__dict__.update(state)
+    return error
+
+
 class ZeusError(Exception):
     """Base exception for all Zeus errors."""
 
-    pass
+    def __reduce__(self):
+        # Subclasses take their own constructor arguments, so rebuild from state.
+        # Errors raised in parallel for workers cross processes pickled.
+        return (_restore, (type(self), self.args, self.__dict__))
 
 
 class ZeusSyntaxError(ZeusError):
@@ -0,0 +1,256 @@
+"""
+Inline caches for operator and call sites of compiled Zeus code.
+
+Each binary operator site watches the classes of its operands. Once it has
+seen WARMUP evaluations in a row with int/int, float/float or str/str
+operands, it specializes: a type guard followed by the operator written
+inline, without the call through the operator module or the error-mapping
+try block. A literal operand is folded into the specialized code, so its
+closure is not called at all. An evaluation that fails the guard takes the
+generic path and drops the specialization, and a site that keeps changing
+types stops specializing after MAX_DEOPTIMIZATIONS.
+
+Each call site remembers what its name resolved to: the definition of a
+user function with its compiled closure and memo table, or the learned
+pattern the name matched, fuzzy matches included. The entry is guarded by
+the runtime's FunctionTable version and memo cache, and pattern entries by
+the pattern table, so redefining any function or learning a pattern makes
+the next call resolve again.
+"""
+
+import operator
+import os
+from typing import Any, Callable, Dict, List, TYPE_CHECKING
+
+from .zeus_ast import FunctionDef, Literal
+from .zeus_exceptions import (
+    ZeusRuntimeError,
+    ZeusTypeError,
+    ZeusDivisionByZeroError,
+)
+from .zeus_runtime import FunctionTable
+from .zeus_trampoline import TRAMPOLINE_DEPTH
+
+if TYPE_CHECKING:
+    from .zeus_closure_compiler import ClosureCompiler, CompiledNode
+    from .zeus_runtime import ZeusRuntime
+
+# Evaluations in a row with the same operand class before a site specializes
+WARMUP = 8
+
+# Guard failures after which a site stays generic
+MAX_DEOPTIMIZATIONS = 4
+
+# Operators that cannot fail on two operands of each class, with their standard functions
+_NUMERIC = ("+", "-", "*", "==", "!=", "<", ">", "<=", ">=")
+_SPECIALIZABLE = {
+    int: frozenset(_NUMERIC),
+    float: frozenset(_NUMERIC),
+    str: frozenset(("+", "==", "!=", "<", ">", "<=", ">=")),
+}
+_STANDARD_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+# Site factories, one per operator so the operator is compiled inline.
+# {left} and {right} are the operand expressions of the specialized path.
+_SITE_TEMPLATE = """
+def make_site(left_fn, right_fn, constant, op, op_func, types, caches):
+    site_class = None
+    streak = 0
+    budget = MAX_DEOPTIMIZATIONS
+
+    def binary_op(runtime):
+        nonlocal site_class, streak, budget
+        {evaluate}
+        if {guard}:
+            return {left} {op} {right}
+
+        if budget:
+            cls = type({guarded})
+            if site_class is not None:
+                # Guard failed, back to the generic path
+                site_class = None
+                streak = 0
+                budget -= 1
+                caches.deoptimizations += 1
+            elif cls in types{same}:
+                streak += 1
+                if streak >= WARMUP:
+                    site_class = cls
+                    caches.specializations += 1
+            else:
+                streak = 0
+
+        try:
+            return op_func(left, right)
+        except ZeroDivisionError:
+            raise ZeusDivisionByZeroError()
+        except TypeError:
+            raise ZeusTypeError(op, "compatible types", left)
+        except Exception as e:
+            raise ZeusRuntimeError(f"Error in {{op}} operation: {{e}}", context=op)
+
+    return binary_op
+"""
+
+# (evaluate, guarded, guard, left, right, same) for each shape of site
+_SHAPES = {
+    "variables": (
+        "left = left_fn(runtime)\n        right = right_fn(runtime)",
+        "left", "type(left) is site_class and type(right) is site_class",
+        "left", "right", " and type(right) is cls",
+    ),
+    "right_constant": (
+        "left = left_fn(runtime)\n        right = constant",
+        "left", "type(left) is site_class", "left", "constant", " and type(constant) is cls",
+    ),
+    "left_constant": (
+        "left = constant\n        right = right_fn(runtime)",
+        "right", "type(right) is site_class", "constant", "right", " and type(constant) is cls",
+    ),
+}
+
+
+def _build_factories() -> Dict[tuple, Callable]:
+    namespace = {
+        "MAX_DEOPTIMIZATIONS": MAX_DEOPTIMIZATIONS,
+        "WARMUP": WARMUP,
+        "ZeusDivisionByZeroError": ZeusDivisionByZeroError,
+        "ZeusTypeError": ZeusTypeError,
+        "ZeusRuntimeError": ZeusRuntimeError,
+    }
+    factories = {}
+    for op in _STANDARD_OPS:
+        for shape, (evaluate, guarded, guard, left, right, same) in _SHAPES.items():
+            source = _SITE_TEMPLATE.format(
+                evaluate=evaluate, guarded=guarded, guard=guard, left=left, op=op,
+                right=right, same=same,
+            )
+            exec(compile(source, f"<zeus inline cache {op}>", "exec"), namespace)
+            factories[(op, shape)] = namespace.pop("make_site")
+    return factories
+
+
+_FACTORIES = _build_factories()
+
+# Kinds of call site entry
+_UNRESOLVED, _GENERIC, _USER, _PATTERN = range(4)
+_EMPTY = (None, -1, None, _UNRESOLVED)
+
+
+class InlineCaches:
+    """Builds the inline-cached sites of one closure compiler and counts their transitions."""
+
+    def __init__(self, compiler: "ClosureCompiler", enabled: bool = None):
+        if enabled is None:
+            enabled = os.environ.get("ZEUS_INLINE_CACHES", "on") != "off"
+        self.compiler = compiler
+        self.enabled = enabled
+        # Call sites only where the evaluator does not decide per call, as tiered mode does
+        self.calls_enabled = enabled and compiler.evaluator.cached_calls
+        self.specializations = 0
+        self.deoptimizations = 0
+        self.call_resolutions = 0
+
+    def binary_site(self, op: str, op_func: Callable, left_node: Any, right_node: Any,
+                    left_fn: "CompiledNode", right_fn: "CompiledNode") -> "CompiledNode":
+        """Return a specializing closure for a binary operator, or None if op cannot specialize."""
+        if not self.enabled or _STANDARD_OPS.get(op) is not op_func:
+            return None
+        for shape, node in (("right_constant", right_node), ("left_constant", left_node)):
+            value = node.value if isinstance(node, Literal) else None
+            if type(value) in _SPECIALIZABLE:
+                if op not in _SPECIALIZABLE[type(value)]:
+                    return None
+                return _FACTORIES[(op, shape)](
+                    left_fn, right_fn, value, op, op_func, frozenset((type(value),)), self
+                )
+        types = frozenset(cls for cls, ops in _SPECIALIZABLE.items() if op in ops)
+        return _FACTORIES[(op, "variables")](left_fn, right_fn, None, op, op_func, types, self)
+
+    def call_site(self, func_name: str, arg_fns: List["CompiledNode"]) -> "CompiledNode":
+        """Return a closure calling a user function or pattern through a cached resolution, or None."""
+        if not self.calls_enabled:
+            return None
+        evaluator = self.compiler.evaluator
+        call_by_name = evaluator._call_by_name
+        trampoline = evaluator.trampoline
+        resolve = self._resolver(func_name)
+        entry = _EMPTY
+
+        def call(runtime):
+            nonlocal entry
+            args = [arg_fn(runtime) for arg_fn in arg_fns]
+            functions = runtime.functions
+            cached = entry
+            if not (cached[0] is functions and cached[1] == functions.version
+                    and cached[2] is runtime.memo):
+                cached = entry = resolve(runtime)
+            kind = cached[3]
+
+            if kind == _USER:
+                node, compiled, table = cached[4:]
+                if len(runtime.scopes) > TRAMPOLINE_DEPTH:
+                    # Deep recursion continues on an explicit stack
+                    return trampoline.call(runtime, func_name, node, args)
+                if table is not None:
+                    return table.call(args, lambda: compiled(runtime, args))
+                return compiled(runtime, args)
+
+            if kind == _PATTERN:
+                patterns, count, name, pattern = cached[4:]
+                brain = runtime.athena_brain
+                if (brain is not None and brain.pattern_learner.patterns is patterns
+                        and len(patterns) == count and patterns.get(name) is pattern):
+                    return runtime.apply_pattern(name, dict(zip(pattern.parameters, args)))
+                entry = _EMPTY
+
+            return call_by_name(func_name, args, runtime)
+
+        return call
+
+    def _resolver(self, func_name: str) -> Callable[["ZeusRuntime"], tuple]:
+        compiler = self.compiler
+        builtins = compiler.evaluator.builtins
+
+        def resolve(runtime):
+            functions = runtime.functions
+            if not isinstance(functions, FunctionTable):
+                return _EMPTY
+            self.call_resolutions += 1
+            guard = (functions, functions.version, runtime.memo)
+
+            node = functions.get(func_name)
+            if isinstance(node, FunctionDef):
+                table = runtime.memo.function_table(func_name, node, functions, builtins)
+                return guard + (_USER, node, compiler.get_function(node), table)
+
+            brain = runtime.athena_brain
+            if node is None and brain is not None:
+                # Patterns are only ever added, so their count guards a fuzzy match
+                learner = brain.pattern_learner
+                patterns = learner.patterns
+                name = func_name if func_name in patterns else learner._find_closest_pattern(func_name)
+                if name is not None:
+                    return guard + (_PATTERN, patterns, len(patterns), name, patterns[name])
+            # Legacy functions and unknown names, left to the evaluator
+            return guard + (_GENERIC,)
+
+        return resolve
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "specializations": self.specializations,
+            "deoptimizations": self.deoptimizations,
+            "call_resolutions": self.call_resolutions,
+        }
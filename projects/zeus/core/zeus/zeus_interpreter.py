@@ -1,11 +1,16 @@
 import ast
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 import logging
-from .zeus_parser import ZeusParser
-from .zeus_evaluator import ZeusEvaluator
+import os
+from .zeus_ast import Node
+from .zeus_exceptions import ZeusError, ZeusRuntimeError
+from .zeus_parse_cache import cached_parse, get_parser
+from .zeus_evaluator import get_evaluator
 from .zeus_runtime import ZeusRuntime
 from .zeus_athena_interface import AthenaInterface
+from .zeus_telemetry import TelemetryChannel, ASYNC
+from .zeus_module_cache import PROGRAM, load_unit
 
 
 class ZeusInterpreter:
@@ -19,8 +24,8 @@ class ZeusInterpreter:
 
         # Initialize components
         self.athena = AthenaInterface()  # Interface to Athena through Ermis
-        self.parser = ZeusParser()
-        self.evaluator = ZeusEvaluator()
+        self.parser = get_parser()  # Shared, stateless between parses
+        self.evaluator = get_evaluator()  # Shared, state lives in the runtime
         self.runtime = ZeusRuntime()  # Uses Cronos for knowledge
         
         # Set athena interface reference in runtime
@@ -35,12 +40,16 @@ class ZeusInterpreter:
         self.last_result = None  # Track last computation result
         self.conversation_history = []  # Track conversation for context
 
+        # Execution records and learning notifications, sent in the background
+        self.telemetry = TelemetryChannel(
+            self.runtime.ermis,
+            self.session_id,
+            os.environ.get("ZEUS_TELEMETRY", ASYNC),
+            sample=int(os.environ.get("ZEUS_TELEMETRY_SAMPLE", 1)),
+        )
+
         # Create session through Ermis
         self.runtime.ermis.start_session({'session_id': self.session_id})
-        
-        # Cache for compiled/parsed code
-        self.cache = {}
-        self._cache_size_limit = 100
 
         self.logger.info(f"Zeus interpreter initialized (session: {self.session_id})")
 
@@ -98,7 +107,7 @@ class ZeusInterpreter:
                     'success': True,
                     'execution_time_ms': execution_time * 1000 if execution_time else None,
                 }
-                self.runtime.set_variable(f'_exec_{len(self.conversation_history)}', execution_data)
+                self.telemetry.record_execution(f'_exec_{len(self.conversation_history)}', execution_data)
 
                 # Store context
                 self.runtime.set_variable("last_result", result)
@@ -112,6 +121,10 @@ class ZeusInterpreter:
             self.logger.error(f"Execution error: {e}")
             return f"Error: {str(e)}"
 
+        finally:
+            # Statement boundary, persist the variables it assigned
+            self.runtime.flush()
+
     def _is_natural_language(self, code: str) -> bool:
         """Check if input is natural language command."""
         # Check for explicit Athena commands
@@ -214,18 +227,18 @@ class ZeusInterpreter:
 
     def _execute_zeus_code(self, code: str) -> Any:
         """Execute traditional Zeus code."""
-        # Parse the code
-        parsed = self.parser.parse(code)
+        # Parse the code (shared AST cache)
+        parsed = cached_parse(code)
 
-        if parsed.get("error"):
-            return f"Parse error: {parsed['error']}"
+        if parsed.error:
+            return f"Parse error: {parsed.error}"
 
         # Evaluate the parsed code
         result = self.evaluator.evaluate_ast(parsed, self.runtime)
 
         # Update context
-        if parsed.get("type") == "assignment":
-            var_name = parsed.get("variable")
+        if parsed.type == "assignment":
+            var_name = parsed.variable
             if var_name:
                 self.context[var_name] = result
                 # Store in persistent knowledge base through runtime
@@ -236,6 +249,45 @@ class ZeusInterpreter:
 
         return result
 
+    def stream_program(self, code: str) -> Iterator[Any]:
+        """
+        Run a multi-statement program, yielding each top-level statement's value.
+
+        The program is parsed once into a Module. Its statements go straight
+        to the evaluator, without the natural-language detection, context
+        resolution and Athena notification execute() does per line. Errors
+        are raised as ZeusSyntaxError or ZeusRuntimeError with the line.
+        With a Lightning cache attached, the parsed Module is kept as a
+        .zeusc artifact, so the same program is not parsed again.
+        """
+        module = load_unit(PROGRAM, code, lambda: self.parser.parse_program(code))
+        try:
+            for statement, line in zip(module.body, module.lines):
+                try:
+                    yield self.evaluator.evaluate_ast(statement, self.runtime)
+                except Exception as e:
+                    if isinstance(e, ZeusError) and e.args:
+                        message = str(e.args[0])
+                    else:
+                        message = f"{type(e).__name__}: {e}"
+                    raise ZeusRuntimeError(message, context=f"line {line}") from e
+        finally:
+            # Program end is a statement boundary for persistence
+            self.runtime.flush()
+
+    def execute_program(self, code: str) -> Any:
+        """Run a multi-statement program and return the value of its last statement."""
+        result = None
+        for result in self.stream_program(code):
+            pass
+        return result
+
+    def execute_file(self, path: str) -> Any:
+        """Run a .zeus file and return the value of its last statement."""
+        with open(path, "r", encoding="utf-8") as f:
+            code = f.read()
+        return self.execute_program(code)
+
     def _generate_session_id(self) -> str:
         """Generate unique session ID."""
         import uuid
@@ -327,26 +379,13 @@ class ZeusInterpreter:
         else:
             return "general"
             
-    def _notify_athena_about_pattern(self, code: str, parsed_ast: Dict[str, Any], result: Any):
+    def _notify_athena_about_pattern(self, code: str, parsed_ast: Node, result: Any):
         """Notify Athena about executed code for pattern learning"""
-        try:
-            # Send pattern learning request to Athena
-            message = {
-                'type': 'learn_from_code',
-                'code': code,
-                'parsed_ast': parsed_ast,
-                'result': result,
-                'context': {
-                    'variables': self.context,
-                    'session_id': self.session_id
-                }
-            }
-            
-            # Send to Athena directly using the sender
-            from .ermis_sender import zeus_sender
-            zeus_sender.send_to_athena(message, 'learn_from_code')
-        except Exception as e:
-            self.logger.debug(f"Failed to notify Athena about pattern: {e}")
+        context = {
+            'variables': self.context,
+            'session_id': self.session_id
+        }
+        self.telemetry.record_learning(code, parsed_ast, result, context)
 
     def save_session(self, path: str):
         """Save current session state."""
@@ -412,15 +451,15 @@ class ZeusInterpreter:
                 analysis["type"] = "zeus_code"
                 
                 # Parse the code
-                parsed = self.parser.parse(code)
-                analysis["ast"] = parsed
+                parsed = cached_parse(code)
+                analysis["ast"] = parsed.to_dict()
                 
-                if parsed.get("error"):
+                if parsed.error:
                     analysis["valid"] = False
-                    analysis["errors"].append(f"Parse error: {parsed['error']}")
+                    analysis["errors"].append(f"Parse error: {parsed.error}")
                 else:
-                    # Extract information from AST
-                    self._analyze_ast(parsed, analysis)
+                    # Extract information from the dict form of the AST
+                    self._analyze_ast(analysis["ast"], analysis)
             
             return analysis
             
@@ -473,27 +512,17 @@ class ZeusInterpreter:
         """
         Evaluate a single expression and return the result.
         Unlike execute(), this expects a pure expression without side effects.
+        The parsed AST is cached; the result is not, since it depends on variables.
         """
-        # Check cache first
-        cache_key = f"expr:{expression}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-        
         try:
             # Parse as an expression
-            parsed = self.parser.parse(expression)
+            parsed = cached_parse(expression)
             
-            if parsed.get("error"):
-                raise ValueError(f"Parse error: {parsed['error']}")
+            if parsed.error:
+                raise ValueError(f"Parse error: {parsed.error}")
             
             # Evaluate without recording in history or database
-            result = self.evaluator.evaluate_ast(parsed, self.runtime)
-            
-            # Cache the result
-            if len(self.cache) < self._cache_size_limit:
-                self.cache[cache_key] = result
-            
-            return result
+            return self.evaluator.evaluate_ast(parsed, self.runtime)
             
         except Exception as e:
             raise ValueError(f"Expression evaluation error: {str(e)}")
@@ -520,14 +549,14 @@ class ZeusInterpreter:
             # Check if it's Zeus code (not natural language)
             if not self._is_natural_language(code) and not self._is_pattern_teaching(code):
                 # Parse the code
-                parsed = self.parser.parse(code)
+                parsed = cached_parse(code)
                 
-                if parsed.get("error"):
+                if parsed.error:
                     validation["valid"] = False
-                    validation["errors"].append(f"Syntax error: {parsed['error']}")
+                    validation["errors"].append(f"Syntax error: {parsed.error}")
                 else:
-                    # Additional validation checks
-                    self._validate_ast(parsed, validation)
+                    # Additional validation checks on the dict form of the AST
+                    self._validate_ast(parsed.to_dict(), validation)
             
             return validation
             
@@ -0,0 +1,166 @@
+"""
+Memoization of pure Zeus user functions and learned patterns.
+
+Each pure callable gets an LRU table of results keyed by its arguments.
+Purity is decided once per definition by zeus_purity and rechecked when
+the function, or any function it may call, is redefined. Calls with
+unhashable arguments such as lists and arrays are not memoized, and
+failed calls are never cached.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .zeus_ast import FunctionDef
+from .zeus_purity import Purity, analyze_function, analyze_pattern
+
+# Results kept per callable
+DEFAULT_MAX_ENTRIES = 1024
+
+# Returned by MemoTable.lookup when nothing is cached
+MISSING = object()
+
+
+def call_key(args: Any) -> tuple:
+    """Key for a call's arguments."""
+    # Types are part of the key, so f(1), f(1.0) and f(True) stay apart
+    return (tuple(args), tuple([arg.__class__ for arg in args]))
+
+
+class MemoTable:
+    """Results of one callable, with its purity and hit statistics."""
+
+    def __init__(self, name: str, kind: str, purity: Purity, source: Any, max_entries: int):
+        self.name = name
+        self.kind = kind
+        self.purity = purity
+        # Definition the analysis was made for
+        self.source = source
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def lookup(self, args: Any) -> Tuple[Optional[tuple], Any]:
+        """(key, cached result or MISSING); key is None when args cannot be keyed."""
+        key = call_key(args)
+        with self._lock:
+            try:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return key, self.entries[key]
+            except TypeError:
+                # Lists, arrays and other unhashable arguments
+                self.uncacheable += 1
+                return None, MISSING
+            self.misses += 1
+        return key, MISSING
+
+    def store(self, key: tuple, value: Any):
+        """Cache the result of a call looked up under key."""
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def call(self, args: Any, compute: Callable[[], Any],
+             keep: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return the cached result for args, or compute and cache it."""
+        key, value = self.lookup(args)
+        if value is not MISSING:
+            return value
+        # Computed outside the lock, recursive calls come back through this table
+        value = compute()
+        if key is not None and (keep is None or keep(value)):
+            self.store(key, value)
+        return value
+
+    def clear(self):
+        """Drop cached results, keeping the purity decision."""
+        with self._lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.uncacheable = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "kind": self.kind,
+                "pure": self.purity.pure,
+                "reason": self.purity.reason,
+                "size": len(self.entries),
+                "max_size": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+                "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+            }
+
+
+class MemoCache:
+    """Memo tables of one runtime's functions and patterns, by name."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(os.environ.get("ZEUS_MEMO_SIZE", DEFAULT_MAX_ENTRIES))
+        # 0 turns memoization off
+        self.max_entries = max_entries
+        self._tables: Dict[Tuple[str, str], MemoTable] = {}
+        self._lock = threading.Lock()
+
+    def function_table(self, name: str, node: Any, functions: Dict[str, Any],
+                       builtins: Dict[str, Any]) -> Optional[MemoTable]:
+        """Table for a user function, or None if its calls cannot be memoized."""
+        if self.max_entries <= 0 or not isinstance(node, FunctionDef):
+            return None
+        key = ("function", name)
+        table = self._tables.get(key)
+        if table is None or not self._current(table, functions):
+            purity = analyze_function(name, node, functions, builtins)
+            table = MemoTable(name, "function", purity, node, self.max_entries)
+            with self._lock:
+                self._tables[key] = table
+        return table if table.purity.pure else None
+
+    def pattern_table(self, name: str, implementation: str) -> Optional[MemoTable]:
+        """Table for a learned pattern, or None if its applications cannot be memoized."""
+        if self.max_entries <= 0:
+            return None
+        key = ("pattern", name)
+        table = self._tables.get(key)
+        if table is None or table.source != implementation:
+            table = MemoTable(name, "pattern", analyze_pattern(implementation),
+                              implementation, self.max_entries)
+            with self._lock:
+                self._tables[key] = table
+        return table if table.purity.pure else None
+
+    @staticmethod
+    def _current(table: MemoTable, functions: Dict[str, Any]) -> bool:
+        """Whether the definitions a table was analyzed for are still in place."""
+        for name, node in table.purity.dependencies:
+            if functions.get(name) is not node:
+                return False
+        return True
+
+    def clear(self, name: Optional[str] = None) -> int:
+        """Drop cached results of every callable, or of the named one; returns how many."""
+        with self._lock:
+            tables = [t for t in self._tables.values() if name is None or t.name == name]
+        for table in tables:
+            table.clear()
+        return len(tables)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-callable memo statistics, by name."""
+        with self._lock:
+            tables = list(self._tables.values())
+        return {table.name: table.get_stats() for table in tables}
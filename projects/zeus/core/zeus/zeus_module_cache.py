@@ -0,0 +1,126 @@
+"""
+Compiled Zeus units (.zeusc artifacts), persisted through Lightning.
+
+Programs run from files and the function library a runtime loads at start
+are rebuilt on every process start: programs are tokenized and parsed,
+functions decoded from JSON and rebuilt node by node. Once a Lightning
+CacheManager has been attached with set_module_cache(), the result is
+stored as a .zeusc artifact and the next process loads it directly.
+
+An artifact holds the pickled AST with a format stamp and the hash of the
+source it was built from, and is stored under that hash. An artifact whose
+stamp or hash does not match, or that cannot be read, is rebuilt from
+source and replaced. FORMAT_VERSION must be bumped whenever the AST nodes
+change shape.
+
+ASTs are stored before optimization: the optimizer depends on the mode and
+level of the evaluator that runs them and is cheap next to parsing.
+"""
+
+import hashlib
+import logging
+import pickle
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .zeus_performance import register_stats_provider
+
+# Stamp of the artifact layout and the AST nodes it pickles
+MAGIC = "zeusc"
+FORMAT_VERSION = 1
+
+# Kinds of unit
+PROGRAM = "program"
+FUNCTIONS = "functions"
+
+logger = logging.getLogger(__name__)
+
+# Lightning CacheManager attached by the orchestrator
+_cache_manager = None
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "rejected": 0, "failures": 0}
+
+
+def set_module_cache(cache_manager):
+    """Persist compiled Zeus units through a Lightning CacheManager, or stop with None."""
+    global _cache_manager
+    _cache_manager = cache_manager
+
+
+def source_hash(kind: str, source: str) -> str:
+    """Hash a unit is stored under."""
+    return hashlib.sha256(f"{kind}\0{source}".encode()).hexdigest()
+
+
+def _count(name: str):
+    with _lock:
+        _stats[name] += 1
+
+
+def _load(cache, digest: str, kind: str) -> Optional[Any]:
+    try:
+        data = cache.get_zeus_unit(digest)
+    except Exception as e:
+        logger.debug(f"Failed to read {kind} unit {digest[:12]}: {e}")
+        _count("failures")
+        return None
+    if data is None:
+        return None
+    try:
+        magic, version, stored_hash, stored_kind, unit = pickle.loads(data)
+    except Exception:
+        _count("rejected")
+        return None
+    if (magic, version, stored_hash, stored_kind) != (MAGIC, FORMAT_VERSION, digest, kind):
+        _count("rejected")
+        return None
+    return unit
+
+
+def _store(cache, digest: str, kind: str, unit: Any):
+    try:
+        data = pickle.dumps((MAGIC, FORMAT_VERSION, digest, kind, unit), pickle.HIGHEST_PROTOCOL)
+        cache.store_zeus_unit(digest, data, {"kind": kind, "format_version": FORMAT_VERSION})
+        _count("stores")
+    except Exception as e:
+        # The unit was built from source, only the next start pays for it again
+        logger.debug(f"Failed to store {kind} unit {digest[:12]}: {e}")
+        _count("failures")
+
+
+def load_unit(kind: str, source: str, build: Callable[[], Any]) -> Any:
+    """The unit built from source, from its artifact when there is a valid one."""
+    cache = _cache_manager
+    if cache is None:
+        return build()
+
+    digest = source_hash(kind, source)
+    unit = _load(cache, digest, kind)
+    if unit is not None:
+        _count("hits")
+        return unit
+
+    _count("misses")
+    # Errors propagate, and nothing is stored for source that does not build
+    unit = build()
+    _store(cache, digest, kind, unit)
+    return unit
+
+
+def get_stats() -> Dict[str, Any]:
+    """Get compiled unit cache statistics."""
+    with _lock:
+        stats = dict(_stats)
+    stats["attached"] = _cache_manager is not None
+    return stats
+
+
+def clear_stats():
+    """Reset the compiled unit cache counters."""
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+register_stats_provider("module_cache", get_stats)
@@ -0,0 +1,559 @@
+"""
+AST optimizer - rewrites parsed Zeus programs before they are compiled.
+
+The optimizer sits between ZeusParser.parse and the evaluator's compilers.
+It runs a pipeline of passes over the immutable node tree, each returning a
+new tree that shares every unchanged subtree with the old one:
+
+- BASIC: constant folding, including pure math builtins with literal arguments
+- STANDARD: dead-branch elimination and algebraic simplification
+- AGGRESSIVE: loop-invariant hoisting out of while/for bodies
+
+The levels use the values of Lightning's OptimizationLevel. Zeus does not
+import Lightning, so anything with a matching ``value`` (the enum itself),
+the integer or the level name is accepted.
+
+Passes never change what a program computes or which errors it raises:
+an operation that fails while folding is left in place to fail at run time,
+identities are only applied to operands known to be numbers, and a hoisted
+expression is still evaluated lazily on its first use in each run of the
+loop. Function definitions are optimized when their statements run, so the
+stored definition stays the source form.
+"""
+
+import itertools
+import logging
+from abc import ABC, abstractmethod
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from .zeus_ast import (
+    Node,
+    Literal,
+    Identifier,
+    BinaryOp,
+    UnaryOp,
+    Call,
+    Parenthesized,
+    ListLiteral,
+    Assign,
+    If,
+    While,
+    For,
+    ParallelFor,
+    FunctionDef,
+    AthenaCommand,
+    PatternDef,
+    ErrorNode,
+    HoistedLoop,
+    InvariantRef,
+    STATEMENT_EXECUTED,
+    map_children,
+    walk,
+)
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+
+# Optimization levels, values match lightning_models.OptimizationLevel
+NONE = 0
+BASIC = 1
+STANDARD = 2
+AGGRESSIVE = 3
+
+LEVEL_NAMES = {"none": NONE, "basic": BASIC, "standard": STANDARD, "aggressive": AGGRESSIVE}
+
+# Builtins whose result depends only on their arguments
+PURE_BUILTINS = frozenset((
+    "abs", "round", "int", "float", "str", "len", "max", "min", "pow",
+    "sqrt", "sin", "cos", "tan", "log", "exp",
+))
+
+# Passes repeat until the tree stops changing, at most this many times
+MAX_ROUNDS = 4
+
+# Larger folded values stay as expressions instead of being kept in the tree
+MAX_FOLDED_SIZE = 1024
+
+_LITERAL_TYPES = (type(None), bool, int, float, str)
+_NUMBER_KINDS = (int, float)
+
+# Result kinds of pure builtins, None where it depends on the arguments
+_BUILTIN_KINDS = {"len": int, "int": int, "float": float, "str": str}
+
+# Math builtins return floats for numbers, arrays for arrays
+_MATH_BUILTINS = frozenset(("sqrt", "sin", "cos", "tan", "log", "exp"))
+
+# Value of an invariant not computed yet in the current loop run
+UNSET_INVARIANT = object()
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_level(level: Any) -> int:
+    """Return the integer optimization level for an enum, integer or name."""
+    value = getattr(level, "value", level)
+    if isinstance(value, str):
+        name = value.strip().lower()
+        value = int(name) if name.isdigit() else LEVEL_NAMES.get(name, value)
+    if value not in (NONE, BASIC, STANDARD, AGGRESSIVE) or isinstance(value, bool):
+        raise ValueError(f"Unknown optimization level: {level}")
+    return value
+
+
+class LoopFrames(threading.local):
+    """Per-thread values of the invariants of running hoisted loops."""
+
+    def __init__(self):
+        self.active: Dict[int, List[Any]] = {}
+
+    def enter(self, frame: int, size: int) -> Optional[List[Any]]:
+        """Start a run of a hoisted loop, returning the frame it replaces."""
+        previous = self.active.get(frame)
+        self.active[frame] = [UNSET_INVARIANT] * size
+        return previous
+
+    def exit(self, frame: int, previous: Optional[List[Any]]):
+        """Finish a run of a hoisted loop."""
+        if previous is None:
+            self.active.pop(frame, None)
+        else:
+            self.active[frame] = previous
+
+
+loop_frames = LoopFrames()
+
+
+def _transform(node: Node, transform: Callable[[Node], Node]) -> Node:
+    """map_children that leaves function definitions alone."""
+    if isinstance(node, FunctionDef):
+        return node
+    return map_children(node, transform)
+
+
+def _is_pure(node: Node, builtins: Dict[str, Any]) -> bool:
+    """Whether evaluating node can neither call user code nor change state beyond assignments."""
+    for child in walk(node):
+        if isinstance(child, Call):
+            if child.name not in PURE_BUILTINS or child.name not in builtins:
+                return False
+        elif isinstance(child, (FunctionDef, AthenaCommand, PatternDef, ErrorNode)):
+            return False
+    return True
+
+
+def _kind(node: Node, env: Dict[str, type]) -> Optional[type]:
+    """The Python type node always evaluates to, when it is known."""
+    if isinstance(node, Literal):
+        return type(node.value)
+    if isinstance(node, Identifier):
+        return env.get(node.name)
+    if isinstance(node, InvariantRef):
+        return _kind(node.expression, env)
+    if isinstance(node, UnaryOp):
+        if node.operator == "not":
+            return bool
+        operand = _kind(node.operand, env)
+        return operand if operand in _NUMBER_KINDS else None
+    if isinstance(node, BinaryOp):
+        left = _kind(node.left, env)
+        right = _kind(node.right, env)
+        op = node.operator
+        if left in _NUMBER_KINDS and right in _NUMBER_KINDS:
+            if op in ("+", "-", "*", "//", "%"):
+                return int if left is int and right is int else float
+            if op == "/":
+                return float
+            if op in ("==", "!=", "<", ">", "<=", ">="):
+                return bool
+        if op == "+" and left is str and right is str:
+            return str
+        return None
+    if isinstance(node, Call):
+        if node.name in _BUILTIN_KINDS:
+            return _BUILTIN_KINDS[node.name]
+        if node.name in _MATH_BUILTINS and node.arguments:
+            kinds = [_kind(argument, env) for argument in node.arguments]
+            return float if all(kind in _NUMBER_KINDS for kind in kinds) else None
+        if node.name == "round" and len(node.arguments) == 1:
+            return int if _kind(node.arguments[0], env) in _NUMBER_KINDS else None
+        if node.name == "abs" and len(node.arguments) == 1:
+            argument = _kind(node.arguments[0], env)
+            return argument if argument in _NUMBER_KINDS else None
+    return None
+
+
+def _is_int_literal(node: Node, value: int) -> bool:
+    return isinstance(node, Literal) and type(node.value) is int and node.value == value
+
+
+class OptimizationPass(ABC):
+    """
+    Base class for optimizer passes.
+
+    run() receives a tree and returns the optimized tree, or the same object
+    when nothing changed. Passes must not rewrite function definitions.
+    """
+
+    name = ""
+    level = BASIC
+
+    @abstractmethod
+    def run(self, node: Node, optimizer: "ZeusOptimizer") -> Node:
+        """Return the optimized tree, or node itself when nothing changed."""
+
+
+class ConstantFolding(OptimizationPass):
+    """Evaluate operators and pure builtins whose operands are literals."""
+
+    name = "constant_folding"
+    level = BASIC
+
+    def run(self, node: Node, optimizer: "ZeusOptimizer") -> Node:
+        def fold(current: Node) -> Node:
+            current = _transform(current, fold)
+
+            if isinstance(current, Parenthesized):
+                return current.expression
+
+            if isinstance(current, BinaryOp):
+                if isinstance(current.left, Literal) and isinstance(current.right, Literal):
+                    op_func = optimizer.binary_ops.get(current.operator)
+                    if op_func is not None:
+                        return self._literal(
+                            current, optimizer, op_func, current.left.value, current.right.value
+                        )
+
+            elif isinstance(current, UnaryOp):
+                if isinstance(current.operand, Literal):
+                    op_func = optimizer.unary_ops.get(current.operator)
+                    if op_func is not None:
+                        return self._literal(current, optimizer, op_func, current.operand.value)
+
+            elif isinstance(current, Call):
+                if (
+                    current.name in PURE_BUILTINS
+                    and current.name in optimizer.builtins
+                    and current.arguments
+                    and all(isinstance(arg, Literal) for arg in current.arguments)
+                ):
+                    builtin = optimizer.builtins[current.name]
+                    return self._literal(
+                        current, optimizer, builtin, *(arg.value for arg in current.arguments)
+                    )
+
+            return current
+
+        return fold(node)
+
+    def _literal(self, node: Node, optimizer: "ZeusOptimizer", func: Callable, *args: Any) -> Node:
+        """Literal holding func(*args), or node if that fails or is not a small constant."""
+        try:
+            value = func(*args)
+        except Exception:
+            # Left for the evaluator, which raises the proper Zeus error
+            return node
+        if type(value) not in _LITERAL_TYPES or sys.getsizeof(value) > MAX_FOLDED_SIZE:
+            return node
+        optimizer.record(self.name)
+        return Literal(value)
+
+
+class DeadBranchElimination(OptimizationPass):
+    """Drop branches and loops whose condition is a constant."""
+
+    name = "dead_branch_elimination"
+    level = STANDARD
+
+    def run(self, node: Node, optimizer: "ZeusOptimizer") -> Node:
+        def eliminate(current: Node) -> Node:
+            current = _transform(current, eliminate)
+
+            if isinstance(current, If) and isinstance(current.condition, Literal):
+                taken = current.then_branch if current.condition.value else current.else_branch
+                if taken is None:
+                    optimizer.record(self.name)
+                    return Literal(STATEMENT_EXECUTED)
+                if current.condition.value is True and current.else_branch is None:
+                    return current
+                # Keeps the marker for a branch evaluating to None
+                optimizer.record(self.name)
+                return If(Literal(True), taken, None)
+
+            if isinstance(current, While) and isinstance(current.condition, Literal):
+                if not current.condition.value:
+                    optimizer.record(self.name)
+                    return Literal(None)
+
+            if isinstance(current, For) and isinstance(current.iterable, ListLiteral):
+                if not current.iterable.elements:
+                    optimizer.record(self.name)
+                    return Literal(None)
+
+            return current
+
+        return eliminate(node)
+
+
+class AlgebraicSimplification(OptimizationPass):
+    """
+    Remove identity operations and combine integer constants.
+
+    Zeus values are dynamically typed, so a rewrite only applies when the
+    operand is known to be a number: a literal, arithmetic on numbers, a
+    numeric builtin or the variable of a for loop over range().
+    """
+
+    name = "algebraic_simplification"
+    level = STANDARD
+
+    def run(self, node: Node, optimizer: "ZeusOptimizer") -> Node:
+        return self._simplify(node, {}, optimizer)
+
+    def _simplify(self, node: Node, env: Dict[str, type], optimizer: "ZeusOptimizer") -> Node:
+        if isinstance(node, For) and node.body and self._counts(node, optimizer):
+            body_env = dict(env)
+            body_env[node.iterator] = int
+            iterable = self._simplify(node.iterable, env, optimizer)
+            body = tuple(self._simplify(statement, body_env, optimizer) for statement in node.body)
+            if iterable is node.iterable and all(new is old for new, old in zip(body, node.body)):
+                return node
+            return For(node.iterator, iterable, body)
+
+        node = _transform(node, lambda child: self._simplify(child, env, optimizer))
+
+        if isinstance(node, BinaryOp):
+            simplified = self._binary(node, env)
+            if simplified is not node:
+                optimizer.record(self.name)
+            return simplified
+
+        if (
+            isinstance(node, UnaryOp)
+            and node.operator == "not"
+            and isinstance(node.operand, UnaryOp)
+            and node.operand.operator == "not"
+            and _kind(node.operand.operand, env) is bool
+        ):
+            optimizer.record(self.name)
+            return node.operand.operand
+
+        return node
+
+    def _counts(self, node: For, optimizer: "ZeusOptimizer") -> bool:
+        """Whether a for loop runs over range() and never reassigns its variable."""
+        iterable = node.iterable
+        if not (isinstance(iterable, Call) and iterable.name == "range" and "range" in optimizer.builtins):
+            return False
+        for statement in node.body:
+            for child in walk(statement):
+                if isinstance(child, Assign) and child.variable == node.iterator:
+                    return False
+                if isinstance(child, For) and child.iterator == node.iterator:
+                    return False
+        return True
+
+    def _binary(self, node: BinaryOp, env: Dict[str, type]) -> Node:
+        op = node.operator
+        left, right = node.left, node.right
+        left_kind = _kind(left, env)
+        right_kind = _kind(right, env)
+
+        # Identities; x + 0 is left alone for floats, where it turns -0.0 into 0.0
+        if op == "+":
+            if left_kind is int and _is_int_literal(right, 0):
+                return left
+            if right_kind is int and _is_int_literal(left, 0):
+                return right
+        elif op == "-":
+            if left_kind in _NUMBER_KINDS and _is_int_literal(right, 0):
+                return left
+        elif op == "*":
+            if left_kind in _NUMBER_KINDS and _is_int_literal(right, 1):
+                return left
+            if right_kind in _NUMBER_KINDS and _is_int_literal(left, 1):
+                return right
+        elif op == "//":
+            if left_kind is int and _is_int_literal(right, 1):
+                return left
+
+        # (x + a) + b -> x + (a + b) on integers, likewise for - and *
+        if (
+            left_kind is int
+            and isinstance(left, BinaryOp)
+            and isinstance(left.right, Literal)
+            and type(left.right.value) is int
+            and isinstance(right, Literal)
+            and type(right.value) is int
+        ):
+            inner = left.operator
+            if op in ("+", "-") and inner in ("+", "-"):
+                total = (left.right.value if inner == "+" else -left.right.value) + (
+                    right.value if op == "+" else -right.value
+                )
+                if total == 0:
+                    return left.left
+                return BinaryOp("+" if total > 0 else "-", left.left, Literal(abs(total)))
+            if op == "*" and inner == "*":
+                return BinaryOp("*", left.left, Literal(left.right.value * right.value))
+
+        return node
+
+
+class LoopInvariantHoisting(OptimizationPass):
+    """
+    Compute expressions that do not change inside a loop once per loop run.
+
+    Only loops whose bodies call nothing but pure builtins are rewritten, so
+    nothing the loop runs can change a variable it does not assign itself.
+    The loop is wrapped in a HoistedLoop and every invariant expression in
+    it becomes an InvariantRef, evaluated on first use and reused after.
+    """
+
+    name = "loop_invariant_hoisting"
+    level = AGGRESSIVE
+
+    def run(self, node: Node, optimizer: "ZeusOptimizer") -> Node:
+        # Frames are numbered per tree, after those of earlier rounds
+        frames = itertools.count(
+            1 + max((n.frame for n in walk(node) if isinstance(n, HoistedLoop)), default=-1)
+        )
+
+        def visit(current: Node) -> Node:
+            # A parallel loop body is hoisted where it runs, possibly in a worker
+            if isinstance(current, (HoistedLoop, ParallelFor)):
+                return current
+            current = _transform(current, visit)
+            if isinstance(current, (For, While)):
+                return self._hoist(current, next(frames), optimizer)
+            return current
+
+        return visit(node)
+
+    def _hoist(self, loop: Node, frame: int, optimizer: "ZeusOptimizer") -> Node:
+        body = loop.body or ()
+        scope = body + (loop.condition,) if isinstance(loop, While) else body
+        if not scope or not all(_is_pure(node, optimizer.builtins) for node in scope):
+            return loop
+
+        assigned: Set[str] = set()
+        if isinstance(loop, For):
+            assigned.add(loop.iterator)
+        for node in scope:
+            for child in walk(node):
+                if isinstance(child, Assign):
+                    assigned.add(child.variable)
+                elif isinstance(child, For):
+                    assigned.add(child.iterator)
+
+        hoisted: List[Node] = []
+
+        def replace(current: Node) -> Node:
+            if isinstance(current, (InvariantRef, FunctionDef)):
+                return current
+            if self._worth_hoisting(current) and self._invariant(current, assigned):
+                hoisted.append(current)
+                return InvariantRef(frame, len(hoisted) - 1, current)
+            return map_children(current, replace)
+
+        if isinstance(loop, While):
+            rewritten = While(replace(loop.condition), tuple(replace(s) for s in body))
+        else:
+            rewritten = For(loop.iterator, loop.iterable, tuple(replace(s) for s in body))
+
+        if not hoisted:
+            return loop
+        optimizer.record(self.name, len(hoisted))
+        return HoistedLoop(frame, len(hoisted), rewritten)
+
+    def _worth_hoisting(self, node: Node) -> bool:
+        return isinstance(node, (BinaryOp, UnaryOp)) or (isinstance(node, Call) and bool(node.arguments))
+
+    def _invariant(self, node: Node, assigned: Set[str]) -> bool:
+        for child in walk(node):
+            if isinstance(child, Identifier):
+                if child.name in assigned:
+                    return False
+            elif isinstance(child, Call):
+                # A bare name argument may be read as a variable
+                if child.name in assigned:
+                    return False
+            elif not isinstance(child, (Literal, BinaryOp, UnaryOp, Parenthesized)):
+                return False
+        return True
+
+
+DEFAULT_PASSES: Tuple[type, ...] = (
+    ConstantFolding,
+    AlgebraicSimplification,
+    DeadBranchElimination,
+    LoopInvariantHoisting,
+)
+
+
+class ZeusOptimizer:
+    """Runs the optimization passes enabled at its level over Zeus ASTs."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", level: Any = STANDARD,
+                 passes: Optional[List[OptimizationPass]] = None):
+        self.level = resolve_level(level)
+        # Fold with the evaluator's own tables so results match evaluation
+        self.binary_ops = evaluator.binary_ops
+        self.unary_ops = evaluator.unary_ops
+        self.builtins = evaluator.builtins
+        self.passes: List[OptimizationPass] = (
+            list(passes) if passes is not None else [cls() for cls in DEFAULT_PASSES]
+        )
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def add_pass(self, optimization_pass: OptimizationPass):
+        """Append a pass to the pipeline."""
+        self.passes.append(optimization_pass)
+
+    def enabled_passes(self) -> List[OptimizationPass]:
+        """Passes that run at the current level."""
+        return [p for p in self.passes if p.level <= self.level]
+
+    def optimize(self, node: Optional[Node]) -> Optional[Node]:
+        """Return the optimized form of a top-level statement."""
+        passes = self.enabled_passes()
+        if node is None or not passes or not isinstance(node, Node):
+            return node
+
+        original = node
+        try:
+            for _ in range(MAX_ROUNDS):
+                start = node
+                for optimization_pass in passes:
+                    node = optimization_pass.run(node, self)
+                if node is start:
+                    break
+        except Exception as e:
+            logger.warning(f"Optimization failed, running the statement unoptimized: {e}")
+            return original
+        return node
+
+    def optimize_function(self, node: FunctionDef) -> FunctionDef:
+        """Return a function definition with each body statement optimized."""
+        if not node.body:
+            return node
+        body = tuple(self.optimize(statement) for statement in node.body)
+        if all(new is old for new, old in zip(body, node.body)):
+            return node
+        return FunctionDef(node.name, node.parameters, body)
+
+    def record(self, pass_name: str, count: int = 1):
+        """Count rewrites made by a pass."""
+        with self._lock:
+            self.stats[pass_name] = self.stats.get(pass_name, 0) + count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get optimizer statistics."""
+        with self._lock:
+            return {
+                "level": self.level,
+                "passes": [p.name for p in self.enabled_passes()],
+                "rewrites": dict(self.stats),
+            }
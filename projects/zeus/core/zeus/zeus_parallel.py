@@ -0,0 +1,324 @@
+"""
+Parallel for loops - runs independent loop iterations in worker processes.
+
+`parallel for i in xs do body` evaluates to the list of the body's values,
+one per item, in order. With ZEUS_PARALLEL=auto, plain top-level for loops
+of at least ZEUS_PARALLEL_MIN items are treated the same way, keeping the
+value of the last iteration as their result.
+
+Iterations only leave the process when zeus_purity.analyze_loop proves
+them independent: the body calls pure functions and deterministic builtins
+only, and every variable it assigns is assigned before it is read in the
+same iteration. Variables the body only reads are sent to the workers with
+the user functions, and the items are split into chunks, several per
+worker so uneven iterations still balance. Chunks are collected in order;
+the first failing iteration's error is raised, and afterwards the loop and
+body variables hold the last iteration's values, as after a plain loop.
+
+Any other loop, or one whose items or variables cannot be pickled, runs in
+order in the calling process with the same result. So does every loop when
+fewer than two workers are configured (ZEUS_PARALLEL_WORKERS, by default
+the CPU count).
+
+Workers are spawned rather than forked, so a script that embeds Zeus must
+guard its entry point with `if __name__ == "__main__"`, as with any
+multiprocessing code.
+"""
+
+import itertools
+import logging
+import math
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_arrays import Range
+from .zeus_ast import Node, For, FunctionDef, ParallelFor, Block
+from .zeus_exceptions import ZeusRuntimeError
+from .zeus_purity import Purity, analyze_loop, loop_names
+from .zeus_runtime import FunctionTable, ZeusRuntime, UNDEFINED
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+
+# When loops run in workers: never, only `parallel for`, or also plain for loops
+OFF = "off"
+EXPLICIT = "explicit"
+AUTO = "auto"
+
+POLICIES = (OFF, EXPLICIT, AUTO)
+
+# Items a plain for loop needs before AUTO sends it to workers
+MIN_ITERATIONS = 1000
+
+# Chunks per worker, so a slow chunk does not leave the others idle
+CHUNKS_PER_WORKER = 4
+
+# Default number of loop analyses kept
+MAX_ENTRIES = 1024
+
+# Iterables whose chunks are slices, sent without listing their items
+SLICEABLE = (Range, range, list, tuple)
+
+# One iteration's statements, as (closure, control) pairs where control is
+# "break" or "continue" after a statement that ends the loop or the iteration
+LoopBody = List[Tuple[Callable[["ZeusRuntime"], Any], Optional[str]]]
+
+logger = logging.getLogger(__name__)
+
+
+def automatic(node: Optional[Node]) -> Optional[Node]:
+    """Mark a top-level for loop to run in workers when that is safe and worth it."""
+    if isinstance(node, For):
+        return ParallelFor(node.iterator, node.iterable, node.body, False)
+    return node
+
+
+class ParallelLoops:
+    """Runs parallel for loops of one evaluator, on a process pool it starts on first use."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", policy: Optional[str] = None,
+                 max_workers: Optional[int] = None, min_iterations: Optional[int] = None):
+        if policy is None:
+            policy = os.environ.get("ZEUS_PARALLEL", EXPLICIT)
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown parallel policy: {policy}")
+        if max_workers is None:
+            max_workers = int(os.environ.get("ZEUS_PARALLEL_WORKERS", os.cpu_count() or 1))
+        if min_iterations is None:
+            min_iterations = int(os.environ.get("ZEUS_PARALLEL_MIN", MIN_ITERATIONS))
+
+        self.evaluator = evaluator
+        self.policy = policy
+        # With one worker, running in order here is always faster
+        self.max_workers = max_workers
+        self.min_iterations = min_iterations
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Independence of each loop, keyed by id() of the node and kept alive with it
+        self._analyses: "OrderedDict[int, Tuple[Node, Purity]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.parallel_loops = 0
+        self.sequential_loops = 0
+        self.chunks = 0
+
+    def run(self, node: ParallelFor, iterable: Any, runtime: "ZeusRuntime", body: LoopBody) -> Any:
+        """Run a loop over the evaluated iterable, body runs one iteration here."""
+        plan = self._plan(node, iterable, runtime)
+        if plan is None:
+            self.sequential_loops += 1
+            return self._sequential(node, iterable, runtime, body)
+        self.parallel_loops += 1
+        return self._parallel(node, plan, runtime)
+
+    def _sequential(self, node: ParallelFor, iterable: Any, runtime: "ZeusRuntime",
+                    body: LoopBody) -> Any:
+        iterator = node.iterator
+        set_variable = runtime.set_variable
+        results = []
+        result = None
+        for item in iterable:
+            set_variable(iterator, item)
+            stop = False
+            for statement_fn, control in body:
+                result = statement_fn(runtime)
+                if control == "break":
+                    stop = True
+                    break
+                if control == "continue":
+                    break
+            if node.collect:
+                results.append(result)
+            if stop:
+                break
+        return results if node.collect else result
+
+    def _plan(self, node: ParallelFor, iterable: Any, runtime: "ZeusRuntime") -> Optional[tuple]:
+        """(shared payload, chunk payloads) to run in workers, or None to run here."""
+        if self.policy == OFF or self.max_workers < 2 or not node.body:
+            return None
+        try:
+            count = len(iterable)
+        except TypeError:
+            # Iterators of unknown length run in order
+            return None
+        if count < (2 if node.collect else self.min_iterations):
+            return None
+
+        purity = self._analyze(node, runtime.functions)
+        if not purity.pure:
+            logger.debug(f"Loop over {node.iterator} runs in order: {purity.reason}")
+            return None
+
+        reads, assigned = loop_names(node.iterator, node.body)
+        variables = {}
+        for name in reads - assigned:
+            value = runtime.lookup_variable(name)
+            if value is not UNDEFINED:
+                variables[name] = value
+        functions = {
+            name: function for name, function in runtime.functions.items()
+            if isinstance(function, FunctionDef)
+        }
+
+        size = max(1, math.ceil(count / (self.max_workers * CHUNKS_PER_WORKER)))
+        try:
+            shared = pickle.dumps(
+                (functions, variables, node.iterator, Block(node.body), tuple(assigned)),
+                pickle.HIGHEST_PROTOCOL,
+            )
+            chunks = [
+                pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL)
+                for chunk in _chunks(iterable, count, size)
+            ]
+        except Exception as e:
+            logger.debug(f"Loop over {node.iterator} runs in order: {e}")
+            return None
+        return shared, chunks
+
+    def _parallel(self, node: ParallelFor, plan: tuple, runtime: "ZeusRuntime") -> Any:
+        shared, chunks = plan
+        mode = self.evaluator.mode
+        level = self.evaluator.optimizer.level
+        pool = self._get_pool()
+        last = len(chunks) - 1
+        futures = [
+            pool.submit(_run_chunk, mode, level, shared, chunk, node.collect, index == last)
+            for index, chunk in enumerate(chunks)
+        ]
+        self.chunks += len(futures)
+
+        results: List[Any] = []
+        state: Dict[str, Any] = {}
+        try:
+            # In order, so the error raised is the first failing iteration's
+            for future in futures:
+                values, state = future.result()
+                results.extend(values)
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise ZeusRuntimeError(f"A worker process stopped: {e}", context="parallel for")
+        finally:
+            for future in futures:
+                future.cancel()
+
+        for name, value in state.items():
+            runtime.set_variable(name, value)
+        if node.collect:
+            return results
+        return results[-1] if results else None
+
+    def _analyze(self, node: ParallelFor, functions: Dict[str, Any]) -> Purity:
+        key = id(node)
+        with self._lock:
+            entry = self._analyses.get(key)
+        if entry is not None and entry[0] is node and all(
+            functions.get(name) is definition for name, definition in entry[1].dependencies
+        ):
+            return entry[1]
+
+        purity = analyze_loop(node.iterator, node.body, functions, self.evaluator.builtins)
+        with self._lock:
+            self._analyses[key] = (node, purity)
+            self._analyses.move_to_end(key)
+            while len(self._analyses) > MAX_ENTRIES:
+                self._analyses.popitem(last=False)
+        return purity
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Workers start fresh instead of forking a process that runs Ermis threads
+                self._pool = ProcessPoolExecutor(self.max_workers, mp_context=get_context("spawn"))
+            return self._pool
+
+    def shutdown(self):
+        """Stop the worker processes, a later parallel loop starts new ones."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get parallel loop statistics."""
+        return {
+            "policy": self.policy,
+            "max_workers": self.max_workers,
+            "parallel_loops": self.parallel_loops,
+            "sequential_loops": self.sequential_loops,
+            "chunks": self.chunks,
+        }
+
+
+def _chunks(iterable: Any, count: int, size: int):
+    """Split the loop's count items into chunks of size, a range into smaller ranges."""
+    if isinstance(iterable, SLICEABLE):
+        for start in range(0, count, size):
+            yield iterable[start:start + size]
+        return
+    # Lazy sequences are listed a chunk at a time, in one pass
+    items = iter(iterable)
+    for _ in range(0, count, size):
+        yield list(itertools.islice(items, size))
+
+
+class _DetachedErmis:
+    """Storage of worker runtimes, which keep everything in memory."""
+
+    def store(self, name: str, value: Any, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        return False
+
+    def store_many(self, variables: Dict[str, Any]) -> Dict[str, bool]:
+        return dict.fromkeys(variables, False)
+
+    def retrieve(self, name: str) -> Any:
+        return None
+
+    def query(self, query_type: str, query_data: Dict[str, Any]) -> Any:
+        return None
+
+    def end_session(self):
+        pass
+
+
+# Evaluator and runtime of this worker process, by evaluation mode and level
+_workers: Dict[Tuple[str, int], tuple] = {}
+
+
+def _run_chunk(mode: str, level: int, shared: bytes, chunk: bytes, collect: bool,
+               final: bool) -> Tuple[List[Any], Dict[str, Any]]:
+    """Run the iterations of one chunk in a worker; returns their values and, if final, the variables."""
+    functions, variables, iterator, body, assigned = pickle.loads(shared)
+
+    worker = _workers.get((mode, level))
+    if worker is None:
+        from .zeus_evaluator import ZeusEvaluator
+
+        runtime = ZeusRuntime(_DetachedErmis())
+        runtime.set_durability("memory")
+        worker = _workers[(mode, level)] = (ZeusEvaluator(mode, level, parallel=OFF), runtime)
+    evaluator, runtime = worker
+    runtime.scopes = [dict(variables)]
+    runtime.functions = FunctionTable(functions)
+
+    results = []
+    result = None
+    for item in pickle.loads(chunk):
+        runtime.set_variable(iterator, item)
+        result = evaluator.evaluate_ast(body, runtime)
+        if collect:
+            results.append(result)
+    if not collect:
+        results.append(result)
+
+    state = {}
+    if final:
+        scope = runtime.scopes[0]
+        state = {name: scope[name] for name in assigned if name in scope}
+    return results, state
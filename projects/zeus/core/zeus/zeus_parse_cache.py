@@ -0,0 +1,154 @@
+"""Process-wide AST cache for parsed Zeus source."""
+
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .zeus_ast import Node
+from .zeus_parser import ZeusParser
+from .zeus_performance import register_stats_provider
+
+# Default limits for the global cache
+MAX_ENTRIES = 2048
+MAX_BYTES = 16 * 1024 * 1024
+
+_HORIZONTAL_SPACE = re.compile(r"[ \t]+")
+
+
+def normalize_source(code: str) -> str:
+    """
+    Normalize source so trivially different inputs share a cache entry.
+
+    Leading/trailing whitespace is dropped. Runs of spaces and tabs are
+    collapsed only when the source has no string literals, where spacing
+    would be significant.
+    """
+    code = code.strip()
+    if '"' not in code and "'" not in code:
+        code = _HORIZONTAL_SPACE.sub(" ", code)
+    return code
+
+
+def estimate_ast_size(node: Any) -> int:
+    """Approximate the memory held by an AST in bytes."""
+    size = sys.getsizeof(node)
+    if isinstance(node, Node):
+        for name in node.__slots__:
+            size += estimate_ast_size(getattr(node, name))
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            size += sys.getsizeof(key) + estimate_ast_size(value)
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            size += estimate_ast_size(item)
+    return size
+
+
+class ParseCache:
+    """Thread-safe LRU cache of parsed ASTs bounded by entry count and bytes."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES,
+                 parser: Optional[ZeusParser] = None):
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.parser = parser or ZeusParser()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, code: str) -> Optional[Node]:
+        """
+        Return the AST for code, parsing it only on a cache miss.
+
+        The returned tree is immutable and shared between callers.
+        Syntax errors propagate and error/empty results are never cached.
+        """
+        key = normalize_source(code)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock, the parser keeps no state between calls
+        parsed = self.parser.parse(key)
+        if parsed is None or parsed.error:
+            return parsed
+
+        size = sys.getsizeof(key) + estimate_ast_size(parsed)
+        if size > self.max_bytes:
+            return parsed
+
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._cache[key] = (parsed, size)
+            self.current_bytes += size
+
+            # Evict least recently used entries until within both limits
+            while len(self._cache) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+        return parsed
+
+    def clear(self):
+        """Clear the cache."""
+        with self._lock:
+            self._cache.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = (self.hits / total * 100) if total > 0 else 0
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_entries,
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "total": total,
+                "hit_rate": hit_rate,
+            }
+
+
+# Global parse cache instance, shared by the interpreter, runtime and evaluator
+_parse_cache = ParseCache()
+register_stats_provider("parse_cache", _parse_cache.get_stats)
+
+
+def cached_parse(code: str) -> Optional[Node]:
+    """Parse code through the global parse cache."""
+    return _parse_cache.parse(code)
+
+
+def get_parser() -> ZeusParser:
+    """Get the shared parser instance."""
+    return _parse_cache.parser
+
+
+def get_parse_cache_stats() -> Dict[str, Any]:
+    """Get global parse cache statistics."""
+    return _parse_cache.get_stats()
+
+
+def clear_parse_cache():
+    """Clear the global parse cache."""
+    _parse_cache.clear()
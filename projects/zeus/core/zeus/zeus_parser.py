@@ -1,27 +1,121 @@
 import re
 import ast
-from typing import Any, Dict, List, Optional, Union
-from dataclasses import dataclass
+import sys
+from bisect import bisect_right
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 import logging
+from .zeus_exceptions import ZeusSyntaxError
 from .zeus_regex_cache import cached_match, cached_search, cached_findall
-
-
-@dataclass
-class ASTNode:
-    """Base class for Zeus AST nodes."""
-
-    node_type: str
-    value: Any = None
-    children: List["ASTNode"] = None
-
-    def __post_init__(self):
-        if self.children is None:
-            self.children = []
+from .zeus_ast import (
+    Node,
+    ErrorNode,
+    Literal,
+    Identifier,
+    BinaryOp,
+    UnaryOp,
+    Call,
+    ListLiteral,
+    Assign,
+    If,
+    While,
+    For,
+    ParallelFor,
+    FunctionDef,
+    AthenaCommand,
+    PatternDef,
+    Block,
+    Module,
+)
+
+
+class Token:
+    """Compact token record produced by the tokenizer."""
+
+    __slots__ = ("type", "value", "position")
+
+    def __init__(self, type: str, value: str, position: int):
+        self.type = type
+        self.value = value
+        self.position = position
+
+    def __repr__(self):
+        return f"Token({self.type}, {self.value!r}, {self.position})"
+
+
+class Line(NamedTuple):
+    """A logical line of a program: its tokens are tokens[start:end]."""
+
+    number: int
+    indent: int
+    start: int
+    end: int
+
+
+class TokenCursor:
+    """Parse state for a single parse: the token list and an index into it."""
+
+    __slots__ = ("tokens", "pos", "end", "nesting", "then_depth")
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.pos = 0
+        # Statements never read past `end`; narrowed for if/else regions and pattern arguments
+        self.end = len(tokens)
+        # Depth of open parentheses/brackets, newlines are insignificant inside them
+        self.nesting = 0
+        # Depth of then-branches being parsed, an inner 'if' never claims the 'else'
+        self.then_depth = 0
+
+    def peek(self) -> Optional[Token]:
+        """Return the current token without consuming it."""
+        tokens = self.tokens
+        pos = self.pos
+        if self.nesting:
+            while pos < self.end and tokens[pos].type == "NEWLINE":
+                pos += 1
+            self.pos = pos
+        if pos < self.end:
+            return tokens[pos]
+        return None
+
+    def at(self, token_type: str, value: Optional[str] = None) -> bool:
+        """Check whether the current token has the given type (and value)."""
+        token = self.peek()
+        return token is not None and token.type == token_type and (value is None or token.value == value)
+
+
+# Binding powers for infix operators, keyed by token type
+_LOGICAL_BP = 10
+_COMPARISON_BP = 20
+_INFIX_BINDING_POWER = {
+    "COMPARISON": _COMPARISON_BP,
+    "PLUS": 30,
+    "MINUS": 30,
+    "MULTIPLY": 40,
+    "DIVIDE": 40,
+}
+
+# Tokens after a leading identifier that make the statement an expression, not a pattern call
+_EXPRESSION_FOLLOWERS = frozenset(
+    ["PLUS", "MINUS", "MULTIPLY", "DIVIDE", "COMPARISON", "LOGICAL", "ASSIGN", "LPAREN"]
+)
+
+# Tokens that end a nested pattern call argument
+_PATTERN_ARG_STOP = frozenset(["COMMA", "PLUS", "MINUS", "MULTIPLY", "DIVIDE"])
+
+# Operators that continue a complex pattern call argument
+_PATTERN_ARG_OPERATORS = frozenset(["PLUS", "MINUS", "MULTIPLY", "DIVIDE", "COMPARISON"])
+
+# Statements that take an indented block when their line ends after the delimiter
+_BLOCK_KEYWORDS = frozenset(["if", "while", "for", "def"])
 
 
 class ZeusParser:
     """
     Parser for Zeus language that handles both traditional syntax and AI-enhanced constructs.
+
+    Expressions are parsed by precedence climbing over a single token cursor, so each
+    token is visited once regardless of statement length or nesting depth.
     """
 
     def __init__(self):
@@ -61,734 +155,668 @@ class ZeusParser:
             pattern_strings.append(f"(?P<{name}>{pattern})")
         return re.compile("|".join(pattern_strings))
 
-    def parse(self, code: str) -> Dict[str, Any]:
+    def parse(self, code: str) -> Optional[Node]:
         """
-        Parse Zeus code into an abstract syntax tree.
+        Parse Zeus code into an immutable tree of zeus_ast nodes.
+
+        Returns None for empty code and an ErrorNode if parsing fails.
         """
         try:
-            # Tokenize
+            # Tokenize (whitespace and comments are dropped)
             tokens = self._tokenize(code)
 
-            # Remove whitespace and comments
-            tokens = [t for t in tokens if t["type"] not in ["WHITESPACE", "COMMENT"]]
-
             if not tokens:
                 return None
 
             # Parse based on first token
-            result = self._parse_statement(tokens)
-            # Clean up internal fields
-            if result is None:
-                return None
-            return self._clean_ast(result)
+            return self._parse_statement(TokenCursor(tokens))
 
         except SyntaxError:
             # Re-raise syntax errors for proper error handling
             raise
         except Exception as e:
             self.logger.error(f"Parse error: {e}")
-            return {"error": str(e)}
+            return ErrorNode(str(e))
 
-    def _clean_ast(self, node: Dict[str, Any]) -> Dict[str, Any]:
-        """Clean AST node by removing internal tracking fields."""
-        if not isinstance(node, dict):
-            return node
+    def parse_program(self, code: str) -> Module:
+        """
+        Parse a multi-statement program into a Module.
 
-        # Create a copy without internal fields
-        cleaned = {}
-        for key, value in node.items():
-            if key == "tokens_consumed":
+        Each line holds one statement. A line starting with if/while/for/def
+        and ending in ':', 'then' or 'do' takes the more indented lines after
+        it as its body; an if block may be followed by an 'else' line at the
+        same indentation. Newlines inside parentheses and brackets do not end
+        a line. Raises ZeusSyntaxError with the line number on failure.
+        """
+        tokens = self._tokenize(code)
+        lines = self._logical_lines(code, tokens)
+        cur = TokenCursor(tokens)
+
+        body: List[Node] = []
+        numbers: List[int] = []
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            try:
+                if line.indent != lines[0].indent:
+                    raise SyntaxError("Unexpected indent")
+                node, i = self._parse_line(cur, lines, i, line)
+            except SyntaxError as e:
+                # Errors carry the line of the statement being parsed
+                raise ZeusSyntaxError(str(e), line=getattr(e, "zeus_line", line.number)) from None
+            body.append(node)
+            numbers.append(line.number)
+
+        return Module(tuple(body), tuple(numbers))
+
+    def _logical_lines(self, code: str, tokens: List[Token]) -> List[Line]:
+        """Split tokens into non-empty logical lines."""
+        newlines = [match.start() for match in re.finditer("\n", code)]
+        lines = []
+        start = None
+        nesting = 0
+
+        # The end of the code closes the last line even inside open brackets
+        for index, token in enumerate(tokens + [Token("END", "", len(code))]):
+            token_type = token.type
+            if token_type == "NEWLINE" or token_type == "END":
+                if start is None or (nesting and token_type == "NEWLINE"):
+                    continue
+                first = tokens[start].position
+                line_start = code.rfind("\n", 0, first) + 1
+                indent = len(code[line_start:first].expandtabs(4))
+                lines.append(Line(bisect_right(newlines, first) + 1, indent, start, index))
+                start = None
                 continue
+            if start is None:
+                start = index
+            if token_type in ("LPAREN", "LBRACKET"):
+                nesting += 1
+            elif token_type in ("RPAREN", "RBRACKET") and nesting:
+                nesting -= 1
 
-            # Recursively clean nested nodes
-            if isinstance(value, dict):
-                cleaned[key] = self._clean_ast(value)
-            elif isinstance(value, list):
-                cleaned[key] = [
-                    self._clean_ast(item) if isinstance(item, dict) else item for item in value
-                ]
-            else:
-                cleaned[key] = value
+        return lines
 
-        return cleaned
+    def _parse_line(self, cur: TokenCursor, lines: List[Line], i: int, line: Line) -> Tuple[Node, int]:
+        """Parse the statement on line, and its block if it has one; returns the next line index."""
+        try:
+            return self._parse_line_statement(cur, lines, i, line)
+        except SyntaxError as e:
+            if not hasattr(e, "zeus_line"):
+                e.zeus_line = line.number
+            raise
+
+    def _parse_line_statement(self, cur: TokenCursor, lines: List[Line], i: int, line: Line) -> Tuple[Node, int]:
+        tokens = cur.tokens
+        first = tokens[line.start]
+        if first.type == "KEYWORD" and first.value == "else":
+            raise SyntaxError("'else' without 'if'")
+
+        last = tokens[line.end - 1]
+        if self._is_parallel_for(tokens, line.start, line.end):
+            first = tokens[line.start + 1]
+        opens_block = (
+            first.type == "KEYWORD"
+            and first.value in _BLOCK_KEYWORDS
+            and (last.type == "COLON" or (last.type == "KEYWORD" and last.value in ("then", "do")))
+        )
+
+        cur.pos = line.start
+        cur.end = line.end
+        cur.nesting = 0
+        node = self._parse_statement(cur)
+        if cur.peek() is not None:
+            raise SyntaxError(f"Unexpected token: {cur.peek().value}")
+        i += 1
 
-    def _tokenize(self, code: str) -> List[Dict[str, Any]]:
-        """Tokenize the input code."""
+        if opens_block:
+            if i >= len(lines) or lines[i].indent <= line.indent:
+                raise SyntaxError("Expected an indented block")
+            body, i = self._parse_block(cur, lines, i, lines[i].indent)
+            if isinstance(node, If):
+                node = If(node.condition, self._block_node(body), None)
+            elif isinstance(node, While):
+                node = While(node.condition, body)
+            elif isinstance(node, For):
+                node = For(node.iterator, node.iterable, body)
+            elif isinstance(node, ParallelFor):
+                node = ParallelFor(node.iterator, node.iterable, body, node.collect)
+            else:
+                node = FunctionDef(node.name, node.parameters, body)
+
+        if isinstance(node, If) and node.else_branch is None and i < len(lines):
+            following = lines[i]
+            else_token = tokens[following.start]
+            if (
+                following.indent == line.indent
+                and else_token.type == "KEYWORD"
+                and else_token.value == "else"
+            ):
+                else_branch, i = self._parse_else(cur, lines, i, following)
+                node = If(node.condition, node.then_branch, else_branch)
+
+        return node, i
+
+    def _parse_else(self, cur: TokenCursor, lines: List[Line], i: int, line: Line) -> Tuple[Node, int]:
+        """Parse an else line, which has a block, a statement or a chained if."""
+        tokens = cur.tokens
+        start = line.start + 1
+        if start == line.end or (start + 1 == line.end and tokens[start].type == "COLON"):
+            i += 1
+            if i >= len(lines) or lines[i].indent <= line.indent:
+                raise SyntaxError("Expected an indented block")
+            body, i = self._parse_block(cur, lines, i, lines[i].indent)
+            return self._block_node(body), i
+        if tokens[start].type == "COLON":
+            start += 1
+        return self._parse_line(cur, lines, i, line._replace(start=start))
+
+    def _parse_block(self, cur: TokenCursor, lines: List[Line], i: int, indent: int) -> Tuple[tuple, int]:
+        """Parse the lines at indent starting at lines[i], up to the first less indented one."""
+        statements = []
+        while i < len(lines) and lines[i].indent >= indent:
+            line = lines[i]
+            if line.indent > indent:
+                error = SyntaxError("Unexpected indent")
+                error.zeus_line = line.number
+                raise error
+            node, i = self._parse_line(cur, lines, i, line)
+            statements.append(node)
+        return tuple(statements), i
+
+    def _block_node(self, statements: tuple) -> Node:
+        """A single node for an if branch block."""
+        return statements[0] if len(statements) == 1 else Block(statements)
+
+    def _tokenize(self, code: str) -> List[Token]:
+        """Tokenize the input code, skipping whitespace and comments."""
         tokens = []
+        append = tokens.append
 
         for match in self.token_regex.finditer(code):
             token_type = match.lastgroup
-            token_value = match.group()
-
-            tokens.append({"type": token_type, "value": token_value, "position": match.start()})
+            if token_type == "WHITESPACE" or token_type == "COMMENT":
+                continue
+            append(Token(token_type, match.group(), match.start()))
 
         return tokens
 
-    def _parse_statement(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse a single statement."""
-        if not tokens:
+    def _parse_statement(self, cur: TokenCursor) -> Optional[Node]:
+        """Parse a single statement starting at the cursor."""
+        if cur.pos >= cur.end:
             return None
 
-        first_token = tokens[0]
+        tokens = cur.tokens
+        first_token = tokens[cur.pos]
 
         # Check for keywords
-        if first_token["type"] == "KEYWORD":
-            keyword = first_token["value"]
+        if first_token.type == "KEYWORD":
+            keyword = first_token.value
 
             if keyword == "if":
-                return self._parse_if_statement(tokens)
+                return self._parse_if_statement(cur)
             elif keyword == "while":
-                return self._parse_while_statement(tokens)
+                return self._parse_while_statement(cur)
             elif keyword == "for":
-                return self._parse_for_statement(tokens)
+                return self._parse_for_statement(cur)
             elif keyword == "def":
-                return self._parse_function_definition(tokens)
+                return self._parse_function_definition(cur)
             elif keyword == "athena":
-                return self._parse_athena_command(tokens)
+                return self._parse_athena_command(cur)
             elif keyword in ["teach", "pattern"]:
-                return self._parse_pattern_definition(tokens)
+                return self._parse_pattern_definition(cur)
+
+        # 'parallel' only starts a statement before 'for', elsewhere it is a name
+        if self._is_parallel_for(tokens, cur.pos, cur.end):
+            cur.pos += 1
+            loop = self._parse_for_statement(cur)
+            return ParallelFor(loop.iterator, loop.iterable, loop.body, True)
+
+        remaining = cur.end - cur.pos
 
         # Check for assignment
-        if len(tokens) >= 3 and tokens[1]["type"] == "ASSIGN":
-            return self._parse_assignment(tokens)
+        if remaining >= 3 and tokens[cur.pos + 1].type == "ASSIGN":
+            return self._parse_assignment(cur)
 
         # Check for pattern/function call without parentheses
-        if first_token["type"] == "IDENTIFIER" and len(tokens) > 1:
+        if first_token.type == "IDENTIFIER" and remaining > 1:
             # Check if following tokens could be arguments (not operators)
-            if tokens[1]["type"] not in [
-                "PLUS",
-                "MINUS",
-                "MULTIPLY",
-                "DIVIDE",
-                "COMPARISON",
-                "LOGICAL",
-                "ASSIGN",
-                "LPAREN",  # Function calls should not be pattern calls
-            ]:
-                return self._parse_pattern_call(tokens)
+            if tokens[cur.pos + 1].type not in _EXPRESSION_FOLLOWERS:
+                return self._parse_pattern_call(cur, cur.end)
 
         # Otherwise, parse as expression
-        return self._parse_expression(tokens)
+        return self._parse_expression(cur)
 
-    def _parse_assignment(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_assignment(self, cur: TokenCursor) -> Node:
         """Parse variable assignment."""
-        if tokens[0]["type"] != "IDENTIFIER":
-            raise SyntaxError(f"Expected identifier, got {tokens[0]['value']}")
+        token = cur.tokens[cur.pos]
+        if token.type != "IDENTIFIER":
+            raise SyntaxError(f"Expected identifier, got {token.value}")
 
-        variable = tokens[0]["value"]
+        variable = sys.intern(token.value)
 
         # Parse the expression after '='
-        expr_tokens = tokens[2:]  # Skip variable and '='
-        expression = self._parse_expression(expr_tokens)
+        cur.pos += 2  # Skip variable and '='
+        expression = self._parse_expression(cur)
 
-        return {"type": "assignment", "variable": variable, "expression": expression}
+        return Assign(variable, expression)
 
-    def _parse_expression(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_expression(self, cur: TokenCursor) -> Node:
         """Parse mathematical or logical expression."""
-        if not tokens:
+        if cur.peek() is None:
             raise SyntaxError("Empty expression")
 
-        # Simple expression parser (can be extended with proper precedence)
-        return self._parse_logical_expr(tokens)
-
-    def _parse_logical_expr(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse logical operations (and, or)."""
-        left = self._parse_comparison_expr(tokens)
-
-        i = self._find_consumed_tokens(tokens, left)
-        while (
-            i < len(tokens)
-            and tokens[i]["type"] == "LOGICAL"
-            and tokens[i]["value"] in ["and", "or"]
-        ):
-            op = tokens[i]
-            i += 1
-
-            remaining_tokens = tokens[i:]
-            right = self._parse_comparison_expr(remaining_tokens)
-
-            left = {"type": "binary_op", "operator": op["value"], "left": left, "right": right}
-
-            i += self._find_consumed_tokens(remaining_tokens, right)
-
-        # Set tokens consumed on the final result
-        left["tokens_consumed"] = i
-        return left
-
-    def _parse_comparison_expr(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse comparison operations."""
-        left = self._parse_additive_expr(tokens)
+        return self._parse_binary(cur, 0)
 
-        i = self._find_consumed_tokens(tokens, left)
-        if i < len(tokens) and tokens[i]["type"] == "COMPARISON":
-            op = tokens[i]
-            i += 1
-
-            remaining_tokens = tokens[i:]
-            right = self._parse_additive_expr(remaining_tokens)
-
-            left = {"type": "binary_op", "operator": op["value"], "left": left, "right": right}
-
-            i += self._find_consumed_tokens(remaining_tokens, right)
-
-        # Set tokens consumed on the final result
-        left["tokens_consumed"] = i
-        return left
-
-    def _parse_additive_expr(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse addition and subtraction."""
-        left = self._parse_multiplicative_expr(tokens)
-
-        i = self._find_consumed_tokens(tokens, left)
-        while i < len(tokens) and tokens[i]["type"] in ["PLUS", "MINUS"]:
-            op = tokens[i]
-            i += 1
-
-            remaining_tokens = tokens[i:]
-            right = self._parse_multiplicative_expr(remaining_tokens)
-
-            left = {"type": "binary_op", "operator": op["value"], "left": left, "right": right}
-
-            i += self._find_consumed_tokens(remaining_tokens, right)
-
-        # Set tokens consumed on the final result
-        left["tokens_consumed"] = i
-        return left
-
-    def _parse_multiplicative_expr(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse multiplication and division."""
-        left = self._parse_primary_expr(tokens)
+    def _parse_binary(self, cur: TokenCursor, min_bp: int) -> Node:
+        """
+        Precedence climbing over infix operators.
 
-        i = self._find_consumed_tokens(tokens, left)
-        while i < len(tokens) and tokens[i]["type"] in ["MULTIPLY", "DIVIDE"]:
-            op = tokens[i]
-            i += 1
+        'and'/'or' bind loosest, then a single (non-chaining) comparison,
+        then '+'/'-', then '*'/'/'. All levels are left-associative.
+        """
+        left = self._parse_primary_expr(cur)
+        # Binding power of the operator that produced `left`; a tighter operator
+        # cannot extend an already-built looser expression
+        left_bp = 1 << 30
+
+        while True:
+            token = cur.peek()
+            if token is None:
+                break
 
-            remaining_tokens = tokens[i:]
-            right = self._parse_primary_expr(remaining_tokens)
+            if token.type == "LOGICAL":
+                if token.value == "not":
+                    break
+                bp = _LOGICAL_BP
+            else:
+                bp = _INFIX_BINDING_POWER.get(token.type)
+                if bp is None:
+                    break
 
-            left = {"type": "binary_op", "operator": op["value"], "left": left, "right": right}
+            if bp < min_bp or bp > left_bp or (bp == left_bp == _COMPARISON_BP):
+                break
 
-            i += self._find_consumed_tokens(remaining_tokens, right)
+            cur.pos += 1
+            right = self._parse_binary(cur, bp + 1)
+            left = BinaryOp(token.value, left, right)
+            left_bp = bp
 
-        # Set tokens consumed on the final result
-        left["tokens_consumed"] = i
         return left
 
-    def _parse_primary_expr(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_primary_expr(self, cur: TokenCursor) -> Node:
         """Parse primary expressions (numbers, strings, identifiers, parentheses)."""
-        if not tokens:
+        token = cur.peek()
+        if token is None:
             raise SyntaxError("Expected expression")
 
-        token = tokens[0]
+        token_type = token.type
 
         # Handle unary 'not'
-        if token["type"] == "LOGICAL" and token["value"] == "not":
-            operand_tokens = tokens[1:]
-            operand = self._parse_primary_expr(operand_tokens)
-            return {
-                "type": "unary_op",
-                "operator": "not",
-                "operand": operand,
-                "tokens_consumed": 1 + operand.get("tokens_consumed", 1),
-            }
+        if token_type == "LOGICAL" and token.value == "not":
+            cur.pos += 1
+            operand = self._parse_primary_expr(cur)
+            return UnaryOp("not", operand)
 
         # Handle unary minus for negative numbers
-        if token["type"] == "MINUS" and len(tokens) > 1 and tokens[1]["type"] == "NUMBER":
-            value = (
-                float(tokens[1]["value"]) if "." in tokens[1]["value"] else int(tokens[1]["value"])
-            )
-            return {"type": "literal", "value": -value, "tokens_consumed": 2}
-
-        if token["type"] == "NUMBER":
-            value = float(token["value"]) if "." in token["value"] else int(token["value"])
-            return {"type": "literal", "value": value, "tokens_consumed": 1}
-
-        elif token["type"] == "STRING":
-            # Remove quotes
-            value = token["value"][1:-1]
-            return {"type": "literal", "value": value, "tokens_consumed": 1}
-
-        elif token["type"] == "IDENTIFIER":
+        if token_type == "MINUS":
+            following = cur.pos + 1
+            if following < cur.end and cur.tokens[following].type == "NUMBER":
+                cur.pos += 2
+                return Literal(-self._number_value(cur.tokens[following].value))
+
+        if token_type == "NUMBER" or token_type == "STRING":
+            cur.pos += 1
+            return self._literal(token)
+
+        elif token_type == "IDENTIFIER":
+            cur.pos += 1
             # Check for boolean literals
-            if token["value"].lower() in ["true", "false"]:
-                value = token["value"].lower() == "true"
-                return {"type": "literal", "value": value, "tokens_consumed": 1}
+            if token.value.lower() in ["true", "false"]:
+                return Literal(token.value.lower() == "true")
             # Check if it's a function call
-            elif len(tokens) > 1 and tokens[1]["type"] == "LPAREN":
-                return self._parse_function_call(tokens)
+            elif cur.pos < cur.end and cur.tokens[cur.pos].type == "LPAREN":
+                return self._parse_function_call(cur, sys.intern(token.value))
             else:
-                return {"type": "identifier", "name": token["value"], "tokens_consumed": 1}
-
-        elif token["type"] == "LPAREN":
-            # Parse parenthesized expression
-            expr_tokens = self._extract_until_matching_paren(tokens[1:])
-            expr = self._parse_expression(expr_tokens)
-            # Return the inner expression directly, but track tokens consumed
-            expr["tokens_consumed"] = len(expr_tokens) + 2  # Include parentheses
+                return Identifier(sys.intern(token.value))
+
+        elif token_type == "LPAREN":
+            # Parse parenthesized expression and return the inner expression directly
+            cur.pos += 1
+            cur.nesting += 1
+            try:
+                if cur.at("RPAREN"):
+                    raise SyntaxError("Empty expression")
+                expr = self._parse_expression(cur)
+                self._expect_closing(cur, "RPAREN", "Missing closing parenthesis")
+            finally:
+                cur.nesting -= 1
             return expr
 
-        elif token["type"] == "LBRACKET":
+        elif token_type == "LBRACKET":
             # Parse list literal
-            list_tokens = self._extract_until_matching_bracket(tokens[1:])
-            elements = self._parse_list_elements(list_tokens)
-            return {
-                "type": "list",
-                "elements": elements,
-                "tokens_consumed": len(list_tokens) + 2,  # Include brackets
-            }
+            cur.pos += 1
+            elements = self._parse_sequence(cur, "RBRACKET", "Missing closing bracket")
+            return ListLiteral(elements)
 
         else:
-            raise SyntaxError(f"Unexpected token: {token['value']}")
+            raise SyntaxError(f"Unexpected token: {token.value}")
 
-    def _parse_function_call(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse function call."""
-        func_name = tokens[0]["value"]
+    def _parse_function_call(self, cur: TokenCursor, func_name: str) -> Node:
+        """Parse function call; the cursor is on the opening parenthesis."""
+        cur.pos += 1  # Skip '('
+        arguments = self._parse_sequence(cur, "RPAREN", "Missing closing parenthesis")
 
-        # Extract arguments between parentheses
-        args_tokens = self._extract_until_matching_paren(tokens[2:])
-        arguments = self._parse_arguments(args_tokens)
+        return Call(func_name, arguments)
 
-        return {
-            "type": "function_call",
-            "name": func_name,
-            "arguments": arguments,
-            "tokens_consumed": len(args_tokens) + 3,  # name + ( + args + )
-        }
-
-    def _parse_arguments(self, tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Parse function arguments."""
-        arguments = []
-
-        if not tokens:
-            return arguments
-
-        # Split by commas
-        current_arg_tokens = []
-        paren_depth = 0
-
-        for token in tokens:
-            if token["type"] == "LPAREN":
-                paren_depth += 1
-            elif token["type"] == "RPAREN":
-                paren_depth -= 1
-            elif token["type"] == "COMMA" and paren_depth == 0:
-                if current_arg_tokens:
-                    arguments.append(self._parse_expression(current_arg_tokens))
-                    current_arg_tokens = []
-                continue
-
-            current_arg_tokens.append(token)
-
-        # Don't forget the last argument
-        if current_arg_tokens:
-            arguments.append(self._parse_expression(current_arg_tokens))
+    def _parse_sequence(self, cur: TokenCursor, closing: str, missing_message: str) -> tuple:
+        """Parse comma-separated expressions up to and including the closing token."""
+        items = []
+        cur.nesting += 1
+        try:
+            while True:
+                token = cur.peek()
+                if token is None:
+                    raise SyntaxError(missing_message)
+                if token.type == closing:
+                    cur.pos += 1
+                    return tuple(items)
+                if token.type == "COMMA":
+                    # Empty items are skipped
+                    cur.pos += 1
+                    continue
 
-        return arguments
+                items.append(self._parse_expression(cur))
+
+                token = cur.peek()
+                if token is not None and token.type not in ("COMMA", closing):
+                    raise SyntaxError(f"Unexpected token: {token.value}")
+        finally:
+            cur.nesting -= 1
+
+    def _expect_closing(self, cur: TokenCursor, closing: str, missing_message: str):
+        """Consume the closing token or raise a syntax error."""
+        token = cur.peek()
+        if token is None:
+            raise SyntaxError(missing_message)
+        if token.type != closing:
+            raise SyntaxError(f"Unexpected token: {token.value}")
+        cur.pos += 1
+
+    def _number_value(self, text: str) -> Union[int, float]:
+        """Convert a NUMBER token's text to int or float."""
+        return float(text) if "." in text else int(text)
+
+    def _literal(self, token: Token) -> Node:
+        """Build a literal node from a NUMBER or STRING token."""
+        if token.type == "NUMBER":
+            return Literal(self._number_value(token.value))
+        # Remove quotes
+        return Literal(token.value[1:-1])
+
+    def _is_keyword(self, cur: TokenCursor, *values: str) -> bool:
+        """Check whether the current token is one of the given keywords."""
+        if cur.pos >= cur.end:
+            return False
+        token = cur.tokens[cur.pos]
+        return token.type == "KEYWORD" and token.value in values
+
+    def _skip_delimiter(self, cur: TokenCursor, keyword: str):
+        """Skip an optional 'then'/'do' keyword or ':' after a condition."""
+        if cur.pos < cur.end and (
+            self._is_keyword(cur, keyword) or cur.tokens[cur.pos].type == "COLON"
+        ):
+            cur.pos += 1
 
-    def _parse_if_statement(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_if_statement(self, cur: TokenCursor) -> Node:
         """Parse if statement."""
-        if not tokens or tokens[0]["value"] != "if":
+        if not self._is_keyword(cur, "if"):
             raise SyntaxError("Expected 'if' keyword")
 
-        i = 1  # Skip 'if'
-
-        # Find 'then' or ':' to delimit condition
-        # Also handle parenthesized conditions
-        condition_end = -1
-        paren_depth = 0
-        
-        for j in range(i, len(tokens)):
-            # Track parentheses depth
-            if tokens[j]["type"] == "LPAREN":
-                paren_depth += 1
-            elif tokens[j]["type"] == "RPAREN":
-                paren_depth -= 1
-                # If we close all parentheses and this is a condition in parens, 
-                # the next token starts the then branch
-                if paren_depth == 0 and j > i:
-                    condition_end = j + 1
-                    break
-            elif paren_depth == 0:
-                # Only check for delimiters when not inside parentheses
-                if (tokens[j]["type"] == "KEYWORD" and tokens[j]["value"] == "then") or tokens[j]["type"] == "COLON":
-                    condition_end = j
-                    break
+        cur.pos += 1  # Skip 'if'
 
-        if condition_end == -1:
-            # No explicit delimiter found
-            # For non-parenthesized conditions, try to find where condition ends
-            # by looking for function calls or other statements
-            for j in range(i, len(tokens)):
-                # If we find a function call token (identifier followed by parenthesis)
-                # and we're not in the middle of an expression, that's likely the then branch
-                if (j + 1 < len(tokens) and 
-                    tokens[j]["type"] == "IDENTIFIER" and 
-                    tokens[j+1]["type"] == "LPAREN" and
-                    j > i + 2):  # At least have a minimal condition
-                    condition_end = j
-                    break
-            
-            if condition_end == -1:
-                # Still no delimiter, use all remaining tokens as condition
-                condition_end = len(tokens)
-
-        # Parse condition
-        condition_tokens = tokens[i:condition_end]
-        if not condition_tokens:
+        if cur.pos >= cur.end or self._is_keyword(cur, "then") or cur.tokens[cur.pos].type == "COLON":
             raise SyntaxError("Expected condition after 'if'")
 
-        condition = self._parse_expression(condition_tokens)
+        # The condition ends where the expression can no longer continue
+        condition = self._parse_expression(cur)
 
         # Skip 'then' or ':' if present
-        i = condition_end
-        if i < len(tokens) and (
-            (tokens[i]["type"] == "KEYWORD" and tokens[i]["value"] == "then")
-            or tokens[i]["type"] == "COLON"
-        ):
-            i += 1
+        self._skip_delimiter(cur, "then")
 
-        # Parse then branch
-        # For now, parse a single expression as the then branch
         then_branch = None
         else_branch = None
 
-        # Find 'else' keyword
+        # The first 'else' belongs to the outermost 'if'; inside a then-branch there is none
         else_index = -1
-        for j in range(i, len(tokens)):
-            if tokens[j]["type"] == "KEYWORD" and tokens[j]["value"] == "else":
-                else_index = j
-                break
+        if not cur.then_depth:
+            tokens = cur.tokens
+            for j in range(cur.pos, cur.end):
+                if tokens[j].type == "KEYWORD" and tokens[j].value == "else":
+                    else_index = j
+                    break
 
+        outer_end = cur.end
         if else_index != -1:
-            # Parse then branch up to else
-            then_tokens = tokens[i:else_index]
-            if then_tokens:
-                then_branch = self._parse_statement(then_tokens)
-
-            # Parse else branch
-            else_tokens = tokens[else_index + 1 :]
-            if else_tokens:
-                else_branch = self._parse_statement(else_tokens)
-        else:
-            # No else branch, parse remaining as then branch
-            then_tokens = tokens[i:]
-            if then_tokens:
-                then_branch = self._parse_statement(then_tokens)
-
-        return {
-            "type": "if_statement",
-            "condition": condition,
-            "then_branch": then_branch,
-            "else_branch": else_branch,
-        }
+            cur.end = else_index
 
-    def _parse_while_statement(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse while loop."""
-        if not tokens or tokens[0]["value"] != "while":
-            raise SyntaxError("Expected 'while' keyword")
+        # Parse then branch (single statement)
+        cur.then_depth += 1
+        try:
+            if cur.pos < cur.end:
+                then_branch = self._parse_statement(cur)
+        finally:
+            cur.then_depth -= 1
+            cur.end = outer_end
 
-        i = 1  # Skip 'while'
+        # Parse else branch
+        if else_index != -1:
+            cur.pos = else_index + 1
+            if cur.pos < cur.end:
+                else_branch = self._parse_statement(cur)
 
-        # Find 'do' or ':' to delimit condition
-        condition_end = -1
-        for j in range(i, len(tokens)):
-            if (tokens[j]["type"] == "KEYWORD" and tokens[j]["value"] == "do") or tokens[j][
-                "type"
-            ] == "COLON":
-                condition_end = j
-                break
+        return If(condition, then_branch, else_branch)
 
-        if condition_end == -1:
-            # No explicit do/colon, use all remaining tokens as condition
-            condition_end = len(tokens)
+    def _parse_while_statement(self, cur: TokenCursor) -> Node:
+        """Parse while loop."""
+        if not self._is_keyword(cur, "while"):
+            raise SyntaxError("Expected 'while' keyword")
 
-        # Parse condition
-        condition_tokens = tokens[i:condition_end]
-        if not condition_tokens:
+        cur.pos += 1  # Skip 'while'
+
+        if cur.pos >= cur.end or self._is_keyword(cur, "do") or cur.tokens[cur.pos].type == "COLON":
             raise SyntaxError("Expected condition after 'while'")
 
-        condition = self._parse_expression(condition_tokens)
+        condition = self._parse_expression(cur)
 
         # Skip 'do' or ':' if present
-        i = condition_end
-        if i < len(tokens) and (
-            (tokens[i]["type"] == "KEYWORD" and tokens[i]["value"] == "do")
-            or tokens[i]["type"] == "COLON"
-        ):
-            i += 1
+        self._skip_delimiter(cur, "do")
 
         # Parse body (for now, single statement)
         body = None
-        if i < len(tokens):
-            body_tokens = tokens[i:]
-            body = [self._parse_statement(body_tokens)]
+        if cur.pos < cur.end:
+            body = (self._parse_statement(cur),)
 
-        return {"type": "while_loop", "condition": condition, "body": body}
+        return While(condition, body)
 
-    def _parse_for_statement(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_for_statement(self, cur: TokenCursor) -> Node:
         """Parse for loop."""
-        if not tokens or tokens[0]["value"] != "for":
+        if not self._is_keyword(cur, "for"):
             raise SyntaxError("Expected 'for' keyword")
 
-        i = 1  # Skip 'for'
+        cur.pos += 1  # Skip 'for'
+        tokens = cur.tokens
 
         # Parse iterator variable
-        if i >= len(tokens) or tokens[i]["type"] != "IDENTIFIER":
+        if cur.pos >= cur.end or tokens[cur.pos].type != "IDENTIFIER":
             raise SyntaxError("Expected iterator variable after 'for'")
 
-        iterator = tokens[i]["value"]
-        i += 1
+        iterator = sys.intern(tokens[cur.pos].value)
+        cur.pos += 1
 
         # Expect 'in' keyword
-        if i >= len(tokens) or tokens[i]["value"] != "in":
+        if cur.pos >= cur.end or tokens[cur.pos].value != "in":
             raise SyntaxError("Expected 'in' after iterator variable")
-        i += 1
-
-        # Find 'do' or ':' to delimit iterable
-        iterable_end = -1
-        for j in range(i, len(tokens)):
-            if (tokens[j]["type"] == "KEYWORD" and tokens[j]["value"] == "do") or tokens[j][
-                "type"
-            ] == "COLON":
-                iterable_end = j
-                break
-
-        if iterable_end == -1:
-            # No explicit do/colon, use all remaining tokens as iterable
-            iterable_end = len(tokens)
+        cur.pos += 1
 
-        # Parse iterable expression
-        iterable_tokens = tokens[i:iterable_end]
-        if not iterable_tokens:
+        if cur.pos >= cur.end or self._is_keyword(cur, "do") or tokens[cur.pos].type == "COLON":
             raise SyntaxError("Expected iterable after 'in'")
 
-        iterable = self._parse_expression(iterable_tokens)
+        iterable = self._parse_expression(cur)
 
         # Skip 'do' or ':' if present
-        i = iterable_end
-        if i < len(tokens) and (
-            (tokens[i]["type"] == "KEYWORD" and tokens[i]["value"] == "do")
-            or tokens[i]["type"] == "COLON"
-        ):
-            i += 1
+        self._skip_delimiter(cur, "do")
 
         # Parse body (for now, single statement)
         body = None
-        if i < len(tokens):
-            body_tokens = tokens[i:]
-            body = [self._parse_statement(body_tokens)]
-
-        return {"type": "for_loop", "iterator": iterator, "iterable": iterable, "body": body}
-
-    def _parse_function_definition(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if cur.pos < cur.end:
+            body = (self._parse_statement(cur),)
+
+        return For(iterator, iterable, body)
+
+    @staticmethod
+    def _is_parallel_for(tokens: List[Token], start: int, end: int) -> bool:
+        """Whether the tokens from start begin a parallel for loop."""
+        return (
+            end - start > 1
+            and tokens[start].type == "IDENTIFIER"
+            and tokens[start].value == "parallel"
+            and tokens[start + 1].type == "KEYWORD"
+            and tokens[start + 1].value == "for"
+        )
+
+    def _parse_function_definition(self, cur: TokenCursor) -> Node:
         """Parse function definition."""
-        if not tokens or tokens[0]["value"] != "def":
+        if not self._is_keyword(cur, "def"):
             raise SyntaxError("Expected 'def' keyword")
 
-        i = 1  # Skip 'def'
+        cur.pos += 1  # Skip 'def'
+        tokens = cur.tokens
+        end = cur.end
 
         # Parse function name
-        if i >= len(tokens) or tokens[i]["type"] != "IDENTIFIER":
+        if cur.pos >= end or tokens[cur.pos].type != "IDENTIFIER":
             raise SyntaxError("Expected function name after 'def'")
 
-        name = tokens[i]["value"]
-        i += 1
+        name = sys.intern(tokens[cur.pos].value)
+        cur.pos += 1
 
         # Parse parameters
         parameters = []
-        if i < len(tokens) and tokens[i]["type"] == "LPAREN":
-            i += 1  # Skip '('
+        if cur.pos < end and tokens[cur.pos].type == "LPAREN":
+            cur.pos += 1  # Skip '('
 
             # Extract parameters
-            while i < len(tokens) and tokens[i]["type"] != "RPAREN":
-                if tokens[i]["type"] == "IDENTIFIER":
-                    parameters.append(tokens[i]["value"])
-                    i += 1
+            while cur.pos < end and tokens[cur.pos].type != "RPAREN":
+                token = tokens[cur.pos]
+                if token.type == "IDENTIFIER":
+                    parameters.append(sys.intern(token.value))
+                    cur.pos += 1
 
                     # Skip comma if present
-                    if i < len(tokens) and tokens[i]["type"] == "COMMA":
-                        i += 1
-                elif tokens[i]["type"] == "COMMA":
+                    if cur.pos < end and tokens[cur.pos].type == "COMMA":
+                        cur.pos += 1
+                elif token.type == "COMMA":
                     raise SyntaxError("Unexpected comma in parameter list")
                 else:
-                    raise SyntaxError(f"Expected parameter name, got {tokens[i]['value']}")
+                    raise SyntaxError(f"Expected parameter name, got {token.value}")
 
-            if i >= len(tokens):
+            if cur.pos >= end:
                 raise SyntaxError("Missing closing parenthesis")
 
-            i += 1  # Skip ')'
+            cur.pos += 1  # Skip ')'
 
         # Skip ':' if present
-        if i < len(tokens) and tokens[i]["type"] == "COLON":
-            i += 1
+        if cur.pos < end and tokens[cur.pos].type == "COLON":
+            cur.pos += 1
 
         # Parse body (for now, single expression)
         body = None
-        if i < len(tokens):
-            body_tokens = tokens[i:]
-            body = [self._parse_statement(body_tokens)]
+        if cur.pos < end:
+            body = (self._parse_statement(cur),)
 
-        return {"type": "function_definition", "name": name, "parameters": parameters, "body": body}
+        return FunctionDef(name, tuple(parameters), body)
 
-    def _parse_athena_command(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_athena_command(self, cur: TokenCursor) -> Node:
         """Parse Athena AI command."""
         # Reconstruct the command text after 'athena'
-        command_tokens = tokens[1:]
-        command_text = " ".join(token["value"] for token in command_tokens)
+        command_text = " ".join(token.value for token in cur.tokens[cur.pos + 1 : cur.end])
+        cur.pos = cur.end
 
-        return {"type": "athena_command", "command": command_text}
+        return AthenaCommand(command_text)
 
-    def _parse_pattern_definition(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _parse_pattern_definition(self, cur: TokenCursor) -> Node:
         """Parse pattern teaching definition."""
         # Reconstruct the pattern definition
-        pattern_text = " ".join(token["value"] for token in tokens)
-
-        return {"type": "pattern_definition", "definition": pattern_text}
-
-    def _extract_until_matching_paren(self, tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Extract tokens until matching closing parenthesis."""
-        result = []
-        paren_depth = 1
-
-        for token in tokens:
-            if token["type"] == "LPAREN":
-                paren_depth += 1
-            elif token["type"] == "RPAREN":
-                paren_depth -= 1
-                if paren_depth == 0:
-                    break
-
-            result.append(token)
-
-        return result
-
-    def _find_consumed_tokens(self, tokens: List[Dict[str, Any]], parsed: Dict[str, Any]) -> int:
-        """Find how many tokens were consumed by parsing."""
-        # Get tokens consumed, defaulting to 1 if not present
-        consumed = parsed.get("tokens_consumed", 1)
-        return consumed
+        pattern_text = " ".join(token.value for token in cur.tokens[cur.pos : cur.end])
+        cur.pos = cur.end
 
-    def _extract_until_matching_bracket(self, tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Extract tokens until matching closing bracket."""
-        result = []
-        bracket_depth = 1
-
-        for token in tokens:
-            if token["type"] == "LBRACKET":
-                bracket_depth += 1
-            elif token["type"] == "RBRACKET":
-                bracket_depth -= 1
-                if bracket_depth == 0:
-                    break
-
-            result.append(token)
-
-        return result
-
-    def _parse_list_elements(self, tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Parse list elements separated by commas."""
-        if not tokens:
-            return []
-
-        elements = []
-        current_element_tokens = []
-        bracket_depth = 0
-
-        for token in tokens:
-            if token["type"] == "LBRACKET":
-                bracket_depth += 1
-            elif token["type"] == "RBRACKET":
-                bracket_depth -= 1
-            elif token["type"] == "COMMA" and bracket_depth == 0:
-                if current_element_tokens:
-                    elements.append(self._parse_expression(current_element_tokens))
-                    current_element_tokens = []
-                continue
+        return PatternDef(pattern_text)
 
-            current_element_tokens.append(token)
-
-        # Don't forget the last element
-        if current_element_tokens:
-            elements.append(self._parse_expression(current_element_tokens))
-
-        return elements
-
-    def _parse_pattern_call(self, tokens: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse pattern/function call without parentheses (e.g., 'double 5' or 'double square 3')."""
-        func_name = tokens[0]["value"]
-
-        # print(f"DEBUG: Parsing pattern call: {func_name}")
-        # print(f"DEBUG: All tokens: {[t['value'] for t in tokens]}")
+    def _parse_pattern_call(self, cur: TokenCursor, end: int, nested: bool = False) -> Node:
+        """
+        Parse pattern/function call without parentheses (e.g., 'double 5' or 'double square 3').
 
-        # If there's only one token, it's a pattern call with no arguments
-        if len(tokens) == 1:
-            return {"type": "function_call", "name": func_name, "arguments": []}
+        Arguments are read from the cursor up to `end`. A nested call's range never
+        contains separators, so it is not scanned again.
+        """
+        tokens = cur.tokens
+        func_name = sys.intern(tokens[cur.pos].value)
 
-        # Collect arguments (all remaining tokens)
         arguments = []
-        i = 1
-        while i < len(tokens):
-            if tokens[i]["type"] == "COMMA":
+        i = cur.pos + 1
+        while i < end:
+            token = tokens[i]
+            if token.type == "COMMA":
                 i += 1
                 continue
 
             # Check if the argument might be another pattern call
-            if tokens[i]["type"] == "IDENTIFIER" and i + 1 < len(tokens):
-                # Look ahead to see if this is a nested pattern call
-                j = i + 1
-                nested_tokens = [tokens[i]]
-
+            if token.type == "IDENTIFIER" and i + 1 < end:
                 # Collect tokens for potential nested pattern
-                while j < len(tokens) and tokens[j]["type"] not in [
-                    "COMMA",
-                    "PLUS",
-                    "MINUS",
-                    "MULTIPLY",
-                    "DIVIDE",
-                ]:
-                    nested_tokens.append(tokens[j])
-                    j += 1
+                if nested:
+                    j = end
+                else:
+                    j = i + 1
+                    while j < end and tokens[j].type not in _PATTERN_ARG_STOP:
+                        j += 1
 
                 # Parse as nested pattern call
-                if len(nested_tokens) > 1:
-                    nested_call = self._parse_pattern_call(nested_tokens)
-                    arguments.append(nested_call)
+                if j - i > 1:
+                    cur.pos = i
+                    arguments.append(self._parse_pattern_call(cur, j, nested=True))
                     i = j
                     continue
 
-            # Parse single token as expression
             # For pattern calls, each space-separated token is a separate argument
-            if tokens[i]["type"] in ["STRING", "NUMBER", "IDENTIFIER"]:
-                # Single token as argument
-                arg_token = tokens[i]
-                # print(f"DEBUG: Processing single arg token: {arg_token['value']}")
-
-                if arg_token["type"] == "IDENTIFIER":
-                    # Check if it might be a variable reference
-                    arguments.append(
-                        {"type": "function_call", "name": arg_token["value"], "arguments": []}
-                    )
-                else:
-                    # Parse as literal expression
-                    arguments.append(self._parse_expression([arg_token]))
+            if token.type == "IDENTIFIER":
+                # Might be a variable reference, resolved at evaluation time
+                arguments.append(Call(sys.intern(token.value), ()))
+                i += 1
+            elif token.type in ["STRING", "NUMBER"]:
+                arguments.append(self._literal(token))
                 i += 1
             else:
-                # Collect tokens for complex expression
-                arg_tokens = []
-                while i < len(tokens) and tokens[i]["type"] != "COMMA":
-                    if tokens[i]["type"] in ["PLUS", "MINUS", "MULTIPLY", "DIVIDE", "COMPARISON"]:
-                        # Include operator and continue collecting
-                        arg_tokens.append(tokens[i])
-                        i += 1
-                    else:
-                        arg_tokens.append(tokens[i])
-                        i += 1
-                        break  # Single token unless it's part of expression
-
-                if arg_tokens:
-                    # print(f"DEBUG: Processing expression tokens: {[t['value'] for t in arg_tokens]}")
-                    arguments.append(self._parse_expression(arg_tokens))
-
-        # print(f"DEBUG: Parsed arguments: {len(arguments)} args")
-        return {"type": "function_call", "name": func_name, "arguments": arguments}
+                # Collect tokens for complex expression: operators keep collecting,
+                # anything else is the final token of the argument
+                start = i
+                while i < end and tokens[i].type != "COMMA":
+                    i += 1
+                    if tokens[i - 1].type not in _PATTERN_ARG_OPERATORS:
+                        break
+
+                if i > start:
+                    arguments.append(self._parse_range(cur, start, i))
+
+        cur.pos = end
+        return Call(func_name, tuple(arguments))
+
+    def _parse_range(self, cur: TokenCursor, start: int, end: int) -> Node:
+        """Parse an expression restricted to tokens[start:end]."""
+        outer_end = cur.end
+        cur.pos = start
+        cur.end = end
+        try:
+            return self._parse_expression(cur)
+        finally:
+            cur.end = outer_end
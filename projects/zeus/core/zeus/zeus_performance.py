@@ -14,6 +14,7 @@ class PerformanceMonitor:
     def __init__(self):
         self._metrics: Dict[str, List[float]] = defaultdict(list)
         self._call_counts: Dict[str, int] = defaultdict(int)
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
         self._lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
@@ -23,28 +24,43 @@ class PerformanceMonitor:
             self._metrics[name].append(value)
             self._call_counts[name] += 1
 
+    def register_provider(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """Register a callable whose statistics are reported under name."""
+        with self._lock:
+            self._providers[name] = provider
+
     def get_stats(self, name: Optional[str] = None) -> Dict[str, Any]:
         """Get performance statistics."""
         with self._lock:
-            if name:
-                if name not in self._metrics:
-                    return {}
-
-                values = self._metrics[name]
-                return {
-                    "name": name,
-                    "count": self._call_counts[name],
-                    "total": sum(values),
-                    "average": sum(values) / len(values) if values else 0,
-                    "min": min(values) if values else 0,
-                    "max": max(values) if values else 0,
-                }
-            else:
+            if name and name in self._metrics:
+                return self._metric_stats(name)
+
+            providers = dict(self._providers)
+            stats = {}
+            if not name:
                 # Return all stats
-                stats = {}
                 for metric_name in self._metrics:
-                    stats[metric_name] = self.get_stats(metric_name)
-                return stats
+                    stats[metric_name] = self._metric_stats(metric_name)
+
+        # Providers take their own locks, call them outside ours
+        if name:
+            provider = providers.get(name)
+            return provider() if provider else {}
+        for provider_name, provider in providers.items():
+            stats[provider_name] = provider()
+        return stats
+
+    def _metric_stats(self, name: str) -> Dict[str, Any]:
+        """Summarize one recorded metric (caller holds the lock)."""
+        values = self._metrics[name]
+        return {
+            "name": name,
+            "count": self._call_counts[name],
+            "total": sum(values),
+            "average": sum(values) / len(values) if values else 0,
+            "min": min(values) if values else 0,
+            "max": max(values) if values else 0,
+        }
 
     def clear(self, name: Optional[str] = None):
         """Clear metrics."""
@@ -148,6 +164,11 @@ def get_performance_stats(name: Optional[str] = None) -> Dict[str, Any]:
     return _monitor.get_stats(name)
 
 
+def register_stats_provider(name: str, provider: Callable[[], Dict[str, Any]]):
+    """Report a component's statistics through get_performance_stats."""
+    _monitor.register_provider(name, provider)
+
+
 def clear_performance_metrics(name: Optional[str] = None):
     """Clear performance metrics from the global monitor."""
     _monitor.clear(name)
@@ -0,0 +1,210 @@
+"""
+Purity analysis for Zeus user functions and learned patterns.
+
+A user function is pure when its result depends only on its arguments and
+running it changes nothing outside its own scope, so a call can be replaced
+by the result of an earlier call with equal arguments. That holds when the
+body:
+
+- reads only its parameters and locals it has definitely assigned, since a
+  local read before assignment falls through to the caller's scopes
+- calls only deterministic builtins and other pure user functions
+- defines no functions or patterns and sends nothing to Athena
+
+Patterns are evaluated by safe_eval over their arguments, other patterns
+and deterministic math helpers, so a pattern whose implementation is a
+valid expression is pure as well.
+
+With reads_only, only the first rule applies, transitively. A function
+that passes cannot observe its caller's frame, so a tail call to it may
+drop that frame.
+
+The iterations of a for loop are independent under the same rules, except
+that the body may read variables it never assigns, which hold the same
+value in every iteration. Such a loop may run its iterations in any order,
+in other processes.
+"""
+
+import ast
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
+
+from .zeus_ast import (
+    Node,
+    Empty,
+    Literal,
+    Identifier,
+    BinaryOp,
+    UnaryOp,
+    Call,
+    Parenthesized,
+    ListLiteral,
+    DictLiteral,
+    Assign,
+    If,
+    While,
+    For,
+    FunctionDef,
+    PatternDef,
+    Block,
+    ParallelFor,
+    walk,
+)
+from .zeus_optimizer import PURE_BUILTINS
+
+# Builtins whose result depends only on their arguments; print and type are not
+MEMO_BUILTINS = PURE_BUILTINS | frozenset(("sum", "mean", "range"))
+
+
+class Purity(NamedTuple):
+    """Outcome of analyzing a function or pattern."""
+
+    pure: bool
+    # Why the callable is impure, empty when it is pure
+    reason: str = ""
+    # User functions the decision rests on, itself included, None for missing names
+    dependencies: Tuple[Tuple[str, Optional[FunctionDef]], ...] = ()
+
+
+class _Impure(Exception):
+    pass
+
+
+class _Analysis:
+    def __init__(self, functions: Dict[str, Any], builtins: Dict[str, Any], reads_only: bool):
+        self.functions = functions
+        self.builtins = builtins
+        self.reads_only = reads_only
+        self.dependencies: Dict[str, Optional[FunctionDef]] = {}
+
+    def function(self, name: str, node: FunctionDef):
+        # A function in progress is assumed pure, its body decides for the cycle
+        if name in self.dependencies:
+            return
+        self.dependencies[name] = node
+        self.statements(node.body or (), set(node.parameters or ()))
+
+    def statements(self, nodes: Tuple[Optional[Node], ...], defined: Set[str]) -> Set[str]:
+        for node in nodes:
+            self.statement(node, defined)
+        return defined
+
+    def statement(self, node: Optional[Node], defined: Set[str]):
+        """Check node, adding the names it definitely assigns to defined."""
+        if node is None or isinstance(node, (Empty, Literal)):
+            return
+        if isinstance(node, Identifier):
+            if node.name not in defined:
+                raise _Impure(f"reads non-local variable {node.name}")
+        elif isinstance(node, Assign):
+            self.statement(node.expression, defined)
+            defined.add(node.variable)
+        elif isinstance(node, BinaryOp):
+            self.statement(node.left, defined)
+            self.statement(node.right, defined)
+        elif isinstance(node, UnaryOp):
+            self.statement(node.operand, defined)
+        elif isinstance(node, Parenthesized):
+            self.statement(node.expression, defined)
+        elif isinstance(node, ListLiteral):
+            self.statements(node.elements, defined)
+        elif isinstance(node, DictLiteral):
+            for key, value in node.items:
+                self.statement(key, defined)
+                self.statement(value, defined)
+        elif isinstance(node, Call):
+            self.call(node, defined)
+        elif isinstance(node, If):
+            self.statement(node.condition, defined)
+            then_defined = self.statements((node.then_branch,), set(defined))
+            if node.else_branch is not None:
+                else_defined = self.statements((node.else_branch,), set(defined))
+                defined |= then_defined & else_defined
+        elif isinstance(node, While):
+            # The body may not run, so nothing it assigns is definitely assigned after
+            self.statement(node.condition, defined)
+            self.statements(node.body or (), set(defined))
+        elif isinstance(node, For):
+            self.statement(node.iterable, defined)
+            self.statements(node.body or (), set(defined) | {node.iterator})
+        elif isinstance(node, Block):
+            self.statements(node.statements, defined)
+        elif self.reads_only and isinstance(node, (FunctionDef, PatternDef)):
+            return
+        else:
+            raise _Impure(f"contains {node.type}")
+
+    def call(self, node: Call, defined: Set[str]):
+        for argument in node.arguments:
+            if isinstance(argument, Call) and not argument.arguments:
+                # A bare name argument reads a variable of that name when one exists
+                if argument.name not in defined:
+                    raise _Impure(f"reads non-local variable {argument.name}")
+            else:
+                self.statement(argument, defined)
+
+        name = node.name
+        if name in self.builtins:
+            if name not in MEMO_BUILTINS and not self.reads_only:
+                raise _Impure(f"calls {name}")
+            return
+        callee = self.functions.get(name)
+        if not isinstance(callee, FunctionDef):
+            self.dependencies.setdefault(name, callee)
+            # Patterns only see their arguments
+            if self.reads_only:
+                return
+            raise _Impure(f"calls {name}, which is not a user function")
+        self.function(name, callee)
+
+
+def analyze_function(name: str, node: FunctionDef, functions: Dict[str, Any],
+                     builtins: Dict[str, Any], reads_only: bool = False) -> Purity:
+    """Decide whether calls to a user function may be memoized, or with reads_only, tail called."""
+    analysis = _Analysis(functions, builtins, reads_only)
+    try:
+        analysis.function(name, node)
+    except _Impure as e:
+        return Purity(False, str(e), tuple(analysis.dependencies.items()))
+    return Purity(True, "", tuple(analysis.dependencies.items()))
+
+
+def loop_names(iterator: str, body: Tuple[Optional[Node], ...]) -> Tuple[Set[str], Set[str]]:
+    """Names a loop body reads and names it assigns, the loop variable included."""
+    reads: Set[str] = set()
+    assigned = {iterator}
+    for statement in body:
+        for node in walk(statement):
+            if isinstance(node, Assign):
+                assigned.add(node.variable)
+            elif isinstance(node, (For, ParallelFor)):
+                assigned.add(node.iterator)
+            elif isinstance(node, Identifier):
+                reads.add(node.name)
+            elif isinstance(node, Call):
+                reads.update(a.name for a in node.arguments if isinstance(a, Call) and not a.arguments)
+    return reads, assigned
+
+
+def analyze_loop(iterator: str, body: Tuple[Optional[Node], ...], functions: Dict[str, Any],
+                 builtins: Dict[str, Any]) -> Purity:
+    """Decide whether the iterations of a for loop are independent of each other."""
+    reads, assigned = loop_names(iterator, body)
+    # Variables the body never assigns hold the same value in every iteration
+    shared = {name for name in reads - assigned if name not in functions}
+    analysis = _Analysis(functions, builtins, reads_only=False)
+    try:
+        analysis.statements(body, shared | {iterator})
+    except _Impure as e:
+        return Purity(False, str(e), tuple(analysis.dependencies.items()))
+    return Purity(True, "", tuple(analysis.dependencies.items()))
+
+
+def analyze_pattern(implementation: str) -> Purity:
+    """Decide whether applications of a learned pattern may be memoized."""
+    if implementation.startswith("{") and implementation.endswith("}"):
+        implementation = implementation[1:-1]
+    try:
+        ast.parse(implementation.strip(), mode="eval")
+    except SyntaxError:
+        return Purity(False, "implementation is not an expression")
+    return Purity(True)
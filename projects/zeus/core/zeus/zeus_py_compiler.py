@@ -0,0 +1,799 @@
+"""
+Python bytecode backend - translates Zeus ASTs into Python ``ast`` modules.
+
+Programs made of assignments, arithmetic, conditionals, loops, calls and
+user functions are translated into a Python function, compiled with
+compile() and run at CPython bytecode speed. Zeus variables become Python
+locals: a value is read from the runtime the first time it is used and
+written back at sync points, before any call that could observe it and when
+the program finishes. Nodes outside that subset are left to the evaluator.
+
+User functions are translated the same way the first time compiled code
+calls them. A function that never reads variables it does not own runs
+directly; otherwise its caller's variables are put in a runtime scope for
+the duration of the call, as the evaluator's dynamic scoping requires.
+
+Code objects are cached per AST and, once a Lightning compiler has been
+attached with set_lightning_compiler(), through LightningCompiler.compile
+under the hash of the program.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import operator
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_ast import Node, Call, For, FunctionDef, STATEMENT_EXECUTED, iter_child_nodes
+from .zeus_exceptions import ZeusError, ZeusRuntimeError, ZeusTypeError, ZeusDivisionByZeroError
+from .zeus_runtime import UNDEFINED
+from .zeus_trampoline import TRAMPOLINE_DEPTH
+from .zeus_parallel import AUTO
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+    from .zeus_runtime import ZeusRuntime
+
+# Default number of compiled programs and functions kept per compiler
+MAX_ENTRIES = 1024
+
+_BINARY_OPS = {
+    operator.add: ast.Add,
+    operator.sub: ast.Sub,
+    operator.mul: ast.Mult,
+    operator.truediv: ast.Div,
+    operator.floordiv: ast.FloorDiv,
+    operator.mod: ast.Mod,
+    operator.pow: ast.Pow,
+    # The evaluator maps and/or to the bitwise operators, both sides evaluated
+    operator.and_: ast.BitAnd,
+    operator.or_: ast.BitOr,
+}
+
+_COMPARE_OPS = {
+    operator.eq: ast.Eq,
+    operator.ne: ast.NotEq,
+    operator.lt: ast.Lt,
+    operator.gt: ast.Gt,
+    operator.le: ast.LtE,
+    operator.ge: ast.GtE,
+}
+
+_UNARY_OPS = {
+    operator.neg: ast.USub,
+    operator.pos: ast.UAdd,
+    operator.not_: ast.Not,
+}
+
+_LITERAL_TYPES = (type(None), bool, int, float, str)
+
+_RESULT = "_r"
+
+logger = logging.getLogger(__name__)
+
+# Lightning compiler attached by the orchestrator
+_lightning_compiler = None
+
+
+class _Unset:
+    """Value of a Zeus variable that has not been read or assigned yet."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<unset>"
+
+
+UNSET = _Unset()
+
+
+class _Unsupported(Exception):
+    """Raised when a node is outside the translatable subset."""
+
+
+def set_lightning_compiler(compiler):
+    """Cache translated code objects through a LightningCompiler."""
+    global _lightning_compiler
+    _lightning_compiler = compiler
+
+
+class _Translator:
+    """Translates one Zeus program or function into an ast.Module."""
+
+    def __init__(self, evaluator: "ZeusEvaluator"):
+        self.evaluator = evaluator
+        self.line = 0
+        self.sites: Dict[int, Tuple[str, ...]] = {}
+        self.operands = 0
+        self.nodes: List[FunctionDef] = []
+        self.builtins_used: List[str] = []
+        self.in_function = False
+        self.function_name = None
+        self.params: frozenset = frozenset()
+        self.locals: List[str] = []
+        self.local_set: frozenset = frozenset()
+        self.free_reads = False
+        self.foreign_calls = False
+
+    # Positions double as site ids, so every generated node gets its own line
+
+    def _at(self, node, site: Optional[Tuple[str, ...]] = None):
+        self.line += 1
+        node.lineno = node.end_lineno = self.line
+        node.col_offset = node.end_col_offset = 0
+        if site is not None:
+            self.sites[self.line] = site
+        return node
+
+    def _name(self, name: str, store: bool = False):
+        return self._at(ast.Name(id=name, ctx=ast.Store() if store else ast.Load()))
+
+    def _const(self, value):
+        return self._at(ast.Constant(value=value))
+
+    def _assign(self, target: str, value) -> ast.stmt:
+        return self._at(ast.Assign(targets=[self._name(target, store=True)], value=value))
+
+    def _ns_call(self, method: str, *args, site: Optional[Tuple[str, ...]] = None):
+        func = self._at(ast.Attribute(value=self._name("_ns"), attr=method, ctx=ast.Load()))
+        return self._at(ast.Call(func=func, args=list(args), keywords=[]), site)
+
+    @staticmethod
+    def _invariant(frame: int, index: int) -> str:
+        return f"h{frame}_{index}"
+
+    @staticmethod
+    def _var(name: str) -> str:
+        if not isinstance(name, str) or not ("z_" + name).isidentifier():
+            raise _Unsupported(f"Invalid variable name: {name!r}")
+        return "z_" + name
+
+    def _snapshot(self) -> List[Any]:
+        """Arguments describing the variables a call could observe."""
+        names = self._const(tuple(self.locals))
+        values = self._at(
+            ast.Tuple(elts=[self._name(self._var(n)) for n in self.locals], ctx=ast.Load())
+        )
+        return [names, values, self._const(self.in_function)]
+
+    # Pre-pass: which Zeus names become Python locals
+
+    def _collect(self, node: Any, names: Dict[str, None], reads: bool):
+        if isinstance(node, tuple):
+            for item in node:
+                self._collect(item, names, reads)
+            return
+        if not isinstance(node, Node):
+            return
+
+        node_type = node.type
+        if node_type == "function_definition":
+            return
+        if node_type == "assignment":
+            names[node.variable] = None
+        elif node_type == "for_loop":
+            names[node.iterator] = None
+        elif reads and node_type == "identifier":
+            names[node.name] = None
+
+        for child in iter_child_nodes(node):
+            self._collect(child, names, reads)
+
+    # Entry points
+
+    def program(self, node: Node) -> ast.Module:
+        """Translate a top-level statement into ``__zeus_main__(_ns)``."""
+        names: Dict[str, None] = {}
+        self._collect(node, names, reads=True)
+        self.locals = list(names)
+        self.local_set = frozenset(self.locals)
+
+        body = self._statement(node, _RESULT)
+        return self._module("__zeus_main__", [], body, sync=bool(self.locals))
+
+    def function(self, node: FunctionDef) -> ast.Module:
+        """Translate a user function into ``__zeus_fn__(_ns, *params)``."""
+        params = node.parameters
+        body = node.body
+        if not isinstance(params, tuple) or not isinstance(body, tuple):
+            raise _Unsupported("Function is not a parsed definition")
+
+        self.in_function = True
+        self.function_name = node.name
+        self.params = frozenset(params)
+        assigned: Dict[str, None] = {name: None for name in params}
+        self._collect(body, assigned, reads=False)
+        self.locals = list(assigned)
+        self.local_set = frozenset(self.locals)
+
+        statements = []
+        for statement in body:
+            statements.extend(self._statement(statement, _RESULT))
+        return self._module("__zeus_fn__", [self._var(p) for p in params], statements, sync=False)
+
+    def _module(self, name: str, params: List[str], body: List[ast.stmt], sync: bool) -> ast.Module:
+        prologue = [
+            self._assign("b_" + builtin, self._at(ast.Subscript(
+                value=self._at(ast.Attribute(value=self._name("_ns"), attr="builtins", ctx=ast.Load())),
+                slice=self._const(builtin),
+                ctx=ast.Load(),
+            )))
+            for builtin in self.builtins_used
+        ]
+        prologue.extend(
+            self._assign(self._var(n), self._name("_U")) for n in self.locals if n not in self.params
+        )
+        prologue.append(self._assign(_RESULT, self._const(None)))
+
+        if sync:
+            final = self._at(ast.Expr(value=self._ns_call("sync", *self._snapshot()[:2])))
+            body = [self._at(ast.Try(body=body, handlers=[], orelse=[], finalbody=[final]))]
+
+        args = [self._at(ast.arg(arg=p)) for p in ["_ns"] + params]
+        function = self._at(ast.FunctionDef(
+            name=name,
+            args=ast.arguments(posonlyargs=[], args=args, vararg=None, kwonlyargs=[],
+                               kw_defaults=[], kwarg=None, defaults=[]),
+            body=prologue + body + [self._at(ast.Return(value=self._name(_RESULT)))],
+            decorator_list=[],
+            returns=None,
+        ))
+        if len(set(params)) != len(params):
+            raise _Unsupported("Duplicate parameter names")
+        return ast.fix_missing_locations(ast.Module(body=[function], type_ignores=[]))
+
+    # Statements
+
+    def _statement(self, node: Any, target: str) -> List[ast.stmt]:
+        """Translate node into statements that leave its value in target."""
+        if not isinstance(node, Node) or node.error:
+            raise _Unsupported("Malformed node")
+
+        node_type = node.type
+
+        if node_type == "assignment":
+            value_node = node.expression
+            if value_node is None:
+                raise _Unsupported("Assignment without a value")
+            variable = self._var(node.variable)
+            return [
+                self._assign(variable, self._expression(value_node)),
+                self._assign(target, self._name(variable)),
+            ]
+
+        if node_type == "if_statement":
+            return [self._at(ast.If(
+                test=self._expression(node.condition),
+                body=self._branch(node.then_branch, target),
+                orelse=self._branch(node.else_branch, target),
+            ))]
+
+        if node_type == "while_loop":
+            return [
+                self._assign(target, self._const(None)),
+                self._at(ast.While(
+                    test=self._expression(node.condition),
+                    body=self._block(node.body, target),
+                    orelse=[],
+                )),
+            ]
+
+        if node_type == "for_loop":
+            return [
+                self._assign(target, self._const(None)),
+                self._at(ast.For(
+                    target=self._name(self._var(node.iterator), store=True),
+                    iter=self._expression(node.iterable),
+                    body=self._block(node.body, target),
+                    orelse=[],
+                )),
+            ]
+
+        if node_type in ("block", "module"):
+            statements = node.statements if node_type == "block" else node.body
+            body = [self._assign(target, self._const(None))]
+            for statement in statements or ():
+                body.extend(self._statement(statement, target))
+            return body
+
+        if node_type == "hoisted_loop":
+            # Hoisted expressions are locals, reset before each run of the loop
+            reset = [
+                self._assign(self._invariant(node.frame, index), self._name("_U"))
+                for index in range(node.size)
+            ]
+            return reset + self._statement(node.loop, target)
+
+        if node_type == "function_definition":
+            self.nodes.append(node)
+            definition = self._at(ast.Subscript(
+                value=self._name("_N"), slice=self._const(len(self.nodes) - 1), ctx=ast.Load()
+            ))
+            return [self._assign(target, self._ns_call("define_function", definition))]
+
+        if node_type in ("athena_command", "pattern_definition"):
+            self.foreign_calls = True
+            argument = node.command if node_type == "athena_command" else node.definition
+            return [self._assign(
+                target, self._ns_call(node_type, self._const(argument), *self._snapshot())
+            )]
+
+        if node_type == "empty":
+            return [self._assign(target, self._const(None))]
+
+        return [self._assign(target, self._expression(node))]
+
+    def _branch(self, node: Any, target: str) -> List[ast.stmt]:
+        """Translate an if branch, which yields the statement marker for None."""
+        if not node:
+            return [self._assign(target, self._name("_M"))]
+        is_none = self._at(ast.Compare(
+            left=self._name(target), ops=[ast.Is()], comparators=[self._const(None)]
+        ))
+        return self._statement(node, target) + [
+            self._at(ast.If(test=is_none, body=[self._assign(target, self._name("_M"))], orelse=[]))
+        ]
+
+    def _block(self, statements: Any, target: str) -> List[ast.stmt]:
+        """Translate a loop body."""
+        body = []
+        for statement in statements or ():
+            body.extend(self._statement(statement, target))
+        return body or [self._at(ast.Pass())]
+
+    # Expressions
+
+    def _expression(self, node: Any) -> ast.expr:
+        if node is None:
+            return self._const(None)
+        if not isinstance(node, Node) or node.error:
+            raise _Unsupported("Malformed node")
+
+        node_type = node.type
+
+        if node_type == "literal":
+            value = node.value
+            if not isinstance(value, _LITERAL_TYPES):
+                raise _Unsupported(f"Literal of type {type(value).__name__}")
+            return self._const(value)
+
+        if node_type == "identifier":
+            return self._read(node.name)
+
+        if node_type == "binary_op":
+            return self._binary_op(node)
+
+        if node_type == "unary_op":
+            op_type = _UNARY_OPS.get(self.evaluator.unary_ops.get(node.operator))
+            if op_type is None:
+                raise _Unsupported(f"Unary operator {node.operator}")
+            return self._at(ast.UnaryOp(op=op_type(), operand=self._expression(node.operand)))
+
+        if node_type == "function_call":
+            return self._call(node)
+
+        if node_type == "parenthesized":
+            return self._expression(node.expression)
+
+        if node_type == "invariant":
+            name = self._invariant(node.frame, node.index)
+            is_set = self._at(ast.Compare(
+                left=self._name(name), ops=[ast.IsNot()], comparators=[self._name("_U")]
+            ))
+            cache = self._at(ast.NamedExpr(
+                target=self._name(name, store=True), value=self._expression(node.expression)
+            ))
+            return self._at(ast.IfExp(test=is_set, body=self._name(name), orelse=cache))
+
+        if node_type == "list":
+            elements = [self._expression(e) for e in node.elements]
+            return self._at(ast.List(elts=elements, ctx=ast.Load()))
+
+        if node_type == "dict":
+            keys, values = [], []
+            for key_node, value_node in node.items:
+                keys.append(self._expression(key_node))
+                values.append(self._expression(value_node))
+            return self._at(ast.Dict(keys=keys, values=values))
+
+        raise _Unsupported(f"Node type {node_type} in expression")
+
+    def _binary_op(self, node: Node) -> ast.expr:
+        op = node.operator
+        op_func = self.evaluator.binary_ops.get(op)
+        if op_func not in _COMPARE_OPS and op_func not in _BINARY_OPS:
+            raise _Unsupported(f"Binary operator {op}")
+
+        # The left operand is kept in a local of its own so a type error can name its type
+        self.operands += 1
+        operand = f"_l{self.operands}"
+        left = self._at(ast.NamedExpr(
+            target=self._name(operand, store=True), value=self._expression(node.left)
+        ))
+        right = self._expression(node.right)
+
+        if op_func in _COMPARE_OPS:
+            return self._at(
+                ast.Compare(left=left, ops=[_COMPARE_OPS[op_func]()], comparators=[right]),
+                site=("binary", op, operand),
+            )
+        return self._at(
+            ast.BinOp(left=left, op=_BINARY_OPS[op_func](), right=right),
+            site=("binary", op, operand),
+        )
+
+    def _read(self, name: str) -> ast.expr:
+        variable = self._var(name)
+        if name in self.params:
+            return self._name(variable)
+
+        load = "lookup" if self.in_function else "load"
+        if self.in_function:
+            self.free_reads = True
+        fetch = self._ns_call(load, self._const(name))
+        if name not in self.local_set:
+            return fetch
+
+        # Read the runtime once, then keep the value in the local
+        is_set = self._at(ast.Compare(
+            left=self._name(variable), ops=[ast.IsNot()], comparators=[self._name("_U")]
+        ))
+        cache = self._at(ast.NamedExpr(target=self._name(variable, store=True), value=fetch))
+        return self._at(ast.IfExp(test=is_set, body=self._name(variable), orelse=cache))
+
+    def _argument(self, arg: Any) -> ast.expr:
+        if not (isinstance(arg, Call) and not arg.arguments):
+            return self._expression(arg)
+
+        # A bare name in argument position may be a variable parsed as a call
+        name = arg.name
+        variable = self._var(name)
+        self.free_reads = self.free_reads or self.in_function
+        self.foreign_calls = True
+        fallback = self._ns_call("variable_or_call", self._const(name), *self._snapshot())
+        if name not in self.local_set:
+            return fallback
+        is_set = self._at(ast.Compare(
+            left=self._name(variable), ops=[ast.IsNot()], comparators=[self._name("_U")]
+        ))
+        return self._at(ast.IfExp(test=is_set, body=self._name(variable), orelse=fallback))
+
+    def _call(self, node: Call) -> ast.expr:
+        name = node.name
+        args = [self._argument(arg) for arg in node.arguments]
+
+        if name in self.evaluator.builtins:
+            if name not in self.builtins_used:
+                self.builtins_used.append(name)
+            return self._at(
+                ast.Call(func=self._name("b_" + self._var(name)[2:]), args=args, keywords=[]),
+                site=("builtin", name, None),
+            )
+
+        if name != self.function_name:
+            self.foreign_calls = True
+        arguments = self._at(ast.Tuple(elts=args, ctx=ast.Load()))
+        return self._ns_call("call", self._const(name), arguments, *self._snapshot())
+
+
+class _Compiled:
+    """A translated program or user function."""
+
+    __slots__ = ("function", "arity", "closed")
+
+    def __init__(self, function, arity=0, closed=False):
+        self.function = function
+        self.arity = arity
+        self.closed = closed
+
+    def call(self, ns: "RuntimeNamespace", args: Tuple[Any, ...]) -> Any:
+        """Call a compiled user function, binding arguments like the evaluator."""
+        arity = self.arity
+        if len(args) != arity:
+            args = tuple(args[:arity]) + (None,) * (arity - len(args))
+        return self.function(ns, *args)
+
+
+class RuntimeNamespace:
+    """Runtime-backed variable access for one run of a compiled program."""
+
+    __slots__ = ("runtime", "evaluator", "compiler", "builtins", "depth", "_synced")
+
+    def __init__(self, runtime: "ZeusRuntime", evaluator: "ZeusEvaluator", compiler: "ZeusPyCompiler"):
+        self.runtime = runtime
+        self.evaluator = evaluator
+        self.compiler = compiler
+        self.builtins = evaluator.builtins
+        # Nesting of user function calls, deep ones move to the trampoline
+        self.depth = 0
+        # Values known to be in the runtime already, so syncing can skip them
+        self._synced: Dict[str, Any] = {}
+
+    def lookup(self, name: str) -> Any:
+        """Resolve an identifier the way the evaluator does."""
+        try:
+            return self.runtime.get_variable(name)
+        except NameError:
+            if name in self.builtins:
+                return self.builtins[name]
+            return f"Error: Variable '{name}' is not defined"
+
+    def load(self, name: str) -> Any:
+        """Resolve a program variable on first use."""
+        value = self.lookup(name)
+        self._synced[name] = value
+        return value
+
+    def sync(self, names: Tuple[str, ...], values: Tuple[Any, ...]):
+        """Write changed program variables back to the runtime."""
+        synced = self._synced
+        for name, value in zip(names, values):
+            if value is not UNSET and synced.get(name, UNSET) is not value:
+                self.runtime.set_variable(name, value)
+                synced[name] = value
+
+    def _expose(self, names, values, scoped: bool) -> bool:
+        """Make the caller's variables visible, returns whether a scope was pushed."""
+        if not scoped:
+            self.sync(names, values)
+            return False
+        runtime = self.runtime
+        runtime.push_scope()
+        scope = runtime.scopes[-1]
+        for name, value in zip(names, values):
+            if value is not UNSET:
+                scope[name] = value
+        return True
+
+    def call(self, name: str, args: Tuple[Any, ...], names, values, scoped: bool) -> Any:
+        """Call a user function or learned pattern by name."""
+        runtime = self.runtime
+        function = runtime.get_function(name)
+        compiled = self.compiler.get_function(function) if function else None
+        if compiled is not None and self.depth >= TRAMPOLINE_DEPTH:
+            pushed = self._expose(names, values, scoped)
+            try:
+                return self.evaluator.trampoline.call(runtime, name, function, list(args))
+            finally:
+                if pushed:
+                    runtime.pop_scope()
+
+        self.depth += 1
+        try:
+            if compiled is not None:
+                # A pure function observes none of the caller's variables
+                memo = runtime.memo.function_table(name, function, runtime.functions, self.builtins)
+                if memo is not None:
+                    return memo.call(args, lambda: compiled.call(self, args))
+                if compiled.closed:
+                    return compiled.call(self, args)
+
+            pushed = self._expose(names, values, scoped)
+            try:
+                if compiled is not None:
+                    return compiled.call(self, args)
+                return self.evaluator._call_by_name(name, list(args), runtime)
+            finally:
+                if pushed:
+                    runtime.pop_scope()
+        finally:
+            self.depth -= 1
+
+    def variable_or_call(self, name: str, names, values, scoped: bool) -> Any:
+        """Resolve a bare name argument as a variable, else call it."""
+        pushed = self._expose(names, values, scoped)
+        try:
+            value = self.runtime.lookup_variable(name)
+            if value is not UNDEFINED:
+                return value
+            return self.evaluator._call_by_name(name, [], self.runtime)
+        finally:
+            if pushed:
+                self.runtime.pop_scope()
+
+    def define_function(self, node: FunctionDef) -> str:
+        self.runtime.define_function(node.name, node)
+        return f"Function {node.name} defined"
+
+    def athena_command(self, command: str, names, values, scoped: bool) -> Any:
+        pushed = self._expose(names, values, scoped)
+        try:
+            return self.runtime.execute_athena_command(command)
+        finally:
+            if pushed:
+                self.runtime.pop_scope()
+
+    def pattern_definition(self, definition: str, names, values, scoped: bool) -> Any:
+        pushed = self._expose(names, values, scoped)
+        try:
+            return self.runtime.teach_pattern(definition)
+        finally:
+            if pushed:
+                self.runtime.pop_scope()
+
+
+class ZeusPyCompiler:
+    """Compiles Zeus programs and functions to Python code objects."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", max_entries: int = MAX_ENTRIES):
+        self.evaluator = evaluator
+        self.max_entries = max_entries
+
+        # Translations keyed by id() of the AST, which is kept alive with it;
+        # None records a node outside the supported subset
+        self._programs: "OrderedDict[int, tuple]" = OrderedDict()
+        self._functions: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.unsupported = 0
+
+    def get_program(self, node: Optional[Node]) -> Optional[_Compiled]:
+        """Return the compiled program for node, or None if it cannot be compiled."""
+        if not isinstance(node, Node):
+            return None
+        return self._get(self._programs, node, self._compile_program)
+
+    def get_function(self, node: Any) -> Optional[_Compiled]:
+        """Return the compiled user function for a definition, or None."""
+        if not isinstance(node, FunctionDef):
+            return None
+        return self._get(self._functions, node, self._compile_function)
+
+    def run(self, program: _Compiled, runtime: "ZeusRuntime") -> Any:
+        """Run a compiled program against runtime."""
+        return self._invoke(program.function, RuntimeNamespace(runtime, self.evaluator, self))
+
+    def call_function(self, function: _Compiled, runtime: "ZeusRuntime", args: List[Any]) -> Any:
+        """Call a compiled user function against runtime, from outside compiled code."""
+        return self._invoke(function.call, RuntimeNamespace(runtime, self.evaluator, self), tuple(args))
+
+    def _invoke(self, function, *args) -> Any:
+        """Call generated code, raising errors from its sites as Zeus errors."""
+        try:
+            return function(*args)
+        except ZeusError:
+            raise
+        except Exception as e:
+            mapped = self._map_error(e)
+            if mapped is None:
+                raise
+            raise mapped from e
+
+    def clear(self):
+        """Drop all compiled programs and functions."""
+        with self._lock:
+            self._programs.clear()
+            self._functions.clear()
+            self.hits = 0
+            self.misses = 0
+            self.unsupported = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get compiled code cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "programs": len(self._programs),
+                "functions": len(self._functions),
+                "max_size": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "unsupported": self.unsupported,
+                "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+            }
+
+    def _get(self, cache: "OrderedDict[int, tuple]", node: Node, compile_node) -> Optional[_Compiled]:
+        key = id(node)
+        with self._lock:
+            entry = cache.get(key)
+            if entry is not None and entry[0] is node:
+                cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        compiled = compile_node(node)
+
+        with self._lock:
+            if compiled is None:
+                self.unsupported += 1
+            cache[key] = (node, compiled)
+            cache.move_to_end(key)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+        return compiled
+
+    def _compile_program(self, node: Node) -> Optional[_Compiled]:
+        if isinstance(node, For) and self.evaluator.parallel.policy == AUTO:
+            # Left to the closure compiler, which may run it in workers
+            return None
+        node = self.evaluator.optimizer.optimize(node)
+        translator = _Translator(self.evaluator)
+        try:
+            module = translator.program(node)
+        except _Unsupported as e:
+            logger.debug(f"Program left to the evaluator: {e}")
+            return None
+        function = self._load(node, module, translator, "__zeus_main__")
+        if function is None:
+            return None
+        return _Compiled(function)
+
+    def _compile_function(self, node: FunctionDef) -> Optional[_Compiled]:
+        node = self.evaluator.optimizer.optimize_function(node)
+        translator = _Translator(self.evaluator)
+        try:
+            module = translator.function(node)
+        except _Unsupported as e:
+            logger.debug(f"Function {node.name} left to the evaluator: {e}")
+            return None
+        function = self._load(node, module, translator, "__zeus_fn__")
+        if function is None:
+            return None
+        closed = not translator.free_reads and not translator.foreign_calls
+        return _Compiled(function, len(node.parameters), closed)
+
+    def _load(self, node: Node, module: ast.Module, translator: _Translator, entry: str):
+        """Compile module, through Lightning when attached, and return its entry function."""
+        try:
+            # The generated code depends on the program and on which names are builtins
+            source = json.dumps(
+                {"program": node.to_dict(), "builtins": sorted(self.evaluator.builtins)},
+                sort_keys=True,
+                separators=(",", ":"),
+            )
+        except (TypeError, ValueError):
+            return None
+        filename = f"<zeus:{hashlib.sha256(source.encode()).hexdigest()[:12]}>"
+
+        code = None
+        lightning = _lightning_compiler
+        if lightning is not None:
+            result = lightning.compile_python_ast(source, module, metadata={"filename": filename})
+            if result.success:
+                code = result.compiled_unit.code_object
+            else:
+                logger.debug(f"Lightning could not compile {filename}: {result.error}")
+
+        try:
+            if code is None:
+                code = compile(module, filename, "exec")
+            namespace = {
+                "__builtins__": {},
+                "_U": UNSET,
+                "_M": STATEMENT_EXECUTED,
+                "_N": tuple(translator.nodes),
+                "_SITES": translator.sites,
+            }
+            exec(code, namespace)
+        except (SyntaxError, ValueError, TypeError) as e:
+            logger.debug(f"Generated code for {filename} did not compile: {e}")
+            return None
+        return namespace[entry]
+
+    def _map_error(self, error: Exception) -> Optional[Exception]:
+        """Translate an exception raised at an operator or builtin site."""
+        # The innermost generated frame decides, its line number is the site id
+        site = frame = None
+        tb = error.__traceback__
+        while tb is not None:
+            sites = tb.tb_frame.f_globals.get("_SITES")
+            if sites is not None and tb.tb_frame.f_code.co_filename.startswith("<zeus:"):
+                site = sites.get(tb.tb_lineno)
+                frame = tb.tb_frame
+            tb = tb.tb_next
+        if site is None:
+            return None
+
+        kind, name, operand = site
+        if kind == "builtin":
+            return RuntimeError(f"Error calling {name}: {error}")
+        if isinstance(error, ZeroDivisionError):
+            return ZeusDivisionByZeroError()
+        if isinstance(error, TypeError):
+            return ZeusTypeError(name, "compatible types", frame.f_locals.get(operand))
+        return ZeusRuntimeError(f"Error in {name} operation: {error}", context=name)
@@ -0,0 +1,108 @@
+"""
+Scope resolver - assigns frame slots to the variables a unit of code owns.
+
+A user function owns its parameters and every variable it assigns, loop
+variables included. A loop outside any function owns the variables its
+body assigns while it runs. The resolver rewrites reads, assignments and
+for loops of those variables into Local* nodes carrying a slot index, so
+the closure compiler reads and writes them in a SlotFrame list instead of
+searching the scope stack by name and falling back to Ermis.
+
+Resolution keeps the evaluator's dynamic scoping. A slot that has not been
+assigned yet reads through the scope stack like any other name, and the
+frame is itself a scope, so functions called from the unit still see its
+variables. Top-level loops run in a LocalFrame whose assigned slots are
+written to the enclosing scope when the loop finishes.
+"""
+
+from typing import Dict, Tuple
+
+from .zeus_ast import (
+    Node,
+    Identifier,
+    Call,
+    Assign,
+    While,
+    For,
+    FunctionDef,
+    ParallelFor,
+    HoistedLoop,
+    LocalFrame,
+    LocalVariable,
+    LocalAssign,
+    LocalFor,
+    LocalArgument,
+    iter_child_nodes,
+    map_children,
+)
+
+_LOOPS = (For, While, HoistedLoop)
+
+
+def _assigned_names(nodes: Tuple[Node, ...], slots: Dict[str, int]):
+    """Add every variable assigned in nodes to slots, outside nested definitions."""
+    for node in nodes:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current is None or isinstance(current, (FunctionDef, ParallelFor)):
+                continue
+            if isinstance(current, Assign):
+                slots.setdefault(current.variable, len(slots))
+            elif isinstance(current, For):
+                slots.setdefault(current.iterator, len(slots))
+            stack.extend(reversed(list(iter_child_nodes(current))))
+
+
+def _rewrite(node: Node, slots: Dict[str, int]) -> Node:
+    """Replace accesses to the names in slots with slot nodes."""
+    if isinstance(node, (FunctionDef, ParallelFor)):
+        # A parallel loop body may run in a worker, away from this frame
+        return node
+    if isinstance(node, Identifier):
+        slot = slots.get(node.name)
+        return node if slot is None else LocalVariable(node.name, slot)
+
+    node = map_children(node, lambda child: _rewrite(child, slots))
+
+    if isinstance(node, Assign) and node.variable in slots:
+        return LocalAssign(node.variable, slots[node.variable], node.expression)
+    if isinstance(node, For) and node.iterator in slots:
+        return LocalFor(node.iterator, slots[node.iterator], node.iterable, node.body)
+    if isinstance(node, Call) and node.arguments:
+        # A bare name in argument position may be a variable parsed as a call
+        arguments = tuple(
+            LocalArgument(arg.name, slots[arg.name])
+            if isinstance(arg, Call) and not arg.arguments and arg.name in slots
+            else arg
+            for arg in node.arguments
+        )
+        if any(new is not old for new, old in zip(arguments, node.arguments)):
+            return Call(node.name, arguments)
+    return node
+
+
+def resolve_function(node: FunctionDef) -> Tuple[FunctionDef, Dict[str, int]]:
+    """Return the definition with its locals resolved, and its slot map."""
+    slots: Dict[str, int] = {}
+    for name in node.parameters or ():
+        slots.setdefault(name, len(slots))
+    _assigned_names(node.body or (), slots)
+
+    body = tuple(_rewrite(statement, slots) for statement in node.body or ())
+    if all(new is old for new, old in zip(body, node.body or ())):
+        return node, slots
+    return FunctionDef(node.name, node.parameters, body), slots
+
+
+def resolve_statement(node: Node) -> Node:
+    """Return a top-level statement with each outermost loop run in a LocalFrame."""
+    if node is None or isinstance(node, (FunctionDef, ParallelFor)):
+        return node
+    if isinstance(node, _LOOPS):
+        slots: Dict[str, int] = {}
+        _assigned_names((node,), slots)
+        if not slots:
+            return node
+        return LocalFrame(tuple(slots), _rewrite(node, slots))
+    return map_children(node, resolve_statement)
@@ -1,7 +1,154 @@
-from typing import Any, Dict, List, Optional
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 import logging
 import json
+import os
+import weakref
+from .zeus_ast import FunctionDef, from_dict
 from .zeus_ermis_interface import ZeusErmisInterface
+from .zeus_write_buffer import WriteBehindBuffer, BATCHED
+from .zeus_memo import MemoCache
+from .zeus_module_cache import FUNCTIONS, load_unit
+
+# Returned by lookup_variable for a name that is not defined
+UNDEFINED = object()
+
+# Value of a frame slot that has not been assigned
+UNASSIGNED = object()
+
+# Names storage had no value for that a runtime remembers, beyond which it starts over
+MAX_MISSING = 4096
+
+# Live runtimes, told when Cronos reports that a variable changed
+_runtimes: "weakref.WeakSet[ZeusRuntime]" = weakref.WeakSet()
+
+
+def forget_missing(name: Optional[str] = None):
+    """Look a name, or every name, up in storage again in all runtimes."""
+    for runtime in list(_runtimes):
+        runtime.forget_missing(name)
+
+
+def _stored(names: Iterable[str]):
+    """Names just written to storage, looked up again by runtimes that missed them."""
+    runtimes = list(_runtimes)
+    for name in names:
+        for runtime in runtimes:
+            runtime.missing.discard(name)
+
+
+class SlotFrame(MutableMapping):
+    """
+    A scope whose resolved variables live in a list, indexed by slot.
+
+    Compiled code reads and writes values by index. Everything else sees a
+    mapping of the assigned slots, plus any other names set in the scope,
+    so dynamic scoping and list_variables() work as with a dict scope.
+    """
+
+    __slots__ = ("slots", "values", "extra")
+
+    def __init__(self, slots: Dict[str, int]):
+        # slots maps names to indexes and is shared by every frame of a function
+        self.slots = slots
+        self.values: List[Any] = [UNASSIGNED] * len(slots)
+        self.extra: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        slot = self.slots.get(name)
+        if slot is None:
+            return self.extra[name]
+        value = self.values[slot]
+        if value is UNASSIGNED:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: Any):
+        slot = self.slots.get(name)
+        if slot is None:
+            self.extra[name] = value
+        else:
+            self.values[slot] = value
+
+    def __delitem__(self, name: str):
+        slot = self.slots.get(name)
+        if slot is None:
+            del self.extra[name]
+        elif self.values[slot] is UNASSIGNED:
+            raise KeyError(name)
+        else:
+            self.values[slot] = UNASSIGNED
+
+    def __contains__(self, name: Any) -> bool:
+        slot = self.slots.get(name)
+        if slot is None:
+            return name in self.extra
+        return self.values[slot] is not UNASSIGNED
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        for name, slot in self.slots.items():
+            if values[slot] is not UNASSIGNED:
+                yield name
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for value in self.values if value is not UNASSIGNED) + len(self.extra)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        slot = self.slots.get(name)
+        if slot is None:
+            return self.extra.get(name, default)
+        value = self.values[slot]
+        return default if value is UNASSIGNED else value
+
+    def clear(self):
+        self.values[:] = [UNASSIGNED] * len(self.values)
+        self.extra.clear()
+
+
+class FunctionTable(dict):
+    """
+    User functions by name, with a version that changes whenever they do.
+
+    Inline caches of compiled call sites check the version instead of
+    resolving the name again, so any change, including direct assignment
+    or clear(), must go through a method that bumps it.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, name: str, definition: Any):
+        super().__setitem__(name, definition)
+        self.version += 1
+
+    def __delitem__(self, name: str):
+        super().__delitem__(name)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def pop(self, *args) -> Any:
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self) -> Any:
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, name: str, default: Any = None) -> Any:
+        self.version += 1
+        return super().setdefault(name, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
 
 
 class ZeusRuntime:
@@ -11,17 +158,29 @@ class ZeusRuntime:
     Olympus decides where data is stored (cache, database, etc.)
     """
 
-    def __init__(self):
+    def __init__(self, ermis: Optional[ZeusErmisInterface] = None):
         self.logger = logging.getLogger(__name__)
 
         # Unified interface - Zeus only talks to Ermis
-        self.ermis = ZeusErmisInterface()
+        self.ermis = ermis if ermis is not None else ZeusErmisInterface()
+
+        # Global variables are persisted through a write-behind buffer
+        self.writes = WriteBehindBuffer(
+            self.ermis, os.environ.get("ZEUS_DURABILITY", BATCHED), on_stored=_stored
+        )
 
         # Scope stack (list of dictionaries)
         self.scopes = [{}]  # Global scope
 
+        # Names storage had no value for, not asked for again until they are set
+        self.missing: Set[str] = set()
+        self.missing_hits = 0
+
+        # Results of pure functions and patterns, by arguments
+        self.memo = MemoCache()
+
         # User-defined functions (in-memory cache)
-        self.functions = {}
+        self.functions = FunctionTable()
 
         # Athena brain reference (will be set by interpreter)
         self.athena_brain = None
@@ -35,6 +194,8 @@ class ZeusRuntime:
         # Track if patterns have been bootstrapped
         self._patterns_bootstrapped = False
 
+        _runtimes.add(self)
+
         self.logger.info("Zeus runtime initialized")
 
     def set_athena_interface(self, interface):
@@ -53,6 +214,10 @@ class ZeusRuntime:
         """Push a new scope onto the stack."""
         self.scopes.append({})
 
+    def push_frame(self, frame: SlotFrame):
+        """Push a slot frame as the current scope, pop it with pop_scope()."""
+        self.scopes.append(frame)
+
     def pop_scope(self):
         """Pop the current scope from the stack."""
         if len(self.scopes) > 1:
@@ -60,12 +225,24 @@ class ZeusRuntime:
         else:
             raise RuntimeError("Cannot pop global scope")
 
-    def get_variable(self, name: str) -> Any:
-        """Get variable value, checking scopes from innermost to outermost."""
-        # Check local scopes first
+    def lookup_variable(self, name: str, default: Any = UNDEFINED) -> Any:
+        """
+        Get variable value, or default if it is not defined.
+
+        Scopes are checked from innermost to outermost, then storage through
+        Ermis, so a name costs at most one round trip. Names storage did not
+        have are remembered, so probing an undefined name again is free
+        until it is set or Cronos reports it changed.
+        """
         for scope in reversed(self.scopes):
-            if name in scope:
-                return scope[name]
+            value = scope.get(name, UNDEFINED)
+            if value is not UNDEFINED:
+                return value
+
+        missing = self.missing
+        if name in missing:
+            self.missing_hits += 1
+            return default
 
         # Check storage through Ermis
         value = self.ermis.retrieve(name)
@@ -74,18 +251,28 @@ class ZeusRuntime:
             self.scopes[0][name] = value
             return value
 
-        raise NameError(f"Variable '{name}' is not defined")
+        if len(missing) >= MAX_MISSING:
+            missing.clear()
+        missing.add(name)
+        return default
+
+    def forget_missing(self, name: Optional[str] = None):
+        """Look a name, or every name, up in storage again."""
+        if name is None:
+            self.missing.clear()
+        else:
+            self.missing.discard(name)
+
+    def get_variable(self, name: str) -> Any:
+        """Get variable value, checking scopes from innermost to outermost."""
+        value = self.lookup_variable(name)
+        if value is UNDEFINED:
+            raise NameError(f"Variable '{name}' is not defined")
+        return value
 
     def has_variable(self, name: str) -> bool:
         """Check if variable exists in any scope."""
-        # Check local scopes first
-        for scope in reversed(self.scopes):
-            if name in scope:
-                return True
-
-        # Check storage through Ermis
-        value = self.ermis.retrieve(name)
-        return value is not None
+        return self.lookup_variable(name) is not UNDEFINED
 
     def set_variable(self, name: str, value: Any):
         """Set variable in current scope and persist to knowledge base."""
@@ -94,28 +281,42 @@ class ZeusRuntime:
 
         # Persist through Ermis (only if in global scope)
         if len(self.scopes) == 1:
-            self.ermis.store(name, value, {'type': 'variable'})
+            # Other runtimes that missed the name hear of it once the write is stored
+            self.missing.discard(name)
+            self.writes.write(name, value, {'type': 'variable'})
 
-    def define_function(self, name: str, definition: Dict[str, Any]):
+    def flush(self) -> int:
+        """Store pending variable writes now, returns how many were stored."""
+        return self.writes.flush()
+
+    def set_durability(self, mode: str):
+        """Set how variables are persisted: sync, batched or memory."""
+        self.writes.set_mode(mode)
+
+    def end_session(self):
+        """Flush pending writes and end the Ermis session."""
+        self.flush()
+        self.ermis.end_session()
+
+    def define_function(self, name: str, definition: FunctionDef):
         """Define a user function."""
         self.functions[name] = definition
-
-        # Store through Ermis
-        if "parameters" in definition and "body" in definition:
-            body_str = (
-                json.dumps(definition["body"])
-                if isinstance(definition["body"], list)
-                else str(definition["body"])
-            )
-            self.ermis.store(name, {
-                'parameters': definition["parameters"],
+        self.missing.discard(name)
+
+        # Store through Ermis, the body in its dict form
+        if isinstance(definition, FunctionDef):
+            body = definition.to_dict()["body"]
+            body_str = json.dumps(body) if isinstance(body, list) else str(body)
+            if self.ermis.store(name, {
+                'parameters': list(definition.parameters),
                 'body': body_str,
-                'return_type': definition.get("return_type")
-            }, {'type': 'function'})
+                'return_type': None
+            }, {'type': 'function'}):
+                _stored((name,))
 
         self.logger.info(f"Defined function: {name}")
 
-    def get_function(self, name: str) -> Optional[Dict[str, Any]]:
+    def get_function(self, name: str) -> Optional[FunctionDef]:
         """Get function definition."""
         return self.functions.get(name)
 
@@ -124,7 +325,18 @@ class ZeusRuntime:
         if not self.athena_brain:
             raise RuntimeError("Athena brain not initialized")
 
-        return self.athena_brain.pattern_learner.apply_pattern(pattern_name, arguments)
+        learner = self.athena_brain.pattern_learner
+        pattern = learner.patterns.get(pattern_name)
+        memo = self.memo.pattern_table(pattern_name, pattern.implementation) if pattern else None
+        if memo is None:
+            return learner.apply_pattern(pattern_name, arguments)
+
+        # Failed applications come back as "Error: ..." strings and are not kept
+        return memo.call(
+            tuple(arguments.values()),
+            lambda: learner.apply_pattern(pattern_name, arguments),
+            keep=lambda result: not (isinstance(result, str) and result.startswith("Error:")),
+        )
 
     def execute_athena_command(self, command: str) -> Any:
         """Execute an Athena AI command."""
@@ -201,6 +413,9 @@ class ZeusRuntime:
             "scope_depth": len(self.scopes),
             "variables": len(self.list_variables()),
             "functions": len(self.functions),
+            "persistence": self.writes.get_stats(),
+            "memo": self.memo.get_stats(),
+            "missing": {"names": len(self.missing), "hits": self.missing_hits},
             # Request statistics through Ermis if needed
             # "knowledge_stats": self.ermis.request('query', {'query_type': 'statistics'}),
         }
@@ -211,45 +426,53 @@ class ZeusRuntime:
         This method provides compatibility with test expectations.
         """
         # Import here to avoid circular dependency
-        from .zeus_parser import ZeusParser
-        from .zeus_evaluator import ZeusEvaluator
-        
-        parser = ZeusParser()
-        evaluator = ZeusEvaluator()
+        from .zeus_parse_cache import cached_parse
+        from .zeus_evaluator import get_evaluator
         
-        # Parse the code
-        parsed = parser.parse(code)
-        if parsed.get("error"):
-            raise RuntimeError(f"Parse error: {parsed['error']}")
+        # Parse the code (shared AST cache)
+        parsed = cached_parse(code)
+        if parsed.error:
+            raise RuntimeError(f"Parse error: {parsed.error}")
         
-        # Evaluate it
-        return evaluator.evaluate_ast(parsed, self)
+        # Evaluate it, the statement boundary flushes its writes
+        try:
+            return get_evaluator().evaluate_ast(parsed, self)
+        finally:
+            self.flush()
 
     def _load_functions(self):
-        """Load functions from storage through Ermis."""
+        """Load functions from storage through Ermis, precompiled when Lightning has them."""
         try:
             # Query for all functions through Ermis
             functions = self.ermis.query('list_functions', {})
             if functions:
-                for func_data in functions:
-                    name = func_data.get('name')
-                    if name and func_data.get('body'):
-                        # Reconstruct function definition
-                        body = (
-                            json.loads(func_data["body"])
-                            if func_data["body"].startswith("[")
-                            else func_data["body"]
-                        )
-                        self.functions[name] = {
-                            "name": name,
-                            "parameters": func_data.get("parameters", []),
-                            "body": body,
-                            "type": "function_definition",
-                        }
+                source = json.dumps(functions, sort_keys=True, default=str)
+                self.functions.update(load_unit(FUNCTIONS, source, lambda: self._build_functions(functions)))
 
             self.logger.info(f"Loaded {len(self.functions)} functions from storage")
         except Exception as e:
             self.logger.warning(f"Failed to load functions: {e}")
+
+    @staticmethod
+    def _build_functions(functions: List[Dict[str, Any]]) -> Dict[str, FunctionDef]:
+        """Reconstruct function definitions from their stored form."""
+        library = {}
+        for func_data in functions:
+            name = func_data.get('name')
+            if name and func_data.get('body'):
+                # Reconstruct function definition
+                body = (
+                    json.loads(func_data["body"])
+                    if func_data["body"].startswith("[")
+                    else func_data["body"]
+                )
+                library[name] = from_dict({
+                    "name": name,
+                    "parameters": func_data.get("parameters", []),
+                    "body": body,
+                    "type": "function_definition",
+                })
+        return library
     
     def bootstrap_patterns(self):
         """Bootstrap teaching patterns if not already done."""
@@ -0,0 +1,189 @@
+"""
+Lazy sequences for Zeus.
+
+map, filter, take and zip return Sequence values that compute their items
+only as they are consumed. sum, max, min, mean, len, list, for loops and
+the other builtins pull items one at a time, so a pipeline over
+range(10**12) runs in constant memory. A sequence can be consumed more
+than once: each pass starts from its sources again, as with a range.
+
+map and filter take the function to apply by name, as a string, since a
+bare name in argument position is read as a variable or called. The name
+is resolved like a call made where the sequence was created: a builtin,
+a user function or a learned pattern. Python callables, such as builtins
+held in variables, are applied directly.
+
+A sequence has a length when its sources do, except after filter. Stored
+variables keep a sequence's description rather than forcing its items.
+"""
+
+import itertools
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .zeus_exceptions import ZeusRuntimeError, ZeusTypeError
+
+# (evaluator, runtime) of the evaluation in progress, set by ZeusEvaluator.evaluate_ast
+active: ContextVar[Optional[Tuple[Any, Any]]] = ContextVar("zeus_active_evaluation", default=None)
+
+_END = object()
+
+
+def _function(function: Any, builtin: str) -> Callable:
+    """The callable a map or filter applies, for a name or a callable."""
+    if callable(function):
+        return function
+    if not isinstance(function, str):
+        raise ZeusTypeError(builtin, "a function name", function)
+    context = active.get()
+    if context is None:
+        raise ZeusRuntimeError(f"Cannot call {function} outside an evaluation", context=builtin)
+
+    evaluator, runtime = context
+    builtin = evaluator.builtins.get(function)
+    if builtin is not None:
+        # Builtins come first in a call by name as well
+        return builtin
+    call_by_name = evaluator._call_by_name
+
+    def call(*args):
+        return call_by_name(function, list(args), runtime)
+
+    call.__name__ = function
+    return call
+
+
+class Sequence(ABC):
+    """A lazy sequence, iterated afresh each time it is consumed."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate the items from the first, computing them from the sources again."""
+
+    def __len__(self) -> int:
+        raise TypeError(f"{self!r} has no length")
+
+    def __bool__(self) -> bool:
+        try:
+            return len(self) > 0
+        except TypeError:
+            # Without a length, whether there is a first item
+            return next(iter(self), _END) is not _END
+
+    def __array__(self, dtype: Any = None, copy: Any = None):
+        import numpy as np
+
+        return np.asarray(list(self), dtype=dtype)
+
+
+def _name(function: Callable) -> str:
+    return getattr(function, "__name__", repr(function))
+
+
+class Map(Sequence):
+    """Items of the function applied to the sources' items, in step."""
+
+    __slots__ = ("function", "sources")
+
+    def __init__(self, function: Callable, sources: Tuple[Any, ...]):
+        self.function = function
+        self.sources = sources
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.function, *self.sources)
+
+    def __len__(self) -> int:
+        return min(len(source) for source in self.sources)
+
+    def __repr__(self) -> str:
+        return f"map({_name(self.function)}, {', '.join(map(repr, self.sources))})"
+
+
+class Filter(Sequence):
+    """Items of the source for which the function is true."""
+
+    __slots__ = ("function", "source")
+
+    def __init__(self, function: Callable, source: Any):
+        self.function = function
+        self.source = source
+
+    def __iter__(self) -> Iterator[Any]:
+        return filter(self.function, self.source)
+
+    def __repr__(self) -> str:
+        return f"filter({_name(self.function)}, {self.source!r})"
+
+
+class Take(Sequence):
+    """The first count items of the source."""
+
+    __slots__ = ("count", "source")
+
+    def __init__(self, count: int, source: Any):
+        self.count = count
+        self.source = source
+
+    def __iter__(self) -> Iterator[Any]:
+        return itertools.islice(self.source, self.count)
+
+    def __len__(self) -> int:
+        return min(self.count, len(self.source))
+
+    def __repr__(self) -> str:
+        return f"take({self.count}, {self.source!r})"
+
+
+class Zip(Sequence):
+    """Tuples of the sources' items, in step, as long as the shortest."""
+
+    __slots__ = ("sources",)
+
+    def __init__(self, sources: Tuple[Any, ...]):
+        self.sources = sources
+
+    def __iter__(self) -> Iterator[Any]:
+        return zip(*self.sources)
+
+    def __len__(self) -> int:
+        return min(len(source) for source in self.sources)
+
+    def __repr__(self) -> str:
+        return f"zip({', '.join(map(repr, self.sources))})"
+
+
+def _map(function: Any, *sources: Any) -> Map:
+    """Lazily apply a function, given by name, to the items of one or more sequences."""
+    if not sources:
+        raise ZeusRuntimeError("map() needs at least one sequence", context="map")
+    return Map(_function(function, "map"), sources)
+
+
+def _filter(function: Any, source: Any) -> Filter:
+    """Lazily keep the items of a sequence for which a function, given by name, is true."""
+    return Filter(_function(function, "filter"), source)
+
+
+def take(count: int, source: Any) -> Take:
+    """Lazily take the first count items of a sequence."""
+    if not isinstance(count, int) or count < 0:
+        raise ZeusTypeError("take", "a non-negative integer count", count)
+    return Take(count, source)
+
+
+def _zip(*sources: Any) -> Zip:
+    """Lazily pair up the items of several sequences."""
+    return Zip(sources)
+
+
+_map.__name__ = "map"
+_filter.__name__ = "filter"
+_zip.__name__ = "zip"
+
+
+def sequence_builtins() -> Dict[str, Callable]:
+    """Builtins that build lazy sequences."""
+    return {"map": _map, "filter": _filter, "take": take, "zip": _zip}
@@ -0,0 +1,253 @@
+"""
+Execution telemetry ZeusInterpreter sends after each command.
+
+Every command used to store an execution record through Ermis and send a
+learn_from_code notification to Athena before returning, two blocking round
+trips on the user's critical path. Both now go onto a bounded channel that a
+background thread drains, sending each batch as a single store_many of the
+execution records and a single learn_from_code_batch message to Athena.
+Each record is still stored as the variable its command named, _exec_N, so
+readers of those variables see the same records as before.
+
+Under load the channel sheds work rather than blocking the user:
+
+- learning notifications are sampled, keeping one in ZEUS_TELEMETRY_SAMPLE
+  (by default every one), and are dropped once the channel is three
+  quarters full, since Athena learns from the ones that remain
+- execution records are dropped, oldest first, only when the channel is full
+
+Modes (ZEUS_TELEMETRY):
+
+- async: records are batched and sent in the background
+- sync: records are sent before execute() returns, as before the channel existed
+- off: nothing is recorded
+"""
+
+import atexit
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_arrays import storable
+
+if TYPE_CHECKING:
+    from .zeus_ast import Node
+    from .zeus_ermis_interface import ZeusErmisInterface
+
+# Telemetry modes
+ASYNC = "async"
+SYNC = "sync"
+OFF = "off"
+
+MODES = (ASYNC, SYNC, OFF)
+
+# Records the channel holds before it drops the oldest
+DEFAULT_MAX_QUEUED = 1024
+
+# Records sent in one batch
+DEFAULT_BATCH_SIZE = 64
+
+# Seconds the sender waits for more records before sending a partial batch
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+# Kinds of record
+EXECUTION = "execution"
+LEARNING = "learning"
+
+logger = logging.getLogger(__name__)
+
+# Channels flushed at shutdown
+_channels: "weakref.WeakSet[TelemetryChannel]" = weakref.WeakSet()
+
+
+def _send_to_athena(message: Dict[str, Any], msg_type: str) -> bool:
+    from .ermis_sender import zeus_sender
+
+    return zeus_sender.send_to_athena(message, msg_type)
+
+
+class TelemetryChannel:
+    """Batches execution records and learning notifications off the critical path."""
+
+    def __init__(self, ermis: "ZeusErmisInterface", session_id: str, mode: str = ASYNC,
+                 sample: int = 1, max_queued: int = DEFAULT_MAX_QUEUED,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 send: Callable[[Dict[str, Any], str], bool] = _send_to_athena):
+        self.ermis = ermis
+        self.session_id = session_id
+        self.mode = self._check_mode(mode)
+        if sample < 1:
+            raise ValueError(f"Telemetry sample must be at least 1: {sample}")
+        self.sample = sample
+        self.max_queued = max_queued
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.send = send
+
+        self._queue: Deque[Tuple[str, Any]] = deque()
+        self._ready = threading.Condition()
+        # Serializes sending, so batches land in the order they were queued
+        self._send_lock = threading.Lock()
+        self._sender: Optional[threading.Thread] = None
+        self._learned = 0
+        self._batches = 0
+
+        self.recorded = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.sent = 0
+        self.failures = 0
+
+        _channels.add(self)
+
+    @staticmethod
+    def _check_mode(mode: str) -> str:
+        mode = str(mode).strip().lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown telemetry mode: {mode}")
+        return mode
+
+    def set_mode(self, mode: str):
+        """Change the telemetry mode, sending records queued under the old one."""
+        mode = self._check_mode(mode)
+        self.flush()
+        self.mode = mode
+
+    def record_execution(self, name: str, data: Dict[str, Any]):
+        """Record a command's execution under name."""
+        self._record(EXECUTION, (name, data))
+
+    def record_learning(self, code: str, parsed_ast: "Node", result: Any, context: Dict[str, Any]):
+        """Tell Athena about executed code, for pattern learning."""
+        self._learned += 1
+        if self._learned % self.sample:
+            self.sampled_out += 1
+            return
+        # The AST is converted to a message in the background
+        self._record(LEARNING, (code, parsed_ast, result, dict(context)))
+
+    def _record(self, kind: str, record: Any):
+        if self.mode == OFF:
+            return
+        if self.mode == SYNC:
+            self.recorded += 1
+            with self._send_lock:
+                self._send([(kind, record)])
+            return
+
+        with self._ready:
+            queue = self._queue
+            if kind == LEARNING and len(queue) * 4 >= self.max_queued * 3:
+                self.dropped += 1
+                return
+            if len(queue) >= self.max_queued:
+                queue.popleft()
+                self.dropped += 1
+            queue.append((kind, record))
+            self.recorded += 1
+            if len(queue) >= self.batch_size:
+                self._ready.notify()
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._run, name="zeus-telemetry", daemon=True)
+                self._sender.start()
+
+    def _run(self):
+        while True:
+            with self._ready:
+                if len(self._queue) < self.batch_size:
+                    self._ready.wait(self.flush_interval)
+            self._send_next()
+
+    def _send_next(self) -> Optional[int]:
+        """Send the next batch, returns how many records were sent or None if none were queued."""
+        with self._send_lock:
+            with self._ready:
+                queue = self._queue
+                batch = [queue.popleft() for _ in range(min(len(queue), self.batch_size))]
+            if not batch:
+                return None
+            return self._send(batch)
+
+    def pending(self) -> int:
+        """Number of records waiting to be sent."""
+        with self._ready:
+            return len(self._queue)
+
+    def flush(self) -> int:
+        """Send every queued record now, returns how many were sent."""
+        sent = 0
+        while True:
+            count = self._send_next()
+            if count is None:
+                return sent
+            sent += count
+
+    def _send(self, batch: List[Tuple[str, Any]]) -> int:
+        """Send a batch as one store and one message, with the send lock held."""
+        executions = {}
+        learning = []
+        for kind, record in batch:
+            if kind == EXECUTION:
+                name, data = record
+                executions[name] = data
+            else:
+                code, parsed_ast, result, context = record
+                learning.append({
+                    'code': code,
+                    'parsed_ast': parsed_ast.to_dict(),
+                    'result': storable(result),
+                    'context': context,
+                })
+
+        sent = 0
+        self._batches += 1
+        if executions:
+            try:
+                results = self.ermis.store_many(
+                    {name: (data, {'type': 'variable'}) for name, data in executions.items()}
+                )
+            except Exception as e:
+                # Telemetry is best effort, the command already ran
+                logger.debug(f"Failed to store execution records: {e}")
+                results = {}
+            stored = sum(1 for name in executions if results.get(name))
+            if stored < len(executions):
+                logger.debug(f"Failed to store {len(executions) - stored} execution records")
+            sent += stored
+            self.failures += len(executions) - stored
+        if learning:
+            try:
+                self.send({'type': 'learn_from_code_batch', 'records': learning},
+                          'learn_from_code_batch')
+                sent += len(learning)
+            except Exception as e:
+                logger.debug(f"Failed to notify Athena about patterns: {e}")
+                self.failures += len(learning)
+        self.sent += sent
+        return sent
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get telemetry statistics."""
+        with self._ready:
+            return {
+                "mode": self.mode,
+                "pending": len(self._queue),
+                "recorded": self.recorded,
+                "dropped": self.dropped,
+                "sampled_out": self.sampled_out,
+                "batches": self._batches,
+                "sent": self.sent,
+                "failures": self.failures,
+            }
+
+
+def flush_all():
+    """Flush every live channel."""
+    for channel in list(_channels):
+        channel.flush()
+
+
+atexit.register(flush_all)
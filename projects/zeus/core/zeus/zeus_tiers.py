@@ -0,0 +1,217 @@
+"""
+Tiered execution - user functions start interpreted and are compiled when hot.
+
+In the tiered evaluation mode every user function starts in the
+interpreted tier, where the tree-walker runs its body in a dict scope,
+so code that runs a few times pays no compilation. Each call is
+counted and timed. Once a function has been called ZEUS_TIER_CALLS times,
+or has spent ZEUS_TIER_SECONDS in total, it is compiled on a background
+thread by the bytecode backend, through Lightning when a compiler is
+attached, and the calls that follow run the compiled code. A function the
+bytecode backend cannot translate is compiled to closures instead.
+
+Compiled code is guarded by the definition it was compiled from: a
+function redefined after promotion drops back to the interpreted tier and
+is profiled again. Learned patterns are run by Athena, not by Zeus code,
+so they are profiled the same way but stay interpreted.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+from .zeus_ast import FunctionDef
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+    from .zeus_runtime import ZeusRuntime
+
+# Tiers
+INTERPRETED = "interpreted"
+CLOSURES = "closures"
+BYTECODE = "bytecode"
+
+# Calls after which a function is compiled
+PROMOTE_CALLS = 100
+
+# Seconds spent in a function after which it is compiled
+PROMOTE_SECONDS = 0.05
+
+logger = logging.getLogger(__name__)
+
+# Set while a function runs in the interpreted tier, so the evaluator walks its body
+interpreting: ContextVar[bool] = ContextVar("zeus_interpreting", default=False)
+
+
+class _Profile:
+    """Calls, time and tier of one function or pattern."""
+
+    __slots__ = ("definition", "tier", "calls", "seconds", "code", "compiling", "transitions")
+
+    def __init__(self, definition: Any):
+        self.definition = definition
+        self.tier = INTERPRETED
+        self.calls = 0
+        self.seconds = 0.0
+        # Runs the compiled tier, as code(runtime, args)
+        self.code: Optional[Callable[["ZeusRuntime", List[Any]], Any]] = None
+        self.compiling = False
+        # Count of each "from->to" tier change
+        self.transitions: Dict[str, int] = {}
+
+    def move(self, tier: str):
+        key = f"{self.tier}->{tier}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self.tier = tier
+
+
+class TieredFunctions:
+    """Profiles the user functions of one evaluator and promotes the hot ones."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", promote_calls: Optional[int] = None,
+                 promote_seconds: Optional[float] = None):
+        if promote_calls is None:
+            promote_calls = int(os.environ.get("ZEUS_TIER_CALLS", PROMOTE_CALLS))
+        if promote_seconds is None:
+            promote_seconds = float(os.environ.get("ZEUS_TIER_SECONDS", PROMOTE_SECONDS))
+
+        self.evaluator = evaluator
+        self.promote_calls = promote_calls
+        self.promote_seconds = promote_seconds
+
+        self._profiles: Dict[str, _Profile] = {}
+        self._patterns: Dict[str, _Profile] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+
+        self.promotions = 0
+        self.deoptimizations = 0
+
+    def call(self, runtime: "ZeusRuntime", name: str, func: FunctionDef, args: List[Any]) -> Any:
+        """Call a user function in its current tier."""
+        profile = self._profiles.get(name)
+        if profile is None or profile.definition is not func:
+            profile = self._profile(name, func)
+
+        code = profile.code
+        if code is not None:
+            profile.calls += 1
+            return code(runtime, args)
+
+        start = time.perf_counter()
+        token = interpreting.set(True)
+        try:
+            return self.evaluator._call_user_function(func, args, runtime)
+        finally:
+            interpreting.reset(token)
+            profile.calls += 1
+            profile.seconds += time.perf_counter() - start
+            if not profile.compiling and (
+                profile.calls >= self.promote_calls or profile.seconds >= self.promote_seconds
+            ):
+                self._promote(name, profile)
+
+    def record_pattern(self, name: str, seconds: float):
+        """Count a learned pattern's application, which stays interpreted."""
+        with self._lock:
+            profile = self._patterns.get(name)
+            if profile is None:
+                profile = self._patterns[name] = _Profile(None)
+            profile.calls += 1
+            profile.seconds += seconds
+
+    def _profile(self, name: str, func: FunctionDef) -> _Profile:
+        """Start profiling a function, dropping the tier of an earlier definition."""
+        with self._lock:
+            old = self._profiles.get(name)
+            if old is not None and old.definition is func:
+                return old
+            profile = _Profile(func)
+            if old is not None:
+                profile.transitions = old.transitions
+                if old.tier != INTERPRETED:
+                    # Guard failed: the compiled code is for another definition
+                    old.move(INTERPRETED)
+                    self.deoptimizations += 1
+                    logger.debug(f"Function {name} redefined, back to {INTERPRETED}")
+            self._profiles[name] = profile
+            return profile
+
+    def _promote(self, name: str, profile: _Profile):
+        with self._lock:
+            if profile.compiling:
+                return
+            profile.compiling = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(1, thread_name_prefix="zeus-tiers")
+            future = self._executor.submit(self._compile, name, profile)
+            self._pending = [pending for pending in self._pending if not pending.done()]
+            self._pending.append(future)
+
+    def _compile(self, name: str, profile: _Profile):
+        """Compile a hot function and swap it in, on the background thread."""
+        evaluator = self.evaluator
+        func = profile.definition
+        try:
+            py_compiler = evaluator.py_compiler
+            compiled = py_compiler.get_function(func)
+            if compiled is not None:
+                tier = BYTECODE
+
+                def code(runtime, args):
+                    return py_compiler.call_function(compiled, runtime, args)
+            else:
+                tier = CLOSURES
+                code = evaluator.compiler.get_function(func)
+        except Exception as e:
+            # The function keeps running interpreted
+            logger.debug(f"Function {name} could not be compiled: {e}")
+            return
+
+        with self._lock:
+            if self._profiles.get(name) is not profile:
+                # Redefined while compiling
+                return
+            profile.code = code
+            profile.move(tier)
+            self.promotions += 1
+        logger.debug(f"Function {name} promoted to {tier} after {profile.calls} calls")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for the compilations started so far."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending, timeout)
+
+    def shutdown(self):
+        """Stop the compile thread, a later promotion starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tier statistics, per function and pattern."""
+
+        def describe(profile: _Profile) -> Dict[str, Any]:
+            return {
+                "tier": profile.tier,
+                "calls": profile.calls,
+                "seconds": profile.seconds,
+                "transitions": dict(profile.transitions),
+            }
+
+        with self._lock:
+            return {
+                "promote_calls": self.promote_calls,
+                "promote_seconds": self.promote_seconds,
+                "promotions": self.promotions,
+                "deoptimizations": self.deoptimizations,
+                "functions": {name: describe(p) for name, p in self._profiles.items()},
+                "patterns": {name: describe(p) for name, p in self._patterns.items()},
+            }
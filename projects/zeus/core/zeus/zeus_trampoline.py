@@ -0,0 +1,539 @@
+"""
+Trampolined execution of user functions on an explicit stack.
+
+Compiled user functions call each other through the Python stack, several
+frames per Zeus call, so recursion a few hundred levels deep would raise
+RecursionError. Once calls nest deeper than TRAMPOLINE_DEPTH, the evaluator
+hands the call to a Trampoline instead. It runs function bodies as
+generators that yield the user function calls they make; a driver loop
+keeps the generators of active calls in a list and resumes each caller
+with its callee's result. Recursion depth is then bounded by max_depth
+and memory, not by the C stack.
+
+A call in tail position whose callee reads no variable outside its own
+frame replaces its caller's frame instead of nesting inside it, so tail
+recursion runs in constant space at any depth. Under dynamic scoping any
+other callee may read the caller's variables, and keeps the caller alive.
+
+Subtrees that call no user function run as the closure compiler's
+closures, with the same results and errors as in compiled mode.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_ast import (
+    Node,
+    BinaryOp,
+    UnaryOp,
+    Call,
+    Parenthesized,
+    ListLiteral,
+    DictLiteral,
+    Assign,
+    If,
+    While,
+    For,
+    FunctionDef,
+    Block,
+    LocalAssign,
+    LocalFor,
+    LocalArgument,
+    STATEMENT_EXECUTED,
+    walk,
+)
+from .zeus_exceptions import (
+    ZeusRuntimeError,
+    ZeusTypeError,
+    ZeusDivisionByZeroError,
+)
+from .zeus_memo import MISSING
+from .zeus_purity import Purity, analyze_function
+from .zeus_resolver import resolve_function
+from .zeus_runtime import SlotFrame, UNASSIGNED, UNDEFINED
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+    from .zeus_runtime import ZeusRuntime
+
+# Nesting of user function calls at which they move to the trampoline
+TRAMPOLINE_DEPTH = 50
+
+# Default limit on calls active on the trampoline at once
+MAX_DEPTH = 100000
+
+# Default number of compiled functions kept
+MAX_ENTRIES = 1024
+
+# Kinds of call a body yields: a plain call, a tail call, and a tail call
+# through an if statement, whose None result reads as STATEMENT_EXECUTED
+CALL, TAIL, WRAPPED_TAIL = 0, 1, 2
+
+# (is_generator, function): generators are driven with `yield from`
+Step = Tuple[bool, Callable[["ZeusRuntime"], Any]]
+
+
+def store_memo(memo: Optional[tuple], value: Any):
+    """Store a result for every call in a frame's memo chain, newest first."""
+    wrapped = False
+    while memo is not None:
+        table, key, wrapped_here, memo = memo
+        wrapped = wrapped or wrapped_here
+        if table is not None:
+            table.store(key, STATEMENT_EXECUTED if wrapped and value is None else value)
+
+
+class _Frame:
+    """A user function call running on the trampoline."""
+
+    __slots__ = ("body", "memo", "wrap")
+
+    def __init__(self, body: Generator, memo: Optional[tuple], wrap: bool):
+        self.body = body
+        # Memoized calls this frame answers, as a chain of (table, key, wrapped, parent):
+        # a tail call links its caller's chain instead of copying it, and a wrapped
+        # entry (table None) makes None results of the entries behind it STATEMENT_EXECUTED
+        self.memo = memo
+        # Whether a None result is returned as STATEMENT_EXECUTED
+        self.wrap = wrap
+
+
+class Trampoline:
+    """Runs user function calls, and the calls they make, on an explicit stack."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", max_depth: Optional[int] = None,
+                 max_entries: int = MAX_ENTRIES):
+        self.evaluator = evaluator
+        if max_depth is None:
+            max_depth = int(os.environ.get("ZEUS_MAX_DEPTH", MAX_DEPTH))
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+
+        # Compiled bodies keyed by id() of the definition, kept alive with it
+        self._functions: "OrderedDict[int, tuple]" = OrderedDict()
+        # Whether a tail call may drop its caller's frame, by callee name
+        self._closed: Dict[str, Purity] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.tail_calls = 0
+        self.max_reached = 0
+
+    def call(self, runtime: "ZeusRuntime", name: str, node: FunctionDef, args: List[Any]) -> Any:
+        """Call a user function and run every user call it makes on the trampoline."""
+        stack: List[_Frame] = []
+        value = self._enter(runtime, stack, name, node, args, CALL)
+        if value is not MISSING:
+            return value
+
+        send = None
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                frame = stack[-1]
+                try:
+                    if error is not None:
+                        request = frame.body.throw(error)
+                    else:
+                        request = frame.body.send(send)
+                except StopIteration as stop:
+                    stack.pop()
+                    runtime.pop_scope()
+                    result = stop.value
+                    if result is None and frame.wrap:
+                        result = STATEMENT_EXECUTED
+                    if frame.memo is not None:
+                        store_memo(frame.memo, stop.value)
+                    if not stack:
+                        return result
+                    send, error = result, None
+                    continue
+                except Exception as e:
+                    stack.pop()
+                    runtime.pop_scope()
+                    if not stack:
+                        raise
+                    send, error = None, e
+                    continue
+
+                callee, callee_args, kind = request
+                send, error = None, None
+                try:
+                    value = self._dispatch(runtime, stack, callee, callee_args, kind)
+                except Exception as e:
+                    error = e
+                    continue
+                if value is not MISSING:
+                    send = value
+        finally:
+            # Only left non-empty when the driver itself is interrupted
+            while stack:
+                stack.pop().body.close()
+                runtime.pop_scope()
+
+    def _dispatch(self, runtime: "ZeusRuntime", stack: List[_Frame], name: str,
+                  args: List[Any], kind: int) -> Any:
+        """Start a call yielded by a body; returns its value unless a frame was pushed."""
+        node = runtime.get_function(name)
+        if not isinstance(node, FunctionDef):
+            # Patterns and legacy functions run as in compiled mode
+            return self.evaluator._call_by_name(name, args, runtime)
+        return self._enter(runtime, stack, name, node, args, kind)
+
+    def _enter(self, runtime: "ZeusRuntime", stack: List[_Frame], name: str, node: FunctionDef,
+               args: List[Any], kind: int) -> Any:
+        """Push a frame for a call, or return its memoized value."""
+        key = None
+        table = runtime.memo.function_table(name, node, runtime.functions, self.evaluator.builtins)
+        if table is not None:
+            key, value = table.lookup(args)
+            if value is not MISSING:
+                return value
+
+        memo = None
+        wrap = False
+        if kind != CALL and stack and self.is_closed(name, node, runtime.functions):
+            # Tail call: the callee's result is the caller's, so the caller's frame goes
+            caller = stack.pop()
+            caller.body.close()
+            runtime.pop_scope()
+            wrapped = kind == WRAPPED_TAIL
+            memo = caller.memo
+            if wrapped and memo is not None and memo[0] is not None:
+                memo = (None, None, True, memo)
+            wrap = caller.wrap or wrapped
+            self.tail_calls += 1
+        if key is not None:
+            memo = (table, key, False, memo)
+
+        if len(stack) >= self.max_depth:
+            raise ZeusRuntimeError(
+                f"Maximum recursion depth of {self.max_depth} exceeded", context=name
+            )
+
+        slots, param_slots, body = self._get(node)
+        frame = SlotFrame(slots)
+        values = frame.values
+        # Missing arguments default to None, extra ones are ignored
+        for index, slot in enumerate(param_slots):
+            values[slot] = args[index] if index < len(args) else None
+        runtime.push_frame(frame)
+        stack.append(_Frame(body(runtime), memo, wrap))
+
+        self.calls += 1
+        if len(stack) > self.max_reached:
+            self.max_reached = len(stack)
+        return MISSING
+
+    def is_closed(self, name: str, node: FunctionDef, functions: Dict[str, Any]) -> bool:
+        """Whether the function reads no variables outside its own frame."""
+        purity = self._closed.get(name)
+        if purity is None or any(functions.get(n) is not d for n, d in purity.dependencies):
+            purity = analyze_function(name, node, functions, self.evaluator.builtins, reads_only=True)
+            self._closed[name] = purity
+        return purity.pure
+
+    def _get(self, node: FunctionDef) -> tuple:
+        key = id(node)
+        with self._lock:
+            entry = self._functions.get(key)
+            if entry is not None and entry[0] is node:
+                self._functions.move_to_end(key)
+                return entry[1]
+
+        compiled = self._compile_function(node)
+
+        with self._lock:
+            self._functions[key] = (node, compiled)
+            self._functions.move_to_end(key)
+            while len(self._functions) > self.max_entries:
+                self._functions.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        """Drop compiled functions and purity decisions."""
+        with self._lock:
+            self._functions.clear()
+            self._closed.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get trampoline statistics."""
+        return {
+            "calls": self.calls,
+            "tail_calls": self.tail_calls,
+            "max_depth": self.max_depth,
+            "max_reached": self.max_reached,
+            "functions": len(self._functions),
+        }
+
+    # Compiling function bodies into generators
+
+    def _compile_function(self, node: FunctionDef) -> tuple:
+        """Compile a body into a generator function, like ClosureCompiler._compile_user_function."""
+        resolved, slots = resolve_function(self.evaluator.optimizer.optimize_function(node))
+        param_slots = [slots[name] for name in resolved.parameters or ()]
+        statements = resolved.body or ()
+        steps = [
+            self._compile(statement, TAIL if index == len(statements) - 1 else CALL)
+            for index, statement in enumerate(statements)
+        ]
+
+        def body(runtime):
+            result = None
+            for is_generator, step in steps:
+                result = (yield from step(runtime)) if is_generator else step(runtime)
+            return result
+
+        return slots, param_slots, body
+
+    def _calls_functions(self, node: Optional[Node]) -> bool:
+        """Whether evaluating node may call a user function."""
+        builtins = self.evaluator.builtins
+        for child in walk(node):
+            if isinstance(child, Call) and child.name not in builtins:
+                return True
+            if isinstance(child, LocalArgument) and child.name not in builtins:
+                return True
+        return False
+
+    def _compile(self, node: Optional[Node], kind: int = CALL) -> Step:
+        """Compile node into a step; a generator only if it may call a user function."""
+        if node is None or isinstance(node, FunctionDef) or not self._calls_functions(node):
+            return False, self.evaluator.compiler.compile(node)
+
+        compiler = {
+            Call: self._call,
+            BinaryOp: self._binary_op,
+            UnaryOp: self._unary_op,
+            Parenthesized: lambda n, k: self._compile(n.expression, k),
+            ListLiteral: self._list,
+            DictLiteral: self._dict,
+            Assign: self._assignment,
+            LocalAssign: self._assignment,
+            If: self._if_statement,
+            While: self._while_loop,
+            For: self._for_loop,
+            LocalFor: self._for_loop,
+            Block: self._block,
+            LocalArgument: lambda n, k: self._argument(n),
+        }.get(type(node))
+        if compiler is None or node.error:
+            # Anything else recurses through the evaluator as in compiled mode
+            return False, self.evaluator.compiler.compile(node)
+        return compiler(node, kind)
+
+    def _argument(self, arg: Node) -> Step:
+        if isinstance(arg, LocalArgument):
+            name, slot = arg.name, arg.slot
+        elif isinstance(arg, Call) and not arg.arguments and arg.name not in self.evaluator.builtins:
+            name, slot = arg.name, None
+        else:
+            return self._compile(arg)
+        if name in self.evaluator.builtins:
+            return False, self.evaluator.compiler.compile(arg) if slot is not None \
+                else self.evaluator.compiler._compile_argument(arg)
+
+        # A bare name in argument position may be a variable parsed as a call
+        def variable_or_call(runtime):
+            if slot is not None:
+                value = runtime.scopes[-1].values[slot]
+                if value is not UNASSIGNED:
+                    return value
+            value = runtime.lookup_variable(name)
+            if value is UNDEFINED:
+                value = yield name, [], CALL
+            return value
+
+        return True, variable_or_call
+
+    @staticmethod
+    def _run_all(steps: List[Step], runtime: "ZeusRuntime"):
+        values = []
+        for is_generator, step in steps:
+            values.append((yield from step(runtime)) if is_generator else step(runtime))
+        return values
+
+    def _call(self, node: Call, kind: int) -> Step:
+        name = node.name
+        arg_steps = [self._argument(arg) for arg in node.arguments]
+        run_all = self._run_all
+        builtin = self.evaluator.builtins.get(name, MISSING)
+
+        if builtin is not MISSING:
+
+            def call_builtin(runtime):
+                args = yield from run_all(arg_steps, runtime)
+                try:
+                    return builtin(*args)
+                except Exception as e:
+                    raise RuntimeError(f"Error calling {name}: {e}")
+
+            return True, call_builtin
+
+        def call(runtime):
+            args = yield from run_all(arg_steps, runtime)
+            return (yield name, args, kind)
+
+        return True, call
+
+    def _binary_op(self, node: BinaryOp, kind: int) -> Step:
+        op = node.operator
+        op_func = self.evaluator.binary_ops.get(op)
+        if op_func is None:
+            return False, self.evaluator.compiler.compile(node)
+        steps = [self._compile(node.left), self._compile(node.right)]
+        run_all = self._run_all
+
+        def binary_op(runtime):
+            left, right = yield from run_all(steps, runtime)
+            try:
+                return op_func(left, right)
+            except ZeroDivisionError:
+                raise ZeusDivisionByZeroError()
+            except TypeError:
+                raise ZeusTypeError(op, "compatible types", left)
+            except Exception as e:
+                raise ZeusRuntimeError(f"Error in {op} operation: {e}", context=op)
+
+        return True, binary_op
+
+    def _unary_op(self, node: UnaryOp, kind: int) -> Step:
+        op_func = self.evaluator.unary_ops.get(node.operator)
+        if op_func is None:
+            return False, self.evaluator.compiler.compile(node)
+        is_generator, operand = self._compile(node.operand)
+
+        def unary_op(runtime):
+            value = (yield from operand(runtime)) if is_generator else operand(runtime)
+            return op_func(value)
+
+        return True, unary_op
+
+    def _list(self, node: ListLiteral, kind: int) -> Step:
+        steps = [self._compile(element) for element in node.elements]
+        run_all = self._run_all
+
+        def list_literal(runtime):
+            return (yield from run_all(steps, runtime))
+
+        return True, list_literal
+
+    def _dict(self, node: DictLiteral, kind: int) -> Step:
+        steps = [self._compile(part) for item in node.items for part in item]
+        run_all = self._run_all
+
+        def dict_literal(runtime):
+            values = yield from run_all(steps, runtime)
+            result = {}
+            for index in range(0, len(values), 2):
+                result[values[index]] = values[index + 1]
+            return result
+
+        return True, dict_literal
+
+    def _assignment(self, node: Node, kind: int) -> Step:
+        if node.expression is None:
+            return False, self.evaluator.compiler.compile(node)
+        is_generator, value_step = self._compile(node.expression)
+        variable = node.variable
+        slot = node.slot if isinstance(node, LocalAssign) else None
+
+        def assignment(runtime):
+            value = (yield from value_step(runtime)) if is_generator else value_step(runtime)
+            if slot is None:
+                runtime.set_variable(variable, value)
+            else:
+                runtime.scopes[-1].values[slot] = value
+            return value
+
+        return True, assignment
+
+    def _if_statement(self, node: If, kind: int) -> Step:
+        # Branches of an if in tail position are in tail position too
+        branch_kind = WRAPPED_TAIL if kind != CALL else CALL
+        condition_generator, condition = self._compile(node.condition)
+        then_step = self._compile(node.then_branch, branch_kind) if node.then_branch else None
+        else_step = self._compile(node.else_branch, branch_kind) if node.else_branch else None
+
+        def if_statement(runtime):
+            if (yield from condition(runtime)) if condition_generator else condition(runtime):
+                step = then_step
+            else:
+                step = else_step
+            if step is None:
+                return STATEMENT_EXECUTED
+            is_generator, branch = step
+            result = (yield from branch(runtime)) if is_generator else branch(runtime)
+            return result if result is not None else STATEMENT_EXECUTED
+
+        return True, if_statement
+
+    def _loop_body(self, statements: Tuple[Node, ...]) -> List[tuple]:
+        """Compile a loop body into (is_generator, step, control) triples, like _compile_block."""
+        body = []
+        for statement in statements:
+            control = None
+            if statement is not None and statement.type in ("break", "continue"):
+                control = statement.type
+            body.append((*self._compile(statement), control))
+        return body
+
+    def _while_loop(self, node: While, kind: int) -> Step:
+        condition_generator, condition = self._compile(node.condition)
+        body = self._loop_body(node.body or ())
+
+        def while_loop(runtime):
+            result = None
+            while (yield from condition(runtime)) if condition_generator else condition(runtime):
+                for is_generator, step, control in body:
+                    result = (yield from step(runtime)) if is_generator else step(runtime)
+                    if control == "break":
+                        return result
+                    if control == "continue":
+                        break
+            return result
+
+        return True, while_loop
+
+    def _for_loop(self, node: Node, kind: int) -> Step:
+        iterable_generator, iterable = self._compile(node.iterable)
+        body = self._loop_body(node.body or ())
+        iterator = node.iterator
+        slot = node.slot if isinstance(node, LocalFor) else None
+
+        def for_loop(runtime):
+            result = None
+            items = (yield from iterable(runtime)) if iterable_generator else iterable(runtime)
+            # Calls made by the body pop their frames, so this scope stays current
+            scope = runtime.scopes[-1]
+            for item in items:
+                if slot is None:
+                    runtime.set_variable(iterator, item)
+                else:
+                    scope.values[slot] = item
+                for is_generator, step, control in body:
+                    result = (yield from step(runtime)) if is_generator else step(runtime)
+                    if control == "break":
+                        return result
+                    if control == "continue":
+                        break
+            return result
+
+        return True, for_loop
+
+    def _block(self, node: Block, kind: int) -> Step:
+        statements = node.statements
+        steps = [
+            self._compile(statement, kind if index == len(statements) - 1 else CALL)
+            for index, statement in enumerate(statements)
+        ]
+
+        def block(runtime):
+            result = None
+            for is_generator, step in steps:
+                result = (yield from step(runtime)) if is_generator else step(runtime)
+            return result
+
+        return True, block
@@ -0,0 +1,954 @@
+"""
+Zeus bytecode and the stack-based virtual machine that runs it.
+
+A program or user function is compiled once into a ZeusCode: a flat list
+of (opcode, argument) integer pairs, a constant pool, the names it reads
+and writes by name, and the slot names of its locals. Jumps hold absolute
+instruction offsets. Anything an instruction needs beyond one integer,
+such as a bound builtin with its name and argument count, is a tuple in
+the constant pool.
+
+The VM runs code in a single dispatch loop with an explicit value stack
+per frame. Calls to user functions push a VM frame instead of recursing in
+Python, so recursion depth is bounded by the trampoline's max_depth, not by
+the C stack. As on the trampoline, a call in tail position to a function
+that reads nothing outside its own frame replaces its caller's frame, so
+tail recursion runs in constant space at any depth. Function locals live in a SlotFrame pushed on the runtime, as
+in compiled mode, so dynamic scoping and unassigned slots behave the same.
+Calls to names that are not user functions go through the evaluator, which
+applies learned patterns.
+
+Results and errors match the closure compiler. Parallel for loops are the
+one construct run by a closure, since their bodies may go to worker
+processes. disassemble() lists the instructions of a code object and of
+the functions it has called.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_ast import Node, Call, FunctionDef, Literal, STATEMENT_EXECUTED
+from .zeus_exceptions import (
+    ZeusRuntimeError,
+    ZeusTypeError,
+    ZeusValueError,
+    ZeusDivisionByZeroError,
+)
+from .zeus_memo import MISSING
+from .zeus_optimizer import loop_frames, UNSET_INVARIANT
+from .zeus_parallel import AUTO, automatic
+from .zeus_resolver import resolve_function, resolve_statement
+from .zeus_runtime import SlotFrame, UNASSIGNED, UNDEFINED
+from .zeus_trampoline import store_memo
+
+if TYPE_CHECKING:
+    from .zeus_evaluator import ZeusEvaluator
+    from .zeus_runtime import ZeusRuntime
+
+# Default number of compiled programs and functions kept per VM
+MAX_ENTRIES = 1024
+
+OPNAMES = (
+    "LOAD_LOCAL",  # slot: push a local, looked up by name while unassigned
+    "LOAD_CONST",  # const: push a constant
+    "LOAD_NAME",  # name: push a variable, builtin or undefined-variable message
+    "STORE_LOCAL",  # slot: pop into a local
+    "STORE_NAME",  # name: pop into a variable of the current scope
+    "BINARY_OP",  # operator index: replace the top two values with the result
+    "POP_JUMP_IF_FALSE",  # target: pop, jump if falsy
+    "JUMP",  # target
+    "FOR_ITER",  # target: under the loop value, push the iterator's next item or jump
+    "POP_TOP",
+    "DUP_TOP",
+    "CALL_FUNCTION",  # const (name, argc): user function, or pattern through the evaluator
+    "CALL_BUILTIN",  # const (function, name, argc)
+    "UNARY_OP",  # operator index
+    "LOOKUP_LOCAL",  # slot: push a local or variable, UNDEFINED if there is none
+    "LOOKUP_NAME",  # name: push a variable, UNDEFINED if there is none
+    "JUMP_IF_DEFINED",  # target: jump if the top is not UNDEFINED, else pop it
+    "GET_ITER",
+    "END_FOR",  # drop the iterator under the loop value
+    "MARK_EXECUTED",  # a None statement value becomes STATEMENT_EXECUTED
+    "BUILD_LIST",  # count
+    "BUILD_DICT",  # pair count
+    "LOAD_INVARIANT",  # const (frame, index): push a hoisted value, UNDEFINED if unset
+    "STORE_INVARIANT",  # const (frame, index): keep the top as a hoisted value
+    "ENTER_HOISTED",  # const (frame, size)
+    "EXIT_HOISTED",
+    "ENTER_FRAME",  # const (slots, names): run what follows in a SlotFrame of its own
+    "EXIT_FRAME",  # write the frame's variables to the enclosing scope
+    "DEFINE_FUNCTION",  # const definition
+    "TEACH_PATTERN",  # const definition source
+    "ATHENA_COMMAND",  # const command
+    "RUN_CLOSURE",  # const closure: push its value for the runtime
+    "RAISE",  # const (exception class, message)
+    "RETURN_VALUE",
+)
+
+(
+    LOAD_LOCAL,
+    LOAD_CONST,
+    LOAD_NAME,
+    STORE_LOCAL,
+    STORE_NAME,
+    BINARY_OP,
+    POP_JUMP_IF_FALSE,
+    JUMP,
+    FOR_ITER,
+    POP_TOP,
+    DUP_TOP,
+    CALL_FUNCTION,
+    CALL_BUILTIN,
+    UNARY_OP,
+    LOOKUP_LOCAL,
+    LOOKUP_NAME,
+    JUMP_IF_DEFINED,
+    GET_ITER,
+    END_FOR,
+    MARK_EXECUTED,
+    BUILD_LIST,
+    BUILD_DICT,
+    LOAD_INVARIANT,
+    STORE_INVARIANT,
+    ENTER_HOISTED,
+    EXIT_HOISTED,
+    ENTER_FRAME,
+    EXIT_FRAME,
+    DEFINE_FUNCTION,
+    TEACH_PATTERN,
+    ATHENA_COMMAND,
+    RUN_CLOSURE,
+    RAISE,
+    RETURN_VALUE,
+) = range(len(OPNAMES))
+
+# Arguments disassemble() shows as jump targets, constants, names or slots
+_JUMPS = frozenset((POP_JUMP_IF_FALSE, JUMP, FOR_ITER, JUMP_IF_DEFINED))
+_NAMES = frozenset((LOAD_NAME, STORE_NAME, LOOKUP_NAME))
+_SLOTS = frozenset((LOAD_LOCAL, STORE_LOCAL, LOOKUP_LOCAL))
+_COUNTS = frozenset((BINARY_OP, UNARY_OP, BUILD_LIST, BUILD_DICT))
+
+# Blocks a frame leaves with cleanup, also when an error unwinds it
+_HOISTED, _LOCALS = 0, 1
+
+
+class ZeusCode:
+    """Compiled bytecode of one program or user function."""
+
+    __slots__ = ("name", "instructions", "consts", "names", "fallbacks", "varnames",
+                 "slots", "param_slots", "is_function", "tails")
+
+    def __init__(self, name: str, instructions: List[int], consts: Tuple[Any, ...],
+                 names: Tuple[str, ...], fallbacks: Tuple[Any, ...], varnames: Tuple[str, ...],
+                 param_slots: Tuple[int, ...], is_function: bool):
+        self.name = name
+        # Opcode and argument pairs
+        self.instructions = instructions
+        self.consts = consts
+        self.names = names
+        # Value of each name when no scope defines it
+        self.fallbacks = fallbacks
+        self.varnames = varnames
+        self.slots = {name: slot for slot, name in enumerate(varnames)}
+        self.param_slots = param_slots
+        self.is_function = is_function
+        # Calls in tail position, by the offset they return to: whether the result passes
+        # through an if statement, which reads None as STATEMENT_EXECUTED
+        self.tails = _tail_calls(instructions) if is_function else {}
+
+    def __repr__(self):
+        kind = "function" if self.is_function else "program"
+        return f"<ZeusCode {kind} {self.name}, {len(self.instructions) // 2} instructions>"
+
+
+def _tail_calls(instructions: List[int]) -> Dict[int, bool]:
+    """Offsets after each CALL_FUNCTION whose result the code returns unchanged."""
+    tails = {}
+    for pc in range(0, len(instructions), 2):
+        if instructions[pc] != CALL_FUNCTION:
+            continue
+        target, wrapped = pc + 2, False
+        while True:
+            op = instructions[target]
+            if op == JUMP:
+                target = instructions[target + 1]
+            elif op == MARK_EXECUTED and not wrapped:
+                target, wrapped = target + 2, True
+            else:
+                break
+        if op == RETURN_VALUE:
+            tails[pc + 2] = wrapped
+    return tails
+
+
+class _Assembler:
+    """Emits the instructions of one code object."""
+
+    def __init__(self, vm: "ZeusVM", varnames: Tuple[str, ...] = ()):
+        self.vm = vm
+        self.instructions: List[int] = []
+        self.consts: List[Any] = []
+        self._const_index: Dict[tuple, int] = {}
+        self.names: List[str] = []
+        self._name_index: Dict[str, int] = {}
+        self.varnames = varnames
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        """Append an instruction, returning its offset for patching jumps."""
+        self.instructions.extend((op, arg))
+        return len(self.instructions) - 2
+
+    def patch(self, offset: int, target: Optional[int] = None):
+        """Point the jump at offset to target, by default the next instruction."""
+        self.instructions[offset + 1] = len(self.instructions) if target is None else target
+
+    def here(self) -> int:
+        return len(self.instructions)
+
+    def const(self, value: Any) -> int:
+        # Literals are shared, keyed by type so 1, 1.0 and True stay apart
+        key = None
+        if isinstance(value, (type(None), bool, int, float, str)):
+            key = (value.__class__, value)
+            index = self._const_index.get(key)
+            if index is not None:
+                return index
+        self.consts.append(value)
+        if key is not None:
+            self._const_index[key] = len(self.consts) - 1
+        return len(self.consts) - 1
+
+    def name(self, name: str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def build(self, name: str, param_slots: Tuple[int, ...] = (), is_function: bool = False) -> ZeusCode:
+        self.emit(RETURN_VALUE)
+        return ZeusCode(
+            name, self.instructions, tuple(self.consts), tuple(self.names),
+            tuple(self.vm.fallback(n) for n in self.names), self.varnames, param_slots, is_function,
+        )
+
+
+class _CodeCompiler:
+    """Compiles resolved Zeus AST nodes into an assembler, each leaving one value."""
+
+    def __init__(self, vm: "ZeusVM", asm: _Assembler):
+        self.vm = vm
+        self.asm = asm
+        self.builtins = vm.evaluator.builtins
+        self._compilers = {
+            "empty": lambda node: self._constant(None),
+            "literal": lambda node: self._constant(node.value),
+            "identifier": self._identifier,
+            "assignment": self._assignment,
+            "binary_op": self._binary_op,
+            "unary_op": self._unary_op,
+            "function_call": self._function_call,
+            "parenthesized": lambda node: self.compile(node.expression),
+            "if_statement": self._if_statement,
+            "while_loop": self._while_loop,
+            "for_loop": self._for_loop,
+            "parallel_for_loop": self._parallel_for_loop,
+            "function_definition": lambda node: self.asm.emit(DEFINE_FUNCTION, self.asm.const(node)),
+            "athena_command": lambda node: self.asm.emit(ATHENA_COMMAND, self.asm.const(node.command)),
+            "pattern_definition": lambda node: self.asm.emit(
+                TEACH_PATTERN, self.asm.const(node.definition)
+            ),
+            "list": self._list,
+            "dict": self._dict,
+            "block": lambda node: self._statements(node.statements),
+            "module": lambda node: self._statements(node.body),
+            "hoisted_loop": self._hoisted_loop,
+            "invariant": self._invariant,
+            "local_frame": self._local_frame,
+            "local": lambda node: self.asm.emit(LOAD_LOCAL, node.slot),
+            "local_assignment": self._assignment,
+            "local_for_loop": self._for_loop,
+            "local_argument": self._argument,
+        }
+
+    def compile(self, node: Optional[Node]):
+        """Emit code leaving the value of node on the stack."""
+        if node is None:
+            return self._constant(None)
+        if node.error:
+            return self._raise(RuntimeError, node.error)
+        compiler = self._compilers.get(node.type)
+        if compiler is None:
+            return self._raise(RuntimeError, f"Unknown node type: {node.type}")
+        return compiler(node)
+
+    def _constant(self, value: Any):
+        self.asm.emit(LOAD_CONST, self.asm.const(value))
+
+    def _raise(self, error_class: type, message: str):
+        self.asm.emit(RAISE, self.asm.const((error_class, message)))
+
+    def _statements(self, statements: Optional[Tuple[Node, ...]]):
+        if not statements:
+            return self._constant(None)
+        for index, statement in enumerate(statements):
+            if index:
+                self.asm.emit(POP_TOP)
+            self.compile(statement)
+
+    def _loop_body(self, statements: Optional[Tuple[Node, ...]]):
+        # Each statement's value replaces the loop value on the stack
+        for statement in statements or ():
+            self.asm.emit(POP_TOP)
+            self.compile(statement)
+
+    def _identifier(self, node: Node):
+        self.asm.emit(LOAD_NAME, self.asm.name(node.name))
+
+    def _assignment(self, node: Node):
+        if node.expression is None:
+            return self._raise(RuntimeError, "Assignment must have either 'expression' or 'value'")
+        self.compile(node.expression)
+        self.asm.emit(DUP_TOP)
+        if node.type == "local_assignment":
+            self.asm.emit(STORE_LOCAL, node.slot)
+        else:
+            self.asm.emit(STORE_NAME, self.asm.name(node.variable))
+
+    def _binary_op(self, node: Node):
+        self.compile(node.left)
+        self.compile(node.right)
+        index = self.vm.binary_index.get(node.operator)
+        if index is None:
+            return self._raise(ZeusValueError, f"Unknown operator: {node.operator}")
+        self.asm.emit(BINARY_OP, index)
+
+    def _unary_op(self, node: Node):
+        self.compile(node.operand)
+        index = self.vm.unary_index.get(node.operator)
+        if index is None:
+            return self._raise(RuntimeError, f"Unknown unary operator: {node.operator}")
+        self.asm.emit(UNARY_OP, index)
+
+    def _argument(self, arg: Node):
+        if arg.type == "local_argument":
+            lookup = (LOOKUP_LOCAL, arg.slot)
+        elif isinstance(arg, Call) and not arg.arguments:
+            lookup = (LOOKUP_NAME, self.asm.name(arg.name))
+        else:
+            return self.compile(arg)
+
+        # A bare name in argument position may be a variable parsed as a call
+        self.asm.emit(*lookup)
+        jump = self.asm.emit(JUMP_IF_DEFINED)
+        self._call(arg.name, ())
+        self.asm.patch(jump)
+
+    def _function_call(self, node: Node):
+        self._call(node.name, node.arguments)
+
+    def _call(self, name: str, arguments: Tuple[Node, ...]):
+        for arg in arguments:
+            self._argument(arg)
+        if name in self.builtins:
+            self.asm.emit(CALL_BUILTIN, self.asm.const((self.builtins[name], name, len(arguments))))
+        else:
+            self.asm.emit(CALL_FUNCTION, self.asm.const((name, len(arguments))))
+
+    def _if_statement(self, node: Node):
+        then_branch = node.then_branch or None
+        else_branch = node.else_branch or None
+
+        if isinstance(node.condition, Literal):
+            # Branch decided at compile time, as left by dead-branch elimination
+            taken = then_branch if node.condition.value else else_branch
+            if taken is None:
+                return self._constant(STATEMENT_EXECUTED)
+            self.compile(taken)
+            self.asm.emit(MARK_EXECUTED)
+            return
+
+        self.compile(node.condition)
+        to_else = self.asm.emit(POP_JUMP_IF_FALSE)
+        if then_branch is not None:
+            self.compile(then_branch)
+            self.asm.emit(MARK_EXECUTED)
+        else:
+            self._constant(STATEMENT_EXECUTED)
+        to_end = self.asm.emit(JUMP)
+        self.asm.patch(to_else)
+        if else_branch is not None:
+            self.compile(else_branch)
+            self.asm.emit(MARK_EXECUTED)
+        else:
+            self._constant(STATEMENT_EXECUTED)
+        self.asm.patch(to_end)
+
+    def _while_loop(self, node: Node):
+        self._constant(None)
+        top = self.asm.here()
+        self.compile(node.condition)
+        to_end = self.asm.emit(POP_JUMP_IF_FALSE)
+        self._loop_body(node.body)
+        self.asm.emit(JUMP, top)
+        self.asm.patch(to_end)
+
+    def _for_loop(self, node: Node):
+        self.compile(node.iterable)
+        self.asm.emit(GET_ITER)
+        self._constant(None)
+        top = self.asm.here()
+        to_end = self.asm.emit(FOR_ITER)
+        if node.type == "local_for_loop":
+            self.asm.emit(STORE_LOCAL, node.slot)
+        else:
+            self.asm.emit(STORE_NAME, self.asm.name(node.iterator))
+        self._loop_body(node.body)
+        self.asm.emit(JUMP, top)
+        self.asm.patch(to_end)
+        self.asm.emit(END_FOR)
+
+    def _parallel_for_loop(self, node: Node):
+        # Iterations may run in worker processes, which the closures handle
+        self.asm.emit(RUN_CLOSURE, self.asm.const(self.vm.evaluator.compiler.compile(node)))
+
+    def _list(self, node: Node):
+        for element in node.elements:
+            self.compile(element)
+        self.asm.emit(BUILD_LIST, len(node.elements))
+
+    def _dict(self, node: Node):
+        for key_node, value_node in node.items:
+            self.compile(key_node)
+            self.compile(value_node)
+        self.asm.emit(BUILD_DICT, len(node.items))
+
+    def _hoisted_loop(self, node: Node):
+        self.asm.emit(ENTER_HOISTED, self.asm.const((node.frame, node.size)))
+        self.compile(node.loop)
+        self.asm.emit(EXIT_HOISTED)
+
+    def _invariant(self, node: Node):
+        index = self.asm.const((node.frame, node.index))
+        self.asm.emit(LOAD_INVARIANT, index)
+        jump = self.asm.emit(JUMP_IF_DEFINED)
+        self.compile(node.expression)
+        self.asm.emit(STORE_INVARIANT, index)
+        self.asm.patch(jump)
+
+    def _local_frame(self, node: Node):
+        slots = {name: slot for slot, name in enumerate(node.names)}
+        self.asm.emit(ENTER_FRAME, self.asm.const((slots, tuple(node.names))))
+        self.compile(node.statement)
+        self.asm.emit(EXIT_FRAME)
+
+
+class _Frame:
+    """A code object running on the VM."""
+
+    __slots__ = ("code", "pc", "stack", "values", "varnames", "blocks", "memo", "wrap")
+
+    def __init__(self, code: ZeusCode, values: Optional[List[Any]], memo: Optional[tuple] = None,
+                 wrap: bool = False):
+        self.code = code
+        self.pc = 0
+        self.stack: List[Any] = []
+        # Slot values and names of the SlotFrame the code's locals live in
+        self.values = values
+        self.varnames = code.varnames
+        # (_HOISTED, frame, previous) and (_LOCALS, SlotFrame, previous values and names)
+        self.blocks: List[tuple] = []
+        # Memoized calls the result answers, a chain as on the trampoline
+        self.memo = memo
+        # Whether a None result is returned as STATEMENT_EXECUTED, after wrapped tail calls
+        self.wrap = wrap
+
+
+class ZeusVM:
+    """Compiles Zeus ASTs to bytecode and runs it, bound to one evaluator."""
+
+    def __init__(self, evaluator: "ZeusEvaluator", max_entries: int = MAX_ENTRIES):
+        self.evaluator = evaluator
+        self.max_entries = max_entries
+
+        # Operator tables indexed by BINARY_OP and UNARY_OP arguments
+        self.binary_ops = tuple(evaluator.binary_ops.items())
+        self.binary_index = {op: index for index, (op, _) in enumerate(self.binary_ops)}
+        self.unary_ops = tuple(evaluator.unary_ops.items())
+        self.unary_index = {op: index for index, (op, _) in enumerate(self.unary_ops)}
+
+        # Code objects keyed by id() of their AST, which is kept alive alongside
+        self._programs: "OrderedDict[int, tuple]" = OrderedDict()
+        self._functions: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.calls = 0
+        self.tail_calls = 0
+
+    # Compiling
+
+    def get_program(self, node: Optional[Node]) -> ZeusCode:
+        """Return the code of a top-level statement or module, compiling it on first use."""
+        return self._get(self._programs, node, self._compile_program)
+
+    def get_function(self, node: FunctionDef) -> ZeusCode:
+        """Return the code of a user function, compiling it on first use."""
+        return self._get(self._functions, node, self._compile_function)
+
+    def _get(self, cache: "OrderedDict[int, tuple]", node: Any, compile_node) -> ZeusCode:
+        key = id(node)
+        with self._lock:
+            entry = cache.get(key)
+            if entry is not None and entry[0] is node:
+                cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        code = compile_node(node)
+
+        with self._lock:
+            cache[key] = (node, code)
+            cache.move_to_end(key)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+        return code
+
+    def _compile_program(self, node: Optional[Node]) -> ZeusCode:
+        if self.evaluator.parallel.policy == AUTO:
+            node = automatic(node)
+        node = resolve_statement(self.evaluator.optimizer.optimize(node))
+        asm = _Assembler(self)
+        _CodeCompiler(self, asm).compile(node)
+        return asm.build("<program>")
+
+    def _compile_function(self, node: FunctionDef) -> ZeusCode:
+        resolved, slots = resolve_function(self.evaluator.optimizer.optimize_function(node))
+        varnames = tuple(sorted(slots, key=slots.get))
+        asm = _Assembler(self, varnames)
+        _CodeCompiler(self, asm)._statements(resolved.body)
+        param_slots = tuple(slots[name] for name in resolved.parameters or ())
+        return asm.build(node.name, param_slots, is_function=True)
+
+    # Running
+
+    def run(self, code: ZeusCode, runtime: "ZeusRuntime") -> Any:
+        """Run program code against runtime and return its value."""
+        return self._execute(runtime, _Frame(code, None))
+
+    def call_function(self, runtime: "ZeusRuntime", name: str, node: FunctionDef, args: List[Any]) -> Any:
+        """Call a user function from outside VM code."""
+        frame = self._enter(runtime, name, node, args, 0)
+        if not isinstance(frame, _Frame):
+            return frame
+        return self._execute(runtime, frame)
+
+    def _enter(self, runtime: "ZeusRuntime", name: str, node: FunctionDef, args: List[Any],
+               depth: int, caller: Optional[_Frame] = None, wrapped: bool = False) -> Any:
+        """
+        Return a frame for a call with its SlotFrame pushed, or the call's memoized value.
+
+        A tail call passes the caller it replaces, whose SlotFrame is popped
+        and whose memoized calls the new frame answers.
+        """
+        key = None
+        table = runtime.memo.function_table(name, node, runtime.functions, self.evaluator.builtins)
+        if table is not None:
+            key, value = table.lookup(args)
+            if value is not MISSING:
+                return value
+
+        memo = None
+        wrap = False
+        if caller is not None:
+            runtime.pop_scope()
+            memo = caller.memo
+            if wrapped and memo is not None and memo[0] is not None:
+                memo = (None, None, True, memo)
+            wrap = caller.wrap or wrapped
+            self.tail_calls += 1
+        if key is not None:
+            memo = (table, key, False, memo)
+
+        max_depth = self.evaluator.trampoline.max_depth
+        if depth >= max_depth:
+            raise ZeusRuntimeError(f"Maximum recursion depth of {max_depth} exceeded", context=name)
+
+        code = self.get_function(node)
+        slot_frame = SlotFrame(code.slots)
+        values = slot_frame.values
+        # Missing arguments default to None, extra ones are ignored
+        for index, slot in enumerate(code.param_slots):
+            values[slot] = args[index] if index < len(args) else None
+        runtime.push_frame(slot_frame)
+        self.calls += 1
+        return _Frame(code, values, memo, wrap)
+
+    def _execute(self, runtime: "ZeusRuntime", frame: _Frame) -> Any:
+        """The dispatch loop: runs frame and every user function call it makes."""
+        callers: List[_Frame] = []
+        code = frame.code
+        instructions = code.instructions
+        consts = code.consts
+        stack = frame.stack
+        push = stack.append
+        pop = stack.pop
+        values = frame.values
+        varnames = frame.varnames
+        pc = frame.pc
+        lookup = runtime.lookup_variable
+        binary_ops = self.binary_ops
+        unary_ops = self.unary_ops
+
+        try:
+            while True:
+                op = instructions[pc]
+                arg = instructions[pc + 1]
+                pc += 2
+
+                if op == LOAD_LOCAL:
+                    value = values[arg]
+                    if value is UNASSIGNED:
+                        # Until the slot is assigned, the name resolves through the scope stack
+                        value = lookup(varnames[arg])
+                        if value is UNDEFINED:
+                            value = self.fallback(varnames[arg])
+                    push(value)
+
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+
+                elif op == LOAD_NAME:
+                    value = lookup(code.names[arg])
+                    push(code.fallbacks[arg] if value is UNDEFINED else value)
+
+                elif op == STORE_LOCAL:
+                    values[arg] = pop()
+
+                elif op == STORE_NAME:
+                    runtime.set_variable(code.names[arg], pop())
+
+                elif op == BINARY_OP:
+                    right = pop()
+                    left = stack[-1]
+                    symbol, function = binary_ops[arg]
+                    try:
+                        stack[-1] = function(left, right)
+                    except ZeroDivisionError:
+                        raise ZeusDivisionByZeroError()
+                    except TypeError:
+                        raise ZeusTypeError(symbol, "compatible types", left)
+                    except Exception as e:
+                        raise ZeusRuntimeError(f"Error in {symbol} operation: {e}", context=symbol)
+
+                elif op == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+
+                elif op == JUMP:
+                    pc = arg
+
+                elif op == FOR_ITER:
+                    try:
+                        push(next(stack[-2]))
+                    except StopIteration:
+                        pc = arg
+
+                elif op == POP_TOP:
+                    pop()
+
+                elif op == DUP_TOP:
+                    push(stack[-1])
+
+                elif op == CALL_FUNCTION:
+                    name, argc = consts[arg]
+                    if argc:
+                        args = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        args = []
+                    node = runtime.get_function(name)
+                    if not isinstance(node, FunctionDef):
+                        # Learned patterns and legacy functions are applied by the evaluator
+                        push(self.evaluator._call_by_name(name, args, runtime))
+                        continue
+                    wrapped = code.tails.get(pc)
+                    if (wrapped is not None and not frame.blocks
+                            and self.evaluator.trampoline.is_closed(name, node, runtime.functions)):
+                        # Tail call: the callee's result is this frame's, so it takes its place
+                        callee = self._enter(runtime, name, node, args, len(callers), frame, wrapped)
+                        if not isinstance(callee, _Frame):
+                            push(callee)
+                            continue
+                    else:
+                        callee = self._enter(runtime, name, node, args, len(callers) + 1)
+                        if not isinstance(callee, _Frame):
+                            push(callee)
+                            continue
+                        frame.pc = pc
+                        callers.append(frame)
+                    frame = callee
+                    code = frame.code
+                    instructions = code.instructions
+                    consts = code.consts
+                    stack = frame.stack
+                    push = stack.append
+                    pop = stack.pop
+                    values = frame.values
+                    varnames = frame.varnames
+                    pc = 0
+
+                elif op == RETURN_VALUE:
+                    result = pop()
+                    if code.is_function:
+                        runtime.pop_scope()
+                        if frame.memo is not None:
+                            store_memo(frame.memo, result)
+                        if result is None and frame.wrap:
+                            result = STATEMENT_EXECUTED
+                    if not callers:
+                        return result
+                    frame = callers.pop()
+                    code = frame.code
+                    instructions = code.instructions
+                    consts = code.consts
+                    stack = frame.stack
+                    push = stack.append
+                    pop = stack.pop
+                    values = frame.values
+                    varnames = frame.varnames
+                    pc = frame.pc
+                    push(result)
+
+                elif op == CALL_BUILTIN:
+                    function, name, argc = consts[arg]
+                    if argc:
+                        args = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        args = ()
+                    try:
+                        push(function(*args))
+                    except Exception as e:
+                        raise RuntimeError(f"Error calling {name}: {e}")
+
+                elif op == UNARY_OP:
+                    stack[-1] = unary_ops[arg][1](stack[-1])
+
+                elif op == LOOKUP_LOCAL:
+                    value = values[arg]
+                    push(lookup(varnames[arg]) if value is UNASSIGNED else value)
+
+                elif op == LOOKUP_NAME:
+                    push(lookup(code.names[arg]))
+
+                elif op == JUMP_IF_DEFINED:
+                    if stack[-1] is UNDEFINED:
+                        pop()
+                    else:
+                        pc = arg
+
+                elif op == GET_ITER:
+                    stack[-1] = iter(stack[-1])
+
+                elif op == END_FOR:
+                    value = pop()
+                    stack[-1] = value
+
+                elif op == MARK_EXECUTED:
+                    if stack[-1] is None:
+                        stack[-1] = STATEMENT_EXECUTED
+
+                elif op == BUILD_LIST:
+                    if arg:
+                        items = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        items = []
+                    push(items)
+
+                elif op == BUILD_DICT:
+                    result = {}
+                    if arg:
+                        items = stack[-2 * arg:]
+                        del stack[-2 * arg:]
+                        for index in range(0, len(items), 2):
+                            result[items[index]] = items[index + 1]
+                    push(result)
+
+                elif op == LOAD_INVARIANT:
+                    hoisted, index = consts[arg]
+                    value = loop_frames.active[hoisted][index]
+                    push(UNDEFINED if value is UNSET_INVARIANT else value)
+
+                elif op == STORE_INVARIANT:
+                    hoisted, index = consts[arg]
+                    loop_frames.active[hoisted][index] = stack[-1]
+
+                elif op == ENTER_HOISTED:
+                    hoisted, size = consts[arg]
+                    frame.blocks.append((_HOISTED, hoisted, loop_frames.enter(hoisted, size)))
+
+                elif op == EXIT_HOISTED:
+                    _, hoisted, previous = frame.blocks.pop()
+                    loop_frames.exit(hoisted, previous)
+
+                elif op == ENTER_FRAME:
+                    slots, names = consts[arg]
+                    slot_frame = SlotFrame(slots)
+                    runtime.push_frame(slot_frame)
+                    frame.blocks.append((_LOCALS, slot_frame, (values, varnames)))
+                    values = frame.values = slot_frame.values
+                    varnames = frame.varnames = names
+
+                elif op == EXIT_FRAME:
+                    block = frame.blocks.pop()
+                    frame.values, frame.varnames = block[2]
+                    values, varnames = block[2]
+                    self._exit_locals(runtime, block[1])
+
+                elif op == DEFINE_FUNCTION:
+                    node = consts[arg]
+                    runtime.define_function(node.name, node)
+                    push(f"Function {node.name} defined")
+
+                elif op == TEACH_PATTERN:
+                    push(runtime.teach_pattern(consts[arg]))
+
+                elif op == ATHENA_COMMAND:
+                    push(runtime.execute_athena_command(consts[arg]))
+
+                elif op == RUN_CLOSURE:
+                    push(consts[arg](runtime))
+
+                elif op == RAISE:
+                    error_class, message = consts[arg]
+                    raise error_class(message)
+
+                else:
+                    raise RuntimeError(f"Unknown opcode: {op}")
+        except BaseException:
+            # Leave every block and frame of this run, innermost first
+            frame.pc = pc
+            callers.append(frame)
+            while callers:
+                self._unwind(runtime, callers.pop())
+            raise
+
+    def _unwind(self, runtime: "ZeusRuntime", frame: _Frame):
+        while frame.blocks:
+            block = frame.blocks.pop()
+            if block[0] == _HOISTED:
+                loop_frames.exit(block[1], block[2])
+            else:
+                frame.values, frame.varnames = block[2]
+                self._exit_locals(runtime, block[1])
+        if frame.code.is_function:
+            runtime.pop_scope()
+
+    def fallback(self, name: str) -> Any:
+        """Value of a name no scope defines: its builtin, or an error message."""
+        builtins = self.evaluator.builtins
+        if name in builtins:
+            return builtins[name]
+        return f"Error: Variable '{name}' is not defined"
+
+    @staticmethod
+    def _exit_locals(runtime: "ZeusRuntime", slot_frame: SlotFrame):
+        # Assigned variables land in the enclosing scope, as without a frame
+        runtime.pop_scope()
+        for name, value in slot_frame.items():
+            runtime.set_variable(name, value)
+
+    # Inspecting
+
+    def clear(self):
+        """Drop all compiled code."""
+        with self._lock:
+            self._programs.clear()
+            self._functions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get code cache and execution statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "programs": len(self._programs),
+                "functions": len(self._functions),
+                "max_size": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total * 100) if total > 0 else 0,
+                "calls": self.calls,
+                "tail_calls": self.tail_calls,
+            }
+
+    def disassemble(self, code: ZeusCode) -> str:
+        """List the instructions of code, and of the compiled functions it calls."""
+        lines = [self._disassemble(code)]
+        called = {value[0] for value in code.consts if _is_call(value)}
+        with self._lock:
+            functions = [entry[1] for entry in self._functions.values()]
+        for function in functions:
+            if function.name in called and function is not code:
+                lines.append(self._disassemble(function))
+        return "\n\n".join(lines)
+
+    def _disassemble(self, code: ZeusCode) -> str:
+        kind = "function" if code.is_function else "program"
+        lines = [f"{kind} {code.name}:"]
+        targets = {
+            code.instructions[pc + 1]
+            for pc in range(0, len(code.instructions), 2)
+            if code.instructions[pc] in _JUMPS
+        }
+        for pc in range(0, len(code.instructions), 2):
+            op, arg = code.instructions[pc], code.instructions[pc + 1]
+            marker = ">>" if pc in targets else "  "
+            line = f"{marker} {pc:4d} {OPNAMES[op]:<18}"
+            if op in _JUMPS:
+                line += f"{arg:4d}"
+            elif op in _NAMES:
+                line += f"{arg:4d} ({code.names[arg]})"
+            elif op in _SLOTS:
+                # Program code names its slots in ENTER_FRAME
+                line += f"{arg:4d} ({code.varnames[arg]})" if code.is_function else f"{arg:4d}"
+            elif op == BINARY_OP:
+                line += f"{arg:4d} ({self.binary_ops[arg][0]})"
+            elif op == UNARY_OP:
+                line += f"{arg:4d} ({self.unary_ops[arg][0]})"
+            elif op in _COUNTS:
+                line += f"{arg:4d}"
+            elif op in (RETURN_VALUE, POP_TOP, DUP_TOP, GET_ITER, END_FOR, MARK_EXECUTED,
+                        EXIT_HOISTED, EXIT_FRAME):
+                pass
+            else:
+                line += f"{arg:4d} ({_describe(code.consts[arg])})"
+            lines.append(line.rstrip())
+        return "\n".join(lines)
+
+
+def _is_call(value: Any) -> bool:
+    return isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], str) \
+        and isinstance(value[1], int)
+
+
+def _describe(value: Any) -> str:
+    """Short form of a constant for disassembly."""
+    if isinstance(value, FunctionDef):
+        return f"def {value.name}"
+    if isinstance(value, tuple) and value and callable(value[0]) and len(value) == 3:
+        return f"{value[1]}/{value[2]}"
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], type):
+        return f"{value[0].__name__}: {value[1]}"
+    if _is_call(value):
+        return f"{value[0]}/{value[1]}"
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], dict):
+        return ", ".join(value[1])
+    if callable(value):
+        return getattr(value, "__name__", "closure")
+    return repr(value)
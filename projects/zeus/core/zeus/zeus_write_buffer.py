@@ -0,0 +1,198 @@
+"""
+Write-behind buffer for variables ZeusRuntime persists through Ermis.
+
+Each store through Ermis is a blocking round trip through Olympus security,
+the storage router and the database. Global assignments are therefore
+coalesced per name and written in batches: when enough names are pending,
+when the oldest pending write is older than the flush interval, at statement
+and session boundaries, and at interpreter shutdown. A batch is sent to Ermis
+at once, so it costs one round trip and Cronos stores it in one transaction.
+
+Durability modes:
+
+- sync: every write is stored immediately, as before the buffer existed
+- batched: writes are coalesced and flushed as described above
+- memory: nothing is persisted, variables live in the runtime only
+"""
+
+import atexit
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+from .zeus_arrays import storable
+
+if TYPE_CHECKING:
+    from .zeus_ermis_interface import ZeusErmisInterface
+
+# Durability modes
+SYNC = "sync"
+BATCHED = "batched"
+MEMORY = "memory"
+
+MODES = (SYNC, BATCHED, MEMORY)
+
+# Pending names that trigger a flush
+DEFAULT_MAX_PENDING = 256
+
+# Seconds a write may stay pending before a timer flushes it
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+# Buffers flushed at shutdown
+_buffers: "weakref.WeakSet[WriteBehindBuffer]" = weakref.WeakSet()
+
+
+class WriteBehindBuffer:
+    """Coalesces Ermis stores per name and flushes them in batches."""
+
+    def __init__(self, ermis: "ZeusErmisInterface", mode: str = BATCHED,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 on_stored: Optional[Callable[[Iterable[str]], None]] = None):
+        self.ermis = ermis
+        self.mode = self._check_mode(mode)
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        # Told the names of each write once it is in storage
+        self.on_stored = on_stored
+
+        # Latest (value, metadata) per name, in first-write order
+        self._pending: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._oldest: Optional[float] = None
+        # Flushes the pending writes once the oldest reaches the flush interval
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        # Serializes flushes, so an older batch never lands after a newer one
+        self._flush_lock = threading.Lock()
+
+        self.writes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.stored = 0
+        self.failures = 0
+
+        _buffers.add(self)
+
+    @staticmethod
+    def _check_mode(mode: str) -> str:
+        mode = str(mode).strip().lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown durability mode: {mode}")
+        return mode
+
+    def set_mode(self, mode: str):
+        """Change the durability mode, flushing writes made under the old one."""
+        mode = self._check_mode(mode)
+        self.flush()
+        self.mode = mode
+
+    def write(self, name: str, value: Any, metadata: Optional[Dict[str, Any]] = None):
+        """Persist a value according to the durability mode."""
+        metadata = metadata or {}
+        if self.mode == MEMORY:
+            return
+        if self.mode == SYNC:
+            with self._lock:
+                self.writes += 1
+            try:
+                stored = self.ermis.store(name, storable(value), metadata)
+            except Exception as e:
+                logger.warning(f"Failed to persist variable {name}: {e}")
+                stored = False
+            if not stored:
+                # The value stays in the runtime, only persistence is lost
+                logger.warning(f"Failed to persist variables: {name}")
+            elif self.on_stored is not None:
+                self.on_stored((name,))
+            with self._lock:
+                if stored:
+                    self.stored += 1
+                else:
+                    self.failures += 1
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self.writes += 1
+            if name in self._pending:
+                self.coalesced += 1
+            self._pending[name] = (value, metadata)
+            first = self._oldest is None
+            if first:
+                self._oldest = now
+            due = (
+                len(self._pending) >= self.max_pending
+                or now - self._oldest >= self.flush_interval
+            )
+            if first and not due:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def pending(self) -> int:
+        """Number of names waiting to be stored."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Store every pending write, returns how many were stored."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._pending = {}
+                self._oldest = None
+                timer, self._timer = self._timer, None
+                self.flushes += 1
+            if timer is not None:
+                timer.cancel()
+
+            try:
+                results = self.ermis.store_many(
+                    {name: (storable(value), metadata) for name, (value, metadata) in batch.items()}
+                )
+            except Exception as e:
+                logger.warning(f"Failed to persist {len(batch)} variables: {e}")
+                results = {}
+
+            stored = [name for name in batch if results.get(name)]
+            if len(stored) < len(batch):
+                # The values stay in the runtime, only persistence is lost
+                failed = [name for name in batch if not results.get(name)]
+                logger.warning(f"Failed to persist variables: {', '.join(failed)}")
+            if stored and self.on_stored is not None:
+                self.on_stored(stored)
+
+            with self._lock:
+                self.stored += len(stored)
+                self.failures += len(batch) - len(stored)
+            return len(stored)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write-behind statistics."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "pending": len(self._pending),
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "stored": self.stored,
+                "failures": self.failures,
+            }
+
+
+def flush_all():
+    """Flush every live buffer."""
+    for buffer in list(_buffers):
+        buffer.flush()
+
+
+atexit.register(flush_all)